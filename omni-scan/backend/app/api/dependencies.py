@@ -5,6 +5,9 @@ from typing import Dict, Any, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.database import get_supabase
+from app.core.logging import get_logger
+
+logger = get_logger("api.dependencies")
 
 security = HTTPBearer(auto_error=False)
 
@@ -47,4 +50,27 @@ async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCrede
     try:
         return await get_current_user(credentials)
     except HTTPException:
-        return None
\ No newline at end of file
+        return None
+
+
+async def get_current_user_is_pro(
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional)
+) -> bool:
+    """
+    Abonnement Pro de l'utilisateur courant, lu côté serveur dans user_stats
+    (même source que le contrôle de quota), jamais dans les métadonnées éditables
+    par l'utilisateur. Dépendance FastAPI : résolue une seule fois par requête.
+    """
+    if not current_user:
+        return False
+    
+    supabase = get_supabase()
+    try:
+        response = supabase.table("user_stats").select("subscription_status")\
+            .eq("user_id", current_user.get("id")).single().execute()
+    except Exception as e:
+        # Pas de ligne user_stats (nouvel utilisateur) ou base indisponible : non Pro
+        logger.warning(f"Statut d'abonnement illisible pour {current_user.get('id')}: {e}")
+        return False
+    
+    return bool(response.data) and response.data.get("subscription_status") == "pro"
@@ -1,20 +1,22 @@
 """Health check endpoint"""
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime, timezone
 from app.core.config import settings
 from app.schemas.common import HealthResponse
+from app.services.ocr import get_ocr_manager
 
 router = APIRouter()
 
 
-@router.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Vérifier l'état de l'application et des services"""
+def _build_health() -> HealthResponse:
+    ocr_manager = get_ocr_manager()
+    
     # Vérifier l'état des services
     services_status = {
         "database": True,  # Pourrait être vérifié via Supabase
-        "ocr": True,       # Pourrait être vérifié via Tesseract
+        "ocr": ocr_manager.is_ready,
         "ai": True         # Pourrait être vérifié via OpenAI
     }
     
@@ -22,5 +24,22 @@ async def health_check():
         status="healthy",
         timestamp=datetime.now(timezone.utc).isoformat(),
         version=settings.app_version,
-        services=services_status
-    )
\ No newline at end of file
+        services=services_status,
+        ready=ocr_manager.is_ready,
+        warmup=ocr_manager.warmup
+    )
+
+
+@router.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Vérifier l'état de l'application et des services (liveness, avec le drapeau ready)"""
+    return _build_health()
+
+
+@router.get("/health/ready", response_model=HealthResponse)
+async def readiness_check():
+    """Readiness : 503 tant que le préchauffage OCR n'est pas terminé, ou s'il a échoué"""
+    health = _build_health()
+    if not health.ready:
+        return JSONResponse(status_code=503, content=health.model_dump())
+    return health
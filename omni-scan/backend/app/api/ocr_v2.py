@@ -20,12 +20,14 @@ logger = get_logger("api.ocr_v2")
 
 
 @router.get("/ocr/engines", status_code=status.HTTP_200_OK)
-async def get_ocr_engines():
+async def get_ocr_engines(refresh: bool = False):
     """
     Obtenir la liste des moteurs OCR disponibles et leurs capacités.
+    
+    Les capacités sont servies depuis le registre ; refresh=true force une nouvelle sonde.
     """
     try:
-        info = await get_engine_info()
+        info = await get_engine_info(refresh=refresh)
         return {
             "success": True,
             "data": info
@@ -48,7 +50,10 @@ async def process_document_ocr(
     extract_formulas: Optional[bool] = Form(False),
     enable_preprocessing: Optional[bool] = Form(True),
     enable_postprocessing: Optional[bool] = Form(True),
+    preprocessing_profile: Optional[str] = Form(None),
     regions: Optional[str] = Form(None),  # JSON string pour les régions
+    detect_regions: Optional[bool] = Form(None),
+    min_confidence: Optional[float] = Form(0.0),
     current_user: Optional[dict] = Depends(get_current_user_optional)
 ):
     """
@@ -63,7 +68,10 @@ async def process_document_ocr(
         extract_formulas: Extraire les formules mathématiques
         enable_preprocessing: Activer le prétraitement d'image
         enable_postprocessing: Activer le post-traitement du texte
+        preprocessing_profile: Profil de prétraitement (fast, balanced, quality)
         regions: Zones d'intérêt (format JSON)
+        detect_regions: N'OCRiser que les blocs de texte détectés (défaut : OCR_REGION_DETECTION)
+        min_confidence: Seuil de confiance par page ; en dessous, la page est reprise par un moteur plus lourd
     """
     logger.info(f"OCR v2 processing: {file.filename}, engine: {engine}, format: {output_format}")
     
@@ -102,7 +110,10 @@ async def process_document_ocr(
             "extract_formulas": extract_formulas,
             "enable_preprocessing": enable_preprocessing,
             "enable_postprocessing": enable_postprocessing,
+            "preprocessing_profile": preprocessing_profile,
             "regions": regions_list,
+            "detect_regions": detect_regions,
+            "min_confidence": min_confidence,
             "use_gpu": os.getenv("ENABLE_GPU", "false").lower() == "true"
         }
         
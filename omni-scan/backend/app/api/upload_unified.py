@@ -3,14 +3,20 @@ API d'upload unifiée
 Remplace upload.py et upload_simple.py
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Header, Form, Depends, BackgroundTasks
+from fastapi import (
+    APIRouter, UploadFile, File, HTTPException, status, Header, Form, Depends, Request,
+    WebSocket, WebSocketDisconnect
+)
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 
 from app.core.logging import get_logger
 from app.services.upload_unified import UnifiedUploadService, UploadMode, UploadConfig
 from app.services.ai_analysis_unified import AIProvider
-from app.api.dependencies import get_current_user_optional, get_current_user
-from app.services.job_manager import job_manager, JobType
+from app.api.dependencies import get_current_user_optional, get_current_user, get_current_user_is_pro
+from app.services.job_manager import job_manager, JobType, JobStatus
+from app.services.job_scheduler import PRIORITY_PRO, PRIORITY_STANDARD
+from app.services.job_events import format_sse
 
 router = APIRouter()
 logger = get_logger("api.upload_unified")
@@ -25,6 +31,7 @@ async def upload_document(
     language: Optional[str] = Form(None),
     include_structured_data: Optional[bool] = Form(True),
     chapter_summaries: Optional[bool] = Form(False),
+    use_cache: Optional[bool] = Form(True),
     current_user: Optional[dict] = Depends(get_current_user_optional)
 ):
     """
@@ -32,6 +39,7 @@ async def upload_document(
     
     - Si authentifié : stockage complet avec historique
     - Si non authentifié : mode simple sans stockage
+    - use_cache=false : relancer OCR et analyse IA sans réutiliser les résultats en cache
     """
     logger.info(f"Document upload: {file.filename}, authenticated: {bool(current_user)}")
     
@@ -70,7 +78,8 @@ async def upload_document(
         "detail_level": detail_level,
         "language": language,
         "include_structured_data": include_structured_data,
-        "chapter_summaries": chapter_summaries
+        "chapter_summaries": chapter_summaries,
+        "use_cache": use_cache
     }
     
     try:
@@ -106,14 +115,13 @@ async def process_upload_background(
     """
     Traite l'upload en arrière-plan et met à jour le job.
     """
-    job = job_manager.get_job(job_id)
-    if not job:
+    if not job_manager.get_job(job_id):
         logger.error(f"Job {job_id} not found")
         return
     
     try:
         # Démarrer le job
-        job.start()
+        job_manager.start_job(job_id)
         job_manager.update_job_progress(job_id, 0, "Initialisation du traitement...")
         
         # Config simple sans stockage
@@ -132,8 +140,13 @@ async def process_upload_background(
         def progress_callback(current: int, total: int, message: str):
             job_manager.update_job_progress(job_id, current, message)
         
-        # Injecter le callback dans le service
+        # Analyse IA partielle publiée pendant l'OCR (mode pipeline)
+        def partial_result_callback(partial: dict):
+            job_manager.update_job_partial_result(job_id, partial)
+        
+        # Injecter les callbacks dans le service
         upload_service._progress_callback = progress_callback
+        upload_service._partial_result_callback = partial_result_callback
         
         # Traiter l'upload
         result = await upload_service.process_upload(
@@ -154,18 +167,24 @@ async def process_upload_background(
 
 @router.post("/upload/simple", status_code=status.HTTP_202_ACCEPTED)
 async def upload_document_simple(
-    background_tasks: BackgroundTasks,
+    request: Request,
     file: UploadFile = File(...),
     x_ai_provider: Optional[str] = Header(None),
     x_ai_key: Optional[str] = Header(None),
     detail_level: Optional[str] = Form("medium"),
     language: Optional[str] = Form(None),
     include_structured_data: Optional[bool] = Form(True),
-    chapter_summaries: Optional[bool] = Form(False)
+    chapter_summaries: Optional[bool] = Form(False),
+    use_cache: Optional[bool] = Form(True),
+    current_user: Optional[dict] = Depends(get_current_user_optional),
+    is_pro: bool = Depends(get_current_user_is_pro)
 ):
     """
-    Upload simple sans authentification ni stockage.
+    Upload simple sans stockage.
     Retourne immédiatement un job_id pour suivre la progression.
+    
+    Le job passe par la file de traitement : priorité aux comptes Pro,
+    équité entre utilisateurs, 429/503 si la file est pleine.
     """
     logger.info(f"Document upload: {file.filename}")
     
@@ -178,12 +197,15 @@ async def upload_document_simple(
         # Pour un PDF, on ne sait pas encore le nombre de pages
         estimated_steps = 100  # Estimation haute
     
-    job = job_manager.create_job(JobType.UPLOAD, estimated_steps)
-    job.metadata = {
-        "filename": file.filename,
-        "size": len(contents),
-        "content_type": file.content_type
-    }
+    job = job_manager.create_job(
+        JobType.UPLOAD,
+        estimated_steps,
+        metadata={
+            "filename": file.filename,
+            "size": len(contents),
+            "content_type": file.content_type
+        }
+    )
     
     # Options pour le traitement
     options = {
@@ -192,24 +214,32 @@ async def upload_document_simple(
         "detail_level": detail_level,
         "language": language,
         "include_structured_data": include_structured_data,
-        "chapter_summaries": chapter_summaries
+        "chapter_summaries": chapter_summaries,
+        "use_cache": use_cache
     }
     
-    # Lancer le traitement en arrière-plan
-    background_tasks.add_task(
-        process_upload_background,
+    # Équité par compte, ou par adresse IP pour les utilisateurs anonymes
+    if current_user:
+        user_key = f"user:{current_user.get('id')}"
+    else:
+        user_key = f"ip:{request.client.host if request.client else 'unknown'}"
+    
+    # Mettre le traitement en file (QueueFullError -> 429/503)
+    queue = await job_manager.submit_job(
         job.id,
-        contents,
-        file.filename,
-        options
+        lambda: process_upload_background(job.id, contents, file.filename, options),
+        user_key,
+        PRIORITY_PRO if is_pro else PRIORITY_STANDARD
     )
     
     # Retourner immédiatement l'ID du job
     return {
         "job_id": job.id,
         "status": "pending",
-        "message": "Traitement en cours...",
-        "status_url": f"/api/v1/job/{job.id}/status"
+        "message": "Traitement en file d'attente...",
+        "status_url": f"/api/v1/job/{job.id}/status",
+        "events_url": f"/api/v1/job/{job.id}/events",
+        "queue": queue
     }
 
 
@@ -380,4 +410,81 @@ async def get_job_status(job_id: str):
             detail="Job non trouvé"
         )
     
-    return job.to_dict()
\ No newline at end of file
+    # Le résultat n'est lu qu'une fois le job terminé : les polls restent légers
+    if job.status == JobStatus.COMPLETED:
+        job.result = job_manager.get_job_result(job_id)
+    
+    return job.to_dict()
+
+
+@router.get("/job/{job_id}/result", status_code=status.HTTP_200_OK)
+async def get_job_result(job_id: str):
+    """
+    Récupérer le résultat d'un job terminé, streamé depuis le stockage.
+    """
+    chunks = job_manager.stream_job_result(job_id)
+    
+    if chunks is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Résultat non disponible"
+        )
+    
+    return StreamingResponse(chunks, media_type="application/json")
+
+
+@router.get("/job/{job_id}/partial", status_code=status.HTTP_200_OK)
+async def get_job_partial_result(job_id: str):
+    """
+    Récupérer la dernière analyse intermédiaire d'un job en cours (upload en pipeline).
+    """
+    chunks = job_manager.stream_job_partial_result(job_id)
+    
+    if chunks is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analyse intermédiaire non disponible"
+        )
+    
+    return StreamingResponse(chunks, media_type="application/json")
+
+
+@router.get("/job/{job_id}/events", status_code=status.HTTP_200_OK)
+async def stream_job_events(job_id: str):
+    """
+    Suivre la progression d'un job en Server-Sent Events (remplace le polling du statut).
+    """
+    if not job_manager.get_job(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job non trouvé"
+        )
+    
+    async def events():
+        async for event in job_manager.watch_job(job_id):
+            yield format_sse(event)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/job/{job_id}/ws")
+async def job_events_websocket(websocket: WebSocket, job_id: str):
+    """
+    Suivre la progression d'un job par WebSocket (mêmes événements que le flux SSE).
+    """
+    await websocket.accept()
+    
+    if not job_manager.get_job(job_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Job non trouvé")
+        return
+    
+    try:
+        async for event in job_manager.watch_job(job_id):
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.debug(f"Job {job_id} events: client disconnected")
@@ -30,7 +30,8 @@ async def omniscan_exception_handler(request: Request, exc: OmniScanException):
                 "code": exc.error_code,
                 "details": exc.details
             }
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -64,6 +64,18 @@ class QuotaExceededError(OmniScanException):
         )
 
 
+class QueueFullError(OmniScanException):
+    """File de traitement saturée"""
+    def __init__(self, message: str, status_code: int, retry_after: int, limit: int):
+        super().__init__(
+            message=message,
+            status_code=status_code,
+            error_code="QUEUE_FULL",
+            details={"retry_after": retry_after, "limit": limit}
+        )
+        self.headers = {"Retry-After": str(retry_after)}
+
+
 class AuthenticationError(OmniScanException):
     """Erreur d'authentification"""
     def __init__(self, message: str = "Authentication required"):
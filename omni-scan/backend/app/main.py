@@ -62,10 +62,31 @@ async def lifespan(app: FastAPI):
     
     logger.info("API key manager initialized with default keys")
     
+    # Éviction périodique des jobs terminés
+    from app.services.job_manager import job_manager
+    await job_manager.start_cleanup_task()
+    
+    # Workers de la file de traitement des jobs
+    job_manager.scheduler.start()
+    
+    # Préchauffage OCR (modèles, workers, inférence à blanc) ; état exposé par /health
+    from app.services.ocr import get_ocr_manager
+    await get_ocr_manager().start_warm_up()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    
+    # Arrêter les moteurs et le pool de workers OCR
+    await get_ocr_manager().cleanup()
+    
+    # Arrêter le nettoyage des jobs et fermer leur stockage
+    await job_manager.close()
+
+    # Fermer les connexions persistantes vers les providers IA
+    from app.services.ai_http import get_ai_client_pool
+    await get_ai_client_pool().close()
 
 
 # Créer l'application FastAPI
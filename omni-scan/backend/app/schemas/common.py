@@ -48,6 +48,8 @@ class HealthResponse(BaseModel):
     timestamp: str = Field(..., description="Timestamp actuel")
     version: str = Field(..., description="Version de l'API")
     services: Optional[Dict[str, bool]] = Field(None, description="État des services")
+    ready: bool = Field(True, description="Préchauffage OCR terminé : prêt à recevoir du trafic")
+    warmup: Optional[Dict[str, Any]] = Field(None, description="Détail du préchauffage OCR")
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -59,7 +61,9 @@ class HealthResponse(BaseModel):
                     "database": True,
                     "ocr": True,
                     "ai": True
-                }
+                },
+                "ready": True,
+                "warmup": {"status": "ready", "workers": 4, "engines": ["lightweight"], "duration": 12.4}
             }
         }
     )
\ No newline at end of file
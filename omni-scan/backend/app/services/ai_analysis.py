@@ -6,6 +6,7 @@ from app.core.logging import get_logger
 from app.services.ai_prompts import get_prompt_for_type
 from app.utils.document_classifier import classify_document
 from app.utils.document_extractor import extract_invoice_data
+from app.utils.document_features import get_document_features
 
 logger = get_logger("ai_analysis")
 
@@ -70,13 +71,14 @@ async def analyze_text(
             "structured_data": None
         }
     
-    # Classifier le document
-    doc_type, doc_confidence, doc_metadata = classify_document(text)
+    # Classifier le document (caractéristiques partagées avec l'extraction)
+    features = get_document_features(text)
+    doc_type, doc_confidence, doc_metadata = classify_document(features)
     
     # Essayer d'extraire les données structurées selon le type de document
     structured_data = None
     if doc_type == "invoice":
-        invoice_data = extract_invoice_data(text)
+        invoice_data = extract_invoice_data(features)
         if invoice_data['confidence'] > 0.5:
             structured_data = invoice_data
     
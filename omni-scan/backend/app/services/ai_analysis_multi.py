@@ -8,7 +8,9 @@ import httpx
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.services.ai_prompts import get_prompt_for_type
-from app.utils.document_classifier import DocumentClassifier
+from app.services.ai_http import get_ai_client_pool
+from app.utils.document_classifier import classify_document
+from app.utils.document_features import get_document_features
 from app.services.document_analyzer import document_analyzer
 
 logger = get_logger("ai_analysis")
@@ -24,9 +26,10 @@ class AIProvider(Enum):
 class AIAnalyzer:
     """Analyseur IA avec support multi-providers"""
     
-    def __init__(self, provider: AIProvider = AIProvider.OPENAI):
+    def __init__(self, provider: AIProvider = AIProvider.OPENAI, client: Optional[httpx.AsyncClient] = None):
         self.provider = provider
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Client injecté, sinon client partagé du provider (connexions gardées entre les analyses)
+        self.client = client or get_ai_client_pool().get(provider.value)
         
     async def analyze_text(self, text: str, detail_level: str = "medium", 
                           language: Optional[str] = None, 
@@ -37,8 +40,11 @@ class AIAnalyzer:
         if not text or len(text.strip()) < 10:
             return self._empty_analysis("Texte trop court pour l'analyse")
         
+        # Caractéristiques du document partagées par l'analyse, la classification et les prompts
+        features = get_document_features(text)
+        
         # Analyser d'abord la structure du document
-        doc_analysis = document_analyzer.analyze_document(text, {
+        doc_analysis = document_analyzer.analyze_document(features, {
             'include_chapter_summaries': chapter_summaries or detail_level in ['high', 'detailed']
         })
         
@@ -277,13 +283,21 @@ class AIAnalyzer:
                           language: Optional[str] = None,
                           include_structured_data: bool = True,
                           text_preview: Optional[str] = None) -> str:
-        """Prompt système pour l'analyse adapté selon les options"""
-        
-        # Détection préliminaire du type de document si un aperçu est fourni
-        doc_type = "general"
-        if text_preview:
-            classifier = DocumentClassifier()
-            doc_type, _, _ = classifier.classify(text_preview[:1000])
+        """Prompt système pour l'analyse adapté selon les options (une fois par document)"""
+        if not text_preview:
+            return self._build_system_prompt("general", detail_level, language, include_structured_data)
+        
+        # Détection préliminaire du type de document sur l'aperçu
+        return get_document_features(text_preview).memoize(
+            ("multi.system_prompt", detail_level, language, include_structured_data),
+            lambda: self._build_system_prompt(
+                classify_document(text_preview[:1000])[0], detail_level, language, include_structured_data
+            )
+        )
+    
+    def _build_system_prompt(self, doc_type: str, detail_level: str, language: Optional[str],
+                             include_structured_data: bool) -> str:
+        """Construire le prompt système pour un type de document"""
         
         # Configuration du niveau de détail avec prompts spécialisés
         detail_config = {
@@ -365,8 +379,12 @@ class AIAnalyzer:
                            language: Optional[str] = None,
                            include_structured_data: bool = True) -> Dict:
         """Analyse de secours sans IA"""
+        features = get_document_features(text)
+        text_lower = features.lower
+        word_count = features.word_count
+        
         # Détection améliorée de la langue
-        sample = text.lower()[:500]
+        sample = text_lower[:500]
         
         # Mots français courants
         french_words = ['le', 'la', 'les', 'de', 'des', 'un', 'une', 'et', 'est', 'dans', 
@@ -398,7 +416,6 @@ class AIAnalyzer:
         
         # Détection basique de catégorie
         category = "autre"
-        text_lower = text.lower()
         if any(word in text_lower for word in ["facture", "invoice", "total", "€", "$"]):
             category = "facture"
         elif any(word in text_lower for word in ["contrat", "contract", "agreement", "accord"]):
@@ -416,21 +433,21 @@ class AIAnalyzer:
             key_points = [
                 f"Type détecté : {category}",
                 "Langue : français",
-                f"{len(text.split())} mots environ"
+                f"{word_count} mots environ"
             ]
         elif lang == "es":
             summary = f"Documento de {len(text)} caracteres en español"
             key_points = [
                 f"Tipo detectado: {category}",
                 "Idioma: español",
-                f"{len(text.split())} palabras aproximadamente"
+                f"{word_count} palabras aproximadamente"
             ]
         else:
             summary = f"Document of {len(text)} characters in English"
             key_points = [
                 f"Detected type: {category}",
                 "Language: English",
-                f"Approximately {len(text.split())} words"
+                f"Approximately {word_count} words"
             ]
         
         # Détection du type de document
@@ -507,7 +524,8 @@ class AIAnalyzer:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # Client partagé : fermé à l'arrêt de l'application
+        pass
 
 
 # Fonction helper pour compatibilité
@@ -1,14 +1,24 @@
 """Service d'analyse IA unifié avec support multi-providers"""
 
+import asyncio
 import json
-from typing import Dict, Optional
+from dataclasses import replace
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional, Tuple
 from enum import Enum
 import httpx
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.api_key_manager import get_api_key_manager
 from app.services.ai_prompts import get_prompt_for_type
-from app.utils.document_classifier import DocumentClassifier
+from app.services.ai_http import get_ai_client_pool, get_provider_limiter
+from app.services.ai_router import NoProviderAvailable, get_provider_router, hedge_providers, is_pinned, pin_provider
+from app.services.ai_chunking import (
+    TextChunk, chunked_analysis_mode, default_chunk_chars, merge_chunk_analyses, split_into_chunks
+)
+from app.services.ai_cache import ai_response_cache, bypass_cache
+from app.utils.document_classifier import classify_document
+from app.utils.document_features import get_document_features
 from app.services.document_analyzer import document_analyzer
 
 logger = get_logger("ai_analysis")
@@ -22,19 +32,47 @@ class AIProvider(Enum):
     OLLAMA = "ollama"
 
 
+# Modèle utilisé par provider (OpenAI : configurable)
+PROVIDER_MODELS = {
+    AIProvider.ANTHROPIC: "claude-3-haiku-20240307",
+    AIProvider.GROQ: "mixtral-8x7b-32768",
+    AIProvider.OPENROUTER: "meta-llama/llama-3.2-3b-instruct:free",
+    AIProvider.OLLAMA: "llama2",
+}
+
+
+def get_model_name(provider: AIProvider) -> str:
+    """Modèle interrogé pour un provider"""
+    if provider == AIProvider.OPENAI:
+        return settings.openai_model or "gpt-4o-mini"
+    return PROVIDER_MODELS[provider]
+
+
 class AIAnalyzer:
     """Analyseur IA unifié avec support multi-providers et gestion sécurisée des clés"""
     
-    def __init__(self, provider: AIProvider = AIProvider.OPENAI):
+    def __init__(self, provider: AIProvider = AIProvider.OPENAI, client: Optional[httpx.AsyncClient] = None):
         self.provider = provider
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Client injecté (tests, appelant qui gère le sien), sinon pool partagé par provider
+        self._client = client
         self.key_manager = get_api_key_manager()
-        
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client_for(self.provider)
+
+    def _client_for(self, provider: AIProvider) -> httpx.AsyncClient:
+        """Client HTTP d'un provider (connexions gardées entre les analyses)"""
+        if self._client is not None:
+            return self._client
+        return get_ai_client_pool().get(provider.value)
+
     async def __aenter__(self):
         return self
-        
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # Les clients du pool restent ouverts : ils sont fermés à l'arrêt de l'application
+        pass
         
     async def analyze_text(
         self, 
@@ -43,7 +81,10 @@ class AIAnalyzer:
         language: Optional[str] = None, 
         include_structured_data: bool = True,
         chapter_summaries: bool = False,
-        custom_api_key: Optional[str] = None
+        custom_api_key: Optional[str] = None,
+        use_cache: bool = True,
+        chunked: Optional[bool] = None,
+        chunk_analyses: Optional[Dict[str, Awaitable[Dict]]] = None
     ) -> Dict[str, any]:
         """
         Analyser le texte avec le provider configuré.
@@ -55,26 +96,44 @@ class AIAnalyzer:
             include_structured_data: Inclure les données structurées
             chapter_summaries: Inclure les résumés par chapitre
             custom_api_key: Clé API personnalisée (optionnelle)
+            use_cache: Réutiliser une analyse déjà en cache (False : réinterroger le provider)
+            chunked: Analyser tout le texte par morceaux (None : selon AI_CHUNKED_ANALYSIS et la longueur)
+            chunk_analyses: Analyses de morceaux déjà lancées, par texte du morceau (AnalysisPipeline)
         """
         
         if not text or len(text.strip()) < 10:
             return self._empty_analysis("Texte trop court pour l'analyse")
         
+        # Caractéristiques du document partagées par l'analyse, la classification et les prompts
+        features = get_document_features(text)
+        
         # Analyser d'abord la structure du document
-        doc_analysis = document_analyzer.analyze_document(text, {
+        doc_analysis = document_analyzer.analyze_document(features, {
             'include_chapter_summaries': chapter_summaries or detail_level in ['high', 'detailed']
         })
         
-        # Préparer le texte pour l'analyse
-        analysis_text = self._prepare_text_for_analysis(text, doc_analysis)
+        # Documents longs : tout le texte analysé par morceaux plutôt qu'un extrait
+        if chunked is None:
+            chunked = chunked_analysis_mode() == "auto" and len(text) > default_chunk_chars()
+        
+        if chunked:
+            run_analysis = partial(
+                self._perform_chunked_analysis, text, detail_level, language, include_structured_data, chunk_analyses
+            )
+        else:
+            # Préparer le texte pour l'analyse
+            analysis_text = self._prepare_text_for_analysis(text, doc_analysis)
+            run_analysis = partial(self._perform_analysis, analysis_text, detail_level, language, include_structured_data)
         
         try:
-            # Si une clé API personnalisée est fournie, l'utiliser dans un contexte isolé
-            if custom_api_key:
-                async with self.key_manager.temporary_key(self.provider.value, custom_api_key):
-                    ai_result = await self._perform_analysis(analysis_text, detail_level, language, include_structured_data)
-            else:
-                ai_result = await self._perform_analysis(analysis_text, detail_level, language, include_structured_data)
+            # Avec la clé de l'utilisateur, le texte reste chez le provider qu'il a choisi
+            with bypass_cache(not use_cache), pin_provider(bool(custom_api_key)):
+                # Si une clé API personnalisée est fournie, l'utiliser dans un contexte isolé
+                if custom_api_key:
+                    async with self.key_manager.temporary_key(self.provider.value, custom_api_key):
+                        ai_result = await run_analysis()
+                else:
+                    ai_result = await run_analysis()
             
             # Enrichir le résultat avec l'analyse de document
             return self._enrich_result(ai_result, doc_analysis)
@@ -83,6 +142,17 @@ class AIAnalyzer:
             logger.error(f"Erreur analyse IA ({self.provider.value}): {str(e)}", exc_info=True)
             return self._error_analysis(str(e))
     
+    def pipeline(
+        self,
+        detail_level: str = "medium",
+        language: Optional[str] = None,
+        include_structured_data: bool = True,
+        use_cache: bool = True,
+        on_partial: Optional[Callable[[Dict], None]] = None
+    ) -> "AnalysisPipeline":
+        """Analyse alimentée au fil de l'extraction du texte (voir AnalysisPipeline)"""
+        return AnalysisPipeline(self, detail_level, language, include_structured_data, use_cache, on_partial)
+    
     async def _perform_analysis(
         self,
         text: str,
@@ -90,17 +160,167 @@ class AIAnalyzer:
         language: Optional[str],
         include_structured_data: bool
     ) -> Dict:
-        """Effectuer l'analyse selon le provider"""
+        """Effectuer l'analyse selon le provider (réponse en cache si le même texte a déjà été analysé)"""
+        
+        system_prompt = self._get_system_prompt(detail_level, language, include_structured_data, text)
+        cache_key = ai_response_cache.make_key(
+            self.provider.value, get_model_name(self.provider), system_prompt, text
+        )
+        cached = ai_response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Analyse IA servie depuis le cache ({self.provider.value})")
+            return cached
+        
+        provider, result = await self._route_analysis(text, detail_level, language, include_structured_data)
+        
+        # Une analyse de secours (clé absente, provider indisponible) est en cache à part :
+        # elle ne doit pas masquer la réponse du provider une fois celui-ci disponible
+        if result.get("analysis_type") != "fallback":
+            if provider != self.provider:
+                # Réponse d'un provider alternatif : en cache sous son nom et son modèle
+                cache_key = ai_response_cache.make_key(
+                    provider.value, get_model_name(provider), system_prompt, text
+                )
+            ai_response_cache.set(cache_key, result)
+        return result
+    
+    def _has_credentials(self, provider: AIProvider) -> bool:
+        """Clé API disponible pour un provider (Ollama : local, sans clé)"""
+        if provider == AIProvider.OLLAMA:
+            return True
+        api_key = self.key_manager.get_key(provider.value)
+        if provider == AIProvider.OPENAI:
+            api_key = api_key or settings.openai_api_key
+        return bool(api_key) and api_key != "disabled-for-testing"
+    
+    async def _route_analysis(
+        self,
+        text: str,
+        detail_level: str,
+        language: Optional[str],
+        include_structured_data: bool
+    ) -> Tuple[AIProvider, Dict]:
+        """
+        Interroger le provider demandé, couvert par les providers alternatifs configurés :
+        requête couverte si le provider dépasse son p95, bascule s'il échoue ou si son
+        disjoncteur est ouvert. Retourne le provider qui a répondu et sa réponse.
+        """
+        router = get_provider_router()
+        
+        async def call(provider: AIProvider) -> Tuple[AIProvider, Dict]:
+            # Concurrence et débit bornés par provider, pour tout le processus
+            async with get_provider_limiter(provider.value).slot():
+                return provider, await self._call_provider(
+                    text, detail_level, language, include_structured_data, provider=provider
+                )
+        
+        if is_pinned():
+            # Clé de l'utilisateur : ni bascule, ni disjoncteur (ses erreurs ne concernent que sa clé)
+            return await call(self.provider)
+        
+        hedge_names = hedge_providers()
+        alternates = {
+            provider.value: provider for provider in AIProvider
+            if provider != self.provider and provider.value in hedge_names and self._has_credentials(provider)
+        }
+        ranked = [
+            alternates[name]
+            for name, _ in router.rank([(name, get_model_name(provider)) for name, provider in alternates.items()])
+        ]
+        
+        providers = [self.provider]
+        if ranked and not self._has_credentials(self.provider):
+            # Pas de clé pour le provider demandé : le plus rapide des providers configurés répond
+            logger.info(f"Pas de clé {self.provider.value}, analyse routée vers {ranked[0].value}")
+            providers = ranked
+        else:
+            providers += ranked
+        
+        try:
+            return await router.run(
+                [(provider.value, get_model_name(provider), partial(call, provider)) for provider in providers],
+                is_ok=lambda answer: answer[1].get("analysis_type") != "fallback"
+            )
+        except NoProviderAvailable as e:
+            logger.warning(f"{e}, analyse de secours")
+            return self.provider, self._fallback_analysis(text, detail_level, language, include_structured_data)
+    
+    async def _perform_chunked_analysis(
+        self,
+        text: str,
+        detail_level: str,
+        language: Optional[str],
+        include_structured_data: bool,
+        started: Optional[Dict[str, Awaitable[Dict]]] = None
+    ) -> Dict:
+        """
+        Analyser chaque morceau en parallèle (map) puis fusionner les analyses (reduce).
+        started : analyses déjà en cours, réutilisées pour les morceaux de même texte.
+        """
+        
+        chunks = split_into_chunks(text)
+        if len(chunks) <= 1:
+            return await self._perform_analysis(text, detail_level, language, include_structured_data)
+        
+        started = started or {}
+        reused = sum(1 for chunk in chunks if chunk.text in started)
+        logger.info(
+            f"Analyse par morceaux: {len(chunks)} morceaux, dont {reused} déjà lancé(s) ({self.provider.value})"
+        )
+        results = await asyncio.gather(
+            *(
+                started.get(chunk.text) or self._perform_analysis(chunk.text, detail_level, language, include_structured_data)
+                for chunk in chunks
+            ),
+            return_exceptions=True
+        )
+        
+        analyzed = [(chunk, result) for chunk, result in zip(chunks, results) if not isinstance(result, Exception)]
+        failed = len(chunks) - len(analyzed)
+        if not analyzed:
+            raise results[0]
+        if failed:
+            logger.warning(f"{failed} morceau(x) non analysé(s) sur {len(chunks)}")
+        
+        # Reduce : résumé global à partir des résumés partiels (inutile si aucun provider n'a répondu)
+        reduced = None
+        if any(result.get("analysis_type") != "fallback" for _, result in analyzed):
+            partial_summaries = "\n\n".join(
+                f"{chunk.title}: {result.get('summary', '')}" if chunk.title else result.get("summary", "")
+                for chunk, result in analyzed
+            )
+            try:
+                reduced = await self._perform_analysis(partial_summaries, detail_level, language, False)
+            except Exception as e:
+                logger.warning(f"Fusion des résumés par le provider impossible: {e}")
+        
+        merged = merge_chunk_analyses(
+            [chunk for chunk, _ in analyzed], [result for _, result in analyzed], reduced
+        )
+        if failed:
+            merged["failed_chunks"] = failed
+        return merged
+    
+    async def _call_provider(
+        self,
+        text: str,
+        detail_level: str,
+        language: Optional[str],
+        include_structured_data: bool,
+        provider: Optional[AIProvider] = None
+    ) -> Dict:
+        """Interroger un provider (par défaut celui de l'analyseur)"""
         
-        if self.provider == AIProvider.OPENAI:
+        provider = provider or self.provider
+        if provider == AIProvider.OPENAI:
             return await self._analyze_openai(text, detail_level, language, include_structured_data)
-        elif self.provider == AIProvider.ANTHROPIC:
+        elif provider == AIProvider.ANTHROPIC:
             return await self._analyze_anthropic(text, detail_level, language, include_structured_data)
-        elif self.provider == AIProvider.OPENROUTER:
+        elif provider == AIProvider.OPENROUTER:
             return await self._analyze_openrouter(text, detail_level, language, include_structured_data)
-        elif self.provider == AIProvider.GROQ:
+        elif provider == AIProvider.GROQ:
             return await self._analyze_groq(text, detail_level, language, include_structured_data)
-        elif self.provider == AIProvider.OLLAMA:
+        elif provider == AIProvider.OLLAMA:
             return await self._analyze_ollama(text, detail_level, language, include_structured_data)
         else:
             return self._fallback_analysis(text, detail_level, language, include_structured_data)
@@ -128,8 +348,10 @@ class AIAnalyzer:
         """Enrichir le résultat avec l'analyse de document"""
         
         if doc_analysis.get('is_long_document', False):
-            # Remplacer le résumé par le résumé global
-            ai_result['summary'] = doc_analysis['global_summary']['text'][:500] + "..."
+            # Remplacer le résumé par le résumé global (sauf si tout le texte a été analysé par morceaux)
+            chunked = ai_result.get('analysis_type') == 'chunked'
+            if not chunked:
+                ai_result['summary'] = doc_analysis['global_summary']['text'][:500] + "..."
             
             # Ajouter les informations de structure
             if doc_analysis.get('has_structure'):
@@ -148,7 +370,8 @@ class AIAnalyzer:
             
             # Marquer comme document long
             ai_result['is_long_document'] = True
-            ai_result['analysis_type'] = 'summarized'
+            if not chunked:
+                ai_result['analysis_type'] = 'summarized'
         
         return ai_result
     
@@ -171,7 +394,7 @@ class AIAnalyzer:
         }
         
         data = {
-            "model": settings.openai_model or "gpt-4o-mini",
+            "model": get_model_name(AIProvider.OPENAI),
             "messages": [
                 {"role": "system", "content": self._get_system_prompt(detail_level, language, include_structured_data, text)},
                 {"role": "user", "content": f"Analyse ce texte:\n\n{text}"}
@@ -181,7 +404,7 @@ class AIAnalyzer:
             "response_format": {"type": "json_object"}
         }
         
-        response = await self.client.post(
+        response = await self._client_for(AIProvider.OPENAI).post(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=data
@@ -198,8 +421,8 @@ class AIAnalyzer:
         
         api_key = self.key_manager.get_key("anthropic")
         if not api_key:
-            # Essayer OpenAI en fallback
-            return await self._analyze_openai(text, detail_level, language, include_structured_data)
+            # Pas de bascule ici : le routeur choisit un autre provider et attribue ses mesures
+            return self._fallback_analysis(text, detail_level, language, include_structured_data)
         
         headers = {
             "x-api-key": api_key,
@@ -208,14 +431,14 @@ class AIAnalyzer:
         }
         
         data = {
-            "model": "claude-3-haiku-20240307",
+            "model": get_model_name(AIProvider.ANTHROPIC),
             "max_tokens": 1000,
             "messages": [
                 {"role": "user", "content": f"{self._get_system_prompt(detail_level, language, include_structured_data, text)}\n\nAnalyse ce texte:\n\n{text}"}
             ]
         }
         
-        response = await self.client.post(
+        response = await self._client_for(AIProvider.ANTHROPIC).post(
             "https://api.anthropic.com/v1/messages",
             headers=headers,
             json=data
@@ -241,7 +464,7 @@ class AIAnalyzer:
         }
         
         data = {
-            "model": "mixtral-8x7b-32768",
+            "model": get_model_name(AIProvider.GROQ),
             "messages": [
                 {"role": "system", "content": self._get_system_prompt(detail_level, language, include_structured_data, text)},
                 {"role": "user", "content": f"Analyse ce texte:\n\n{text}"}
@@ -250,7 +473,7 @@ class AIAnalyzer:
             "max_tokens": 1000
         }
         
-        response = await self.client.post(
+        response = await self._client_for(AIProvider.GROQ).post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
             json=data
@@ -282,7 +505,7 @@ class AIAnalyzer:
         }
         
         data = {
-            "model": "meta-llama/llama-3.2-3b-instruct:free",
+            "model": get_model_name(AIProvider.OPENROUTER),
             "messages": [
                 {"role": "system", "content": self._get_system_prompt(detail_level, language, include_structured_data, text)},
                 {"role": "user", "content": f"Analyse ce texte:\n\n{text}"}
@@ -291,7 +514,7 @@ class AIAnalyzer:
             "max_tokens": 1000
         }
         
-        response = await self.client.post(
+        response = await self._client_for(AIProvider.OPENROUTER).post(
             "https://openrouter.ai/api/v1/chat/completions",
             headers=headers,
             json=data
@@ -317,10 +540,10 @@ class AIAnalyzer:
         """Analyse avec Ollama (local)"""
         
         try:
-            response = await self.client.post(
+            response = await self._client_for(AIProvider.OLLAMA).post(
                 "http://localhost:11434/api/generate",
                 json={
-                    "model": "llama2",
+                    "model": get_model_name(AIProvider.OLLAMA),
                     "prompt": f"{self._get_system_prompt(detail_level, language, include_structured_data, text)}\n\nAnalyse ce texte:\n\n{text}",
                     "stream": False
                 }
@@ -337,11 +560,17 @@ class AIAnalyzer:
             return self._fallback_analysis(text, detail_level, language, include_structured_data)
     
     def _get_system_prompt(self, detail_level: str, language: Optional[str], include_structured_data: bool, text: str) -> str:
-        """Générer le prompt système selon les paramètres"""
-        
+        """Générer le prompt système selon les paramètres (une fois par document)"""
+        features = get_document_features(text)
+        return features.memoize(
+            ("unified.system_prompt", detail_level, language, include_structured_data),
+            lambda: self._build_system_prompt(detail_level, language, include_structured_data, text)
+        )
+    
+    def _build_system_prompt(self, detail_level: str, language: Optional[str], include_structured_data: bool, text: str) -> str:
+        """Construire le prompt système pour le type de document détecté"""
         # Classifier le document
-        classifier = DocumentClassifier()
-        doc_type, confidence, metadata = classifier.classify(text)
+        doc_type, confidence, metadata = classify_document(text)
         base_prompt = get_prompt_for_type(doc_type)
         
         # Adapter selon le niveau de détail
@@ -375,19 +604,30 @@ Répondre UNIQUEMENT en JSON valide avec cette structure exacte:
         return base_prompt
     
     def _fallback_analysis(self, text: str, detail_level: str, language: Optional[str], include_structured_data: bool) -> Dict:
-        """Analyse de secours sans IA"""
+        """Analyse de secours sans IA (mise en cache comme les réponses des providers)"""
+        cache_key = ai_response_cache.make_key(
+            "fallback", "rules", f"{detail_level}|{language}|{include_structured_data}", text
+        )
+        result = ai_response_cache.get(cache_key)
+        if result is None:
+            result = self._build_fallback_analysis(text, detail_level, language, include_structured_data)
+            ai_response_cache.set(cache_key, result)
+        return result
+    
+    def _build_fallback_analysis(self, text: str, detail_level: str, language: Optional[str], include_structured_data: bool) -> Dict:
+        """Analyse basique : classification, entités et statistiques du texte"""
         
         # Classifier le document
-        classifier = DocumentClassifier()
-        doc_type, confidence, metadata = classifier.classify(text)
+        features = get_document_features(text)
+        doc_type, confidence, metadata = classify_document(features)
         
         # Extraire les premières phrases pour le résumé
-        sentences = text.split('. ')[:3]
+        sentences = text.split('. ', 3)[:3]
         summary = '. '.join(sentences) if sentences else text[:200]
         
         # Points clés basiques
         key_points = []
-        text_lower = text.lower()
+        text_lower = features.lower
         
         if "experience" in text_lower or "cv" in text_lower:
             key_points.append("Document de type CV/Résumé")
@@ -430,8 +670,8 @@ Répondre UNIQUEMENT en JSON valide avec cette structure exacte:
             result["structured_data"] = {
                 "emails": emails[:5],
                 "amounts": amounts[:5],
-                "word_count": len(text.split()),
-                "char_count": len(text)
+                "word_count": features.word_count,
+                "char_count": features.char_count
             }
         
         return result
@@ -500,6 +740,112 @@ Répondre UNIQUEMENT en JSON valide avec cette structure exacte:
         }
 
 
+class AnalysisPipeline:
+    """
+    Analyse IA démarrée avant la fin de l'OCR.
+    
+    feed() reçoit le texte de chaque page extraite. Les morceaux complets (tous
+    sauf le dernier, qui peut encore grandir) sont analysés aussitôt ; chaque
+    analyse terminée publie un résultat partiel (on_partial). finish() lance
+    l'analyse du texte complet en réutilisant les analyses déjà en cours : le
+    temps total tend vers max(OCR, IA).
+    """
+    
+    # Même séparateur que l'assemblage des pages par les moteurs OCR
+    PAGE_SEPARATOR = "\n\n"
+    
+    def __init__(
+        self,
+        analyzer: AIAnalyzer,
+        detail_level: str,
+        language: Optional[str],
+        include_structured_data: bool,
+        use_cache: bool = True,
+        on_partial: Optional[Callable[[Dict], None]] = None
+    ):
+        self.analyzer = analyzer
+        self.detail_level = detail_level
+        self.language = language
+        self.include_structured_data = include_structured_data
+        self.use_cache = use_cache
+        self.on_partial = on_partial
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._done: Dict[int, Tuple[TextChunk, Dict]] = {}
+        # Texte depuis le début du dernier morceau, le seul qui peut encore changer
+        self._tail: Optional[str] = None
+        self._next_index = 0
+    
+    @property
+    def started_chunks(self) -> int:
+        return len(self._tasks)
+    
+    async def feed(self, page_text: str) -> None:
+        """Ajouter le texte d'une page et lancer l'analyse des morceaux devenus complets"""
+        self._tail = page_text if self._tail is None else self._tail + self.PAGE_SEPARATOR + page_text
+        if chunked_analysis_mode() != "auto" or len(self._tail) <= default_chunk_chars():
+            return
+        
+        # Les chapitres sont détectés ligne à ligne et les morceaux remplis dans l'ordre :
+        # seul le dernier morceau peut encore changer, le texte qui précède n'est plus redécoupé
+        chunks = split_into_chunks(self._tail)
+        position = 0
+        for chunk in chunks[:-1]:
+            position = self._tail.index(chunk.text, position) + len(chunk.text)
+            self._launch(replace(chunk, index=self._next_index))
+            self._next_index += 1
+        if len(chunks) > 1:
+            self._tail = self._tail[self._tail.index(chunks[-1].text, position):]
+    
+    def _launch(self, chunk: TextChunk) -> None:
+        if chunk.text in self._tasks:
+            return
+        with bypass_cache(not self.use_cache):
+            task = asyncio.create_task(self.analyzer._perform_analysis(
+                chunk.text, self.detail_level, self.language, self.include_structured_data
+            ))
+        task.add_done_callback(partial(self._chunk_done, chunk))
+        self._tasks[chunk.text] = task
+    
+    def _chunk_done(self, chunk: TextChunk, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._done[chunk.index] = (chunk, task.result())
+        if self.on_partial is None:
+            return
+        
+        analyzed = [self._done[index] for index in sorted(self._done)]
+        merged = merge_chunk_analyses([chunk for chunk, _ in analyzed], [result for _, result in analyzed])
+        merged["partial"] = True
+        merged["pending_chunks"] = len(self._tasks) - len(self._done)
+        try:
+            self.on_partial(merged)
+        except Exception as e:
+            logger.warning(f"Publication du résultat partiel impossible: {e}")
+    
+    async def finish(self, text: str, chapter_summaries: bool = False) -> Dict:
+        """Analyse du texte complet, à partir des analyses de morceaux déjà lancées"""
+        try:
+            return await self.analyzer.analyze_text(
+                text,
+                detail_level=self.detail_level,
+                language=self.language,
+                include_structured_data=self.include_structured_data,
+                chapter_summaries=chapter_summaries,
+                use_cache=self.use_cache,
+                chunked=True if self._tasks else None,
+                chunk_analyses=self._tasks
+            )
+        finally:
+            # Morceaux absents du découpage final : analyses devenues inutiles
+            self.cancel()
+    
+    def cancel(self) -> None:
+        """Abandonner les analyses de morceaux encore en cours"""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+
 # Fonction helper pour créer un analyseur avec une clé temporaire
 async def analyze_with_custom_key(
     text: str,
@@ -0,0 +1,109 @@
+"""
+Cache des réponses d'analyse IA
+Clé = provider + modèle + prompt système et texte normalisés
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any
+
+from app.core.logging import get_logger
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+logger = get_logger("ai_cache")
+
+# Version du format des entrées : à incrémenter si la structure des analyses change
+CACHE_FORMAT_VERSION = 1
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Lecture du cache désactivée pour la requête en cours (les réponses fraîches sont stockées)
+_bypass: ContextVar[bool] = ContextVar("ai_cache_bypass", default=False)
+
+
+def normalize_text(text: str) -> str:
+    """Forme canonique d'un texte : Unicode NFC, espaces et sauts de ligne réduits à un espace"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+@contextmanager
+def bypass_cache(bypass: bool = True):
+    """Ignorer les entrées existantes pour les analyses lancées dans ce contexte"""
+    token = _bypass.set(bypass)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class AIResponseCache:
+    """Cache des analyses IA (réponses des providers et analyses de secours)"""
+
+    def __init__(self, cache: TieredCache, enabled: bool = True):
+        self.cache = cache
+        self.enabled = enabled
+
+    def make_key(self, provider: str, model: str, prompt: str, text: str) -> str:
+        """Construire la clé de cache d'une analyse"""
+        material = json.dumps(
+            {
+                "v": CACHE_FORMAT_VERSION,
+                "provider": provider,
+                "model": model,
+                "prompt": normalize_text(prompt),
+                "text": normalize_text(text)
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled or _bypass.get():
+            return None
+        try:
+            value = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Lecture du cache IA impossible: {e}")
+            return None
+        # Copie : l'appelant enrichit le résultat en place
+        return copy.deepcopy(value) if value is not None else None
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.cache.set(key, copy.deepcopy(result))
+        except Exception as e:
+            logger.warning(f"Écriture du cache IA impossible: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self.cache.get_stats()}
+
+
+def _build_default_cache() -> AIResponseCache:
+    """Construire le cache à partir des variables d'environnement"""
+    enabled = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    ttl = float(os.getenv("AI_CACHE_TTL_SECONDS", "86400")) or None
+    memory = LRUCache(max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "512")), ttl=ttl)
+
+    disk = None
+    db_path = os.getenv("AI_CACHE_DB_PATH", "")
+    if enabled and db_path:
+        max_bytes = int(os.getenv("AI_CACHE_MAX_DB_MB", "128")) * 1024 * 1024
+        try:
+            disk = SQLiteCache(db_path, max_bytes=max_bytes, ttl=ttl)
+            logger.info(f"Cache IA persistant: {db_path} ({max_bytes // (1024 * 1024)} MB max)")
+        except Exception as e:
+            logger.error(f"Cache IA persistant indisponible ({db_path}): {e}")
+
+    return AIResponseCache(TieredCache(memory, disk), enabled=enabled)
+
+
+# Instance globale
+ai_response_cache = _build_default_cache()
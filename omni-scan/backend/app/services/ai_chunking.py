@@ -0,0 +1,174 @@
+"""
+Analyse IA des documents longs par morceaux (map-reduce)
+
+Le texte est découpé aux limites de chapitres (text_cleaner.detect_chapters),
+les chapitres regroupés en morceaux de taille bornée puis analysés en
+parallèle ; les analyses partielles sont ensuite fusionnées.
+"""
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.text_cleaner import text_cleaner
+
+# Points clés et entités gardés après fusion
+MAX_KEY_POINTS = 10
+MAX_ENTITIES = 30
+
+
+def default_chunk_chars() -> int:
+    """Taille maximale d'un morceau envoyé au provider (caractères)"""
+    return int(os.getenv("AI_CHUNK_MAX_CHARS", "4000"))
+
+
+def chunked_analysis_mode() -> str:
+    """auto : documents plus longs qu'un morceau analysés par morceaux ; off : jamais"""
+    return os.getenv("AI_CHUNKED_ANALYSIS", "auto").lower()
+
+
+@dataclass
+class TextChunk:
+    """Morceau de document : position, titre du premier chapitre couvert et texte"""
+    index: int
+    title: Optional[str]
+    text: str
+
+
+def _split_section(text: str, max_chars: int) -> List[str]:
+    """Découper une section trop longue aux sauts de ligne, sinon en fenêtres fixes"""
+    windows: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.split('\n'):
+        while len(line) > max_chars:
+            if current:
+                windows.append('\n'.join(current))
+                current, size = [], 0
+            windows.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and size + len(line) + 1 > max_chars:
+            windows.append('\n'.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        windows.append('\n'.join(current))
+    return windows
+
+
+def split_into_chunks(text: str, max_chars: Optional[int] = None) -> List[TextChunk]:
+    """
+    Découper un texte en morceaux d'au plus max_chars caractères.
+    Les chapitres consécutifs sont regroupés ; aucun texte n'est perdu
+    (y compris ce qui précède le premier chapitre).
+    """
+    max_chars = max_chars or default_chunk_chars()
+    lines = text.split('\n')
+
+    # Sections : début du texte puis un bloc par chapitre détecté
+    starts = [chapter['start_line'] for chapter in text_cleaner.detect_chapters(text)]
+    titles = {start: lines[start].strip() for start in starts}
+    bounds = [0] + [start for start in starts if start > 0] + [len(lines)]
+    sections = [
+        (titles.get(begin), '\n'.join(lines[begin:end]))
+        for begin, end in zip(bounds, bounds[1:])
+    ]
+
+    chunks: List[TextChunk] = []
+    title: Optional[str] = None
+    parts: List[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal title, parts, size
+        content = '\n'.join(parts).strip()
+        if content:
+            chunks.append(TextChunk(len(chunks), title, content))
+        title, parts, size = None, [], 0
+
+    for section_title, section in sections:
+        if len(section) > max_chars:
+            flush()
+            for window in _split_section(section, max_chars):
+                title, parts = section_title, [window]
+                flush()
+            continue
+        if parts and size + len(section) + 1 > max_chars:
+            flush()
+        if not parts:
+            title = section_title
+        parts.append(section)
+        size += len(section) + 1
+    flush()
+    return chunks
+
+
+def _unique(values: Iterable[Any], key=lambda value: value) -> List[Any]:
+    seen = set()
+    unique = []
+    for value in values:
+        marker = key(value)
+        if marker not in seen:
+            seen.add(marker)
+            unique.append(value)
+    return unique
+
+
+def _most_common(values: Iterable[Any]) -> Optional[Any]:
+    counts = Counter(value for value in values if value)
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def merge_chunk_analyses(
+    chunks: List[TextChunk],
+    results: List[Dict[str, Any]],
+    reduced: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Fusionner les analyses des morceaux (dans l'ordre du document).
+    reduced : analyse des résumés partiels, qui fournit le résumé global et la catégorie.
+    """
+    summaries = [result.get("summary", "") for result in results]
+
+    key_points = _unique(
+        (point for result in results for point in result.get("key_points") or [] if point),
+        key=lambda point: str(point).strip().lower()
+    )[:MAX_KEY_POINTS]
+
+    entities = _unique(
+        (entity for result in results for entity in result.get("entities") or [] if isinstance(entity, dict)),
+        key=lambda entity: (entity.get("type"), str(entity.get("value", "")).strip().lower())
+    )[:MAX_ENTITIES]
+
+    confidences = [
+        result["confidence"] for result in results if isinstance(result.get("confidence"), (int, float))
+    ]
+
+    merged: Dict[str, Any] = {
+        "summary": (reduced or {}).get("summary") or " ".join(summary for summary in summaries if summary),
+        "key_points": key_points,
+        "entities": entities,
+        "language": _most_common(result.get("language") for result in results) or "fr",
+        "category": (reduced or {}).get("category") or _most_common(result.get("category") for result in results) or "other",
+        "confidence": round(sum(confidences) / len(confidences), 2) if confidences else 0.5,
+        "chunk_summaries": [
+            {"index": chunk.index, "title": chunk.title, "summary": summary}
+            for chunk, summary in zip(chunks, summaries)
+        ],
+        "chunk_count": len(chunks),
+        "analysis_type": "chunked"
+    }
+
+    # Données structurées : listes concaténées sans doublons, première valeur gardée sinon
+    structured: Dict[str, Any] = {}
+    for result in results:
+        for key, value in (result.get("structured_data") or {}).items():
+            if isinstance(value, list) and isinstance(structured.get(key, []), list):
+                structured[key] = _unique(structured.get(key, []) + value, key=repr)
+            elif key not in structured:
+                structured[key] = value
+    if structured:
+        merged["structured_data"] = structured
+
+    return merged
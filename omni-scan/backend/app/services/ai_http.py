@@ -0,0 +1,206 @@
+"""
+Clients HTTP partagés pour les providers IA
+
+Un client httpx par provider, gardé pour toute la vie du processus : les
+connexions (DNS, TCP, TLS) sont réutilisées d'une analyse à l'autre au lieu
+d'être rouvertes à chaque upload. HTTP/2 est activé si le paquet h2 est
+installé. Les clients sont fermés à l'arrêt de l'application (lifespan).
+
+Chaque provider a aussi un limiteur (requêtes simultanées, débit) partagé par
+toutes les analyses, y compris les morceaux d'un même document.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.core.logging import get_logger
+
+logger = get_logger("ai_http")
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Délai de lecture par provider (secondes) : génération plus lente en local
+DEFAULT_TIMEOUTS = {
+    "openai": 30.0,
+    "anthropic": 30.0,
+    "groq": 20.0,
+    "openrouter": 45.0,
+    "ollama": 120.0,
+}
+DEFAULT_TIMEOUT = 30.0
+
+# Providers joints en clair (HTTP/1.1 seulement sans TLS)
+LOCAL_PROVIDERS = frozenset({"ollama"})
+
+
+def provider_timeout(provider: str) -> httpx.Timeout:
+    """Délais d'un provider (AI_HTTP_TIMEOUT_<PROVIDER> surcharge la lecture)"""
+    read = float(os.getenv(f"AI_HTTP_TIMEOUT_{provider.upper()}", DEFAULT_TIMEOUTS.get(provider, DEFAULT_TIMEOUT)))
+    connect = float(os.getenv("AI_HTTP_CONNECT_TIMEOUT", "5"))
+    return httpx.Timeout(read, connect=connect, pool=connect)
+
+
+def default_limits() -> httpx.Limits:
+    """Limites de connexions par provider"""
+    return httpx.Limits(
+        max_connections=int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("AI_HTTP_KEEPALIVE_SECONDS", "60")),
+    )
+
+
+class AIClientPool:
+    """Un client httpx persistant par provider"""
+
+    def __init__(self, http2: Optional[bool] = None, limits: Optional[httpx.Limits] = None):
+        if http2 is None:
+            http2 = HTTP2_AVAILABLE and os.getenv("AI_HTTP2", "true").lower() == "true"
+        self.http2 = http2
+        self.limits = limits or default_limits()
+        # Un client est lié à la boucle d'événements qui a ouvert ses connexions
+        self._clients: Dict[str, Tuple[Optional[asyncio.AbstractEventLoop], httpx.AsyncClient]] = {}
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Client du provider, créé à la première demande"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry = self._clients.get(provider)
+        if entry is not None:
+            client_loop, client = entry
+            if not client.is_closed and client_loop in (None, loop):
+                # Créé hors boucle : aucune connexion ouverte, il adopte la boucle courante
+                self._clients[provider] = (client_loop or loop, client)
+                return client
+            # Boucle changée (tests, rechargement) : l'ancien client est fermé avant d'être remplacé
+            self._close_replaced(provider, client_loop, client)
+
+        http2 = self.http2 and provider not in LOCAL_PROVIDERS
+        client = httpx.AsyncClient(timeout=provider_timeout(provider), limits=self.limits, http2=http2)
+        self._clients[provider] = (loop, client)
+        logger.debug(f"Client HTTP créé pour {provider} (http2={http2})")
+        return client
+
+    def _close_replaced(
+        self,
+        provider: str,
+        client_loop: Optional[asyncio.AbstractEventLoop],
+        client: httpx.AsyncClient
+    ) -> None:
+        """Fermer un client remplacé sur sa propre boucle, seule à pouvoir fermer ses connexions"""
+        if client.is_closed:
+            return
+        if client_loop is None or client_loop.is_closed():
+            # Boucle fermée : ses transports ne sont plus fermables, libérés par le ramasse-miettes
+            logger.info(f"Client HTTP {provider} abandonné avec sa boucle d'événements déjà fermée")
+            return
+        if not client_loop.is_running() and not self._loop_running():
+            client_loop.run_until_complete(client.aclose())
+        else:
+            # Boucle active dans un autre thread (ou exécutée plus tard) : fermeture planifiée sur elle
+            asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+        logger.debug(f"Client HTTP remplacé pour {provider} (boucle d'événements changée)")
+
+    @staticmethod
+    def _loop_running() -> bool:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Fermer tous les clients (arrêt de l'application)"""
+        clients, self._clients = self._clients, {}
+        for provider, (_, client) in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Fermeture du client HTTP {provider} impossible: {e}")
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "http2": self.http2,
+            "providers": sorted(provider for provider, (_, client) in self._clients.items() if not client.is_closed),
+        }
+
+
+# Instance globale
+_client_pool: Optional[AIClientPool] = None
+
+
+def get_ai_client_pool() -> AIClientPool:
+    """Pool de clients HTTP partagé par les analyseurs IA"""
+    global _client_pool
+    if _client_pool is None:
+        _client_pool = AIClientPool()
+    return _client_pool
+
+
+class ProviderLimiter:
+    """
+    Requêtes simultanées et débit maximum vers un provider, pour tout le processus.
+    Le débit est réparti en créneaux réguliers (60 / rpm secondes entre deux départs).
+    """
+
+    def __init__(self, max_concurrency: int, requests_per_minute: float = 0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self.in_flight = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # Boucles fermées oubliées (tests, redémarrage de la boucle)
+            self._semaphores = {l: s for l, s in self._semaphores.items() if not l.is_closed()}
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _wait_for_slot(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Réserver une place (concurrence puis débit) pour une requête"""
+        async with self._semaphore():
+            await self._wait_for_slot()
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+
+
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    """Limiteur d'un provider (AI_PROVIDER_CONCURRENCY, AI_PROVIDER_RATE_LIMIT_RPM[_<PROVIDER>])"""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        concurrency = int(os.getenv("AI_PROVIDER_CONCURRENCY", "4"))
+        rpm = float(os.getenv(
+            f"AI_PROVIDER_RATE_LIMIT_RPM_{provider.upper()}",
+            os.getenv("AI_PROVIDER_RATE_LIMIT_RPM", "0")
+        ))
+        limiter = _limiters[provider] = ProviderLimiter(concurrency, rpm)
+    return limiter
@@ -0,0 +1,330 @@
+"""
+Routage des analyses IA entre providers
+
+Pour chaque provider (et modèle), le routeur suit la latence (p50/p95 sur une
+fenêtre glissante) et le taux d'erreur. Il en déduit :
+- un disjoncteur : un provider qui échoue trop souvent est écarté un temps,
+  puis une seule requête d'essai décide de sa réouverture ;
+- des requêtes couvertes (hedging) : si le provider choisi n'a pas répondu
+  après son p95, la même analyse est lancée sur le provider alternatif le plus
+  rapide ; la première réponse est gardée, l'autre requête est annulée.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger("ai_router")
+
+class NoProviderAvailable(RuntimeError):
+    """Tous les providers envisagés sont écartés par leur disjoncteur"""
+
+
+def hedge_providers() -> List[str]:
+    """
+    Providers alternatifs pour les requêtes couvertes et le contournement des pannes.
+    Désactivé par défaut : le document partirait chez un provider que l'utilisateur
+    n'a pas choisi, ce qui doit être un choix explicite de l'opérateur.
+    """
+    if os.getenv("AI_HEDGING", "false").lower() != "true":
+        return []
+    value = os.getenv("AI_HEDGE_PROVIDERS", "")
+    return [provider.strip().lower() for provider in value.split(",") if provider.strip()]
+
+
+# Routage vers un autre provider interdit pour la requête en cours (clé API de l'utilisateur)
+_pinned: ContextVar[bool] = ContextVar("ai_router_pinned", default=False)
+
+
+@contextmanager
+def pin_provider(pinned: bool = True):
+    """Garder le provider demandé pour les analyses lancées dans ce contexte"""
+    token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def is_pinned() -> bool:
+    return _pinned.get()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ProviderStats:
+    """Latences et issues des dernières requêtes d'un provider"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.outcomes.append(ok)
+        # Seules les réponses réussies renseignent la latence (un échec rapide n'est pas une réponse)
+        if ok:
+            self.latencies.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return _percentile(sorted(self.latencies), fraction)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": len(self.outcomes),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un provider : fermé, ouvert (écarté) puis semi-ouvert (une requête d'essai)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, error_rate: float, min_requests: int, open_seconds: float):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Requête autorisée (en semi-ouvert : une seule à la fois)"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def available(self) -> bool:
+        """Provider utilisable, sans réserver la requête d'essai"""
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        return self.state == self.CLOSED or not self._probe_in_flight
+
+    def on_result(self, ok: bool, stats: ProviderStats) -> None:
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+            if ok:
+                self.state = self.CLOSED
+                stats.outcomes.clear()
+            else:
+                self._open()
+        elif not ok and len(stats.outcomes) >= self.min_requests and stats.error_rate >= self.error_rate:
+            self._open()
+
+    def release(self) -> None:
+        """Requête d'essai annulée sans issue connue"""
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+
+class ProviderRouter:
+    """Statistiques, disjoncteurs et requêtes couvertes pour les providers IA"""
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        min_requests: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        default_hedge_delay: Optional[float] = None,
+        min_hedge_delay: Optional[float] = None,
+        min_samples: int = 20
+    ):
+        self.window = window or int(os.getenv("AI_LATENCY_WINDOW", "100"))
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("AI_CIRCUIT_ERROR_RATE", "0.5"))
+        self.min_requests = min_requests or int(os.getenv("AI_CIRCUIT_MIN_REQUESTS", "5"))
+        self.open_seconds = open_seconds if open_seconds is not None else float(os.getenv("AI_CIRCUIT_OPEN_SECONDS", "30"))
+        self.default_hedge_delay = (
+            default_hedge_delay if default_hedge_delay is not None
+            else float(os.getenv("AI_HEDGE_DEFAULT_DELAY_SECONDS", "10"))
+        )
+        self.min_hedge_delay = (
+            min_hedge_delay if min_hedge_delay is not None
+            else int(os.getenv("AI_HEDGE_MIN_DELAY_MS", "500")) / 1000
+        )
+        self.min_samples = min_samples
+        self._stats: Dict[Tuple[str, str], ProviderStats] = {}
+        self._circuits: Dict[str, CircuitBreaker] = {}
+
+    def stats(self, provider: str, model: str) -> ProviderStats:
+        key = (provider, model)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = ProviderStats(self.window)
+        return stats
+
+    def circuit(self, provider: str) -> CircuitBreaker:
+        circuit = self._circuits.get(provider)
+        if circuit is None:
+            circuit = self._circuits[provider] = CircuitBreaker(self.error_rate, self.min_requests, self.open_seconds)
+        return circuit
+
+    def available(self, provider: str) -> bool:
+        return self.circuit(provider).available()
+
+    def record(self, provider: str, model: str, latency: float, ok: bool) -> None:
+        stats = self.stats(provider, model)
+        stats.record(latency, ok)
+        circuit = self.circuit(provider)
+        was_open = circuit.state != CircuitBreaker.CLOSED
+        circuit.on_result(ok, stats)
+        if circuit.state == CircuitBreaker.OPEN and not was_open:
+            logger.warning(
+                f"Disjoncteur ouvert pour {provider} (erreurs: {stats.error_rate:.0%}, "
+                f"{self.open_seconds:.0f}s)"
+            )
+        elif was_open and circuit.state == CircuitBreaker.CLOSED:
+            logger.info(f"Disjoncteur refermé pour {provider}")
+
+    def hedge_delay(self, provider: str, model: str) -> float:
+        """Attente avant la requête couverte : p95 du provider (valeur par défaut sans historique)"""
+        stats = self.stats(provider, model)
+        if len(stats.latencies) < self.min_samples:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, stats.percentile(0.95))
+
+    def rank(self, candidates: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Providers disponibles, du plus rapide (p50) au plus lent ; sans historique en dernier"""
+        available = [candidate for candidate in candidates if self.available(candidate[0])]
+
+        def latency(candidate: Tuple[str, str]) -> float:
+            p50 = self.stats(*candidate).percentile(0.5)
+            return p50 if p50 is not None else float("inf")
+
+        return sorted(available, key=latency)
+
+    async def _timed(self, provider: str, model: str, call: Callable[[], Awaitable[Any]],
+                     is_ok: Callable[[Any], bool]) -> Any:
+        circuit = self.circuit(provider)
+        start = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            circuit.release()
+            raise
+        except Exception:
+            self.record(provider, model, time.monotonic() - start, False)
+            raise
+        if is_ok(result):
+            self.record(provider, model, time.monotonic() - start, True)
+        else:
+            # Réponse dégradée sans appel (clé absente...) : ni succès ni échec du provider
+            circuit.release()
+        return result
+
+    async def run(
+        self,
+        attempts: List[Tuple[str, str, Callable[[], Awaitable[Any]]]],
+        is_ok: Callable[[Any], bool] = lambda result: True
+    ) -> Any:
+        """
+        Exécuter une requête avec couverture.
+
+        attempts : (provider, modèle, appel) par ordre de préférence. Le premier
+        est lancé aussitôt ; le suivant après le délai de couverture du précédent,
+        ou dès son échec. La première réponse acceptable (is_ok) est retournée et
+        les requêtes encore en cours sont annulées. À défaut, la dernière réponse
+        reçue est retournée, ou la dernière erreur levée.
+        """
+        pending: Dict[asyncio.Task, Tuple[str, str]] = {}
+        queue = list(attempts)
+        fallback_result = None
+        has_fallback = False
+        last_error: Optional[BaseException] = None
+
+        def launch() -> Optional[asyncio.Task]:
+            while queue:
+                provider, model, call = queue.pop(0)
+                if not self.circuit(provider).allow():
+                    continue
+                task = asyncio.create_task(self._timed(provider, model, call, is_ok))
+                pending[task] = (provider, model)
+                return task
+            return None
+
+        def next_delay() -> Optional[float]:
+            if not queue or not pending:
+                return None
+            # Délai du dernier provider lancé
+            return self.hedge_delay(*list(pending.values())[-1])
+
+        try:
+            if launch() is None:
+                raise NoProviderAvailable("Aucun provider IA disponible (disjoncteurs ouverts)")
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, timeout=next_delay(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Pas de réponse dans le p95 : requête couverte sur le provider suivant
+                    task = launch()
+                    if task is not None:
+                        logger.info(f"Requête couverte lancée sur {pending[task][0]}")
+                    continue
+                for task in done:
+                    provider, _ = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning(f"Échec du provider {provider}: {last_error}")
+                        continue
+                    result = task.result()
+                    if is_ok(result):
+                        return result
+                    fallback_result, has_fallback = result, True
+                if not pending:
+                    # Échec ou réponse dégradée : essayer aussitôt le provider suivant
+                    launch()
+            if has_fallback:
+                return fallback_result
+            raise last_error or RuntimeError("Aucun provider IA disponible (disjoncteurs ouverts)")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "providers": {
+                f"{provider}/{model}": stats.to_dict() for (provider, model), stats in self._stats.items()
+            },
+            "circuits": {provider: circuit.state for provider, circuit in self._circuits.items()},
+        }
+
+
+# Instance globale
+_router: Optional[ProviderRouter] = None
+
+
+def get_provider_router() -> ProviderRouter:
+    """Routeur partagé par les analyseurs IA"""
+    global _router
+    if _router is None:
+        _router = ProviderRouter()
+    return _router
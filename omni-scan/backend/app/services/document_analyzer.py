@@ -1,299 +1,529 @@
-"""Service d'analyse avancée de documents longs"""
+"""Service d'analyse avancée de documents longs
 
-from typing import Dict, List
+L'analyse est incrémentale : DocumentAnalysisStream consomme le texte par
+morceaux (les pages au fil de l'OCR) et tient à jour statistiques, chapitres,
+phrases clés et compteurs. Seuls la ligne et la phrase en cours sont gardées
+en mémoire, jamais une copie du texte complet.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 import re
-from app.services.text_cleaner import text_cleaner
+from app.services.text_cleaner import ChapterTracker
+from app.utils.document_features import DocumentFeatures, get_document_features
+from app.utils.keyword_matcher import KeywordMatcher, WeightedKeywords
 from app.core.logging import get_logger
 
 logger = get_logger("document_analyzer")
 
 
-class DocumentAnalyzer:
-    """Analyse avancée pour documents longs avec détection de structure"""
-    
-    def __init__(self):
-        self.min_chapter_length = 500  # Caractères minimum pour un chapitre
-        self.max_summary_length = 2000  # Longueur max d'un résumé
-    
-    def analyze_document(self, text: str, options: Dict = None) -> Dict:
-        """Analyse complète d'un document"""
-        options = options or {}
-        
-        # Statistiques de base
-        stats = self._get_text_stats(text)
-        
-        # Détecter la structure du document
-        chapters = text_cleaner.detect_chapters(text)
-        
+# Mots-clés par type de document, dans l'ordre de priorité de la détection
+INVOICE_KEYWORDS = ('facture', 'invoice', 'total ttc', 'montant')
+CV_KEYWORDS = ('curriculum', 'expérience professionnelle', 'compétences')
+BOOK_KEYWORDS = ('chapitre', 'section', 'partie')
+MEDICAL_KEYWORDS = ('diagnostic', 'prescription', 'patient', 'traitement')
+EMAIL_KEYWORDS = ('bonjour', 'cordialement', 'objet')
+
+# Thèmes : au moins 3 mots-clés présents
+THEME_KEYWORDS = {
+    'finance': ('budget', 'coût', 'prix', 'euro', 'montant', 'facture', 'paiement'),
+    'juridique': ('article', 'loi', 'décret', 'règlement', 'juridique', 'légal'),
+    'technique': ('système', 'processus', 'méthode', 'technique', 'développement', 'logiciel'),
+    'commercial': ('client', 'vente', 'marché', 'produit', 'service', 'offre'),
+    'ressources_humaines': ('employé', 'recrutement', 'compétence', 'formation', 'équipe'),
+    'santé': ('patient', 'traitement', 'médical', 'diagnostic', 'santé'),
+}
+
+# Phrases du milieu retenues pour le résumé global
+IMPORTANT_WORDS = ('conclusion', 'résumé', 'important', 'principal', 'essentiel', 'total', 'final')
+
+# Mots ignorés pour les concepts clés
+STOP_WORDS = frozenset({
+    'le', 'la', 'les', 'de', 'du', 'des', 'un', 'une', 'et', 'à', 'dans', 'pour', 'sur',
+    'avec', 'par', 'ce', 'cette', 'ces', 'qui', 'que', 'dont', 'où'
+})
+
+_ALL_KEYWORDS = frozenset(
+    INVOICE_KEYWORDS + CV_KEYWORDS + BOOK_KEYWORDS + MEDICAL_KEYWORDS + EMAIL_KEYWORDS
+    + tuple(keyword for keywords in THEME_KEYWORDS.values() for keyword in keywords)
+)
+# Un seul automate pour tous les mots-clés : une passe par ligne, quel que soit leur nombre
+_KEYWORD_MATCHER = KeywordMatcher(_ALL_KEYWORDS)
+_THEME_SCORES = WeightedKeywords({
+    theme: [(keyword, 1.0) for keyword in keywords] for theme, keywords in THEME_KEYWORDS.items()
+})
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_LEGAL_RE = re.compile(r'article \d+|loi|décret|arrêté')
+_CONCEPT_RE = re.compile(r'\b[A-Za-zÀ-ÿ]{4,}\b')
+
+# Points clés : aucun de ces patterns ne traverse un point
+_KEY_POINT_RES = (
+    re.compile(r'(?:(?:il est|c\'est)\s+)?(?:important|essentiel|crucial|nécessaire)\s+(?:de|que)\s+([^.]+)', re.IGNORECASE),
+    re.compile(r'(?:en conclusion|pour conclure|finalement)\s*[,:]\s*([^.]+)', re.IGNORECASE),
+    re.compile(r'(?:le but|l\'objectif|la finalité)\s+(?:est|était)\s+(?:de\s+)?([^.]+)', re.IGNORECASE),
+)
+# Points numérotés : le numéro termine le segment précédent
+_NUMBERED_POINT_RE = re.compile(r'(?:\d+\.\s+)([A-Z][^.]+)', re.IGNORECASE)
+
+_SUBSECTION_RES = (
+    re.compile(r'^\s*\d+\.\d+\.?\s+(.+)$'),  # 1.1, 1.2, etc.
+    re.compile(r'^\s*[a-z]\)\s+(.+)$'),  # a), b), etc.
+    re.compile(r'^\s*[A-Z]\.\s+(.+)$'),  # A., B., etc.
+)
+
+MAX_SUMMARY_SENTENCES = 10
+MAX_KEY_POINTS = 5
+MAX_TOPICS = 10
+CHAPTER_SUMMARY_SENTENCES = 3
+
+
+class _PieceSplitter:
+    """
+    Découpage incrémental d'un flux de texte : on_piece reçoit les mêmes morceaux
+    que split() sur le texte complet, à condition qu'aucun séparateur ne soit
+    coupé entre deux appels à feed (les morceaux fournis se terminent par un saut de ligne).
+    """
+
+    def __init__(self, split: Callable[[str], List[str]], on_piece: Callable[[str], None]):
+        self._split = split
+        self._on_piece = on_piece
+        self._parts: List[str] = []
+
+    def feed(self, chunk: str) -> None:
+        pieces = self._split(chunk)
+        self._parts.append(pieces[0])
+        for piece in pieces[1:]:
+            self._on_piece(''.join(self._parts))
+            self._parts = [piece]
+
+    def finish(self) -> None:
+        self._on_piece(''.join(self._parts))
+        self._parts = []
+
+
+def _trailing_digits(text: str) -> str:
+    """Chiffres terminant le texte (ceux que capture \\d+ juste avant un point)"""
+    start = len(text)
+    while start > 0 and text[start - 1].isdecimal():
+        start -= 1
+    return text[start:]
+
+
+class ChapterStats:
+    """
+    Chapitre résumé au fil de la lecture : taille et mots du contenu, sous-sections,
+    premières phrases significatives et fréquence des concepts.
+    """
+
+    def __init__(self, title: str, start_line: int):
+        self.title = title
+        self.start_line = start_line
+        self.end_line = start_line
+        self.length = 0  # len(contenu) une fois les lignes jointes
+        self.word_count = 0
+        self.subsection_count = 0
+        self.sentences: List[str] = []
+        self.concepts: Dict[str, int] = {}
+        self._pending_blanks = 0
+        self._sentence_splitter: Optional[_PieceSplitter] = _PieceSplitter(
+            _SENTENCE_SPLIT_RE.split, self._on_sentence
+        )
+
+    def add_line(self, line: str) -> None:
+        # Lignes vides internes : un saut de ligne chacune ; en fin de chapitre, retirées par strip()
+        separator = '\n' * (self._pending_blanks + 1) if self.length else ''
+        self._pending_blanks = 0
+        self.length += len(separator) + len(line)
+        self.word_count += len(line.split())
+
+        if any(pattern.match(line) for pattern in _SUBSECTION_RES):
+            self.subsection_count += 1
+
+        if self._sentence_splitter is not None:
+            self._sentence_splitter.feed(separator + line)
+
+        for word in _CONCEPT_RE.findall(line.lower()):
+            if word not in STOP_WORDS:
+                self.concepts[word] = self.concepts.get(word, 0) + 1
+
+    def add_blank(self) -> None:
+        if self.length:
+            self._pending_blanks += 1
+
+    def _on_sentence(self, piece: str) -> None:
+        sentence = piece.strip()
+        if len(sentence) > 20 and len(self.sentences) < CHAPTER_SUMMARY_SENTENCES:
+            self.sentences.append(sentence)
+            if len(self.sentences) == CHAPTER_SUMMARY_SENTENCES:
+                # Assez de phrases : inutile de découper la suite du chapitre
+                self._sentence_splitter = None
+
+    def summary(self) -> str:
+        """Premières phrases significatives du chapitre"""
+        if self._sentence_splitter is not None:
+            self._sentence_splitter.finish()
+            self._sentence_splitter = None
+        return ' '.join(self.sentences)
+
+    def key_concepts(self) -> List[str]:
+        """Top 5 des mots les plus fréquents (vus plus de 2 fois)"""
+        sorted_words = sorted(self.concepts.items(), key=lambda x: x[1], reverse=True)
+        return [word for word, freq in sorted_words[:5] if freq > 2]
+
+
+class DocumentAnalysisStream:
+    """
+    Analyse incrémentale d'un document.
+
+    Le texte est fourni par morceaux via feed() (pages OCR jointes comme dans le
+    résultat final, ex. séparées par une ligne vide) ; finish() retourne le même
+    résultat que DocumentAnalyzer.analyze_document sur le texte complet.
+    """
+
+    def __init__(self, analyzer: 'DocumentAnalyzer', options: Dict = None):
+        self.analyzer = analyzer
+        self.options = options or {}
+        self._partial_line = ''
+        self._result: Optional[Dict] = None
+
+        # Statistiques
+        self.char_count = 0
+        self.word_count = 0
+        self._word_chars = 0
+        self._sentence_pieces = 0
+        self._sentence_count = 0
+        self._paragraph_count = 0
+        self._paragraph_has_content = False
+        self._open_newline = False
+
+        # Phrases significatives (> 20 caractères) pour le résumé global
+        self._significant_count = 0
+        self._first_sentence = ''
+        self._last_sentence = ''
+        self._important_sentences: List[Tuple[int, str]] = []
+
+        # Points clés par pattern (le dernier : points numérotés)
+        self._key_points: List[List[str]] = [[] for _ in range(len(_KEY_POINT_RES) + 1)]
+        self._key_points_seen: List[set] = [set() for _ in self._key_points]
+        self._numbered_prefix = ''
+
+        # Mots-clés (type de document, thèmes) et titres probables
+        self._keywords_found: set = set()
+        self._has_at_sign = False
+        self._has_legal = False
+        self._topics: List[str] = []
+
+        self._chapters = ChapterTracker(ChapterStats)
+        self._sentences = _PieceSplitter(_SENTENCE_SPLIT_RE.split, self._on_sentence)
+        self._segments = _PieceSplitter(lambda chunk: chunk.split('.'), self._on_segment)
+
+    def feed(self, text: str) -> None:
+        """Ajouter un morceau de texte (les lignes complètes sont analysées aussitôt)"""
+        if self._result is not None:
+            raise RuntimeError("Analyse déjà terminée")
+        lines = (self._partial_line + text).split('\n')
+        self._partial_line = lines.pop()
+        for line in lines:
+            self._feed_line(line, True)
+
+    def feed_lines(self, lines: Iterable[str]) -> None:
+        """Ajouter des lignes déjà découpées, chacune suivie d'un saut de ligne"""
+        if self._result is not None:
+            raise RuntimeError("Analyse déjà terminée")
+        for line in lines:
+            if self._partial_line:
+                line, self._partial_line = self._partial_line + line, ''
+            self._feed_line(line, True)
+
+    def finish(self) -> Dict:
+        """Terminer l'analyse et construire le résultat"""
+        if self._result is None:
+            self._feed_line(self._partial_line, False)
+            self._partial_line = ''
+            self._sentences.finish()
+            self._segments.finish()
+            if self._paragraph_has_content:
+                self._paragraph_count += 1
+            self._result = self._build_result(self._chapters.finish())
+        return self._result
+
+    def _feed_line(self, line: str, newline: bool) -> None:
+        self.char_count += len(line) + newline
+        words = line.split()
+        self.word_count += len(words)
+        self._word_chars += sum(len(w) for w in words)
+
+        # Paragraphes : séparés par '\n\n' (paires de sauts de ligne, de gauche à droite)
+        if newline and not line and self._open_newline:
+            if self._paragraph_has_content:
+                self._paragraph_count += 1
+            self._paragraph_has_content = False
+            self._open_newline = False
+        else:
+            if line.strip():
+                self._paragraph_has_content = True
+            self._open_newline = newline
+
+        # Phrases et segments : aucun séparateur ne contient de saut de ligne
+        chunk = line + '\n' if newline else line
+        self._sentences.feed(chunk)
+        self._segments.feed(chunk)
+
+        # Mots-clés : aucun ne contient de saut de ligne, la recherche par ligne suffit
+        text_lower = line.lower()
+        if len(self._keywords_found) < len(_ALL_KEYWORDS):
+            self._keywords_found |= _KEYWORD_MATCHER.find(text_lower)
+        if not self._has_at_sign and '@' in line:
+            self._has_at_sign = True
+        if not self._has_legal and _LEGAL_RE.search(text_lower):
+            self._has_legal = True
+
+        stripped = line.strip()
+        # Titre probable : court, commence par majuscule, pas de ponctuation finale
+        if (len(self._topics) < MAX_TOPICS and
+                10 < len(stripped) < 100 and
+                stripped[0].isupper() and
+                not stripped.endswith('.') and
+                not stripped.endswith(',') and
+                ':' not in stripped):
+            self._topics.append(stripped)
+
+        self._chapters.feed_line(line)
+
+    def _on_sentence(self, piece: str) -> None:
+        self._sentence_pieces += 1
+        sentence = piece.strip()
+        if not sentence:
+            return
+        self._sentence_count += 1
+        if len(sentence) <= 20:
+            return
+
+        index = self._significant_count
+        self._significant_count += 1
+        if index == 0:
+            self._first_sentence = sentence
+        elif (len(self._important_sentences) < MAX_SUMMARY_SENTENCES and
+                any(word in sentence.lower() for word in IMPORTANT_WORDS)):
+            self._important_sentences.append((index, sentence))
+        self._last_sentence = sentence
+
+    def _on_segment(self, segment: str) -> None:
+        """Texte entre deux points : les patterns de points clés s'y appliquent sans déborder"""
+        for pattern, points, seen in zip(_KEY_POINT_RES, self._key_points, self._key_points_seen):
+            if len(points) < 2 * MAX_KEY_POINTS:
+                for match in pattern.findall(segment):
+                    self._add_key_point(match, points, seen)
+
+        if self._numbered_prefix:
+            match = _NUMBERED_POINT_RE.match(self._numbered_prefix + '.' + segment)
+            if match:
+                # Le point capture tout le segment, numéro final compris
+                self._add_key_point(match.group(1), self._key_points[-1], self._key_points_seen[-1])
+                self._numbered_prefix = ''
+                return
+        self._numbered_prefix = _trailing_digits(segment)
+
+    @staticmethod
+    def _add_key_point(match: str, points: List[str], seen: set) -> None:
+        # Les premiers points uniques de chaque pattern suffisent pour le top 5 dédupliqué
+        point = match.strip()
+        if 20 < len(point) < 200 and len(points) < 2 * MAX_KEY_POINTS and point.lower() not in seen:
+            seen.add(point.lower())
+            points.append(point)
+
+    def _build_result(self, chapters: List[ChapterStats]) -> Dict:
+        stats = self._get_text_stats()
+
         # Déterminer le type d'analyse
         is_long_document = stats['word_count'] > 1000
         has_chapters = len(chapters) > 1
-        
+
         result = {
             'stats': stats,
             'has_structure': has_chapters,
             'chapter_count': len(chapters),
-            'document_type': self._detect_document_type(text, stats),
+            'document_type': self._detect_document_type(stats),
         }
-        
+
         # Pour les documents longs
         if is_long_document:
             result['is_long_document'] = True
-            
+
             # Toujours créer un résumé global
-            result['global_summary'] = self._create_global_summary(text, stats)
-            
+            result['global_summary'] = self._create_global_summary()
+
             # Si structuré, ajouter l'analyse par chapitre
-            if has_chapters and options.get('include_chapter_summaries', True):
+            if has_chapters and self.options.get('include_chapter_summaries', True):
                 result['structure_analysis'] = self._analyze_structure(chapters)
                 result['chapter_summaries'] = self._create_chapter_summaries(chapters)
-            
+
             # Extraire les points clés du document entier
-            result['key_themes'] = self._extract_key_themes(text)
-            result['main_topics'] = self._extract_main_topics(text)
+            result['key_themes'] = self._extract_key_themes()
+            result['main_topics'] = self._extract_main_topics()
         else:
             result['is_long_document'] = False
-        
+
         return result
-    
-    def _get_text_stats(self, text: str) -> Dict:
-        """Calcule les statistiques du texte"""
-        words = text.split()
-        sentences = re.split(r'[.!?]+', text)
-        paragraphs = text.split('\n\n')
-        
+
+    def _get_text_stats(self) -> Dict:
+        """Statistiques du texte"""
         return {
-            'char_count': len(text),
-            'word_count': len(words),
-            'sentence_count': len([s for s in sentences if s.strip()]),
-            'paragraph_count': len([p for p in paragraphs if p.strip()]),
-            'avg_word_length': sum(len(w) for w in words) / len(words) if words else 0,
-            'avg_sentence_length': len(words) / len(sentences) if sentences else 0,
+            'char_count': self.char_count,
+            'word_count': self.word_count,
+            'sentence_count': self._sentence_count,
+            'paragraph_count': self._paragraph_count,
+            'avg_word_length': self._word_chars / self.word_count if self.word_count else 0,
+            'avg_sentence_length': self.word_count / self._sentence_pieces if self._sentence_pieces else 0,
         }
-    
-    def _detect_document_type(self, text: str, stats: Dict) -> str:
+
+    def _detect_document_type(self, stats: Dict) -> str:
         """Détecte le type de document"""
-        text_lower = text.lower()
-        
-        # Patterns de détection
-        if any(word in text_lower for word in ['facture', 'invoice', 'total ttc', 'montant']):
+        found = self._keywords_found
+
+        if any(word in found for word in INVOICE_KEYWORDS):
             return 'invoice'
-        elif any(word in text_lower for word in ['curriculum', 'expérience professionnelle', 'compétences']):
+        elif any(word in found for word in CV_KEYWORDS):
             return 'cv'
-        elif any(word in text_lower for word in ['chapitre', 'section', 'partie']) and stats['word_count'] > 1000:
+        elif any(word in found for word in BOOK_KEYWORDS) and stats['word_count'] > 1000:
             return 'book_or_report'
-        elif re.search(r'article \d+|loi|décret|arrêté', text_lower):
+        elif self._has_legal:
             return 'legal'
-        elif any(word in text_lower for word in ['diagnostic', 'prescription', 'patient', 'traitement']):
+        elif any(word in found for word in MEDICAL_KEYWORDS):
             return 'medical'
-        elif '@' in text and any(word in text_lower for word in ['bonjour', 'cordialement', 'objet']):
+        elif self._has_at_sign and any(word in found for word in EMAIL_KEYWORDS):
             return 'email'
         elif stats['avg_sentence_length'] > 20 and stats['word_count'] > 500:
             return 'academic'
         else:
             return 'general'
-    
-    def _create_global_summary(self, text: str, stats: Dict) -> Dict:
-        """Crée un résumé global du document complet"""
-        # Extraire les phrases les plus importantes
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if len(s.strip()) > 20]
-        
+
+    def _create_global_summary(self) -> Dict:
+        """Résumé global : première phrase, phrases importantes du milieu, dernière phrase"""
+        count = self._significant_count
+
         # Limiter le nombre de phrases pour le résumé
-        max_sentences = min(10, len(sentences) // 10 + 1)
-        
-        # Sélectionner les phrases clés (début, milieu, fin + importantes)
+        max_sentences = min(MAX_SUMMARY_SENTENCES, count // 10 + 1)
+
         key_sentences = []
-        if sentences:
-            # Première phrase
-            key_sentences.append(sentences[0])
-            
-            # Phrases du milieu avec mots clés importants
-            important_words = ['conclusion', 'résumé', 'important', 'principal', 'essentiel', 'total', 'final']
-            for sentence in sentences[1:-1]:
-                if any(word in sentence.lower() for word in important_words):
-                    key_sentences.append(sentence)
-                    if len(key_sentences) >= max_sentences - 1:
-                        break
-            
+        if count:
+            key_sentences.append(self._first_sentence)
+
+            # Phrases du milieu avec mots clés importants (la dernière phrase est exclue)
+            for index, sentence in self._important_sentences:
+                if index >= count - 1:
+                    break
+                key_sentences.append(sentence)
+                if len(key_sentences) >= max_sentences - 1:
+                    break
+
             # Dernière phrase significative
-            if len(sentences) > 1:
-                key_sentences.append(sentences[-1])
-        
-        # Créer le résumé structuré
+            if count > 1:
+                key_sentences.append(self._last_sentence)
+
         summary_text = ' '.join(key_sentences[:max_sentences])
-        
+
         return {
-            'text': summary_text[:self.max_summary_length],
+            'text': summary_text[:self.analyzer.max_summary_length],
             'length': len(summary_text),
-            'coverage': f"{(len(key_sentences) / len(sentences) * 100):.1f}%" if sentences else "0%",
-            'key_points': self._extract_key_points(text)[:5],  # Top 5 points
+            'coverage': f"{(len(key_sentences) / count * 100):.1f}%" if count else "0%",
+            'key_points': self._extract_key_points()[:MAX_KEY_POINTS],
         }
-    
-    def _extract_key_points(self, text: str) -> List[str]:
-        """Extrait les points clés du texte"""
-        key_points = []
-        
-        # Patterns pour identifier les points importants
-        patterns = [
-            r'(?:(?:il est|c\'est)\s+)?(?:important|essentiel|crucial|nécessaire)\s+(?:de|que)\s+([^.]+)',
-            r'(?:en conclusion|pour conclure|finalement)\s*[,:]\s*([^.]+)',
-            r'(?:le but|l\'objectif|la finalité)\s+(?:est|était)\s+(?:de\s+)?([^.]+)',
-            r'(?:\d+\.\s+)([A-Z][^.]+)',  # Points numérotés
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                point = match.strip()
-                if len(point) > 20 and len(point) < 200:
-                    key_points.append(point)
-        
-        # Dédupliquer et limiter
+
+    def _extract_key_points(self) -> List[str]:
+        """Points clés dédupliqués, dans l'ordre des patterns"""
         seen = set()
         unique_points = []
-        for point in key_points:
-            if point.lower() not in seen:
-                seen.add(point.lower())
-                unique_points.append(point)
-        
+        for points in self._key_points:
+            for point in points:
+                if point.lower() not in seen:
+                    seen.add(point.lower())
+                    unique_points.append(point)
         return unique_points
-    
-    def _analyze_structure(self, chapters: List[Dict]) -> Dict:
+
+    def _analyze_structure(self, chapters: List[ChapterStats]) -> Dict:
         """Analyse la structure du document"""
-        if not chapters:
-            return {'type': 'unstructured'}
-        
         structure = {
             'type': 'structured',
             'depth': 1,  # Profondeur de la hiérarchie
             'chapters': []
         }
-        
+
         for chapter in chapters:
             chapter_info = {
-                'title': chapter['title'],
-                'word_count': len(chapter['content'].split()),
-                'position': f"Lignes {chapter['start_line']}-{chapter['end_line']}",
+                'title': chapter.title,
+                'word_count': chapter.word_count,
+                'position': f"Lignes {chapter.start_line}-{chapter.end_line}",
             }
-            
-            # Détecter les sous-sections
-            subsections = self._detect_subsections(chapter['content'])
-            if subsections:
-                chapter_info['subsection_count'] = len(subsections)
+
+            if chapter.subsection_count:
+                chapter_info['subsection_count'] = chapter.subsection_count
                 structure['depth'] = max(structure['depth'], 2)
-            
+
             structure['chapters'].append(chapter_info)
-        
+
         return structure
-    
-    def _detect_subsections(self, text: str) -> List[str]:
-        """Détecte les sous-sections dans un chapitre"""
-        subsection_patterns = [
-            r'^\s*\d+\.\d+\.?\s+(.+)$',  # 1.1, 1.2, etc.
-            r'^\s*[a-z]\)\s+(.+)$',  # a), b), etc.
-            r'^\s*[A-Z]\.\s+(.+)$',  # A., B., etc.
-        ]
-        
-        subsections = []
-        for line in text.split('\n'):
-            for pattern in subsection_patterns:
-                match = re.match(pattern, line.strip())
-                if match:
-                    subsections.append(match.group(1))
-                    break
-        
-        return subsections
-    
-    def _create_chapter_summaries(self, chapters: List[Dict]) -> List[Dict]:
-        """Crée des résumés pour chaque chapitre"""
+
+    def _create_chapter_summaries(self, chapters: List[ChapterStats]) -> List[Dict]:
+        """Résumés des chapitres assez longs : 3 premières phrases significatives"""
         summaries = []
-        
+
         for chapter in chapters:
-            if len(chapter['content']) < self.min_chapter_length:
+            if chapter.length < self.analyzer.min_chapter_length:
                 continue
-            
-            # Résumer le chapitre
-            chapter_sentences = [s.strip() for s in re.split(r'[.!?]+', chapter['content']) 
-                               if len(s.strip()) > 20]
-            
-            # Prendre les 3 premières phrases significatives
-            summary_sentences = chapter_sentences[:3]
-            
+
             summaries.append({
-                'chapter_title': chapter['title'],
-                'summary': ' '.join(summary_sentences),
-                'word_count': len(chapter['content'].split()),
-                'key_concepts': self._extract_key_concepts(chapter['content'])
+                'chapter_title': chapter.title,
+                'summary': chapter.summary(),
+                'word_count': chapter.word_count,
+                'key_concepts': chapter.key_concepts()
             })
-        
+
         return summaries
-    
-    def _extract_key_concepts(self, text: str) -> List[str]:
-        """Extrait les concepts clés d'un texte"""
-        # Mots à ignorer
-        stop_words = {'le', 'la', 'les', 'de', 'du', 'des', 'un', 'une', 'et', 'à', 'dans', 'pour', 'sur', 'avec', 'par', 'ce', 'cette', 'ces', 'qui', 'que', 'dont', 'où'}
-        
-        # Extraire les mots significatifs
-        words = re.findall(r'\b[A-Za-zÀ-ÿ]{4,}\b', text.lower())
-        word_freq = {}
-        
-        for word in words:
-            if word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Trier par fréquence et prendre le top 5
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:5] if freq > 2]
-    
-    def _extract_key_themes(self, text: str) -> List[str]:
-        """Extrait les thèmes principaux du document"""
-        themes = []
-        
-        # Détecter les thèmes par patterns
-        theme_patterns = {
-            'finance': ['budget', 'coût', 'prix', 'euro', 'montant', 'facture', 'paiement'],
-            'juridique': ['article', 'loi', 'décret', 'règlement', 'juridique', 'légal'],
-            'technique': ['système', 'processus', 'méthode', 'technique', 'développement', 'logiciel'],
-            'commercial': ['client', 'vente', 'marché', 'produit', 'service', 'offre'],
-            'ressources_humaines': ['employé', 'recrutement', 'compétence', 'formation', 'équipe'],
-            'santé': ['patient', 'traitement', 'médical', 'diagnostic', 'santé'],
-        }
-        
-        text_lower = text.lower()
-        for theme, keywords in theme_patterns.items():
-            count = sum(1 for keyword in keywords if keyword in text_lower)
-            if count >= 3:  # Au moins 3 mots clés du thème
-                themes.append(theme.replace('_', ' ').title())
-        
-        return themes
-    
-    def _extract_main_topics(self, text: str) -> List[str]:
-        """Extrait les sujets principaux basés sur les titres et répétitions"""
-        topics = []
-        
-        # Chercher les lignes qui ressemblent à des titres
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            # Titre probable : court, commence par majuscule, pas de ponctuation finale
-            if (10 < len(line) < 100 and 
-                line[0].isupper() and 
-                not line.endswith('.') and
-                not line.endswith(',') and
-                ':' not in line):
-                topics.append(line)
-        
-        # Limiter et dédupliquer
+
+    def _extract_key_themes(self) -> List[str]:
+        """Thèmes dont au moins 3 mots-clés apparaissent"""
+        scores = _THEME_SCORES.scores(self._keywords_found)
+        return [theme.replace('_', ' ').title() for theme in THEME_KEYWORDS if scores[theme] >= 3]
+
+    def _extract_main_topics(self) -> List[str]:
+        """Titres probables (les 10 premiers), dédupliqués"""
         seen = set()
         unique_topics = []
-        for topic in topics[:10]:  # Max 10 topics
+        for topic in self._topics:
             topic_lower = topic.lower()
             if topic_lower not in seen:
                 seen.add(topic_lower)
                 unique_topics.append(topic)
-        
         return unique_topics
 
 
+class DocumentAnalyzer:
+    """Analyse avancée pour documents longs avec détection de structure"""
+
+    def __init__(self):
+        self.min_chapter_length = 500  # Caractères minimum pour un chapitre
+        self.max_summary_length = 2000  # Longueur max d'un résumé
+
+    def stream(self, options: Dict = None) -> DocumentAnalysisStream:
+        """Analyse incrémentale : feed() page par page, puis finish()"""
+        return DocumentAnalysisStream(self, options)
+
+    def analyze_document(self, text: Union[str, DocumentFeatures], options: Dict = None) -> Dict:
+        """Analyse complète d'un document (une fois par document et jeu d'options)"""
+        features = get_document_features(text)
+        options = options or {}
+        return features.memoize(
+            ("document_analysis", repr(sorted(options.items()))),
+            lambda: self._analyze_lines(features.lines, options)
+        )
+
+    def _analyze_lines(self, lines: List[str], options: Dict) -> Dict:
+        stream = self.stream(options)
+        stream.feed_lines(lines[:-1])
+        stream.feed(lines[-1])
+        return stream.finish()
+
+
 # Instance globale
-document_analyzer = DocumentAnalyzer()
\ No newline at end of file
+document_analyzer = DocumentAnalyzer()
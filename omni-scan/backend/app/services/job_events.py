@@ -0,0 +1,134 @@
+"""
+Diffusion de la progression des jobs
+Chaque sauvegarde d'un job est publiée aux abonnés (SSE, WebSocket) du même processus.
+Un abonné lent ne garde que le dernier état : les mises à jour rapprochées sont fusionnées.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, Optional, Set
+
+from app.core.logging import get_logger
+
+logger = get_logger("job_events")
+
+FINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+
+def min_event_interval() -> float:
+    """Intervalle minimal entre deux événements d'un abonné (fusion des mises à jour)"""
+    return int(os.getenv("JOB_EVENTS_MIN_INTERVAL_MS", "250")) / 1000
+
+
+def poll_interval() -> float:
+    """Relecture du stockage sans notification (jobs traités par un autre processus)"""
+    return float(os.getenv("JOB_EVENTS_POLL_SECONDS", "2"))
+
+
+class Subscription:
+    """Abonnement aux mises à jour d'un job : seul le dernier état est conservé"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.latest: Optional[Dict[str, Any]] = None
+        self.updated = asyncio.Event()
+
+    def push(self, row: Dict[str, Any]):
+        self.latest = row
+        self.updated.set()
+
+    def take(self) -> Optional[Dict[str, Any]]:
+        row, self.latest = self.latest, None
+        self.updated.clear()
+        return row
+
+
+class JobEventBroker:
+    """Relais en mémoire entre JobManager.save_job et les flux de progression"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, job_id: str) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(job_id)
+        self._subscribers.setdefault(job_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.job_id)
+        if subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.job_id]
+
+    def publish(self, job_id: str, row: Dict[str, Any]):
+        """Publier le nouvel état d'un job (appelable depuis un thread)"""
+        subscribers = self._subscribers.get(job_id)
+        if not subscribers:
+            return
+
+        def deliver():
+            for subscription in list(subscribers):
+                subscription.push(row)
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            deliver()
+        elif self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(deliver)
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def job_state(row: Dict[str, Any], queue: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Champs suivis d'un job, comparés d'un événement à l'autre"""
+    return {
+        "status": row["status"],
+        "current": row.get("current_step") or 0,
+        "total": row.get("total_steps") or 0,
+        "percentage": row.get("progress_percentage") or 0,
+        "message": row.get("current_message") or "",
+        "queue": queue,
+        # Analyse IA des pages déjà extraites (upload en pipeline) : référence, pas le contenu
+        "partial_analysis": partial_reference(row)
+    }
+
+
+def partial_reference(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Version et adresse de l'analyse intermédiaire d'un job (None si absente)"""
+    version = (row.get("metadata") or {}).get("partial_version")
+    if version is None:
+        return None
+    return {"version": version, "url": f"/api/v1/job/{row['id']}/partial"}
+
+
+def state_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs modifiés depuis le dernier événement envoyé"""
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+def final_event(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Dernier événement d'un job : référence vers le résultat, pas le résultat lui-même"""
+    event = {"type": row["status"], "job_id": row["id"], "percentage": row.get("progress_percentage") or 0}
+    if row["status"] == "completed":
+        event["result_url"] = f"/api/v1/job/{row['id']}/result"
+    else:
+        event["error"] = row.get("error")
+    return event
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encoder un événement au format Server-Sent Events"""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+# Instance globale
+job_events = JobEventBroker()
@@ -1,14 +1,26 @@
 """
 Gestionnaire de jobs pour suivre la progression des tâches
+Les jobs sont persistés dans un JobStore (mémoire, SQLite ou Redis) :
+plusieurs workers uvicorn partagent ainsi le même état.
+Leur exécution passe par un JobScheduler (file bornée, workers limités)
+et leur progression est poussée aux clients via un JobEventBroker.
 """
 
+import json
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator, AsyncIterator, Callable, Awaitable
 from enum import Enum
 import asyncio
 
 from app.core.logging import get_logger
+from app.core.exceptions import QueueFullError
+from app.services.job_events import (
+    JobEventBroker, job_events, job_state, state_delta, final_event,
+    min_event_interval, poll_interval, FINAL_STATUSES
+)
+from app.services.job_scheduler import JobScheduler, PRIORITY_STANDARD
+from app.services.job_store import JobStore, create_job_store
 
 logger = get_logger("job_manager")
 
@@ -27,6 +39,14 @@ class JobType(str, Enum):
     UPLOAD = "upload"
 
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _partial_key(job_id: str) -> str:
+    """Clé de l'analyse intermédiaire d'un job, stockée comme un résultat"""
+    return f"{job_id}:partial"
+
+
 class Job:
     """Représente un job en cours"""
     
@@ -51,6 +71,9 @@ class Job:
         
         # Métadonnées
         self.metadata: Dict[str, Any] = {}
+        
+        # Position dans la file d'attente (jobs en attente uniquement, non persistée)
+        self.queue: Optional[Dict[str, Any]] = None
     
     def start(self):
         """Démarre le job"""
@@ -82,6 +105,51 @@ class Job:
         self.updated_at = datetime.utcnow()
         self.error = error
     
+    def to_row(self) -> Dict[str, Any]:
+        """Ligne compacte pour le stockage (sans le résultat)"""
+        def timestamp(value: Optional[datetime]) -> Optional[float]:
+            return (value - _EPOCH).total_seconds() if value else None
+        
+        return {
+            "id": self.id,
+            "type": self.type.value,
+            "status": self.status.value,
+            "created_at": timestamp(self.created_at),
+            "updated_at": timestamp(self.updated_at),
+            "started_at": timestamp(self.started_at),
+            "completed_at": timestamp(self.completed_at),
+            "current_step": self.current_step,
+            "total_steps": self.total_steps,
+            "progress_percentage": self.progress_percentage,
+            "current_message": self.current_message,
+            "error": self.error,
+            "metadata": self.metadata
+        }
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Job":
+        """Reconstruire un job depuis une ligne du stockage"""
+        def as_datetime(value: Optional[float]) -> Optional[datetime]:
+            return datetime.utcfromtimestamp(value) if value is not None else None
+        
+        job = cls.__new__(cls)
+        job.id = row["id"]
+        job.type = JobType(row["type"])
+        job.status = JobStatus(row["status"])
+        job.created_at = as_datetime(row["created_at"])
+        job.updated_at = as_datetime(row["updated_at"])
+        job.started_at = as_datetime(row.get("started_at"))
+        job.completed_at = as_datetime(row.get("completed_at"))
+        job.current_step = row.get("current_step") or 0
+        job.total_steps = row.get("total_steps") or 0
+        job.progress_percentage = row.get("progress_percentage") or 0
+        job.current_message = row.get("current_message") or ""
+        job.result = None
+        job.error = row.get("error")
+        job.metadata = row.get("metadata") or {}
+        job.queue = None
+        return job
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convertit le job en dictionnaire"""
         return {
@@ -100,7 +168,8 @@ class Job:
             },
             "result": self.result,
             "error": self.error,
-            "metadata": self.metadata
+            "metadata": self.metadata,
+            "queue": self.queue
         }
 
 
@@ -108,7 +177,6 @@ class JobManager:
     """Gestionnaire singleton pour les jobs"""
     
     _instance = None
-    _jobs: Dict[str, Job] = {}
     _cleanup_task = None
     
     def __new__(cls):
@@ -117,11 +185,18 @@ class JobManager:
             cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self):
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        scheduler: Optional[JobScheduler] = None,
+        events: Optional[JobEventBroker] = None
+    ):
         if not self._initialized:
-            self._jobs = {}
+            self.store = store or create_job_store()
+            self.scheduler = scheduler or JobScheduler()
+            self.events = events or job_events
             self._initialized = True
-            logger.info("JobManager initialized")
+            logger.info(f"JobManager initialized ({type(self.store).__name__})")
     
     async def start_cleanup_task(self):
         """Démarre la tâche de nettoyage périodique"""
@@ -129,66 +204,217 @@ class JobManager:
             self._cleanup_task = asyncio.create_task(self._cleanup_old_jobs())
     
     async def _cleanup_old_jobs(self):
-        """Nettoie les jobs anciens (> 1 heure)"""
+        """Évince les jobs terminés expirés (TTL) ou en surnombre"""
         while True:
             try:
                 await asyncio.sleep(300)  # Toutes les 5 minutes
                 
-                now = datetime.utcnow()
-                cutoff = now - timedelta(hours=1)
-                
-                jobs_to_remove = []
-                for job_id, job in self._jobs.items():
-                    if job.completed_at and job.completed_at < cutoff:
-                        jobs_to_remove.append(job_id)
-                
-                for job_id in jobs_to_remove:
-                    del self._jobs[job_id]
-                    
-                if jobs_to_remove:
-                    logger.info(f"Cleaned up {len(jobs_to_remove)} old jobs")
+                removed = await asyncio.to_thread(self.store.evict)
+                if removed:
+                    logger.info(f"Cleaned up {removed} old jobs")
                     
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in cleanup task: {e}")
     
-    def create_job(self, job_type: JobType, total_steps: int = 0) -> Job:
+    async def close(self):
+        """Arrête les workers et le nettoyage périodique, puis ferme le stockage"""
+        for job_id in await self.scheduler.stop():
+            self.fail_job(job_id, "Traitement interrompu par l'arrêt du service")
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        self.store.close()
+    
+    async def submit_job(
+        self,
+        job_id: str,
+        run: Callable[[], Awaitable[Any]],
+        user_key: str,
+        priority: str = PRIORITY_STANDARD
+    ) -> Dict[str, Any]:
+        """
+        Met un job en file d'exécution.
+        
+        Returns:
+            Position dans la file et estimation de fin
+        
+        Raises:
+            QueueFullError: file pleine (le job est alors supprimé)
+        """
+        try:
+            return await self.scheduler.submit(job_id, run, user_key, priority)
+        except QueueFullError:
+            self.store.delete(job_id)
+            raise
+    
+    def save_job(self, job: Job):
+        """Persister l'état d'un job (sans son résultat) et le publier aux abonnés"""
+        row = job.to_row()
+        self.store.save(row)
+        self.events.publish(job.id, row)
+    
+    def create_job(
+        self,
+        job_type: JobType,
+        total_steps: int = 0,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Job:
         """Crée un nouveau job"""
         job = Job(job_type, total_steps)
-        self._jobs[job.id] = job
+        if metadata:
+            job.metadata = metadata
+        self.save_job(job)
         logger.info(f"Created job {job.id} of type {job_type}")
         return job
     
     def get_job(self, job_id: str) -> Optional[Job]:
-        """Récupère un job par son ID"""
-        return self._jobs.get(job_id)
+        """Récupère un job par son ID (le résultat se lit avec get_job_result)"""
+        row = self.store.get(job_id)
+        if not row:
+            return None
+        job = Job.from_row(row)
+        if job.status == JobStatus.PENDING:
+            job.queue = self.scheduler.get_position(job_id)
+        return job
+    
+    def start_job(self, job_id: str):
+        """Passe un job en cours de traitement"""
+        job = self.get_job(job_id)
+        if job:
+            job.start()
+            self.save_job(job)
     
     def update_job_progress(self, job_id: str, current_step: int, message: str = ""):
         """Met à jour la progression d'un job"""
         job = self.get_job(job_id)
         if job:
             job.update_progress(current_step, message)
+            self.save_job(job)
             logger.debug(f"Updated job {job_id}: step {current_step}/{job.total_steps} - {message}")
     
+    def update_job_partial_result(self, job_id: str, partial: Dict[str, Any]):
+        """
+        Publie un résultat intermédiaire (analyse IA des pages déjà extraites).
+        
+        Stocké à côté des résultats : la ligne du job ne garde qu'un numéro de
+        version, et les événements une référence vers /job/{id}/partial.
+        """
+        job = self.get_job(job_id)
+        if job:
+            self.store.save_result(_partial_key(job_id), json.dumps(partial, ensure_ascii=False, default=str))
+            job.metadata["partial_version"] = job.metadata.get("partial_version", 0) + 1
+            job.updated_at = datetime.utcnow()
+            self.save_job(job)
+    
+    def _clear_partial_result(self, job: Job):
+        """Le résultat final (ou l'échec) remplace l'analyse intermédiaire"""
+        if job.metadata.pop("partial_version", None) is not None:
+            self.store.delete(_partial_key(job.id))
+    
     def complete_job(self, job_id: str, result: Optional[Dict[str, Any]] = None):
         """Marque un job comme terminé"""
         job = self.get_job(job_id)
         if job:
-            job.complete(result)
+            # Résultat écrit avant le statut : un job "completed" a toujours son résultat
+            if result:
+                self.store.save_result(job_id, json.dumps(result, ensure_ascii=False, default=str))
+            self._clear_partial_result(job)
+            job.complete()
+            self.save_job(job)
             logger.info(f"Completed job {job_id}")
     
     def fail_job(self, job_id: str, error: str):
         """Marque un job comme échoué"""
         job = self.get_job(job_id)
         if job:
+            self._clear_partial_result(job)
             job.fail(error)
+            self.save_job(job)
             logger.error(f"Failed job {job_id}: {error}")
     
+    def get_job_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Résultat complet d'un job terminé"""
+        return self.store.get_result(job_id)
+    
+    def stream_job_result(self, job_id: str) -> Optional[Iterator[str]]:
+        """Résultat JSON d'un job, par morceaux (None si absent)"""
+        return self.store.iter_result(job_id)
+    
+    def get_job_partial_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Dernière analyse intermédiaire d'un job en cours (None si absente)"""
+        return self.store.get_result(_partial_key(job_id))
+    
+    def stream_job_partial_result(self, job_id: str) -> Optional[Iterator[str]]:
+        """Analyse intermédiaire JSON d'un job, par morceaux (None si absente)"""
+        return self.store.iter_result(_partial_key(job_id))
+    
+    async def watch_job(
+        self,
+        job_id: str,
+        min_interval: Optional[float] = None,
+        poll_seconds: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Flux d'événements d'un job : un instantané, puis les seuls champs modifiés,
+        puis un événement final avec la référence du résultat.
+        
+        Les mises à jour reçues pendant min_interval sont fusionnées en un événement.
+        Sans notification pendant poll_seconds, le stockage est relu (job traité
+        par un autre processus, position dans la file).
+        """
+        min_interval = min_event_interval() if min_interval is None else min_interval
+        poll_seconds = poll_interval() if poll_seconds is None else poll_seconds
+        
+        subscription = self.events.subscribe(job_id)
+        try:
+            job = self.get_job(job_id)
+            if not job:
+                return
+            
+            row = job.to_row()
+            yield {"type": "snapshot", "job": job.to_dict()}
+            if row["status"] in FINAL_STATUSES:
+                yield final_event(row)
+                return
+            last_state = job_state(row, job.queue)
+            
+            while True:
+                try:
+                    await asyncio.wait_for(subscription.updated.wait(), poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                row = subscription.take() or self.store.get(job_id)
+                if row is None:
+                    yield {"type": "failed", "job_id": job_id, "error": "Job expiré"}
+                    return
+                
+                if row["status"] in FINAL_STATUSES:
+                    yield final_event(row)
+                    return
+                
+                queue = self.scheduler.get_position(job_id) if row["status"] == JobStatus.PENDING.value else None
+                state = job_state(row, queue)
+                delta = state_delta(last_state, state)
+                if delta:
+                    yield {"type": "progress", **delta}
+                    last_state = state
+                
+                # Fenêtre de fusion : les mises à jour suivantes s'accumulent dans l'abonnement
+                await asyncio.sleep(min_interval)
+        finally:
+            self.events.unsubscribe(subscription)
+    
     def get_all_jobs(self, status: Optional[JobStatus] = None) -> Dict[str, Job]:
         """Récupère tous les jobs ou ceux d'un statut spécifique"""
-        if status:
-            return {k: v for k, v in self._jobs.items() if v.status == status}
-        return self._jobs.copy()
+        jobs = {}
+        for job_id in self.store.list_ids(status.value if status else None):
+            job = self.get_job(job_id)
+            if job:
+                jobs[job_id] = job
+        return jobs
 
 
 # Instance globale
-job_manager = JobManager()
\ No newline at end of file
+job_manager = JobManager()
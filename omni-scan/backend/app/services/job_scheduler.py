@@ -0,0 +1,271 @@
+"""
+Ordonnanceur des jobs de traitement
+File d'attente bornée servie par un nombre fixe de workers asyncio :
+- priorité aux comptes Pro, avec une part garantie pour les autres (pas de famine)
+- équité entre utilisateurs : leurs files sont servies à tour de rôle
+- refus explicite quand la file est pleine (429 par utilisateur, 503 global)
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app.core.exceptions import QueueFullError
+from app.core.logging import get_logger
+
+logger = get_logger("job_scheduler")
+
+PRIORITY_PRO = "pro"
+PRIORITY_STANDARD = "standard"
+
+
+@dataclass
+class QueuedJob:
+    """Job en attente d'un worker"""
+    job_id: str
+    user_key: str
+    priority: str
+    run: Callable[[], Awaitable[Any]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class _FairQueue:
+    """File d'un niveau de priorité : une sous-file par utilisateur, servies à tour de rôle"""
+
+    def __init__(self):
+        self.users: "OrderedDict[str, Deque[QueuedJob]]" = OrderedDict()
+        self.size = 0
+
+    def push(self, entry: QueuedJob):
+        self.users.setdefault(entry.user_key, deque()).append(entry)
+        self.size += 1
+
+    def pop(self) -> QueuedJob:
+        user_key, jobs = next(iter(self.users.items()))
+        entry = jobs.popleft()
+        # L'utilisateur servi repasse en fin de tour
+        del self.users[user_key]
+        if jobs:
+            self.users[user_key] = jobs
+        self.size -= 1
+        return entry
+
+    def drain(self) -> List[QueuedJob]:
+        entries = self.order()
+        self.users.clear()
+        self.size = 0
+        return entries
+
+    def order(self) -> List[QueuedJob]:
+        """Ordre de service prévu (tourniquet entre utilisateurs)"""
+        queues = list(self.users.values())
+        entries = []
+        depth = 0
+        while len(entries) < self.size:
+            for jobs in queues:
+                if depth < len(jobs):
+                    entries.append(jobs[depth])
+            depth += 1
+        return entries
+
+
+class JobScheduler:
+    """File de jobs bornée avec un nombre limité de workers concurrents"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_per_user: Optional[int] = None,
+        pro_weight: Optional[int] = None,
+        estimated_duration: Optional[float] = None
+    ):
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.max_queue = max_queue or int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+        self.max_per_user = max_per_user or int(os.getenv("JOB_QUEUE_MAX_PER_USER", "5"))
+        # Nombre de jobs Pro servis d'affilée avant de laisser passer un job standard
+        self.pro_weight = pro_weight or int(os.getenv("JOB_QUEUE_PRO_WEIGHT", "3"))
+        # Durée moyenne d'un job (moyenne glissante), utilisée pour l'ETA
+        self.average_duration = estimated_duration or float(os.getenv("JOB_ESTIMATED_SECONDS", "30"))
+
+        self._queues = {PRIORITY_PRO: _FairQueue(), PRIORITY_STANDARD: _FairQueue()}
+        self._pro_streak = 0
+        self._running: Dict[str, QueuedJob] = {}
+        self._user_counts: Dict[str, int] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def queued(self) -> int:
+        return sum(queue.size for queue in self._queues.values())
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def start(self):
+        """Démarrer les workers sur la boucle courante (idempotent)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        # Nouvelle boucle (tests, rechargement) : les anciens workers sont perdus
+        self._loop = loop
+        self._condition = asyncio.Condition()
+        self._running.clear()
+        self._user_counts = {}
+        for entry in self._iter_queued():
+            self._user_counts[entry.user_key] = self._user_counts.get(entry.user_key, 0) + 1
+        self._tasks = [
+            asyncio.create_task(self._worker(index), name=f"job-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(
+            f"Job scheduler started: {self.workers} workers, queue max {self.max_queue}, "
+            f"{self.max_per_user} per user"
+        )
+
+    async def stop(self) -> List[str]:
+        """Arrêter les workers ; retourne les jobs en attente ou interrompus"""
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        pending = [entry.job_id for queue in self._queues.values() for entry in queue.drain()]
+        self._running.clear()
+        self._user_counts.clear()
+        return interrupted + pending
+
+    def _retry_after(self) -> int:
+        """Délai conseillé avant de réessayer : le temps de libérer un worker"""
+        return max(1, math.ceil(self.average_duration))
+
+    async def submit(
+        self,
+        job_id: str,
+        run: Callable[[], Awaitable[Any]],
+        user_key: str,
+        priority: str = PRIORITY_STANDARD
+    ) -> Dict[str, Any]:
+        """
+        Mettre un job en file.
+
+        Raises:
+            QueueFullError: 429 si l'utilisateur a trop de jobs, 503 si la file est pleine
+        """
+        self.start()
+
+        if self._user_counts.get(user_key, 0) >= self.max_per_user:
+            raise QueueFullError(
+                f"Trop de documents en cours pour cet utilisateur (max {self.max_per_user})",
+                status_code=429,
+                retry_after=self._retry_after(),
+                limit=self.max_per_user
+            )
+        if self.queued >= self.max_queue:
+            raise QueueFullError(
+                "File de traitement pleine, réessayez plus tard",
+                status_code=503,
+                retry_after=self._retry_after(),
+                limit=self.max_queue
+            )
+
+        self._queues[priority].push(QueuedJob(job_id, user_key, priority, run))
+        self._user_counts[user_key] = self._user_counts.get(user_key, 0) + 1
+        async with self._condition:
+            self._condition.notify()
+
+        return self.get_position(job_id)
+
+    def _next_priority(self, pro: int, standard: int, streak: int) -> Optional[str]:
+        if pro and (not standard or streak < self.pro_weight):
+            return PRIORITY_PRO
+        if standard:
+            return PRIORITY_STANDARD
+        return None
+
+    def _pop(self) -> QueuedJob:
+        priority = self._next_priority(
+            self._queues[PRIORITY_PRO].size, self._queues[PRIORITY_STANDARD].size, self._pro_streak
+        )
+        self._pro_streak = self._pro_streak + 1 if priority == PRIORITY_PRO else 0
+        return self._queues[priority].pop()
+
+    def _iter_queued(self) -> List[QueuedJob]:
+        return [entry for queue in self._queues.values() for entry in queue.order()]
+
+    def dispatch_order(self) -> List[QueuedJob]:
+        """Ordre prévu de démarrage des jobs en attente"""
+        pro = deque(self._queues[PRIORITY_PRO].order())
+        standard = deque(self._queues[PRIORITY_STANDARD].order())
+        streak = self._pro_streak
+        order = []
+        while pro or standard:
+            if self._next_priority(len(pro), len(standard), streak) == PRIORITY_PRO:
+                order.append(pro.popleft())
+                streak += 1
+            else:
+                order.append(standard.popleft())
+                streak = 0
+        return order
+
+    def get_position(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Position dans la file et estimation de fin (None si le job n'attend pas ici)"""
+        for index, entry in enumerate(self.dispatch_order()):
+            if entry.job_id == job_id:
+                position = index + 1
+                return {
+                    "position": position,
+                    "queued": self.queued,
+                    "eta_seconds": self._estimate_completion(position)
+                }
+        return None
+
+    def _estimate_completion(self, position: int) -> int:
+        # Jobs à terminer avant qu'un worker se libère pour celui-ci
+        ahead = position - 1 + self.running
+        waves = math.ceil(max(0, ahead + 1 - self.workers) / self.workers)
+        return math.ceil((waves + 1) * self.average_duration)
+
+    async def _worker(self, index: int):
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self.queued > 0)
+                entry = self._pop()
+
+            self._running[entry.job_id] = entry
+            started = time.monotonic()
+            try:
+                await entry.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {entry.job_id} crashed in worker {index}: {e}", exc_info=True)
+            else:
+                duration = time.monotonic() - started
+                self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+            finally:
+                self._running.pop(entry.job_id, None)
+                remaining = self._user_counts.get(entry.user_key, 1) - 1
+                if remaining > 0:
+                    self._user_counts[entry.user_key] = remaining
+                else:
+                    self._user_counts.pop(entry.user_key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.queued,
+            "queued_pro": self._queues[PRIORITY_PRO].size,
+            "max_queue": self.max_queue,
+            "max_per_user": self.max_per_user,
+            "average_duration": round(self.average_duration, 1)
+        }
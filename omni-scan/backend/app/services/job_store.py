@@ -0,0 +1,396 @@
+"""
+Stockage des jobs : mémoire, SQLite (WAL) ou Redis
+Les lignes de job restent compactes (progression, statut, métadonnées) ;
+les résultats sont stockés à part et lus ou streamés à la demande.
+"""
+
+import codecs
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List, Iterator
+
+from app.core.logging import get_logger
+
+logger = get_logger("job_store")
+
+# Statuts terminaux : seuls ces jobs sont évincés
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Colonnes d'une ligne de job
+JOB_FIELDS = (
+    "id", "type", "status", "created_at", "updated_at", "started_at", "completed_at",
+    "current_step", "total_steps", "progress_percentage", "current_message", "error", "metadata"
+)
+
+RESULT_CHUNK_SIZE = 64 * 1024
+
+
+class JobStore(ABC):
+    """Interface d'un stockage de jobs"""
+
+    def __init__(self, ttl: float = 3600, max_jobs: int = 1000):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+
+    @abstractmethod
+    def save(self, row: Dict[str, Any]) -> None:
+        """Créer ou mettre à jour la ligne d'un job"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Lire la ligne d'un job"""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        """Supprimer un job et son résultat"""
+
+    @abstractmethod
+    def save_result(self, job_id: str, payload: str) -> None:
+        """Stocker le résultat (JSON sérialisé) d'un job"""
+
+    @abstractmethod
+    def iter_result(self, job_id: str, chunk_size: int = RESULT_CHUNK_SIZE) -> Optional[Iterator[str]]:
+        """Lire le résultat par morceaux (None si absent)"""
+
+    @abstractmethod
+    def list_ids(self, status: Optional[str] = None) -> List[str]:
+        """Identifiants des jobs, filtrés par statut via l'index"""
+
+    @abstractmethod
+    def evict(self) -> int:
+        """Supprimer les jobs terminés expirés, puis les plus anciens au-delà de max_jobs"""
+
+    def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Lire le résultat complet d'un job"""
+        chunks = self.iter_result(job_id)
+        if chunks is None:
+            return None
+        return json.loads("".join(chunks))
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryJobStore(JobStore):
+    """Stockage en mémoire (un seul worker), borné en nombre de jobs"""
+
+    def __init__(self, ttl: float = 3600, max_jobs: int = 1000):
+        super().__init__(ttl, max_jobs)
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._results: Dict[str, str] = {}
+        self._by_status: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def save(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            previous = self._rows.get(row["id"])
+            if previous is not None:
+                self._by_status.get(previous["status"], set()).discard(row["id"])
+            self._rows[row["id"]] = dict(row)
+            self._by_status.setdefault(row["status"], set()).add(row["id"])
+            overflow = len(self._rows) > self.max_jobs
+        if overflow:
+            self.evict()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._rows.get(job_id)
+        return dict(row) if row is not None else None
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(job_id, None)
+            if row is not None:
+                self._by_status.get(row["status"], set()).discard(job_id)
+            self._results.pop(job_id, None)
+
+    def save_result(self, job_id: str, payload: str) -> None:
+        self._results[job_id] = payload
+
+    def iter_result(self, job_id: str, chunk_size: int = RESULT_CHUNK_SIZE) -> Optional[Iterator[str]]:
+        payload = self._results.get(job_id)
+        if payload is None:
+            return None
+        return (payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size))
+
+    def list_ids(self, status: Optional[str] = None) -> List[str]:
+        if status:
+            return list(self._by_status.get(status, ()))
+        return list(self._rows)
+
+    def evict(self) -> int:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            finished = sorted(
+                (row for row in self._rows.values() if row["status"] in FINISHED_STATUSES),
+                key=lambda row: row["updated_at"]
+            )
+            expired = [row["id"] for row in finished if row["updated_at"] < cutoff]
+            excess = len(self._rows) - len(expired) - self.max_jobs
+            if excess > 0:
+                expired += [row["id"] for row in finished if row["id"] not in expired][:excess]
+        for job_id in expired:
+            self.delete(job_id)
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """Stockage SQLite (WAL) partagé entre les workers d'une même machine"""
+
+    def __init__(self, db_path: str, ttl: float = 3600, max_jobs: int = 1000):
+        super().__init__(ttl, max_jobs)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                started_at REAL,
+                completed_at REAL,
+                current_step INTEGER NOT NULL DEFAULT 0,
+                total_steps INTEGER NOT NULL DEFAULT 0,
+                progress_percentage INTEGER NOT NULL DEFAULT 0,
+                current_message TEXT,
+                error TEXT,
+                metadata TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_updated ON jobs(status, updated_at);
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def save(self, row: Dict[str, Any]) -> None:
+        values = dict(row, metadata=json.dumps(row.get("metadata") or {}, default=str))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(JOB_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in JOB_FIELDS)})",
+                tuple(values.get(field) for field in JOB_FIELDS)
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        data = dict(row)
+        data["metadata"] = json.loads(data["metadata"]) if data["metadata"] else {}
+        return data
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def save_result(self, job_id: str, payload: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_results (job_id, payload) VALUES (?, ?)", (job_id, payload)
+            )
+            self._conn.commit()
+
+    def iter_result(self, job_id: str, chunk_size: int = RESULT_CHUNK_SIZE) -> Optional[Iterator[str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT length(payload) FROM job_results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        def chunks() -> Iterator[str]:
+            # Lecture par sous-chaînes : le résultat n'est jamais chargé en entier
+            for start in range(1, row[0] + 1, chunk_size):
+                with self._lock:
+                    part = self._conn.execute(
+                        "SELECT substr(payload, ?, ?) FROM job_results WHERE job_id = ?",
+                        (start, chunk_size, job_id)
+                    ).fetchone()
+                if part is None:
+                    return
+                yield part[0]
+
+        return chunks()
+
+    def list_ids(self, status: Optional[str] = None) -> List[str]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute("SELECT id FROM jobs WHERE status = ?", (status,)).fetchall()
+            else:
+                rows = self._conn.execute("SELECT id FROM jobs").fetchall()
+        return [row[0] for row in rows]
+
+    def evict(self) -> int:
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._lock:
+            expired = [
+                row[0] for row in self._conn.execute(
+                    f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+                    (*FINISHED_STATUSES, time.time() - self.ttl)
+                )
+            ]
+            total = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            excess = total - len(expired) - self.max_jobs
+            if excess > 0:
+                expired += [
+                    row[0] for row in self._conn.execute(
+                        f"SELECT id FROM jobs WHERE status IN ({placeholders}) "
+                        f"ORDER BY updated_at LIMIT ? OFFSET ?",
+                        (*FINISHED_STATUSES, excess, len(expired))
+                    )
+                ]
+            for job_id in expired:
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+        return len(expired)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisJobStore(JobStore):
+    """
+    Stockage Redis partagé entre machines.
+    Accepte tout client compatible (redis-py, fakeredis en local).
+    """
+
+    def __init__(self, client, ttl: float = 3600, max_jobs: int = 1000, prefix: str = "omniscan:"):
+        super().__init__(ttl, max_jobs)
+        self.client = client
+        self.prefix = prefix
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _result_key(self, job_id: str) -> str:
+        return f"{self.prefix}job_result:{job_id}"
+
+    def _status_key(self, status: str) -> str:
+        return f"{self.prefix}jobs:status:{status}"
+
+    @property
+    def _finished_key(self) -> str:
+        # Jobs terminés triés par date de mise à jour
+        return f"{self.prefix}jobs:finished"
+
+    def save(self, row: Dict[str, Any]) -> None:
+        previous = self.get(row["id"])
+        pipe = self.client.pipeline()
+        if previous is not None and previous["status"] != row["status"]:
+            pipe.srem(self._status_key(previous["status"]), row["id"])
+        pipe.sadd(self._status_key(row["status"]), row["id"])
+        pipe.set(self._job_key(row["id"]), json.dumps(row, default=str))
+        if row["status"] in FINISHED_STATUSES:
+            pipe.zadd(self._finished_key, {row["id"]: row["updated_at"]})
+            # Filet de sécurité : Redis expire aussi les clés lui-même
+            pipe.expire(self._job_key(row["id"]), int(self.ttl) * 2)
+            pipe.expire(self._result_key(row["id"]), int(self.ttl) * 2)
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = self.client.get(self._job_key(job_id))
+        return json.loads(data) if data else None
+
+    def delete(self, job_id: str) -> None:
+        row = self.get(job_id)
+        pipe = self.client.pipeline()
+        if row is not None:
+            pipe.srem(self._status_key(row["status"]), job_id)
+        pipe.zrem(self._finished_key, job_id)
+        pipe.delete(self._job_key(job_id), self._result_key(job_id))
+        pipe.execute()
+
+    def save_result(self, job_id: str, payload: str) -> None:
+        self.client.set(self._result_key(job_id), payload.encode("utf-8"))
+
+    def iter_result(self, job_id: str, chunk_size: int = RESULT_CHUNK_SIZE) -> Optional[Iterator[str]]:
+        key = self._result_key(job_id)
+        size = self.client.strlen(key)
+        if not size:
+            return None
+
+        def chunks() -> Iterator[str]:
+            # GETRANGE travaille en octets : décodage incrémental aux frontières UTF-8
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            for start in range(0, size, chunk_size):
+                part = self.client.getrange(key, start, start + chunk_size - 1)
+                if isinstance(part, str):
+                    part = part.encode("utf-8")
+                text = decoder.decode(part)
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+        return chunks()
+
+    def list_ids(self, status: Optional[str] = None) -> List[str]:
+        if status:
+            members = self.client.smembers(self._status_key(status))
+        else:
+            members = set()
+            for key in self.client.scan_iter(f"{self.prefix}jobs:status:*"):
+                members |= self.client.smembers(key)
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+
+    def evict(self) -> int:
+        expired = self.client.zrangebyscore(self._finished_key, "-inf", time.time() - self.ttl)
+        total = sum(
+            self.client.scard(self._status_key(status))
+            for status in ("pending", "processing", *FINISHED_STATUSES)
+        )
+        excess = total - len(expired) - self.max_jobs
+        if excess > 0:
+            expired += self.client.zrange(self._finished_key, len(expired), len(expired) + excess - 1)
+        for job_id in expired:
+            self.delete(job_id.decode() if isinstance(job_id, bytes) else job_id)
+        return len(expired)
+
+
+def create_job_store() -> JobStore:
+    """Construire le stockage de jobs à partir des variables d'environnement"""
+    backend = os.getenv("JOB_STORE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+    max_jobs = int(os.getenv("JOB_MAX_JOBS", "1000"))
+
+    try:
+        if backend == "sqlite":
+            db_path = os.getenv("JOB_STORE_PATH", "temp/jobs.db")
+            logger.info(f"Jobs stockés dans SQLite: {db_path}")
+            return SQLiteJobStore(db_path, ttl=ttl, max_jobs=max_jobs)
+        if backend == "redis":
+            import redis
+
+            url = os.getenv("JOB_STORE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379"))
+            client = redis.from_url(url)
+            client.ping()
+            logger.info(f"Jobs stockés dans Redis: {url}")
+            return RedisJobStore(client, ttl=ttl, max_jobs=max_jobs)
+    except Exception as e:
+        logger.error(f"Stockage de jobs '{backend}' indisponible, repli en mémoire: {e}")
+
+    return MemoryJobStore(ttl=ttl, max_jobs=max_jobs)
@@ -2,14 +2,17 @@
 Base classes pour le système OCR modulaire
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, AsyncIterator
 from enum import Enum
 from pathlib import Path
 import numpy as np
 from PIL import Image
 
+from .batching import default_max_batch_size
+
 
 class OutputFormat(Enum):
     """Formats de sortie supportés"""
@@ -81,9 +84,23 @@ class OCRResult:
     page_count: int = 1
     language: Optional[str] = None
     
+    # Numéro de page (résultats par page du pipeline PDF)
+    page_number: Optional[int] = None
+    
+    # Page servie par le cache de pages / compteurs du cache pour un document
+    from_cache: bool = False
+    page_cache: Optional[Dict[str, int]] = None
+    
+    # Origine du texte d'une page ("ocr" ou "text_layer") / détail par page d'un document
+    source: str = "ocr"
+    page_details: Optional[List[Dict[str, Any]]] = None
+    
     # Zones de texte avec coordonnées
     text_blocks: Optional[List[Dict[str, Any]]] = None
     
+    # Moteur ayant réellement traité le document (nom d'enregistrement)
+    engine: Optional[str] = None
+    
     # Warnings ou infos
     warnings: Optional[List[str]] = None
     
@@ -131,9 +148,15 @@ class OCRConfig:
     enable_preprocessing: bool = True
     enable_postprocessing: bool = True
     
+    # Profil de preprocessing : "fast", "balanced" ou "quality" (None = OCR_PREPROCESSING_PROFILE)
+    preprocessing_profile: Optional[str] = None
+    
     # Zones d'intérêt
     regions: Optional[List[BoundingBox]] = None
     
+    # Détection des blocs de texte pour n'OCRiser que ces zones (None = OCR_REGION_DETECTION)
+    detect_regions: Optional[bool] = None
+    
     # Performance
     use_gpu: bool = False
     batch_size: int = 1
@@ -146,11 +169,49 @@ class OCRConfig:
     def __post_init__(self):
         if self.languages is None:
             self.languages = ["fra", "eng"]
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Champs qui changent le résultat de l'OCR (clés de cache)"""
+        from app.utils.image_preprocessing import default_profile
+        from .text_regions import region_detection_mode
+        
+        return {
+            "languages": list(self.languages or []),
+            "output_format": self.output_format.value,
+            "enable_preprocessing": self.enable_preprocessing,
+            "preprocessing_profile": self.preprocessing_profile or default_profile(),
+            "enable_postprocessing": self.enable_postprocessing,
+            "enhance_quality": self.enhance_quality,
+            "extract_tables": self.extract_tables,
+            "extract_formulas": self.extract_formulas,
+            "min_confidence": self.min_confidence,
+            "max_pages": self.max_pages,
+            "regions": [
+                [r.x, r.y, r.width, r.height] if isinstance(r, BoundingBox) else r
+                for r in (self.regions or [])
+            ],
+            "detect_regions": region_detection_mode() if self.detect_regions is None else self.detect_regions
+        }
 
 
 class OCREngine(ABC):
     """Interface abstraite pour un moteur OCR"""
     
+    # Résolution de rastérisation des PDFs pour le traitement page par page
+    pdf_dpi: int = 300
+    
+    # Le moteur peut-il traiter un PDF page par page (pool de workers) ?
+    # Les moteurs multi-pages natifs (GOT-OCR2) traitent le document entier.
+    supports_page_dispatch: bool = True
+    
+    # Le moteur regroupe-t-il les pages concurrentes en lots (micro-batching) ?
+    # Les lots se forment dans le processus : ces moteurs contournent le pool de workers.
+    batches_in_process: bool = False
+    
+    # Coût relatif d'une page (cascade : le moins coûteux d'abord, les plus lourds
+    # seulement pour les pages sous OCRConfig.min_confidence)
+    cost_rank: int = 1
+    
     def __init__(self, config: Optional[OCRConfig] = None):
         self.config = config or OCRConfig()
         self._initialized = False
@@ -160,6 +221,11 @@ class OCREngine(ABC):
         """Initialiser le moteur (charger modèles, etc.)"""
         pass
     
+    async def warm_up(self) -> None:
+        """Charger le moteur et faire une inférence à blanc (premières allocations, chemins paresseux)"""
+        await self.initialize()
+        await self.process_image(Image.new("RGB", (200, 64), "white"), self.config)
+    
     @abstractmethod
     async def process_image(
         self,
@@ -218,19 +284,94 @@ class OCREngine(ABC):
         file_paths: List[Union[str, Path]],
         config: Optional[OCRConfig] = None
     ) -> List[OCRResult]:
-        """Traiter plusieurs documents"""
-        results = []
-        for file_path in file_paths:
-            file_path = Path(file_path)
-            file_type = file_path.suffix.lstrip(".")
-            result = await self.process_document(file_path, file_type, config)
-            results.append(result)
-        return results
+        """
+        Traiter plusieurs documents en parallèle.
+        
+        Les documents sont soumis ensemble pour que les moteurs à lots
+        les regroupent ; les résultats suivent l'ordre de file_paths.
+        """
+        semaphore = asyncio.Semaphore(default_max_batch_size())
+        
+        async def process(file_path: Path) -> OCRResult:
+            async with semaphore:
+                return await self.process_document(file_path, file_path.suffix.lstrip("."), config)
+        
+        return list(await asyncio.gather(*(process(Path(path)) for path in file_paths)))
+    
+    def rasterize_pdf(
+        self,
+        pdf_path: Union[str, Path],
+        config: Optional[OCRConfig] = None,
+        first_page: int = 1,
+        last_page: Optional[int] = None
+    ) -> List[Image.Image]:
+        """Convertir une plage de pages d'un PDF en images (opération bloquante)"""
+        import pdf2image
+        
+        config = config or self.config
+        return pdf2image.convert_from_path(
+            pdf_path,
+            dpi=self.pdf_dpi,
+            first_page=first_page,
+            last_page=last_page or config.max_pages
+        )
+    
+    async def stream_pdf(
+        self,
+        pdf_path: Union[str, Path],
+        config: Optional[OCRConfig] = None
+    ) -> AsyncIterator[OCRResult]:
+        """Traiter un PDF page par page, en rastérisant par fenêtres"""
+        from .pdf_stream import stream_pdf_pages
+        from .page_cache import get_page_cache
+        
+        async for page_result in stream_pdf_pages(
+            self, pdf_path, config or self.config, page_cache=get_page_cache()
+        ):
+            yield page_result
+    
+    # Séparateur entre les pages dans le texte du document
+    PAGE_SEPARATOR = "\n\n"
+    
+    def format_page_text(self, page_number: int, page_result: OCRResult) -> Optional[str]:
+        """Texte d'une page tel qu'assemblé dans le document (None : page omise)"""
+        if not page_result.text.strip():
+            return None
+        return f"--- Page {page_number} ---\n{page_result.text}"
+    
+    def merge_page_results(
+        self,
+        page_results: List[OCRResult],
+        config: Optional[OCRConfig] = None
+    ) -> OCRResult:
+        """Assembler les résultats par page en un résultat de document"""
+        config = config or self.config
+        
+        texts = []
+        total_confidence = 0.0
+        for page_num, page_result in enumerate(page_results, start=1):
+            page_text = self.format_page_text(page_num, page_result)
+            if page_text is not None:
+                texts.append(page_text)
+                total_confidence += page_result.confidence
+        
+        page_count = len(page_results)
+        return OCRResult(
+            text=self.PAGE_SEPARATOR.join(texts),
+            confidence=total_confidence / page_count if page_count else 0.0,
+            processing_time=sum(r.processing_time for r in page_results),
+            page_count=page_count,
+            language=config.languages[0] if config.languages else "unknown"
+        )
     
     def can_handle(self, feature: OCRFeature) -> bool:
         """Vérifier si le moteur supporte une fonctionnalité"""
         return feature in self.get_supported_features()
     
+    def refresh_capabilities(self) -> None:
+        """Relire les capacités sondées à l'initialisation (langues installées, etc.)"""
+        pass
+    
     async def cleanup(self) -> None:
         """Nettoyer les ressources (modèles en mémoire, etc.)"""
         pass
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Micro-batching des inférences OCR
+Les pages soumises en même temps (pages d'un PDF, requêtes concurrentes) sont
+regroupées pendant une courte fenêtre puis traitées en un seul appel au modèle.
+Compromis latence / débit réglable : OCR_BATCH_MAX_SIZE et OCR_BATCH_MAX_WAIT_MS.
+"""
+
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.logging import get_logger
+
+logger = get_logger("ocr.batching")
+
+
+def default_max_batch_size() -> int:
+    """Nombre maximum d'images par lot (1 = pas de regroupement)"""
+    return max(1, int(os.getenv("OCR_BATCH_MAX_SIZE", "8")))
+
+
+def default_max_wait() -> float:
+    """Attente maximale pour compléter un lot, en secondes"""
+    return max(0, int(os.getenv("OCR_BATCH_MAX_WAIT_MS", "20"))) / 1000
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels concurrents en lots pour une fonction d'inférence bloquante.
+
+    run_batch reçoit une liste d'entrées et retourne une liste de sorties dans le même
+    ordre ; elle est exécutée dans un thread, un lot à la fois (les modèles ne sont pas
+    réentrants). Pendant qu'un lot tourne, le suivant se remplit.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        name: str = "batch"
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size or default_max_batch_size()
+        self.max_wait = default_max_wait() if max_wait is None else max_wait
+        self.name = name
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._changed: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Soumettre une entrée et attendre sa sortie"""
+        if self.max_batch_size <= 1:
+            return (await asyncio.to_thread(self.run_batch, [item]))[0]
+
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._pending.append((item, future))
+        self._changed.set()
+        return await future
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        # Nouvelle boucle (workers du pool, tests) : repartir d'un état propre
+        self._loop = loop
+        self._changed = asyncio.Event()
+        self._pending = [(item, future) for item, future in self._pending if not future.done()]
+        self._worker = loop.create_task(self._run(), name=f"ocr-batcher-{self.name}")
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Attendre un premier élément, puis compléter le lot jusqu'à la taille ou l'échéance"""
+        while not self._pending:
+            self._changed.clear()
+            await self._changed.wait()
+
+        deadline = self._loop.time() + self.max_wait
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # Requêtes annulées pendant l'attente
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                outputs = await asyncio.to_thread(self.run_batch, items)
+            except Exception as e:
+                logger.error(f"Lot {self.name} de {len(items)} image(s) en échec: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._batches += 1
+            self._items += len(items)
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+    async def close(self) -> None:
+        """Arrêter la collecte ; les appels en attente échouent"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        for _, future in self._pending:
+            if not future.done():
+                future.cancel()
+        self._pending = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": int(self.max_wait * 1000),
+            "batches": self._batches,
+            "items": self._items,
+            "average_batch_size": round(self._items / self._batches, 2) if self._batches else 0
+        }
+
+
+def pad_to_common_size(images: List[np.ndarray], fill: int = 255) -> List[np.ndarray]:
+    """
+    Compléter les images (à droite et en bas) jusqu'à une taille commune.
+
+    Les modèles traitent un lot comme un seul tenseur ; l'ancrage en haut à gauche
+    conserve les coordonnées des boîtes de chaque image.
+    """
+    height = max(image.shape[0] for image in images)
+    width = max(image.shape[1] for image in images)
+    padded = []
+    for image in images:
+        if image.shape[0] == height and image.shape[1] == width:
+            padded.append(image)
+            continue
+        canvas = np.full((height, width) + image.shape[2:], fill, dtype=image.dtype)
+        canvas[:image.shape[0], :image.shape[1]] = image
+        padded.append(canvas)
+    return padded
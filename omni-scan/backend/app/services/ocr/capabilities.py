@@ -0,0 +1,93 @@
+"""
+Registre des capacités des moteurs OCR
+Versions, langues, fonctionnalités et formats sont sondés une fois à l'initialisation
+(la sonde Tesseract lance des sous-processus), puis servis depuis ce registre.
+Rafraîchissement à la demande ou périodique (OCR_CAPABILITIES_REFRESH_SECONDS).
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
+
+from app.core.logging import get_logger
+
+from .base import OCREngine, OCRFeature
+
+logger = get_logger("ocr.capabilities")
+
+
+@dataclass
+class EngineCapabilities:
+    """Capacités sondées d'un moteur"""
+    key: str
+    name: str
+    version: str
+    features: List[str] = field(default_factory=list)
+    languages: List[str] = field(default_factory=list)
+    supported_formats: List[str] = field(default_factory=list)
+    info: Dict[str, Any] = field(default_factory=dict)
+
+    def supports(self, feature: OCRFeature) -> bool:
+        return feature.value in self.features
+
+
+def probe_engine(key: str, engine: OCREngine, refresh: bool = False) -> EngineCapabilities:
+    """Sonder un moteur (opération bloquante : peut lancer des sous-processus)"""
+    if refresh:
+        engine.refresh_capabilities()
+    info = engine.get_info()
+    return EngineCapabilities(
+        key=key,
+        name=info.get("name", key),
+        version=str(info.get("version", "unknown")),
+        features=[feature.value for feature in engine.get_supported_features()],
+        languages=list(engine.get_supported_languages()),
+        supported_formats=list(info.get("supported_formats", [])),
+        info=info
+    )
+
+
+class EngineCapabilityRegistry:
+    """Instantané des capacités de tous les moteurs chargés"""
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("OCR_CAPABILITIES_REFRESH_SECONDS", "0"))
+        # 0 = jamais rafraîchi automatiquement
+        self.refresh_interval = refresh_interval
+        self.engines: Dict[str, EngineCapabilities] = {}
+        self.built_at: Optional[float] = None
+
+    def build(self, engines: Dict[str, OCREngine], refresh: bool = False) -> None:
+        """Sonder tous les moteurs (opération bloquante)"""
+        capabilities = {}
+        for key, engine in engines.items():
+            try:
+                capabilities[key] = probe_engine(key, engine, refresh)
+            except Exception as e:
+                logger.warning(f"Capacités du moteur {key} indisponibles: {e}")
+                # On garde l'ancien instantané plutôt que de perdre le moteur
+                if key in self.engines:
+                    capabilities[key] = self.engines[key]
+        # Remplacement atomique : les lecteurs voient l'ancien ou le nouvel instantané
+        self.engines = capabilities
+        self.built_at = time.time()
+        logger.info(f"Capacités OCR sondées pour {len(capabilities)} moteur(s)")
+
+    def is_stale(self) -> bool:
+        if self.built_at is None:
+            return True
+        return self.refresh_interval > 0 and time.time() - self.built_at > self.refresh_interval
+
+    def get(self, key: str) -> Optional[EngineCapabilities]:
+        return self.engines.get(key)
+
+    def get_info(self) -> Dict[str, Dict[str, Any]]:
+        return {key: capabilities.info for key, capabilities in self.engines.items()}
+
+    def supported_features(self) -> List[str]:
+        return sorted({feature for caps in self.engines.values() for feature in caps.features})
+
+    def supported_languages(self) -> List[str]:
+        return sorted({language for caps in self.engines.values() for language in caps.languages})
@@ -2,6 +2,7 @@
 Moteur OCR GOT-OCR2.0 - State-of-the-art OCR avec support avancé
 """
 
+import asyncio
 import os
 import time
 from typing import Optional, Dict, Any, List, Union
@@ -28,6 +29,15 @@ class GOTOCR2Engine(OCREngine):
     - Support OCR interactif par zones
     """
     
+    # Modèle le plus lourd : dernier recours de la cascade
+    cost_rank = 3
+    
+    # chat() n'expose pas les scores des tokens : confiance estimée, pas mesurée
+    estimated_confidence = 0.95
+    
+    # Traitement multi-page natif (chat_crop) : pas de découpage par page
+    supports_page_dispatch = False
+    
     def __init__(self, config: Optional[OCRConfig] = None):
         super().__init__(config)
         self.name = "GOT-OCR2.0"
@@ -58,12 +68,15 @@ class GOTOCR2Engine(OCREngine):
             model_name = os.getenv("GOT_OCR2_MODEL", "stepfun-ai/GOT-OCR2_0")
             logger.info(f"Chargement du modèle: {model_name}")
             
-            self.tokenizer = AutoTokenizer.from_pretrained(
+            # Chargement des poids dans un thread : la boucle d'événements reste libre
+            self.tokenizer = await asyncio.to_thread(
+                AutoTokenizer.from_pretrained,
                 model_name,
                 trust_remote_code=True
             )
             
-            self.model = AutoModel.from_pretrained(
+            self.model = await asyncio.to_thread(
+                AutoModel.from_pretrained,
                 model_name,
                 trust_remote_code=True,
                 low_cpu_mem_usage=True,
@@ -138,7 +151,7 @@ class GOTOCR2Engine(OCREngine):
                 json_data=parsed_result.get("json_data"),
                 tables=parsed_result.get("tables"),
                 formulas=parsed_result.get("formulas"),
-                confidence=0.95,  # GOT-OCR2.0 a généralement une très haute précision
+                confidence=self.estimated_confidence,
                 processing_time=processing_time,
                 language=config.languages[0] if config.languages else "multi"
             )
@@ -187,7 +200,7 @@ class GOTOCR2Engine(OCREngine):
                 json_data=parsed_result.get("json_data"),
                 tables=parsed_result.get("tables"),
                 formulas=parsed_result.get("formulas"),
-                confidence=0.95,
+                confidence=self.estimated_confidence,
                 processing_time=processing_time,
                 page_count=parsed_result.get("page_count", 1),
                 language=config.languages[0] if config.languages else "multi"
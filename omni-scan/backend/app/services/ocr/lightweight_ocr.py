@@ -5,7 +5,7 @@ Combinaison EasyOCR + PaddleOCR + optimisations mémoire
 
 import asyncio
 import time
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Tuple, Union
 from pathlib import Path
 import os
 import gc
@@ -16,6 +16,8 @@ import cv2
 
 from app.core.logging import get_logger
 from .base import OCREngine, OCRResult, OCRConfig, OCRFeature, OutputFormat, BoundingBox
+from .batching import MicroBatcher, default_max_batch_size, pad_to_common_size
+from .page_cache import record_page_cache_stats
 
 logger = get_logger("ocr.lightweight")
 
@@ -23,6 +25,8 @@ logger = get_logger("ocr.lightweight")
 class LightweightOCREngine(OCREngine):
     """Moteur OCR léger optimisé pour les VPS avec ressources limitées"""
     
+    pdf_dpi = 150
+    
     def __init__(self, config: Optional[OCRConfig] = None):
         super().__init__(config)
         self.easyocr_reader = None
@@ -32,6 +36,28 @@ class LightweightOCREngine(OCREngine):
         self.memory_limit_mb = int(os.getenv("OCR_MEMORY_LIMIT_MB", "512"))
         self._model_cache = {}
         
+        # Micro-batching : les pages concurrentes sont regroupées en un appel au modèle
+        self.batch_size = default_max_batch_size()
+        self.recognition_batch_size = int(os.getenv("OCR_REC_BATCH_SIZE", "16"))
+        self._easy_batcher = MicroBatcher(self._easyocr_batch, self.batch_size, name="easyocr")
+        self._paddle_batcher = MicroBatcher(self._paddle_batch, self.batch_size, name="paddleocr")
+        
+        # Paramètres de lecture EasyOCR (readtext), optimisés pour les documents
+        self._easyocr_params = {
+            "width_ths": 0.7,
+            "height_ths": 0.7,
+            "slope_ths": 0.1,
+            "ycenter_ths": 0.5,
+            "canvas_size": 1024,  # Limite la résolution pour économiser RAM
+            "mag_ratio": 1.0
+        }
+        self._paddle_drop_score = 0.5
+    
+    @property
+    def batches_in_process(self) -> bool:
+        """Le regroupement se fait dans ce processus : ne pas disperser les pages dans le pool"""
+        return self.batch_size > 1
+        
     async def initialize(self) -> None:
         """Initialisation paresseuse des modèles pour économiser la mémoire"""
         if self._initialized:
@@ -62,19 +88,14 @@ class LightweightOCREngine(OCREngine):
             import easyocr
             
             # Configuration minimaliste pour économiser la mémoire
-            self.easyocr_reader = easyocr.Reader(
+            # (chargement des poids dans un thread : la boucle d'événements reste libre)
+            # Les paramètres de lecture vont à readtext_batched (Reader ne les accepte pas)
+            self.easyocr_reader = await asyncio.to_thread(
+                easyocr.Reader,
                 ['en', 'fr'], 
                 gpu=False,  # Force CPU pour compatibilité VPS
                 model_storage_directory=os.getenv("OCR_MODEL_CACHE", "./models"),
-                download_enabled=True,
-                detector_batch_size=1,  # Minimal batch size
-                recognition_batch_size=1,
-                width_ths=0.7,  # Optimisé pour documents
-                height_ths=0.7,
-                slope_ths=0.1,
-                ycenter_ths=0.5,
-                canvas_size=1024,  # Limite la résolution pour économiser RAM
-                mag_ratio=1.0
+                download_enabled=True
             )
             
             self._model_cache["easyocr"] = self.easyocr_reader
@@ -93,7 +114,9 @@ class LightweightOCREngine(OCREngine):
             from paddleocr import PaddleOCR
             
             # Configuration optimisée pour CPU et faible mémoire
-            self.paddle_ocr = PaddleOCR(
+            # (chargement des poids dans un thread : la boucle d'événements reste libre)
+            self.paddle_ocr = await asyncio.to_thread(
+                PaddleOCR,
                 use_angle_cls=True,
                 lang='fr',  # Français prioritaire
                 use_gpu=False,  # Force CPU
@@ -103,11 +126,11 @@ class LightweightOCREngine(OCREngine):
                 cls_model_dir=None,
                 det_limit_side_len=960,  # Limite résolution
                 det_limit_type='min',
-                rec_batch_num=1,  # Traitement unitaire pour économiser RAM
+                rec_batch_num=self.recognition_batch_size,  # Lignes reconnues par lot
                 max_text_length=25,
                 rec_char_dict_path=None,
                 use_space_char=True,
-                drop_score=0.5,  # Score minimum pour filtrer bruit
+                drop_score=self._paddle_drop_score,  # Score minimum pour filtrer bruit
                 use_tensorrt=False,
                 precision='fp32',
                 cpu_threads=2,  # Limite threads CPU
@@ -155,49 +178,67 @@ class LightweightOCREngine(OCREngine):
         config: Optional[OCRConfig] = None
     ) -> OCRResult:
         """Traiter un PDF page par page avec optimisations mémoire"""
-        from pdf2image import convert_from_path
-        
         start_time = time.time()
         config = config or self.config
         
-        # Conversion PDF optimisée (résolution réduite pour économiser RAM)
-        pages = convert_from_path(
+        # Les pages sont rastérisées par fenêtres : seules quelques bitmaps en mémoire
+        page_results = []
+        async for page_result in self.stream_pdf(pdf_path, config):
+            logger.debug(f"Page {page_result.page_number} traitée")
+            page_results.append(page_result)
+            
+            if page_result.page_number % 3 == 0:  # Nettoyage périodique
+                gc.collect()
+        
+        # Résultat final
+        result = self.merge_page_results(page_results, config)
+        result.processing_time = time.time() - start_time
+        
+        return record_page_cache_stats(result, page_results)
+    
+    def rasterize_pdf(
+        self,
+        pdf_path: Union[str, Path],
+        config: Optional[OCRConfig] = None,
+        first_page: int = 1,
+        last_page: Optional[int] = None
+    ) -> List[Image.Image]:
+        """Conversion PDF optimisée (résolution réduite pour économiser RAM)"""
+        from pdf2image import convert_from_path
+        
+        config = config or self.config
+        return convert_from_path(
             pdf_path,
-            dpi=150,  # Résolution réduite mais suffisante
-            first_page=1,
-            last_page=config.max_pages if config.max_pages else None,
+            dpi=self.pdf_dpi,  # Résolution réduite mais suffisante
+            first_page=first_page,
+            last_page=last_page or config.max_pages,
             poppler_path=None,
             fmt='jpeg',
             jpegopt={'quality': 85, 'progressive': True, 'optimize': True}
         )
+    
+    def format_page_text(self, page_number: int, page_result: OCRResult) -> Optional[str]:
+        """Pages assemblées sans en-tête, pages vides comprises"""
+        return page_result.text
+    
+    def merge_page_results(
+        self,
+        page_results: List[OCRResult],
+        config: Optional[OCRConfig] = None
+    ) -> OCRResult:
+        """Assembler les pages traitées par le moteur léger"""
+        page_count = len(page_results)
+        total_confidence = sum(r.confidence for r in page_results)
         
-        combined_text = []
-        total_confidence = 0
-        page_count = len(pages)
-        
-        for i, page in enumerate(pages):
-            logger.debug(f"Traitement page {i+1}/{page_count}")
-            
-            # Traiter la page
-            page_result = await self.process_image(page, config)
-            combined_text.append(page_result.text)
-            total_confidence += page_result.confidence
-            
-            # Libérer la mémoire de la page immédiatement
-            del page
-            if i % 3 == 0:  # Nettoyage périodique
-                gc.collect()
-        
-        # Résultat final
-        result = OCRResult(
-            text="\n\n".join(combined_text),
+        return OCRResult(
+            text=self.PAGE_SEPARATOR.join(
+                self.format_page_text(page_num, r) for page_num, r in enumerate(page_results, start=1)
+            ),
             confidence=total_confidence / page_count if page_count > 0 else 0,
-            processing_time=time.time() - start_time,
+            processing_time=sum(r.processing_time for r in page_results),
             page_count=page_count,
             warnings=[f"Traité avec moteur léger optimisé ({page_count} pages)"]
         )
-        
-        return result
     
     async def _preprocess_image(
         self,
@@ -275,45 +316,11 @@ class LightweightOCREngine(OCREngine):
         image: Image.Image,
         config: OCRConfig
     ) -> OCRResult:
-        """Traitement avec PaddleOCR"""
+        """Traitement avec PaddleOCR (regroupé avec les pages concurrentes)"""
         try:
-            # Conversion pour PaddleOCR
-            img_array = np.array(image)
-            
-            # OCR avec PaddleOCR
-            results = self.paddle_ocr.ocr(img_array, cls=True)
-            
-            # Parser les résultats
-            extracted_text = []
-            total_confidence = 0
-            text_blocks = []
-            
-            for line_result in results[0] if results and results[0] else []:
-                if line_result:
-                    bbox, (text, confidence) = line_result
-                    extracted_text.append(text)
-                    total_confidence += confidence
-                    
-                    # Coordonnées du texte
-                    text_blocks.append({
-                        'text': text,
-                        'confidence': confidence,
-                        'bbox': {
-                            'x': int(min(p[0] for p in bbox)),
-                            'y': int(min(p[1] for p in bbox)),
-                            'width': int(max(p[0] for p in bbox) - min(p[0] for p in bbox)),
-                            'height': int(max(p[1] for p in bbox) - min(p[1] for p in bbox))
-                        }
-                    })
-            
-            avg_confidence = total_confidence / len(extracted_text) if extracted_text else 0
-            
-            return OCRResult(
-                text="\n".join(extracted_text),
-                confidence=avg_confidence,
-                text_blocks=text_blocks,
-                warnings=["Traité avec PaddleOCR (optimisé documents)"]
-            )
+            # PaddleOCR attend une image BGR (convention OpenCV)
+            lines = await self._paddle_batcher.submit(_to_bgr(image))
+            return _lines_to_result(lines, "Traité avec PaddleOCR (optimisé documents)")
             
         except Exception as e:
             logger.error(f"Erreur PaddleOCR: {e}")
@@ -324,58 +331,73 @@ class LightweightOCREngine(OCREngine):
         image: Image.Image,
         config: OCRConfig
     ) -> OCRResult:
-        """Traitement avec EasyOCR"""
+        """Traitement avec EasyOCR (regroupé avec les pages concurrentes)"""
         try:
-            # Conversion pour EasyOCR
-            img_array = np.array(image)
-            
-            # OCR avec EasyOCR
-            results = self.easyocr_reader.readtext(
-                img_array,
-                detail=1,
-                paragraph=True,  # Grouper par paragraphes
-                width_ths=0.7,
-                height_ths=0.7
-            )
-            
-            # Parser les résultats
-            extracted_text = []
-            total_confidence = 0
-            text_blocks = []
-            
-            for (bbox, text, confidence) in results:
-                if confidence > config.min_confidence:
-                    extracted_text.append(text)
-                    total_confidence += confidence
-                    
-                    # Coordonnées du texte
-                    x_coords = [p[0] for p in bbox]
-                    y_coords = [p[1] for p in bbox]
-                    
-                    text_blocks.append({
-                        'text': text,
-                        'confidence': confidence,
-                        'bbox': {
-                            'x': int(min(x_coords)),
-                            'y': int(min(y_coords)),
-                            'width': int(max(x_coords) - min(x_coords)),
-                            'height': int(max(y_coords) - min(y_coords))
-                        }
-                    })
-            
-            avg_confidence = total_confidence / len(extracted_text) if extracted_text else 0
-            
-            return OCRResult(
-                text="\n".join(extracted_text),
-                confidence=avg_confidence,
-                text_blocks=text_blocks,
-                warnings=["Traité avec EasyOCR (optimisé multilingue)"]
+            lines = await self._easy_batcher.submit(np.array(image.convert("RGB")))
+            result = _lines_to_result(
+                [line for line in lines if line[2] > config.min_confidence],
+                "Traité avec EasyOCR (optimisé multilingue)"
             )
+            # Confiance de la page avant filtrage : c'est elle qui décide de la cascade
+            result.confidence = sum(line[2] for line in lines) / len(lines) if lines else 0
+            return result
             
         except Exception as e:
             logger.error(f"Erreur EasyOCR: {e}")
             return await self._fallback_processing(image, config)
     
+    def _easyocr_batch(self, images: List[np.ndarray]) -> List[List[Tuple[List, str, float]]]:
+        """Détection et reconnaissance EasyOCR d'un lot d'images en un appel (bloquant)"""
+        results = self.easyocr_reader.readtext_batched(
+            pad_to_common_size(images),
+            batch_size=self.recognition_batch_size,
+            detail=1,
+            paragraph=False,  # Garder la confiance de chaque ligne
+            **self._easyocr_params
+        )
+        return [
+            [(bbox, text, float(confidence)) for bbox, text, confidence in image_result]
+            for image_result in results
+        ]
+    
+    def _paddle_batch(self, images: List[np.ndarray]) -> List[List[Tuple[List, str, float]]]:
+        """
+        PaddleOCR sur un lot d'images (bloquant) : détection image par image,
+        puis classification et reconnaissance de toutes les lignes du lot ensemble.
+        """
+        system = self.paddle_ocr
+        if not (hasattr(system, "text_detector") and hasattr(system, "text_recognizer")):
+            # Version de PaddleOCR sans accès aux étapes : une image à la fois
+            return [_paddle_lines(system.ocr(image, cls=True)) for image in images]
+        
+        boxes_per_image = []
+        crops = []
+        for image in images:
+            dt_boxes, _ = system.text_detector(image)
+            boxes = _sort_boxes(dt_boxes) if dt_boxes is not None else []
+            boxes_per_image.append(boxes)
+            crops.extend(_crop_text_region(image, box) for box in boxes)
+        
+        if not crops:
+            return [[] for _ in images]
+        
+        if getattr(system, "text_classifier", None) is not None:
+            crops, _, _ = system.text_classifier(crops)
+        recognized, _ = system.text_recognizer(crops)
+        
+        # Redistribuer les lignes reconnues à leur image d'origine
+        outputs = []
+        index = 0
+        for boxes in boxes_per_image:
+            lines = []
+            for box in boxes:
+                text, score = recognized[index]
+                index += 1
+                if score >= self._paddle_drop_score:
+                    lines.append((np.asarray(box).tolist(), text, float(score)))
+            outputs.append(lines)
+        return outputs
+    
     async def _fallback_processing(
         self,
         image: Image.Image,
@@ -434,11 +456,24 @@ class LightweightOCREngine(OCREngine):
                 "easyocr": self.use_easy,
                 "paddleocr": self.use_paddle
             },
-            "memory_limit_mb": self.memory_limit_mb
+            "memory_limit_mb": self.memory_limit_mb,
+            "batching": {
+                "max_batch_size": self.batch_size,
+                "recognition_batch_size": self.recognition_batch_size
+            }
+        }
+    
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Statistiques du regroupement des inférences"""
+        return {
+            "easyocr": self._easy_batcher.get_stats(),
+            "paddleocr": self._paddle_batcher.get_stats()
         }
     
     async def cleanup(self) -> None:
         """Nettoyer les ressources"""
+        await self._easy_batcher.close()
+        await self._paddle_batcher.close()
         # Libérer les modèles
         self.easyocr_reader = None
         self.paddle_ocr = None
@@ -448,4 +483,80 @@ class LightweightOCREngine(OCREngine):
         gc.collect()
         
         self._initialized = False
-        logger.info("Moteur OCR léger nettoyé")
\ No newline at end of file
+        logger.info("Moteur OCR léger nettoyé")
+
+
+def _to_bgr(image: Image.Image) -> np.ndarray:
+    """Image PIL vers tableau BGR (convention OpenCV / PaddleOCR)"""
+    return cv2.cvtColor(np.array(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+
+def _sort_boxes(boxes) -> List[np.ndarray]:
+    """Ordre de lecture : de haut en bas, puis de gauche à droite sur une même ligne"""
+    boxes = sorted(boxes, key=lambda box: (box[0][1], box[0][0]))
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            same_line = abs(boxes[j + 1][0][1] - boxes[j][0][1]) < 10
+            if same_line and boxes[j + 1][0][0] < boxes[j][0][0]:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+
+def _crop_text_region(image: np.ndarray, box) -> np.ndarray:
+    """Extraire une ligne détectée (quadrilatère) redressée à l'horizontale"""
+    points = np.asarray(box, dtype=np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    width, height = max(width, 1), max(height, 1)
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    crop = cv2.warpPerspective(
+        image,
+        cv2.getPerspectiveTransform(points, target),
+        (width, height),
+        borderMode=cv2.BORDER_REPLICATE,
+        flags=cv2.INTER_CUBIC
+    )
+    # Texte vertical : le reconnaisseur attend des lignes horizontales
+    if height / width >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+def _paddle_lines(results) -> List[Tuple[List, str, float]]:
+    """Lignes (boîte, texte, confiance) d'un résultat PaddleOCR.ocr()"""
+    lines = []
+    for line_result in results[0] if results and results[0] else []:
+        if line_result:
+            bbox, (text, confidence) = line_result
+            lines.append((bbox, text, float(confidence)))
+    return lines
+
+
+def _lines_to_result(lines: List[Tuple[List, str, float]], warning: str) -> OCRResult:
+    """Assembler les lignes reconnues d'une image en OCRResult"""
+    text_blocks = []
+    for bbox, text, confidence in lines:
+        # Coordonnées du texte
+        x_coords = [p[0] for p in bbox]
+        y_coords = [p[1] for p in bbox]
+        text_blocks.append({
+            'text': text,
+            'confidence': confidence,
+            'bbox': {
+                'x': int(min(x_coords)),
+                'y': int(min(y_coords)),
+                'width': int(max(x_coords) - min(x_coords)),
+                'height': int(max(y_coords) - min(y_coords))
+            }
+        })
+    
+    avg_confidence = sum(line[2] for line in lines) / len(lines) if lines else 0
+    
+    return OCRResult(
+        text="\n".join(line[1] for line in lines),
+        confidence=avg_confidence,
+        text_blocks=text_blocks,
+        warnings=[warning]
+    )
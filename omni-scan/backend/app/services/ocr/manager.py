@@ -2,15 +2,23 @@
 Gestionnaire OCR - Sélection et orchestration des moteurs
 """
 
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, AsyncIterator, Awaitable, Callable
 from pathlib import Path
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
 import os
+import time
 
 from app.core.logging import get_logger
 from app.core.config import settings
 
 from .base import OCREngine, OCRResult, OCRConfig, OCRFeature, OutputFormat
 from .tesseract import TesseractEngine
+from .capabilities import EngineCapabilityRegistry, EngineCapabilities, probe_engine
+from .worker_pool import OCRWorkerPool
+from .pdf_stream import stream_pdf_pages
+from .page_cache import get_page_cache, record_page_cache_stats
+from .text_layer import extract_text_layer, record_page_details, text_layer_enabled
 
 logger = get_logger("ocr.manager")
 
@@ -21,13 +29,24 @@ class OCRManager:
     def __init__(self):
         self.engines: Dict[str, OCREngine] = {}
         self.default_engine = "tesseract"
+        self.worker_pool: Optional[OCRWorkerPool] = None
+        self.capabilities = EngineCapabilityRegistry()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Préchauffage au démarrage (exposé par /health)
+        self.warmup: Dict[str, Any] = {"status": "pending"}
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._init_lock = asyncio.Lock()
         self._initialized = False
         
     async def initialize(self) -> None:
-        """Initialiser les moteurs disponibles"""
+        """Initialiser les moteurs disponibles (une seule fois, même en concurrence)"""
         if self._initialized:
             return
-            
+        async with self._init_lock:
+            if not self._initialized:
+                await self._initialize()
+    
+    async def _initialize(self) -> None:
         logger.info("Initialisation du gestionnaire OCR...")
         
         # Toujours charger Tesseract comme fallback
@@ -78,10 +97,74 @@ class OCRManager:
         if not self.engines:
             raise RuntimeError("Aucun moteur OCR disponible!")
         
+        # Capacités sondées une fois, servies ensuite sans sous-processus
+        await asyncio.to_thread(self.capabilities.build, self.engines)
+        
+        # Pool de workers pour sortir l'OCR de la boucle d'événements
+        pool = OCRWorkerPool()
+        if pool.enabled:
+            if not pool.warm_engines:
+                pool.warm_engines = [self.default_engine]
+            # Mode fork : les workers héritent des moteurs déjà chargés ici
+            pool.share_engines(self.engines)
+            pool.start()
+            self.worker_pool = pool
+        else:
+            logger.info("Pool OCR désactivé (OCR_WORKER_PROCESSES=0), traitement en processus")
+        
         self._initialized = True
         logger.info(f"Gestionnaire OCR initialisé avec {len(self.engines)} moteur(s)")
         logger.info(f"Moteur par défaut: {self.default_engine}")
     
+    async def warm_up(self) -> Dict[str, Any]:
+        """
+        Préchauffer l'OCR : charger les moteurs, démarrer les workers et faire
+        une inférence à blanc, pour que la première requête ait la latence du régime établi.
+        """
+        started = time.time()
+        self.warmup = {"status": "running"}
+        try:
+            await self.initialize()
+            if self.worker_pool is not None:
+                self.warmup["workers"] = await self.worker_pool.warm_up()
+                self.warmup["pool_size"] = self.worker_pool.size
+                self.warmup["engines"] = self.worker_pool.warm_engines
+            else:
+                engine = self.engines[self.default_engine]
+                await engine.warm_up()
+                self.warmup["engines"] = [self.default_engine]
+            self.warmup["status"] = "ready"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Liveness préservée, mais l'instance n'est pas déclarée prête (is_ready)
+            logger.error(f"Préchauffage OCR échoué: {e}")
+            self.warmup.update(status="failed", error=str(e))
+        self.warmup["duration"] = round(time.time() - started, 2)
+        logger.info(f"Préchauffage OCR: {self.warmup}")
+        return self.warmup
+    
+    async def start_warm_up(self, mode: Optional[str] = None) -> None:
+        """
+        Lancer le préchauffage selon OCR_WARMUP :
+        background (défaut, /health passe à ready une fois terminé), blocking ou off.
+        """
+        mode = (mode or os.getenv("OCR_WARMUP", "background")).lower()
+        if mode == "off":
+            self.warmup = {"status": "disabled"}
+        elif mode == "blocking":
+            await self.warm_up()
+        else:
+            self._warmup_task = asyncio.create_task(self.warm_up())
+    
+    @property
+    def is_ready(self) -> bool:
+        """
+        Préchauffage réussi (ou désactivé) : la première requête ne paiera pas de chargement.
+        Un échec laisse l'instance hors service (/health/ready en 503, détail dans warmup).
+        """
+        return self.warmup.get("status") in ("ready", "disabled")
+    
     def _check_got_ocr_available(self) -> bool:
         """Vérifier si GOT-OCR2.0 est disponible"""
         try:
@@ -126,26 +209,335 @@ class OCRManager:
         file_path: Union[str, Path],
         file_type: str,
         engine_name: Optional[str] = None,
-        config: Optional[OCRConfig] = None
+        config: Optional[OCRConfig] = None,
+        on_page: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> OCRResult:
-        """Traiter un document avec le moteur spécifié ou le meilleur disponible"""
+        """
+        Traiter un document avec le moteur spécifié ou le meilleur disponible.
+        
+        on_page : appelé après chaque page d'un PDF traité page par page, avec le
+        texte de cette page tel qu'assemblé dans le résultat (pages omises exclues) ;
+        joints par OCREngine.PAGE_SEPARATOR, ces textes forment le texte final.
+        """
         if not self._initialized:
             await self.initialize()
         
         # Sélectionner le moteur
         engine = self._select_engine(engine_name, config)
+        engine_key = self._engine_key(engine)
+        capabilities = self.get_engine_capabilities(engine_key)
+        
+        logger.info(f"Traitement du document avec le moteur: {capabilities.name}")
         
-        logger.info(f"Traitement du document avec le moteur: {engine.get_info()['name']}")
+        # Traiter le document (pages transmises à on_page comptées pour une reprise)
+        emitted = 0
         
-        # Traiter le document
-        result = await engine.process_document(file_path, file_type, config)
+        async def emit_page(page_text: str) -> None:
+            nonlocal emitted
+            emitted += 1
+            await on_page(page_text)
         
-        # Ajouter des métadonnées sur le moteur utilisé
+        try:
+            result = await self._process_with_engine(
+                engine, file_path, file_type, config, emit_page if on_page else None
+            )
+        except BrokenProcessPool:
+            logger.error("Un worker OCR s'est arrêté brutalement, reprise du document en processus")
+            self.worker_pool.restart()
+            # Même chemin (couche texte, cache de pages, cascade) hors du pool ;
+            # les pages déjà transmises ne sont pas renvoyées
+            skip = emitted
+            
+            async def resume_page(page_text: str) -> None:
+                nonlocal skip
+                if skip:
+                    skip -= 1
+                    return
+                await on_page(page_text)
+            
+            result = await self._process_with_engine(
+                engine, file_path, file_type, config, resume_page if on_page else None, in_process=True
+            )
+        
+        # Ajouter des métadonnées sur le moteur utilisé (moteur plus lourd si la cascade l'a retenu)
+        if not result.engine or result.engine not in self.engines:
+            result.engine = engine_key
+        capabilities = self.get_engine_capabilities(result.engine)
         result.warnings = result.warnings or []
-        result.warnings.append(f"Traité avec: {engine.get_info()['name']} v{engine.get_info()['version']}")
+        result.warnings.append(f"Traité avec: {capabilities.name} v{capabilities.version}")
         
         return result
     
+    async def stream_document(
+        self,
+        file_path: Union[str, Path],
+        file_type: str,
+        engine_name: Optional[str] = None,
+        config: Optional[OCRConfig] = None
+    ) -> AsyncIterator[OCRResult]:
+        """Traiter un document et restituer les résultats page par page, dans l'ordre"""
+        if not self._initialized:
+            await self.initialize()
+        
+        engine = self._select_engine(engine_name, config)
+        config = config or engine.config
+        
+        if file_type.lower() == "pdf" and engine.supports_page_dispatch:
+            async for page_result in self._stream_pdf(engine, file_path, config):
+                yield page_result
+        else:
+            result = await self._process_with_engine(engine, file_path, file_type, config)
+            result.page_number = result.page_number or 1
+            yield result
+    
+    async def _process_with_engine(
+        self,
+        engine: OCREngine,
+        file_path: Union[str, Path],
+        file_type: str,
+        config: Optional[OCRConfig] = None,
+        on_page: Optional[Callable[[str], Awaitable[None]]] = None,
+        in_process: bool = False
+    ) -> OCRResult:
+        """
+        Traiter un document, via le pool de workers s'il est actif (sauf in_process).
+        
+        Cascade : un résultat sous config.min_confidence est repris par les moteurs
+        plus lourds (page par page pour les PDFs, document entier sinon).
+        """
+        config = config or engine.config
+        is_pdf = file_type.lower() == "pdf"
+        
+        if is_pdf and engine.supports_page_dispatch:
+            start_time = time.time()
+            page_results = []
+            async for page_result in self._stream_pdf(engine, file_path, config, in_process):
+                page_results.append(page_result)
+                if on_page is not None:
+                    page_text = engine.format_page_text(len(page_results), page_result)
+                    if page_text is not None:
+                        await on_page(page_text)
+            return self._merge_pdf_pages(engine, page_results, config, start_time)
+        
+        if is_pdf:
+            # Moteur multi-pages natif : court-circuité seulement si toutes les pages ont du texte
+            start_time = time.time()
+            text_layer = await self._read_text_layer(engine, file_path, config)
+            if text_layer and all(page is not None for page in text_layer):
+                return self._merge_pdf_pages(engine, text_layer, config, start_time)
+        
+        result = await self._process_whole_document(engine, file_path, file_type, config, in_process)
+        result.engine = self._engine_key(engine)
+        
+        for heavier in self._cascade_engines(engine, config):
+            if result.confidence >= config.min_confidence:
+                break
+            try:
+                candidate = await self._process_whole_document(heavier, file_path, file_type, config, in_process)
+            except Exception as e:
+                logger.warning(f"Cascade vers {self._engine_key(heavier)} impossible: {e}")
+                continue
+            candidate.engine = self._engine_key(heavier)
+            result = self._keep_best(result, candidate, config)
+        
+        return result
+    
+    async def _process_whole_document(
+        self,
+        engine: OCREngine,
+        file_path: Union[str, Path],
+        file_type: str,
+        config: OCRConfig,
+        in_process: bool = False
+    ) -> OCRResult:
+        """Document entier par un moteur, dans le pool ou en processus"""
+        if self._uses_worker_pool(engine, in_process):
+            return await self.worker_pool.process_document(
+                self._engine_key(engine), file_path, file_type, config
+            )
+        
+        return await engine.process_document(file_path, file_type, config)
+    
+    def _cascade_engines(self, engine: OCREngine, config: Optional[OCRConfig]) -> List[OCREngine]:
+        """Moteurs plus lourds capables du même traitement, du moins coûteux au plus coûteux"""
+        if config is None or config.min_confidence <= 0:
+            return []
+        required_features = self._required_features(config)
+        heavier = [
+            candidate
+            for name, candidate in self.engines.items()
+            if candidate.cost_rank > engine.cost_rank
+            and all(self.get_engine_capabilities(name).supports(feature) for feature in required_features)
+        ]
+        return sorted(heavier, key=lambda candidate: candidate.cost_rank)
+    
+    def _keep_best(self, result: OCRResult, candidate: OCRResult, config: OCRConfig) -> OCRResult:
+        """Garder le résultat du moteur plus lourd s'il est plus sûr"""
+        logger.info(
+            f"Cascade {result.engine} ({result.confidence:.2f}) -> {candidate.engine} "
+            f"({candidate.confidence:.2f}), seuil {config.min_confidence:.2f}"
+        )
+        if candidate.confidence <= result.confidence:
+            return result
+        candidate.page_number = result.page_number
+        return candidate
+    
+    def _page_ocr(
+        self,
+        engine: OCREngine,
+        config: OCRConfig,
+        in_process: bool = False
+    ) -> Callable[[Any], Awaitable[OCRResult]]:
+        """OCR d'une page rastérisée par un moteur, dans le pool ou en processus"""
+        engine_key = self._engine_key(engine)
+        
+        async def ocr_page(image) -> OCRResult:
+            if self._uses_worker_pool(engine, in_process):
+                result = await self.worker_pool.process_page(engine_key, image, config)
+            else:
+                result = await engine.process_image(image, config)
+            result.engine = engine_key
+            return result
+        
+        return ocr_page
+    
+    def _merge_pdf_pages(
+        self,
+        engine: OCREngine,
+        page_results: List[OCRResult],
+        config: OCRConfig,
+        start_time: float
+    ) -> OCRResult:
+        """Assembler les pages d'un PDF et reporter le détail par page"""
+        result = engine.merge_page_results(page_results, config)
+        result.processing_time = time.time() - start_time
+        record_page_details(result, page_results)
+        
+        engine_key = self._engine_key(engine)
+        escalated = sum(1 for page in page_results if page.engine and page.engine != engine_key)
+        if escalated:
+            result.warnings = result.warnings or []
+            result.warnings.append(
+                f"{escalated} page(s) sous le seuil de confiance reprise(s) par un moteur plus lourd"
+            )
+        return record_page_cache_stats(result, page_results)
+    
+    async def _read_text_layer(
+        self,
+        engine: OCREngine,
+        file_path: Union[str, Path],
+        config: OCRConfig
+    ) -> Optional[List[Optional[OCRResult]]]:
+        """Couche texte du PDF par page (None par page à OCRiser), None si non applicable"""
+        # Zones, tableaux et formules nécessitent l'analyse de l'image
+        if not text_layer_enabled() or config.regions or config.extract_tables or config.extract_formulas:
+            return None
+        try:
+            return await asyncio.to_thread(
+                extract_text_layer, file_path, config.max_pages, engine.pdf_dpi, config.languages
+            )
+        except Exception as e:
+            logger.warning(f"Lecture de la couche texte impossible, OCR complet: {e}")
+            return None
+    
+    async def _stream_pdf(
+        self,
+        engine: OCREngine,
+        file_path: Union[str, Path],
+        config: OCRConfig,
+        in_process: bool = False
+    ) -> AsyncIterator[OCRResult]:
+        """Pipeline PDF : couche texte quand elle est exploitable, OCR en streaming sinon"""
+        text_layer = await self._read_text_layer(engine, file_path, config)
+        if text_layer is None:
+            async for page_result in self._stream_pdf_ocr(engine, file_path, config, in_process=in_process):
+                yield page_result
+            return
+        
+        ocr_pages = [number for number, page in enumerate(text_layer, start=1) if page is None]
+        if ocr_pages:
+            logger.info(f"Couche texte absente sur {len(ocr_pages)}/{len(text_layer)} page(s), OCR de ces pages")
+        ocr_stream = (
+            self._stream_pdf_ocr(engine, file_path, config, pages=ocr_pages, in_process=in_process)
+            if ocr_pages else None
+        )
+        
+        try:
+            for page in text_layer:
+                if page is None:
+                    page = await ocr_stream.__anext__()
+                yield page
+        finally:
+            if ocr_stream is not None:
+                await ocr_stream.aclose()
+    
+    def _stream_pdf_ocr(
+        self,
+        engine: OCREngine,
+        file_path: Union[str, Path],
+        config: OCRConfig,
+        pages: Optional[List[int]] = None,
+        in_process: bool = False
+    ) -> AsyncIterator[OCRResult]:
+        """OCR des pages d'un PDF en streaming, pages OCRisées par le pool si actif"""
+        page_cache = get_page_cache()
+        ocr_page = self._page_ocr(engine, config, in_process)
+        
+        # Cascade page par page : seules les pages peu sûres passent au moteur plus lourd
+        heavier = [
+            (candidate, self._page_ocr(candidate, config, in_process))
+            for candidate in self._cascade_engines(engine, config)
+        ]
+        if heavier:
+            ocr_primary = ocr_page
+            
+            async def ocr_page(image) -> OCRResult:
+                result = await ocr_primary(image)
+                for candidate, ocr_heavier in heavier:
+                    if result.confidence >= config.min_confidence:
+                        break
+                    try:
+                        result = self._keep_best(result, await ocr_heavier(image), config)
+                    except Exception as e:
+                        logger.warning(f"Cascade vers {self._engine_key(candidate)} impossible: {e}")
+                return result
+        
+        if not self._uses_worker_pool(engine, in_process):
+            # Moteur à lots : assez de pages en vol pour remplir un lot
+            max_in_flight = getattr(engine, "batch_size", None) if engine.batches_in_process else None
+        else:
+            # Deux pages en vol par worker : le pool reste alimenté pendant la rastérisation
+            max_in_flight = self.worker_pool.size * 2
+        
+        return stream_pdf_pages(
+            engine,
+            file_path,
+            config,
+            ocr_page=ocr_page,
+            max_in_flight=max_in_flight,
+            page_cache=page_cache,
+            pages=pages
+        )
+    
+    def _uses_worker_pool(self, engine: OCREngine, in_process: bool = False) -> bool:
+        """Les moteurs qui regroupent leurs inférences (et les reprises in_process) restent dans ce processus"""
+        return self.worker_pool is not None and not in_process and not engine.batches_in_process
+    
+    def select_engine_name(
+        self,
+        engine_name: Optional[str] = None,
+        config: Optional[OCRConfig] = None
+    ) -> str:
+        """Nom du moteur qui traiterait un document avec cette configuration"""
+        return self._engine_key(self._select_engine(engine_name, config))
+    
+    def _engine_key(self, engine: OCREngine) -> str:
+        """Retrouver le nom d'enregistrement d'un moteur"""
+        for name, candidate in self.engines.items():
+            if candidate is engine:
+                return name
+        return self.default_engine
+    
     def _select_engine(
         self,
         engine_name: Optional[str] = None,
@@ -161,6 +553,28 @@ class OCRManager:
             return self.engines[self.default_engine]
         
         # Sélection intelligente basée sur les besoins
+        required_features = self._required_features(config)
+        
+        # Trouver le meilleur moteur
+        candidates = [
+            (name, engine)
+            for name, engine in self.engines.items()
+            if all(self.get_engine_capabilities(name).supports(feature) for feature in required_features)
+        ]
+        if candidates:
+            if config.min_confidence > 0:
+                # Cascade : commencer par le moteur le moins coûteux
+                candidates.sort(key=lambda candidate: candidate[1].cost_rank)
+            name, engine = candidates[0]
+            logger.debug(f"Moteur sélectionné: {name} pour les features: {required_features}")
+            return engine
+        
+        # Fallback sur le moteur par défaut
+        logger.warning(f"Aucun moteur ne supporte toutes les features demandées, utilisation de: {self.default_engine}")
+        return self.engines[self.default_engine]
+    
+    def _required_features(self, config: OCRConfig) -> List[OCRFeature]:
+        """Fonctionnalités nécessaires pour traiter cette configuration"""
         required_features = []
         
         if config.extract_tables:
@@ -170,42 +584,73 @@ class OCRManager:
         if config.regions:
             required_features.append(OCRFeature.INTERACTIVE)
         
-        # Trouver le meilleur moteur
-        for name, engine in self.engines.items():
-            if all(engine.can_handle(feature) for feature in required_features):
-                logger.debug(f"Moteur sélectionné: {name} pour les features: {required_features}")
-                return engine
-        
-        # Fallback sur le moteur par défaut
-        logger.warning(f"Aucun moteur ne supporte toutes les features demandées, utilisation de: {self.default_engine}")
-        return self.engines[self.default_engine]
+        return required_features
+    
+    def get_engine_capabilities(self, name: str) -> EngineCapabilities:
+        """Capacités d'un moteur depuis le registre (sondé à la volée s'il manque)"""
+        self._schedule_refresh_if_stale()
+        capabilities = self.capabilities.get(name)
+        if capabilities is None:
+            capabilities = probe_engine(name, self.engines[name])
+            self.capabilities.engines[name] = capabilities
+        return capabilities
+    
+    async def refresh_capabilities(self) -> None:
+        """Sonder à nouveau les moteurs (langues installées, versions)"""
+        await asyncio.to_thread(self.capabilities.build, dict(self.engines), True)
+    
+    def _schedule_refresh_if_stale(self) -> None:
+        """Rafraîchissement périodique en tâche de fond, sans bloquer la requête"""
+        if not self._initialized or not self.capabilities.is_stale():
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        try:
+            self._refresh_task = asyncio.get_running_loop().create_task(self.refresh_capabilities())
+        except RuntimeError:
+            pass  # Hors boucle d'événements : rafraîchi au prochain accès
     
     def get_available_engines(self) -> Dict[str, Dict[str, Any]]:
         """Retourner les informations sur les moteurs disponibles"""
         return {
-            name: engine.get_info()
-            for name, engine in self.engines.items()
+            name: self.get_engine_capabilities(name).info
+            for name in self.engines
         }
     
     def get_supported_features(self) -> List[OCRFeature]:
         """Retourner toutes les fonctionnalités supportées par au moins un moteur"""
         all_features = set()
-        for engine in self.engines.values():
-            all_features.update(engine.get_supported_features())
-        return list(all_features)
+        for name in self.engines:
+            all_features.update(self.get_engine_capabilities(name).features)
+        return [OCRFeature(feature) for feature in sorted(all_features)]
     
     def get_supported_languages(self) -> List[str]:
         """Retourner toutes les langues supportées"""
         all_languages = set()
-        for engine in self.engines.values():
-            all_languages.update(engine.get_supported_languages())
-        return sorted(list(all_languages))
+        for name in self.engines:
+            all_languages.update(self.get_engine_capabilities(name).languages)
+        return sorted(all_languages)
+    
+    def get_worker_pool_info(self) -> Dict[str, Any]:
+        """Retourner l'état du pool de workers OCR"""
+        if self.worker_pool is None:
+            return {"enabled": False}
+        return self.worker_pool.get_info()
     
     async def cleanup(self) -> None:
         """Nettoyer tous les moteurs"""
+        for task in (self._refresh_task, self._warmup_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._refresh_task = None
+        self._warmup_task = None
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+            self.worker_pool = None
         for engine in self.engines.values():
             await engine.cleanup()
         self.engines.clear()
+        self.capabilities = EngineCapabilityRegistry()
         self._initialized = False
 
 
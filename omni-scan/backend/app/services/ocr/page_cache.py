@@ -0,0 +1,155 @@
+"""
+Cache OCR par page
+Clé = empreinte du bitmap rendu + moteur (nom, version) + configuration OCR.
+Une révision de contrat où seules 1 ou 2 pages changent ne ré-OCRise que ces pages.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+from typing import Optional, Dict, Any, List
+
+from PIL import Image
+
+from app.core.logging import get_logger
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+from .base import OCREngine, OCRResult, OCRConfig, BoundingBox, ExtractedTable, ExtractedFormula
+
+logger = get_logger("ocr.page_cache")
+
+# Version du format des entrées : à incrémenter si OCRResult change
+PAGE_CACHE_FORMAT_VERSION = 1
+
+
+def hash_page_image(image: Image.Image) -> str:
+    """Empreinte SHA-256 des pixels d'une page rendue (opération bloquante)"""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.width}x{image.height}".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def _bbox_from_dict(data: Optional[Dict[str, Any]]) -> Optional[BoundingBox]:
+    return BoundingBox(**data) if data else None
+
+
+def result_to_dict(result: OCRResult) -> Dict[str, Any]:
+    """Sérialiser un résultat de page en JSON"""
+    data = dataclasses.asdict(result)
+    for key in ("page_number", "from_cache", "page_cache", "page_details", "engine"):
+        data.pop(key, None)
+    return data
+
+
+def result_from_dict(data: Dict[str, Any]) -> OCRResult:
+    """Reconstruire un résultat de page depuis le cache"""
+    data = dict(data)
+    if data.get("tables"):
+        data["tables"] = [
+            ExtractedTable(t["headers"], t["rows"], _bbox_from_dict(t.get("bbox")))
+            for t in data["tables"]
+        ]
+    if data.get("formulas"):
+        data["formulas"] = [
+            ExtractedFormula(f["latex"], f["text"], _bbox_from_dict(f.get("bbox")))
+            for f in data["formulas"]
+        ]
+    return OCRResult(**data)
+
+
+class OCRPageCache:
+    """Cache des résultats OCR page par page"""
+
+    def __init__(self, cache: TieredCache, enabled: bool = True):
+        self.cache = cache
+        self.enabled = enabled
+
+    def make_key(self, image_hash: str, engine: OCREngine, config: OCRConfig) -> str:
+        """Construire la clé d'une page"""
+        info = engine.get_info()
+        fingerprint = config.fingerprint()
+        # La limite de pages n'influe pas sur le texte d'une page donnée
+        fingerprint.pop("max_pages", None)
+        material = json.dumps(
+            {
+                "v": PAGE_CACHE_FORMAT_VERSION,
+                "image": image_hash,
+                "engine": info.get("name"),
+                "engine_version": str(info.get("version")),
+                "config": fingerprint
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[OCRResult]:
+        if not self.enabled:
+            return None
+        try:
+            data = self.cache.get(key)
+            if data is None:
+                return None
+            result = result_from_dict(data)
+            result.from_cache = True
+            return result
+        except Exception as e:
+            logger.warning(f"Lecture du cache de pages impossible: {e}")
+            return None
+
+    def set(self, key: str, result: OCRResult) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.cache.set(key, result_to_dict(result))
+        except Exception as e:
+            logger.warning(f"Écriture du cache de pages impossible: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self.cache.get_stats()}
+
+
+def record_page_cache_stats(result: OCRResult, page_results: List[OCRResult]) -> OCRResult:
+    """Reporter les compteurs hit/miss du cache de pages sur le résultat du document"""
+    # Les pages lues dans la couche texte du PDF ne passent pas par le cache
+    ocr_pages = [page for page in page_results if page.source == "ocr"]
+    hits = sum(1 for page in ocr_pages if page.from_cache)
+    misses = len(ocr_pages) - hits
+    result.page_cache = {"hits": hits, "misses": misses}
+    if hits:
+        result.warnings = result.warnings or []
+        result.warnings.append(
+            f"Cache de pages: {hits} page(s) réutilisée(s), {misses} page(s) traitée(s)"
+        )
+    return result
+
+
+def _build_default_cache() -> OCRPageCache:
+    """Construire le cache à partir des variables d'environnement"""
+    enabled = os.getenv("OCR_PAGE_CACHE_ENABLED", "true").lower() == "true"
+    memory = LRUCache(max_entries=int(os.getenv("OCR_PAGE_CACHE_MAX_ENTRIES", "2048")))
+
+    disk = None
+    db_path = os.getenv("OCR_PAGE_CACHE_DB_PATH", "")
+    if enabled and db_path:
+        max_bytes = int(os.getenv("OCR_PAGE_CACHE_MAX_DB_MB", "512")) * 1024 * 1024
+        try:
+            disk = SQLiteCache(db_path, max_bytes=max_bytes)
+            logger.info(f"Cache de pages persistant: {db_path} ({max_bytes // (1024 * 1024)} MB max)")
+        except Exception as e:
+            logger.error(f"Cache de pages persistant indisponible ({db_path}): {e}")
+
+    return OCRPageCache(TieredCache(memory, disk), enabled=enabled)
+
+
+# Instance singleton
+_page_cache: Optional[OCRPageCache] = None
+
+
+def get_page_cache() -> OCRPageCache:
+    """Obtenir l'instance singleton du cache de pages"""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = _build_default_cache()
+    return _page_cache
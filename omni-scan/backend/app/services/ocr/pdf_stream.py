@@ -0,0 +1,156 @@
+"""
+Pipeline PDF en streaming
+Rastérise les pages par fenêtres (first_page/last_page) pendant que les pages
+précédentes sont en cours d'OCR, et restitue les résultats page par page, dans l'ordre
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional, AsyncIterator, Awaitable, Callable, Iterator, List, Tuple, Union
+
+from PIL import Image
+
+from app.core.logging import get_logger
+
+from .base import OCREngine, OCRResult, OCRConfig
+from .page_cache import OCRPageCache, hash_page_image
+
+logger = get_logger("ocr.pdf_stream")
+
+PageOCR = Callable[[Image.Image], Awaitable[OCRResult]]
+
+
+def default_chunk_size() -> int:
+    """Nombre de pages rastérisées par fenêtre"""
+    return max(1, int(os.getenv("OCR_PDF_CHUNK_PAGES", "4")))
+
+
+def get_pdf_page_count(pdf_path: Union[str, Path]) -> int:
+    """Nombre de pages d'un PDF sans le rastériser"""
+    import pdf2image
+
+    info = pdf2image.pdfinfo_from_path(str(pdf_path))
+    return int(info.get("Pages", 0))
+
+
+def iter_page_windows(
+    page_count: int,
+    chunk_size: int,
+    max_pages: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """Découper [1, page_count] en fenêtres (first_page, last_page) inclusives"""
+    last = min(page_count, max_pages) if max_pages else page_count
+    for first_page in range(1, last + 1, chunk_size):
+        yield first_page, min(first_page + chunk_size - 1, last)
+
+
+def group_page_windows(pages: List[int], chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Regrouper une liste de pages en fenêtres contiguës d'au plus chunk_size pages"""
+    window_start = None
+    previous = None
+    for page in sorted(pages):
+        if window_start is not None and (page != previous + 1 or page - window_start >= chunk_size):
+            yield window_start, previous
+            window_start = None
+        if window_start is None:
+            window_start = page
+        previous = page
+    if window_start is not None:
+        yield window_start, previous
+
+
+async def stream_pdf_pages(
+    engine: OCREngine,
+    pdf_path: Union[str, Path],
+    config: OCRConfig,
+    ocr_page: Optional[PageOCR] = None,
+    chunk_size: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    page_cache: Optional[OCRPageCache] = None,
+    pages: Optional[List[int]] = None
+) -> AsyncIterator[OCRResult]:
+    """
+    OCR d'un PDF en streaming.
+
+    Args:
+        engine: Moteur fournissant la rastérisation (rasterize_pdf)
+        pdf_path: Chemin du PDF
+        config: Configuration OCR
+        ocr_page: Coroutine d'OCR d'une page (par défaut engine.process_image)
+        chunk_size: Pages rastérisées par appel à pdf2image
+        max_in_flight: Pages rastérisées en attente ou en cours d'OCR au maximum
+        page_cache: Cache par page ; seules les pages absentes sont OCRisées
+        pages: Pages à traiter (numérotées à partir de 1), toutes par défaut
+
+    Yields:
+        OCRResult de chaque page, dans l'ordre, avec page_number renseigné
+    """
+    chunk_size = chunk_size or default_chunk_size()
+    max_in_flight = max_in_flight or chunk_size
+    if ocr_page is None:
+        async def ocr_page(image: Image.Image) -> OCRResult:
+            return await engine.process_image(image, config)
+    
+    if page_cache is not None and page_cache.enabled:
+        ocr_uncached = ocr_page
+        
+        async def ocr_page(image: Image.Image) -> OCRResult:
+            image_hash = await asyncio.to_thread(hash_page_image, image)
+            key = page_cache.make_key(image_hash, engine, config)
+            cached = page_cache.get(key)
+            if cached is not None:
+                return cached
+            result = await ocr_uncached(image)
+            page_cache.set(key, result)
+            return result
+
+    if pages is not None:
+        windows = list(group_page_windows(pages, chunk_size))
+    else:
+        page_count = await asyncio.to_thread(get_pdf_page_count, pdf_path)
+        windows = list(iter_page_windows(page_count, chunk_size, config.max_pages))
+
+    # Les pages en vol bornent la mémoire : une fenêtre + max_in_flight bitmaps
+    slots = asyncio.Semaphore(max_in_flight)
+    pending: "asyncio.Queue[Optional[Tuple[int, asyncio.Task]]]" = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            for first_page, last_page in windows:
+                images = await asyncio.to_thread(
+                    engine.rasterize_pdf, pdf_path, config, first_page, last_page
+                )
+                for offset in range(len(images)):
+                    await slots.acquire()
+                    image = images[offset]
+                    images[offset] = None
+                    task = asyncio.create_task(ocr_page(image))
+                    await pending.put((first_page + offset, task))
+                del images
+        finally:
+            await pending.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            page_number, task = item
+            try:
+                result = await task
+            finally:
+                slots.release()
+            result.page_number = page_number
+            yield result
+
+        # Propager une éventuelle erreur de rastérisation
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+        while not pending.empty():
+            item = pending.get_nowait()
+            if item is not None:
+                item[1].cancel()
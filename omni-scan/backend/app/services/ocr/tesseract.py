@@ -2,13 +2,10 @@
 Moteur OCR Tesseract (legacy, utilisé comme fallback)
 """
 
-import pytesseract
+import asyncio
 from PIL import Image
-import pdf2image
-import tempfile
-import os
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Tuple, Union
 import numpy as np
 import time
 
@@ -17,6 +14,12 @@ from app.utils.image_preprocessing import ImagePreprocessor
 from app.utils.ocr_postprocessing import improve_ocr_text
 
 from .base import OCREngine, OCRResult, OCRConfig, OCRFeature, OutputFormat
+from .page_cache import record_page_cache_stats
+from .tesseract_api import TesseractAPI, TesseractOutput
+from .text_regions import (
+    TextRegion, as_bounding_box, crop_region, detect_text_regions,
+    max_region_coverage, region_concurrency, region_coverage, region_detection_mode
+)
 
 logger = get_logger("ocr.tesseract")
 
@@ -24,17 +27,24 @@ logger = get_logger("ocr.tesseract")
 class TesseractEngine(OCREngine):
     """Moteur OCR basé sur Tesseract"""
     
+    cost_rank = 0
+    
     def __init__(self, config: Optional[OCRConfig] = None):
         super().__init__(config)
         self.preprocessor = ImagePreprocessor()
         self.name = "Tesseract"
         self.version = None
+        # Handles Tesseract persistants (tesserocr) ou pytesseract en repli
+        self.api = TesseractAPI()
+        # Langues installées, sondées une fois (chaque sonde lance un processus tesseract)
+        self._languages: Optional[List[str]] = None
         
     async def initialize(self) -> None:
         """Initialiser Tesseract"""
         try:
-            self.version = pytesseract.get_tesseract_version()
-            logger.info(f"Tesseract initialisé, version: {self.version}")
+            self.version = self.api.version()
+            self.refresh_capabilities()
+            logger.info(f"Tesseract initialisé, version: {self.version}, backend: {self.api.backend}")
             self._initialized = True
         except Exception as e:
             logger.error(f"Erreur initialisation Tesseract: {e}")
@@ -60,38 +70,28 @@ class TesseractEngine(OCREngine):
             else:
                 raise ValueError(f"Type d'image non supporté: {type(image)}")
             
-            # Preprocessing si activé
-            if config.enable_preprocessing:
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                    temp_path = tmp_file.name
-                
-                try:
-                    processed_image = self.preprocessor.process(pil_image)
-                    processed_image.save(temp_path)
-                    pil_image = processed_image
-                finally:
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-            
-            # Configuration Tesseract
-            tesseract_config = '--psm 3 --oem 3'  # Page segmentation + best OCR engine mode
             lang = "+".join(config.languages)
+            text_blocks = None
             
-            # OCR
-            text = pytesseract.image_to_string(
-                pil_image,
-                lang=lang,
-                config=tesseract_config
-            )
+            # Zones demandées ou détectées : seules ces zones passent par Tesseract
+            regions = await self._plan_regions(pil_image, config)
+            if regions:
+                text, text_blocks, confidence = await self._process_regions(pil_image, regions, config, lang)
+            else:
+                # Preprocessing si activé
+                if config.enable_preprocessing:
+                    pil_image = self.preprocessor.process(pil_image, config.preprocessing_profile)
+                
+                # OCR (segmentation automatique de la page), confiance moyenne des mots
+                output = await asyncio.to_thread(self.api.recognize, pil_image, lang, 3)
+                text, confidence = output.text, output.confidence
+                text_blocks = output.line_blocks() or None
             
             # Post-processing si activé
             if config.enable_postprocessing and text:
                 post_result = improve_ocr_text(text.strip())
                 text = post_result.get('improved', text)
             
-            # Calculer la confiance (approximation basique)
-            confidence = 0.85 if len(text.strip()) > 50 else 0.7
-            
             processing_time = time.time() - start_time
             
             # Créer le résultat
@@ -99,7 +99,8 @@ class TesseractEngine(OCREngine):
                 text=text.strip(),
                 confidence=confidence,
                 processing_time=processing_time,
-                language=config.languages[0] if config.languages else "unknown"
+                language=config.languages[0] if config.languages else "unknown",
+                text_blocks=text_blocks
             )
             
             # Ajouter format markdown si demandé
@@ -112,6 +113,84 @@ class TesseractEngine(OCREngine):
             logger.error(f"Erreur OCR Tesseract: {e}")
             raise
     
+    async def _plan_regions(
+        self,
+        image: Image.Image,
+        config: OCRConfig
+    ) -> Optional[List[TextRegion]]:
+        """Zones à OCRiser, None pour un OCR pleine page"""
+        if config.regions:
+            # Zones fournies par l'appelant, dans son ordre
+            return [TextRegion(bbox=as_bounding_box(region)) for region in config.regions]
+        
+        mode = region_detection_mode() if config.detect_regions is None else (
+            "always" if config.detect_regions else "off"
+        )
+        if mode == "off":
+            return None
+        
+        regions = await asyncio.to_thread(detect_text_regions, image)
+        if not regions:
+            return None
+        
+        # Page dense : la segmentation de Tesseract sur la page entière est plus efficace
+        coverage = region_coverage(regions, image.width, image.height)
+        if mode == "auto" and coverage > max_region_coverage():
+            return None
+        
+        logger.debug(f"{len(regions)} zone(s) de texte, {coverage:.0%} de la page")
+        return regions
+    
+    async def _process_regions(
+        self,
+        image: Image.Image,
+        regions: List[TextRegion],
+        config: OCRConfig,
+        lang: str
+    ) -> Tuple[str, List[Dict[str, Any]], float]:
+        """OCR des zones en parallèle, assemblées dans l'ordre des zones"""
+        semaphore = asyncio.Semaphore(region_concurrency())
+        
+        async def ocr_region(region: TextRegion) -> TesseractOutput:
+            async with semaphore:
+                return await asyncio.to_thread(self._ocr_region, image, region, config, lang)
+        
+        outputs = await asyncio.gather(*(ocr_region(region) for region in regions))
+        
+        text_blocks = []
+        words = []
+        for region, output in zip(regions, outputs):
+            text = output.text.strip()
+            if not text:
+                continue
+            words.extend(output.words)
+            text_blocks.append({
+                'text': text,
+                'confidence': output.confidence,
+                'bbox': {
+                    'x': region.bbox.x,
+                    'y': region.bbox.y,
+                    'width': region.bbox.width,
+                    'height': region.bbox.height
+                }
+            })
+        
+        text = "\n".join(block['text'] for block in text_blocks)
+        return text, text_blocks, TesseractOutput(text=text, words=words).confidence
+    
+    def _ocr_region(
+        self,
+        image: Image.Image,
+        region: TextRegion,
+        config: OCRConfig,
+        lang: str
+    ) -> TesseractOutput:
+        """OCR d'une zone (bloquant) avec le mode de segmentation adapté au bloc"""
+        crop = crop_region(image, region.bbox)
+        if config.enable_preprocessing:
+            crop = self.preprocessor.process(crop, config.preprocessing_profile)
+        return self.api.recognize(crop, lang, region.psm)
+    
     async def process_pdf(
         self,
         pdf_path: Union[str, Path],
@@ -122,66 +201,59 @@ class TesseractEngine(OCREngine):
         config = config or self.config
         
         try:
-            # Convertir PDF en images
-            images = pdf2image.convert_from_path(
-                pdf_path,
-                dpi=300,
-                first_page=1,
-                last_page=config.max_pages
-            )
-            
-            all_texts = []
-            total_confidence = 0.0
-            
-            for i, image in enumerate(images):
-                page_num = i + 1
-                logger.debug(f"Traitement page {page_num}/{len(images)}")
-                
-                # OCR sur chaque page
-                page_result = await self.process_image(image, config)
-                
-                if page_result.text.strip():
-                    all_texts.append(f"--- Page {page_num} ---\n{page_result.text}")
-                    total_confidence += page_result.confidence
+            # Rastérisation par fenêtres, OCR page par page
+            page_results = []
+            async for page_result in self.stream_pdf(pdf_path, config):
+                logger.debug(f"Page {page_result.page_number} traitée")
+                page_results.append(page_result)
             
             # Combiner les résultats
-            combined_text = "\n\n".join(all_texts)
-            avg_confidence = total_confidence / len(images) if images else 0.0
-            processing_time = time.time() - start_time
+            result = self.merge_page_results(page_results, config)
+            result.processing_time = time.time() - start_time
             
-            result = OCRResult(
-                text=combined_text,
-                confidence=avg_confidence,
-                processing_time=processing_time,
-                page_count=len(images),
-                language=config.languages[0] if config.languages else "unknown"
-            )
-            
-            if config.output_format == OutputFormat.MARKDOWN:
-                result.markdown = self._text_to_markdown(combined_text)
-            
-            return result
+            return record_page_cache_stats(result, page_results)
             
         except Exception as e:
             logger.error(f"Erreur OCR PDF Tesseract: {e}")
             raise
     
+    def merge_page_results(
+        self,
+        page_results: List[OCRResult],
+        config: Optional[OCRConfig] = None
+    ) -> OCRResult:
+        """Assembler les pages et générer le markdown si demandé"""
+        config = config or self.config
+        result = super().merge_page_results(page_results, config)
+        
+        if config.output_format == OutputFormat.MARKDOWN:
+            result.markdown = self._text_to_markdown(result.text)
+        
+        return result
+    
     def get_supported_features(self) -> List[OCRFeature]:
         """Fonctionnalités supportées par Tesseract"""
         return [
             OCRFeature.BASIC_TEXT,
             OCRFeature.MULTILINGUAL,
-            OCRFeature.BATCH
+            OCRFeature.BATCH,
+            OCRFeature.INTERACTIVE
         ]
     
-    def get_supported_languages(self) -> List[str]:
-        """Langues supportées"""
+    def refresh_capabilities(self) -> None:
+        """Sonder les langues installées (lance un processus tesseract)"""
         try:
-            langs = pytesseract.get_languages()
+            langs = self.api.get_languages()
             # Filtrer les langues spéciales
-            return [lang for lang in langs if lang not in ["osd", "equ"]]
+            self._languages = [lang for lang in langs if lang not in ["osd", "equ"]]
         except Exception:
-            return ["eng", "fra", "deu", "spa", "ita"]  # Fallback
+            self._languages = ["eng", "fra", "deu", "spa", "ita"]  # Fallback
+    
+    def get_supported_languages(self) -> List[str]:
+        """Langues supportées (sondées à l'initialisation)"""
+        if self._languages is None:
+            self.refresh_capabilities()
+        return list(self._languages)
     
     def get_info(self) -> Dict[str, Any]:
         """Informations sur le moteur"""
@@ -189,6 +261,7 @@ class TesseractEngine(OCREngine):
             "name": self.name,
             "version": str(self.version) if self.version else "unknown",
             "type": "traditional",
+            "backend": self.api.backend,
             "requires_gpu": False,
             "supported_formats": ["jpg", "jpeg", "png", "tiff", "bmp", "pdf"],
             "max_resolution": "unlimited",
@@ -215,4 +288,9 @@ class TesseractEngine(OCREngine):
             else:
                 markdown_lines.append(line)
         
-        return "\n".join(markdown_lines)
\ No newline at end of file
+        return "\n".join(markdown_lines)
+    
+    async def cleanup(self) -> None:
+        """Libérer les handles Tesseract"""
+        self.api.close()
+        self._initialized = False
@@ -0,0 +1,217 @@
+"""
+Accès à Tesseract : API persistante (tesserocr) ou processus par appel (pytesseract)
+Avec tesserocr, chaque thread garde ses handles Tesseract (un par jeu de langues) :
+les données d'entraînement sont chargées une fois, les images passent en mémoire et
+le texte et la confiance de chaque mot sortent du même appel.
+pytesseract reste le repli quand tesserocr n'est pas installé.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from app.core.logging import get_logger
+
+logger = get_logger("ocr.tesseract_api")
+
+
+@dataclass
+class RecognizedWord:
+    """Mot reconnu avec sa confiance (0-1) et sa boîte (x, y, largeur, hauteur)"""
+    text: str
+    confidence: float
+    bbox: Tuple[int, int, int, int]
+    line: Tuple[int, int, int] = (0, 0, 0)  # (bloc, paragraphe, ligne)
+
+
+@dataclass
+class TesseractOutput:
+    """Texte d'une image et détail par mot"""
+    text: str
+    words: List[RecognizedWord] = field(default_factory=list)
+
+    @property
+    def confidence(self) -> float:
+        """Confiance moyenne des mots (0 sans mot reconnu)"""
+        if not self.words:
+            return 0.0
+        return sum(word.confidence for word in self.words) / len(self.words)
+
+    def line_blocks(self) -> List[Dict[str, Any]]:
+        """Lignes reconnues (format text_blocks) avec confiance moyenne et boîte englobante"""
+        lines: Dict[Tuple[int, int, int], List[RecognizedWord]] = {}
+        for word in self.words:
+            lines.setdefault(word.line, []).append(word)
+
+        blocks = []
+        for words in lines.values():
+            left = min(word.bbox[0] for word in words)
+            top = min(word.bbox[1] for word in words)
+            right = max(word.bbox[0] + word.bbox[2] for word in words)
+            bottom = max(word.bbox[1] + word.bbox[3] for word in words)
+            blocks.append({
+                'text': " ".join(word.text for word in words),
+                'confidence': sum(word.confidence for word in words) / len(words),
+                'bbox': {'x': left, 'y': top, 'width': right - left, 'height': bottom - top}
+            })
+        return blocks
+
+
+def _load_tesserocr():
+    try:
+        import tesserocr
+        return tesserocr
+    except ImportError:
+        return None
+
+
+def tesseract_backend() -> str:
+    """Backend effectif selon OCR_TESSERACT_BACKEND (auto, tesserocr, pytesseract)"""
+    requested = os.getenv("OCR_TESSERACT_BACKEND", "auto").lower()
+    if requested == "pytesseract":
+        return "pytesseract"
+    if _load_tesserocr() is not None:
+        return "tesserocr"
+    if requested == "tesserocr":
+        logger.warning("tesserocr non installé, repli sur pytesseract")
+    return "pytesseract"
+
+
+class TesseractAPI:
+    """
+    Reconnaissance Tesseract avec handles persistants.
+
+    Les handles tesserocr ne sont pas réentrants : chacun appartient à un thread
+    (les threads de asyncio.to_thread sont réutilisés, les handles aussi).
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend or tesseract_backend()
+        self._tesserocr = _load_tesserocr() if self.backend == "tesserocr" else None
+        self._local = threading.local()
+        self._handles: List[Any] = []
+        self._lock = threading.Lock()
+
+    def version(self) -> str:
+        if self._tesserocr is not None:
+            return self._tesserocr.tesseract_version().split()[1]
+        return str(pytesseract.get_tesseract_version())
+
+    def get_languages(self) -> List[str]:
+        if self._tesserocr is not None:
+            return list(self._tesserocr.get_languages()[1])
+        return pytesseract.get_languages()
+
+    def recognize(self, image: Image.Image, lang: str, psm: int = 3) -> TesseractOutput:
+        """Texte et mots d'une image (bloquant)"""
+        if self._tesserocr is not None:
+            return self._recognize_tesserocr(image, lang, psm)
+        return self._recognize_pytesseract(image, lang, psm)
+
+    def _handle(self, lang: str):
+        handles: Dict[str, Any] = getattr(self._local, "handles", None)
+        if handles is None:
+            handles = self._local.handles = {}
+        api = handles.get(lang)
+        if api is None:
+            tesserocr = self._tesserocr
+            path = tesserocr.get_languages()[0]
+            api = tesserocr.PyTessBaseAPI(path=path, lang=lang, oem=tesserocr.OEM.DEFAULT)
+            handles[lang] = api
+            with self._lock:
+                self._handles.append(api)
+            logger.debug(f"Handle Tesseract créé ({lang}) pour le thread {threading.get_ident()}")
+        return api
+
+    def _recognize_tesserocr(self, image: Image.Image, lang: str, psm: int) -> TesseractOutput:
+        tesserocr = self._tesserocr
+        api = self._handle(lang)
+        api.SetPageSegMode(psm)
+
+        # Tampon brut, sans fichier intermédiaire
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+        pixels = np.ascontiguousarray(np.asarray(image, dtype=np.uint8))
+        bytes_per_pixel = 1 if pixels.ndim == 2 else pixels.shape[2]
+        api.SetImageBytes(
+            pixels.tobytes(), image.width, image.height, bytes_per_pixel, image.width * bytes_per_pixel
+        )
+        text = api.GetUTF8Text()
+
+        words = []
+        iterator = api.GetIterator()
+        level = tesserocr.RIL.WORD
+        block = paragraph = line = 0
+        if iterator is not None:
+            while True:
+                if iterator.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block, paragraph, line = block + 1, 0, 0
+                if iterator.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    paragraph, line = paragraph + 1, 0
+                if iterator.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line += 1
+                word = iterator.GetUTF8Text(level)
+                box = iterator.BoundingBox(level)
+                if word and word.strip() and box:
+                    x1, y1, x2, y2 = box
+                    words.append(RecognizedWord(
+                        text=word.strip(),
+                        confidence=iterator.Confidence(level) / 100.0,
+                        bbox=(x1, y1, x2 - x1, y2 - y1),
+                        line=(block, paragraph, line)
+                    ))
+                if not iterator.Next(level):
+                    break
+        api.Clear()
+        return TesseractOutput(text=text, words=words)
+
+    def _recognize_pytesseract(self, image: Image.Image, lang: str, psm: int) -> TesseractOutput:
+        # Un seul processus tesseract pour le texte et les confiances
+        data = pytesseract.image_to_data(
+            image, lang=lang, config=f"--psm {psm} --oem 3", output_type=pytesseract.Output.DICT
+        )
+        words = []
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if not word or not word.strip() or confidence < 0:
+                continue
+            words.append(RecognizedWord(
+                text=word.strip(),
+                confidence=confidence / 100.0,
+                bbox=(int(data["left"][i]), int(data["top"][i]), int(data["width"][i]), int(data["height"][i])),
+                line=(int(data["block_num"][i]), int(data["par_num"][i]), int(data["line_num"][i]))
+            ))
+        return TesseractOutput(text=words_to_text(words), words=words)
+
+    def close(self) -> None:
+        """Libérer les handles de tous les threads (aucune reconnaissance en cours)"""
+        with self._lock:
+            handles, self._handles = self._handles, []
+        for api in handles:
+            api.End()
+        self._local = threading.local()
+
+    def get_info(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "handles": len(self._handles)}
+
+
+def words_to_text(words: List[RecognizedWord]) -> str:
+    """Reconstituer le texte : mots d'une ligne séparés par un espace, paragraphes par une ligne vide"""
+    lines: List[str] = []
+    current_line = None
+    current_paragraph = None
+    for word in words:
+        paragraph = word.line[:2]
+        if word.line != current_line:
+            if current_paragraph is not None and paragraph != current_paragraph:
+                lines.append("")
+            lines.append(word.text)
+            current_line, current_paragraph = word.line, paragraph
+        else:
+            lines[-1] += " " + word.text
+    return "\n".join(lines)
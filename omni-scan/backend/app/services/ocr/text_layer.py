@@ -0,0 +1,166 @@
+"""
+Extraction de la couche texte des PDF natifs
+Les PDF exportés par les logiciels (comptabilité, bureautique) contiennent déjà leur texte :
+on le lit directement, et seules les pages sans texte exploitable passent par l'OCR
+"""
+
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+from app.core.logging import get_logger
+
+from .base import OCRResult
+
+logger = get_logger("ocr.text_layer")
+
+TEXT_LAYER_SOURCE = "text_layer"
+
+
+def text_layer_enabled() -> bool:
+    """Lecture de la couche texte activée (OCR_PDF_TEXT_LAYER)"""
+    return os.getenv("OCR_PDF_TEXT_LAYER", "true").lower() == "true"
+
+
+def _min_chars() -> int:
+    return int(os.getenv("OCR_TEXT_LAYER_MIN_CHARS", "20"))
+
+
+def is_usable_text(text: str, min_chars: Optional[int] = None) -> bool:
+    """
+    Vérifier qu'une couche texte est exploitable (ni vide, ni illisible).
+
+    Rejette : pages quasi vides, glyphes non mappés (cid/U+FFFD),
+    texte majoritairement non alphanumérique, lettres espacées une à une.
+    """
+    min_chars = _min_chars() if min_chars is None else min_chars
+    compact = "".join(text.split())
+    if len(compact) < min_chars:
+        return False
+
+    if "(cid:" in text or compact.count("�") / len(compact) > 0.05:
+        return False
+
+    alnum_ratio = sum(c.isalnum() for c in compact) / len(compact)
+    if alnum_ratio < 0.5:
+        return False
+
+    words = text.split()
+    if len(words) >= 10 and sum(len(w) for w in words) / len(words) < 2:
+        return False
+
+    return True
+
+
+def _extract_page(page, scale: float) -> Tuple[str, List[Dict[str, Any]]]:
+    """Texte d'une page et fragments positionnés (origine en haut à gauche), en une passe"""
+    page_height = float(page.mediabox.height)
+    page_bottom = float(page.mediabox.bottom)
+    blocks = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        text = text.strip()
+        if not text:
+            return
+        # Position du texte dans l'espace utilisateur (matrice texte puis matrice courante)
+        x = cm[0] * tm[4] + cm[2] * tm[5] + cm[4]
+        y = cm[1] * tm[4] + cm[3] * tm[5] + cm[5]
+        size = abs(font_size * (tm[3] or tm[0]) * (cm[3] or cm[0])) or 10.0
+        # Largeur approximative : une demi-hauteur de police par caractère
+        width = len(text) * size * 0.5
+        top = page_height - (y - page_bottom) - size
+        blocks.append({
+            "text": text,
+            "confidence": 1.0,
+            "bbox": {
+                "x": int(x * scale),
+                "y": int(max(0.0, top) * scale),
+                "width": int(width * scale),
+                "height": int(size * scale)
+            }
+        })
+
+    text = page.extract_text(visitor_text=visitor) or ""
+    return text, blocks
+
+
+def extract_text_layer(
+    pdf_path: Union[str, Path],
+    max_pages: Optional[int] = None,
+    dpi: int = 72,
+    languages: Optional[List[str]] = None
+) -> List[Optional[OCRResult]]:
+    """
+    Lire la couche texte de chaque page (opération bloquante).
+
+    Args:
+        pdf_path: Chemin du PDF
+        max_pages: Nombre maximum de pages
+        dpi: Résolution de référence des coordonnées (celle de la rastérisation)
+        languages: Langues de la configuration OCR
+
+    Returns:
+        Un OCRResult par page, ou None si la page doit passer par l'OCR
+    """
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(str(pdf_path))
+    page_count = len(reader.pages)
+    if max_pages:
+        page_count = min(page_count, max_pages)
+
+    scale = dpi / 72
+    language = languages[0] if languages else "unknown"
+    results: List[Optional[OCRResult]] = []
+    for index in range(page_count):
+        try:
+            page = reader.pages[index]
+            text, blocks = _extract_page(page, scale)
+            if not is_usable_text(text):
+                results.append(None)
+                continue
+            results.append(OCRResult(
+                text=text.strip(),
+                confidence=1.0,
+                language=language,
+                page_number=index + 1,
+                text_blocks=blocks,
+                source=TEXT_LAYER_SOURCE
+            ))
+        except Exception as e:
+            logger.debug(f"Couche texte illisible page {index + 1}: {e}")
+            results.append(None)
+
+    return results
+
+
+def record_page_details(result: OCRResult, page_results: List[OCRResult]) -> OCRResult:
+    """Reporter sur le résultat du document l'origine et la confiance de chaque page"""
+    result.page_details = [
+        {
+            "page": page.page_number or index,
+            "source": page.source,
+            "confidence": page.confidence,
+            "engine": page.engine,
+            "from_cache": page.from_cache,
+            "characters": len(page.text)
+        }
+        for index, page in enumerate(page_results, start=1)
+    ]
+
+    # Zones de texte de toutes les pages, avec leur numéro de page
+    blocks = [
+        {**block, "page": page.page_number or index}
+        for index, page in enumerate(page_results, start=1)
+        for block in (page.text_blocks or [])
+    ]
+    if blocks:
+        result.text_blocks = blocks
+
+    text_pages = sum(1 for page in page_results if page.source == TEXT_LAYER_SOURCE)
+    if text_pages:
+        result.warnings = result.warnings or []
+        result.warnings.append(
+            f"Couche texte PDF: {text_pages}/{len(page_results)} page(s) extraite(s) sans OCR"
+        )
+    return result
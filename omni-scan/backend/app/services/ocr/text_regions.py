@@ -0,0 +1,193 @@
+"""
+Détection des zones de texte (OpenCV, sans GPU)
+Localise les blocs de texte d'une page pour n'OCRiser que ces zones : sur les
+documents clairsemés (tickets, cartes de visite) les grandes zones vides ne
+passent plus par le moteur, et chaque bloc a ses coordonnées.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .base import BoundingBox
+
+# Largeur maximale de l'image analysée (la détection n'a pas besoin de la pleine résolution)
+_DETECTION_MAX_WIDTH = 1600
+
+# Taille minimale d'une ligne de texte, en pixels de l'image analysée
+_MIN_LINE_HEIGHT = 6
+_MIN_LINE_WIDTH = 8
+
+
+def region_detection_mode() -> str:
+    """Mode par défaut (OCR_REGION_DETECTION) : auto, always ou off"""
+    mode = os.getenv("OCR_REGION_DETECTION", "auto").lower()
+    return mode if mode in ("auto", "always", "off") else "auto"
+
+
+def max_region_coverage() -> float:
+    """Part de la page couverte par les blocs au-delà de laquelle l'OCR pleine page est préféré"""
+    return float(os.getenv("OCR_REGION_MAX_COVERAGE", "0.5"))
+
+
+def region_concurrency() -> int:
+    """Zones OCRisées en parallèle"""
+    return max(1, int(os.getenv("OCR_REGION_CONCURRENCY", str(min(4, os.cpu_count() or 1)))))
+
+
+@dataclass
+class TextRegion:
+    """Bloc de texte détecté (ou zone demandée) et son nombre de lignes estimé"""
+    bbox: BoundingBox
+    lines: int = 0  # 0 = inconnu (zone fournie par l'appelant)
+
+    @property
+    def psm(self) -> int:
+        """Mode de segmentation Tesseract adapté au bloc"""
+        if self.lines == 1:
+            # Mot isolé (montant, code) ou ligne
+            return 8 if self.bbox.width < 3 * self.bbox.height else 7
+        return 6  # Bloc de texte uniforme
+
+
+def as_bounding_box(region: Union[BoundingBox, Dict[str, Any], Sequence[int]]) -> BoundingBox:
+    """Normaliser une zone fournie par l'API ({x, y, width, height} ou [x, y, w, h])"""
+    if isinstance(region, BoundingBox):
+        return region
+    if isinstance(region, dict):
+        return BoundingBox(
+            x=int(region["x"]),
+            y=int(region["y"]),
+            width=int(region["width"]),
+            height=int(region["height"])
+        )
+    x, y, width, height = (int(value) for value in region[:4])
+    return BoundingBox(x=x, y=y, width=width, height=height)
+
+
+def detect_text_regions(image: Union[Image.Image, np.ndarray]) -> List[TextRegion]:
+    """
+    Détecter les blocs de texte d'une page.
+
+    Gradient morphologique + seuillage d'Otsu, fermeture horizontale pour souder
+    les caractères en lignes, contours des lignes, puis regroupement des lignes
+    voisines en blocs. Coordonnées dans le repère de l'image fournie.
+
+    Returns:
+        Blocs en ordre de lecture
+    """
+    gray = _to_gray(image)
+    height, width = gray.shape
+    scale = min(1.0, _DETECTION_MAX_WIDTH / width) if width else 1.0
+    if scale < 1.0:
+        gray = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    lines = _detect_lines(gray)
+    blocks = _group_lines(lines)
+
+    regions = []
+    for x, y, w, h, line_count in blocks:
+        regions.append(TextRegion(
+            bbox=BoundingBox(
+                x=int(x / scale),
+                y=int(y / scale),
+                width=int(round(w / scale)),
+                height=int(round(h / scale))
+            ),
+            lines=line_count
+        ))
+    return sort_reading_order(regions)
+
+
+def region_coverage(regions: List[TextRegion], width: int, height: int) -> float:
+    """Part de la page occupée par les blocs"""
+    if not width or not height:
+        return 0.0
+    area = sum(region.bbox.width * region.bbox.height for region in regions)
+    return area / float(width * height)
+
+
+def sort_reading_order(regions: List[TextRegion]) -> List[TextRegion]:
+    """
+    Ordre de lecture : bandes horizontales de haut en bas, de gauche à droite dans une bande.
+
+    Deux blocs sont dans la même bande quand le centre vertical de l'un tombe dans l'autre
+    (libellé et montant d'une ligne de ticket, par exemple).
+    """
+    rows: List[List[TextRegion]] = []
+    for region in sorted(regions, key=lambda r: r.bbox.y):
+        center = region.bbox.y + region.bbox.height / 2
+        row = rows[-1] if rows else None
+        if row is not None and any(r.bbox.y <= center <= r.bbox.y + r.bbox.height for r in row):
+            row.append(region)
+        else:
+            rows.append([region])
+    return [region for row in rows for region in sorted(row, key=lambda r: r.bbox.x)]
+
+
+def crop_region(image: Image.Image, bbox: BoundingBox, margin: Optional[int] = None) -> Image.Image:
+    """Découper une zone avec une marge (Tesseract lit mal le texte collé au bord)"""
+    if margin is None:
+        margin = max(4, bbox.height // 5)
+    left = max(0, bbox.x - margin)
+    top = max(0, bbox.y - margin)
+    right = min(image.width, bbox.x + bbox.width + margin)
+    bottom = min(image.height, bbox.y + bbox.height + margin)
+    return image.crop((left, top, right, bottom))
+
+
+def _to_gray(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    if isinstance(image, Image.Image):
+        return np.array(image.convert("L"))
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return image
+
+
+def _detect_lines(gray: np.ndarray) -> List[List[int]]:
+    """Rectangles [x, y, w, h] des lignes de texte"""
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    # Souder les caractères d'une même ligne sans fusionner les lignes entre elles
+    kernel_width = max(9, gray.shape[1] // 80)
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_width, 1)))
+
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    lines = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < _MIN_LINE_HEIGHT or w < _MIN_LINE_WIDTH:
+            continue
+        # Du texte remplit une part notable de son rectangle (écarte cadres et traits)
+        fill = cv2.countNonZero(binary[y:y + h, x:x + w]) / float(w * h)
+        if fill < 0.15:
+            continue
+        lines.append([x, y, w, h])
+    return lines
+
+
+def _group_lines(lines: List[List[int]]) -> List[List[int]]:
+    """Regrouper les lignes alignées et proches verticalement en blocs [x, y, w, h, lignes]"""
+    blocks: List[List[int]] = []
+    for x, y, w, h in sorted(lines, key=lambda line: (line[1], line[0])):
+        for block in blocks:
+            bx, by, bw, bh, count = block
+            line_height = bh / count
+            vertical_gap = y - (by + bh)
+            overlaps = x < bx + bw and bx < x + w
+            if overlaps and vertical_gap <= line_height * 0.8 and abs(h - line_height) <= line_height * 0.6:
+                right = max(bx + bw, x + w)
+                bottom = max(by + bh, y + h)
+                block[0] = min(bx, x)
+                block[2] = right - block[0]
+                block[3] = bottom - by
+                block[4] = count + 1
+                break
+        else:
+            blocks.append([x, y, w, h, 1])
+    return blocks
@@ -0,0 +1,287 @@
+"""
+Pool de processus workers pour l'OCR
+Déporte le travail OCR (bloquant, CPU-bound) hors de la boucle d'événements FastAPI
+
+Deux modes de démarrage (OCR_WORKER_START_METHOD) :
+- spawn : chaque worker charge ses propres modèles (isolation maximale)
+- fork : les modèles chargés une fois dans le processus principal sont hérités
+  par les workers et partagés en copie sur écriture (pas de copie des poids)
+"""
+
+import asyncio
+import gc
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Union
+
+import numpy as np
+from PIL import Image
+
+from app.core.logging import get_logger
+
+from .base import OCREngine, OCRResult, OCRConfig
+
+logger = get_logger("ocr.worker_pool")
+
+
+def _default_pool_size() -> int:
+    """
+    Taille par défaut : un worker par cœur, plafonnée par OCR_WORKER_MAX_PROCESSES.
+
+    En mode spawn chaque worker charge sa propre copie des modèles : le plafond
+    borne la mémoire consommée sur les machines à nombreux cœurs (0 = pas de plafond).
+    """
+    cpu_count = os.cpu_count() or 1
+    max_processes = int(os.getenv("OCR_WORKER_MAX_PROCESSES", "4"))
+    return min(max_processes, cpu_count) if max_processes > 0 else cpu_count
+
+
+def _create_engine(engine_name: str) -> OCREngine:
+    """Instancier un moteur OCR par son nom (imports paresseux)"""
+    if engine_name == "tesseract":
+        from .tesseract import TesseractEngine
+        return TesseractEngine()
+    if engine_name == "lightweight":
+        from .lightweight_ocr import LightweightOCREngine
+        return LightweightOCREngine()
+    if engine_name == "got-ocr2":
+        from .got_ocr2 import GOTOCR2Engine
+        return GOTOCR2Engine()
+    if engine_name == "trocr":
+        from .trocr import TrOCREngine
+        return TrOCREngine()
+    raise ValueError(f"Moteur OCR inconnu: {engine_name}")
+
+
+# --- Côté worker -----------------------------------------------------------
+# Moteurs chargés dans le processus worker, réutilisés d'une tâche à l'autre
+_worker_engines: Dict[str, OCREngine] = {}
+# Barrière du préchauffage, reçue à la création du worker
+_warm_barrier: Optional[threading.Barrier] = None
+
+
+def _get_worker_engine(engine_name: str) -> OCREngine:
+    """Récupérer (ou charger) un moteur dans le processus worker courant"""
+    engine = _worker_engines.get(engine_name)
+    if engine is None:
+        engine = _create_engine(engine_name)
+        asyncio.run(engine.initialize())
+        _worker_engines[engine_name] = engine
+    return engine
+
+
+def _worker_initializer(warm_engines: List[str], warm_inference: bool, barrier) -> None:
+    """
+    Préchauffer les modèles au démarrage du worker.
+
+    Avec warm_inference, l'inférence à blanc a lieu ici : tout worker, y compris
+    ceux recyclés (max_tasks_per_child) ou relancés après une panne, est chaud
+    avant sa première tâche.
+    """
+    global _warm_barrier
+    _warm_barrier = barrier
+    for engine_name in warm_engines:
+        try:
+            engine = _get_worker_engine(engine_name)
+            if warm_inference:
+                asyncio.run(engine.warm_up())
+        except Exception as e:
+            logger.warning(f"Préchauffage du moteur {engine_name} impossible dans le worker: {e}")
+
+
+def _warm_worker(timeout: float) -> int:
+    """
+    Tâche de préchauffage : attend à la barrière que tous les workers en tiennent une,
+    ce qui garantit qu'ils ont tous démarré (et exécuté leur initialisation).
+    """
+    try:
+        _warm_barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        pass
+    return os.getpid()
+
+
+def _run_engine_task(
+    engine_name: str,
+    method: str,
+    payload: Any,
+    config: Optional[OCRConfig]
+) -> OCRResult:
+    """Exécuter une méthode OCR d'un moteur dans le worker"""
+    engine = _get_worker_engine(engine_name)
+    if method == "process_document":
+        file_path, file_type = payload
+        return asyncio.run(engine.process_document(file_path, file_type, config))
+    return asyncio.run(getattr(engine, method)(payload, config))
+
+
+# --- Côté processus principal ------------------------------------------------
+
+class OCRWorkerPool:
+    """Pool de processus dédié à l'OCR, piloté par OCRManager"""
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+        warm_engines: Optional[List[str]] = None
+    ):
+        self.size = size if size is not None else int(
+            os.getenv("OCR_WORKER_PROCESSES", str(_default_pool_size()))
+        )
+        if max_tasks_per_child is None:
+            max_tasks_per_child = int(os.getenv("OCR_WORKER_MAX_TASKS_PER_CHILD", "50"))
+        self.max_tasks_per_child = max_tasks_per_child or None
+        if warm_engines is None:
+            warm_env = os.getenv("OCR_WORKER_WARM_ENGINES", "")
+            warm_engines = [name.strip() for name in warm_env.split(",") if name.strip()]
+        self.warm_engines = warm_engines
+        start_method = os.getenv("OCR_WORKER_START_METHOD", "spawn").lower()
+        if start_method == "fork" and "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("fork indisponible sur cette plateforme, utilisation de spawn")
+            start_method = "spawn"
+        self.start_method = start_method
+        # Inférence à blanc à la création de chaque worker, sauf préchauffage désactivé
+        self.warm_inference = os.getenv("OCR_WARMUP", "background").lower() != "off"
+        self.shared_engines: List[str] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Le pool est désactivé avec OCR_WORKER_PROCESSES=0"""
+        return self.size > 0
+
+    def share_engines(self, engines: Dict[str, OCREngine]) -> None:
+        """
+        Mode fork : exposer aux futurs workers les moteurs déjà chargés ici.
+
+        Les workers forkés héritent de ces objets sans les recharger ; gc.freeze()
+        évite que le ramasse-miettes ne touche (et donc ne copie) leurs pages mémoire.
+        """
+        if self.start_method != "fork":
+            return
+        # CUDA ne survit pas à un fork : ces moteurs sont rechargés par chaque worker
+        shareable = {
+            name: engine for name, engine in engines.items()
+            if name in self.warm_engines and getattr(engine, "device", None) != "cuda"
+        }
+        _worker_engines.update(shareable)
+        self.shared_engines = sorted(shareable)
+        gc.collect()
+        gc.freeze()
+        logger.info(f"Moteurs partagés en copie sur écriture: {self.shared_engines or 'aucun'}")
+
+    def start(self) -> None:
+        """Créer l'exécuteur (les processus sont lancés à la demande)"""
+        if not self.enabled or self._executor is not None:
+            return
+
+        if self.start_method == "fork" and self.max_tasks_per_child:
+            # Incompatible avec fork (ProcessPoolExecutor) : les workers ne sont pas recyclés
+            logger.info("OCR_WORKER_MAX_TASKS_PER_CHILD ignoré en mode fork")
+            self.max_tasks_per_child = None
+
+        context = multiprocessing.get_context(self.start_method)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=context,
+            initializer=_worker_initializer,
+            initargs=(self.warm_engines, self.warm_inference, context.Barrier(self.size)),
+            max_tasks_per_child=self.max_tasks_per_child
+        )
+        logger.info(
+            f"Pool OCR démarré ({self.start_method}): {self.size} worker(s), "
+            f"max_tasks_per_child={self.max_tasks_per_child}, "
+            f"préchauffage={self.warm_engines or 'aucun'}"
+        )
+
+    async def warm_up(self, timeout: float = 300) -> int:
+        """
+        Démarrer tous les workers (inférence à blanc dans leur initialisation).
+
+        Une tâche par worker, bloquée à une barrière de self.size places : chaque
+        tâche occupe donc un worker distinct. timeout borne l'attente des workers
+        lents à charger leurs modèles.
+
+        Returns:
+            Nombre de workers distincts préchauffés
+        """
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _warm_worker, timeout)
+            for _ in range(self.size)
+        ])
+        warmed = len(set(pids))
+        if warmed < self.size:
+            logger.warning(f"Préchauffage incomplet du pool OCR: {warmed}/{self.size} worker(s)")
+        return warmed
+
+    def submit(
+        self,
+        engine_name: str,
+        method: str,
+        payload: Any,
+        config: Optional[OCRConfig] = None
+    ) -> "asyncio.Future[OCRResult]":
+        """Soumettre une tâche OCR et retourner un future awaitable"""
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self._executor, _run_engine_task, engine_name, method, payload, config
+        )
+
+    async def process_page(
+        self,
+        engine_name: str,
+        image: Union[str, Path, Image.Image, np.ndarray],
+        config: Optional[OCRConfig] = None
+    ) -> OCRResult:
+        """OCR d'une page (image) dans un worker"""
+        if isinstance(image, Path):
+            image = str(image)
+        return await self.submit(engine_name, "process_image", image, config)
+
+    async def process_document(
+        self,
+        engine_name: str,
+        file_path: Union[str, Path],
+        file_type: str,
+        config: Optional[OCRConfig] = None
+    ) -> OCRResult:
+        """OCR d'un document complet dans un seul worker"""
+        return await self.submit(
+            engine_name, "process_document", (str(file_path), file_type), config
+        )
+
+    def restart(self) -> None:
+        """Recréer le pool après la mort inattendue d'un worker"""
+        logger.warning("Redémarrage du pool OCR")
+        self.shutdown(wait=False)
+        self.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrêter les workers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            logger.info("Pool OCR arrêté")
+
+    def get_info(self) -> Dict[str, Any]:
+        """Informations sur le pool"""
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "warm_engines": self.warm_engines,
+            "warm_inference": self.warm_inference,
+            "start_method": self.start_method,
+            "shared_engines": self.shared_engines,
+            "running": self._executor is not None
+        }
+
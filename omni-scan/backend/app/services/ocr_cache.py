@@ -0,0 +1,98 @@
+"""
+Cache des résultats OCR adressé par contenu
+Clé = SHA-256 du fichier + moteur (nom, version) + options OCR influant sur le résultat
+"""
+
+import copy
+import hashlib
+import json
+import os
+from typing import Optional, Dict, Any
+
+from app.core.logging import get_logger
+from app.services.ocr import OCRConfig
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+logger = get_logger("ocr_cache")
+
+# Version du format des entrées : à incrémenter si la structure des résultats change
+CACHE_FORMAT_VERSION = 1
+
+
+def hash_content(content: bytes) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class OCRResultCache:
+    """Cache des réponses de process_document_advanced"""
+
+    def __init__(self, cache: TieredCache, enabled: bool = True):
+        self.cache = cache
+        self.enabled = enabled
+
+    def make_key(
+        self,
+        content_hash: str,
+        file_type: str,
+        engine_name: str,
+        engine_version: str,
+        config: OCRConfig
+    ) -> str:
+        """Construire la clé de cache d'un document"""
+        material = json.dumps(
+            {
+                "v": CACHE_FORMAT_VERSION,
+                "content": content_hash,
+                "file_type": file_type.lower(),
+                "engine": engine_name,
+                "engine_version": engine_version,
+                "config": config.fingerprint()
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Lecture du cache OCR impossible: {e}")
+            return None
+        # Copie : l'appelant complète le résultat (métadonnées, cache_hit...)
+        return copy.deepcopy(value) if value is not None else None
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.cache.set(key, copy.deepcopy(result))
+        except Exception as e:
+            logger.warning(f"Écriture du cache OCR impossible: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self.cache.get_stats()}
+
+
+def _build_default_cache() -> OCRResultCache:
+    """Construire le cache à partir des variables d'environnement"""
+    enabled = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+    memory = LRUCache(max_entries=int(os.getenv("OCR_CACHE_MAX_ENTRIES", "256")))
+
+    disk = None
+    db_path = os.getenv("OCR_CACHE_DB_PATH", "")
+    if enabled and db_path:
+        max_bytes = int(os.getenv("OCR_CACHE_MAX_DB_MB", "512")) * 1024 * 1024
+        try:
+            disk = SQLiteCache(db_path, max_bytes=max_bytes)
+            logger.info(f"Cache OCR persistant: {db_path} ({max_bytes // (1024 * 1024)} MB max)")
+        except Exception as e:
+            logger.error(f"Cache OCR persistant indisponible ({db_path}): {e}")
+
+    return OCRResultCache(TieredCache(memory, disk), enabled=enabled)
+
+
+# Instance globale
+ocr_result_cache = _build_default_cache()
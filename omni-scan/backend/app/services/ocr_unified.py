@@ -4,6 +4,8 @@ Combine les fonctionnalités de ocr.py et ocr_simple.py
 """
 
 from typing import Optional, Dict, Any, List
+from dataclasses import asdict
+import asyncio
 import pytesseract
 from PIL import Image
 import pdf2image
@@ -12,8 +14,11 @@ import numpy as np
 from pathlib import Path
 
 from app.core.logging import get_logger
-from app.utils.image_preprocessing import ImagePreprocessor
-from app.utils.ocr_postprocessing import OCRPostProcessor
+from app.utils.image_preprocessing import (
+    ImagePreprocessor, PREPROCESSING_PROFILES, probe_image_quality, plan_preprocessing
+)
+from app.utils.ocr_postprocessing import get_postprocessor
+from app.services.ocr.pdf_stream import get_pdf_page_count, iter_page_windows, default_chunk_size
 
 logger = get_logger("ocr_unified")
 
@@ -48,7 +53,7 @@ class UnifiedOCRService:
         self._progress_callback = None  # Callback pour la progression
         # Initialiser les processeurs
         self.image_preprocessor = ImagePreprocessor()
-        self.text_postprocessor = OCRPostProcessor()
+        self.text_postprocessor = get_postprocessor()
     
     def _verify_tesseract(self):
         """Vérifier que Tesseract est installé"""
@@ -109,43 +114,49 @@ class UnifiedOCRService:
         logger.info(f"Processing PDF: {pdf_path}")
         
         try:
-            # Convertir PDF en images
-            images = pdf2image.convert_from_path(
-                pdf_path,
-                dpi=self.config.pdf_dpi,
-                first_page=1,
-                last_page=self.config.max_pages
-            )
-            
-            # Traiter chaque page
-            texts = []
-            total_pages = len(images)
+            # Rastériser par fenêtres de pages pour borner la mémoire
+            total_pages = await asyncio.to_thread(get_pdf_page_count, pdf_path)
+            if self.config.max_pages:
+                total_pages = min(total_pages, self.config.max_pages)
             # Stocker le nombre de pages pour l'usage externe
             self._last_total_pages = total_pages
             
-            for i, image in enumerate(images):
-                current_page = i + 1
-                logger.debug(f"Processing page {current_page}/{total_pages}")
-                
-                # Callback de progression si disponible
-                if self._progress_callback:
-                    self._progress_callback(current_page, total_pages)
-                
-                # Preprocessing si activé
-                if enable_preprocessing:
-                    # La méthode process() de ImagePreprocessor prend un chemin ou une image PIL
-                    # et retourne une image PIL
-                    image = self.image_preprocessor.process(image)
-                
-                # OCR sur l'image
-                page_text = pytesseract.image_to_string(
-                    image,
-                    lang="+".join(languages),
-                    config=self.config.tesseract_config
+            texts = []
+            for first_page, last_page in iter_page_windows(total_pages, default_chunk_size()):
+                # Convertir la fenêtre en images (bloquant, hors de la boucle d'événements)
+                images = await asyncio.to_thread(
+                    pdf2image.convert_from_path,
+                    pdf_path,
+                    dpi=self.config.pdf_dpi,
+                    first_page=first_page,
+                    last_page=last_page
                 )
                 
-                if page_text.strip():
-                    texts.append(f"--- Page {current_page} ---\n{page_text}")
+                for current_page, image in enumerate(images, start=first_page):
+                    logger.debug(f"Processing page {current_page}/{total_pages}")
+                    
+                    # Callback de progression si disponible
+                    if self._progress_callback:
+                        self._progress_callback(current_page, total_pages)
+                    
+                    # Preprocessing si activé
+                    if enable_preprocessing:
+                        # La méthode process() de ImagePreprocessor prend un chemin ou une image PIL
+                        # et retourne une image PIL
+                        image = self.image_preprocessor.process(image)
+                    
+                    # OCR sur l'image
+                    page_text = await asyncio.to_thread(
+                        pytesseract.image_to_string,
+                        image,
+                        lang="+".join(languages),
+                        config=self.config.tesseract_config
+                    )
+                    
+                    if page_text.strip():
+                        texts.append(f"--- Page {current_page} ---\n{page_text}")
+                
+                del images
             
             return "\n\n".join(texts)
             
@@ -190,7 +201,8 @@ class UnifiedOCRService:
                 image = Image.open(image_path)
             
             # OCR
-            text = pytesseract.image_to_string(
+            text = await asyncio.to_thread(
+                pytesseract.image_to_string,
                 image,
                 lang="+".join(languages),
                 config=self.config.tesseract_config
@@ -272,6 +284,10 @@ class UnifiedOCRService:
             # Détecter le bruit
             noise_level = self._estimate_noise(gray)
             
+            # Étapes de preprocessing que retiendrait le profil adaptatif
+            probe = probe_image_quality(gray)
+            plan = plan_preprocessing(probe, PREPROCESSING_PROFILES["adaptive"])
+            
             # Recommandations
             recommendations = []
             quality_score = 100
@@ -299,7 +315,9 @@ class UnifiedOCRService:
                 "noise_level": float(noise_level),
                 "quality_score": max(0, quality_score),
                 "recommendations": recommendations,
-                "suitable_for_ocr": quality_score >= 50
+                "suitable_for_ocr": quality_score >= 50,
+                "born_digital": probe.born_digital,
+                "preprocessing": asdict(plan)
             }
             
         except Exception as e:
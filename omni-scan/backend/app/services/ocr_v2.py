@@ -3,11 +3,12 @@ Service OCR v2 - Wrapper pour la nouvelle architecture modulaire
 Maintient la compatibilité avec l'ancienne API
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Awaitable, Callable
 from pathlib import Path
 
 from app.core.logging import get_logger
 from app.services.ocr import get_ocr_manager, OCRConfig, OutputFormat
+from app.services.ocr.text_regions import as_bounding_box
 
 logger = get_logger("ocr_v2")
 
@@ -54,33 +55,58 @@ async def process_document(
     return result.text
 
 
+def build_ocr_config(options: Dict[str, Any]) -> OCRConfig:
+    """Convertir les options de l'API avancée en OCRConfig"""
+    return OCRConfig(
+        languages=options.get("languages", ["fra", "eng"]),
+        enable_preprocessing=options.get("enable_preprocessing", True),
+        enable_postprocessing=options.get("enable_postprocessing", True),
+        preprocessing_profile=options.get("preprocessing_profile"),
+        output_format=OutputFormat(options.get("output_format", "text")),
+        extract_tables=options.get("extract_tables", False),
+        extract_formulas=options.get("extract_formulas", False),
+        use_gpu=options.get("use_gpu", False),
+        regions=[as_bounding_box(region) for region in options["regions"]] if options.get("regions") else None,
+        detect_regions=options.get("detect_regions"),
+        min_confidence=options.get("min_confidence") or 0.0,
+        max_pages=options.get("max_pages")
+    )
+
+
+async def get_engine_identity(options: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+    """
+    Déterminer le moteur qui traiterait un document avec ces options.
+    
+    Returns:
+        Tuple (nom du moteur, version)
+    """
+    options = options or {}
+    manager = get_ocr_manager()
+    await manager.initialize()
+    
+    engine_name = manager.select_engine_name(options.get("engine"), build_ocr_config(options))
+    return engine_name, manager.get_engine_capabilities(engine_name).version
+
+
 async def process_document_advanced(
     file_path: str,
     file_type: str,
-    options: Optional[Dict[str, Any]] = None
+    options: Optional[Dict[str, Any]] = None,
+    on_page: Optional[Callable[[str], Awaitable[None]]] = None
 ) -> Dict[str, Any]:
     """
     Interface avancée retournant toutes les informations.
     
+    on_page : reçoit le texte de chaque page extraite (PDF traités page par page)
+    
     Returns:
         Dict avec toutes les informations extraites
     """
     options = options or {}
     
     # Convertir les options vers OCRConfig
-    output_format = OutputFormat(options.get("output_format", "text"))
-    
-    config = OCRConfig(
-        languages=options.get("languages", ["fra", "eng"]),
-        enable_preprocessing=options.get("enable_preprocessing", True),
-        enable_postprocessing=options.get("enable_postprocessing", True),
-        output_format=output_format,
-        extract_tables=options.get("extract_tables", False),
-        extract_formulas=options.get("extract_formulas", False),
-        use_gpu=options.get("use_gpu", False),
-        regions=options.get("regions"),
-        max_pages=options.get("max_pages")
-    )
+    config = build_ocr_config(options)
+    output_format = config.output_format
     
     # Utiliser le gestionnaire OCR
     manager = get_ocr_manager()
@@ -90,7 +116,8 @@ async def process_document_advanced(
         file_path=file_path,
         file_type=file_type,
         engine_name=options.get("engine"),
-        config=config
+        config=config,
+        on_page=on_page
     )
     
     # Construire la réponse
@@ -103,6 +130,16 @@ async def process_document_advanced(
         "warnings": result.warnings
     }
     
+    # Compteurs du cache de pages (PDF traités page par page)
+    if result.page_cache is not None:
+        response["page_cache"] = result.page_cache
+    
+    # Détail par page (couche texte ou OCR) et zones de texte positionnées
+    if result.page_details:
+        response["pages"] = result.page_details
+    if result.text_blocks:
+        response["text_blocks"] = result.text_blocks
+    
     # Ajouter le format demandé
     if output_format != OutputFormat.TEXT:
         response[output_format.value] = result.to_format(output_format)
@@ -126,23 +163,32 @@ async def process_document_advanced(
             for formula in result.formulas
         ]
     
-    # Informations sur le moteur utilisé
-    engines_info = await get_engine_info()
-    response["engine_used"] = engines_info.get("default_engine", "unknown")
+    # Moteur réellement choisi pour ce document (registre des capacités, sans sonde)
+    engine_used = result.engine or manager.select_engine_name(options.get("engine"), config)
+    response["engine_used"] = engine_used
+    response["engine_version"] = manager.get_engine_capabilities(engine_used).version
     
     return response
 
 
-async def get_engine_info() -> Dict[str, Any]:
-    """Obtenir les informations sur les moteurs OCR disponibles"""
+async def get_engine_info(refresh: bool = False) -> Dict[str, Any]:
+    """
+    Obtenir les informations sur les moteurs OCR disponibles.
+    
+    Args:
+        refresh: Sonder à nouveau les moteurs au lieu de lire le registre
+    """
     manager = get_ocr_manager()
     await manager.initialize()
+    if refresh:
+        await manager.refresh_capabilities()
     
     return {
         "engines": manager.get_available_engines(),
         "default_engine": manager.default_engine,
         "supported_features": [f.value for f in manager.get_supported_features()],
-        "supported_languages": manager.get_supported_languages()[:20]  # Top 20
+        "supported_languages": manager.get_supported_languages()[:20],  # Top 20
+        "capabilities_updated_at": manager.capabilities.built_at
     }
 
 
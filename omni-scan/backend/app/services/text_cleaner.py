@@ -1,55 +1,158 @@
 """Service de nettoyage et amélioration du texte OCR"""
 
 import re
-from typing import List, Dict
+from typing import Any, Callable, Dict, List
 import unicodedata
 
+
+# Caractères mal reconnus et apostrophes : un seul passage (str.translate)
+CHARACTER_REPLACEMENTS = {
+    'ﬁ': 'fi',
+    'ﬂ': 'fl',
+    'œ': 'oe',
+    'æ': 'ae',
+    '©': 'e',
+    '®': 'e',
+    '€': 'e',
+    '\u2018': "'",
+    '\u2019': "'",
+    '´': "'",
+    '`': "'",
+}
+
+# Espaces problématiques (remplacements successifs, l'ordre compte)
+SPACING_REPLACEMENTS = (
+    ('  ', ' '),  # Double espace
+    (' ,', ','),
+    (' .', '.'),
+    (' ;', ';'),
+    (' :', ':'),
+    (' !', '!'),
+    (' ?', '?'),
+    ('( ', '('),
+    (' )', ')'),
+)
+
+# Mots français courants mal reconnus
+WORD_CORRECTIONS = {
+    'ler': '1er',
+    '2eme': '2ème',
+    '3eme': '3ème',
+    'iere': 'ière',
+    'ieme': 'ième',
+    'Etat': 'État',
+    'Ecole': 'École',
+    'Etude': 'Étude',
+    'a la': 'à la',
+    'a l\'': 'à l\'',
+}
+
+_CHARACTER_TABLE = str.maketrans(CHARACTER_REPLACEMENTS)
+_WORD_CORRECTIONS_LOWER = {old.lower(): new for old, new in WORD_CORRECTIONS.items()}
+_WORD_CORRECTIONS_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(old) for old in WORD_CORRECTIONS) + r')\b', re.IGNORECASE
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+([.,;:!?])')
+_SPACE_AFTER_PUNCT_RE = re.compile(r'([.,;:!?])\s*')
+_QUOTES_RE = re.compile(r'"([^"]+)"')
+_HIGH_PUNCT_RES = tuple(re.compile(r'\s*' + re.escape(char) + r'\s*') for char in ':;!?')
+_CONTRACTION_RE = re.compile(r'\b([dlcjmts])\s+\'', re.IGNORECASE)
+
+# Patterns de détection de chapitres, en une seule expression
+_CHAPTER_RE = re.compile(
+    r'(?:Chapitre|CHAPITRE|Chap\.|CHAP\.)\s+(?:\d+|[IVX]+)'
+    r'|\d+\.\s+[A-Z][^.]+$'  # 1. Titre
+    r'|(?:Section|SECTION)\s+\d+'
+    r'|(?:Partie|PARTIE)\s+(?:\d+|[IVX]+)'
+    r'|(?:Article|ARTICLE)\s+\d+'
+)
+
+
+def is_chapter_title(line: str) -> bool:
+    """Ligne (déjà nettoyée des espaces) ressemblant à un titre de chapitre"""
+    if _CHAPTER_RE.match(line):
+        return True
+    # Ou en majuscules et courte (probable titre)
+    return line.isupper() and len(line) < 100 and not line.endswith('.')
+
+
+class ChapterText:
+    """Chapitre en cours de lecture : titre, position et lignes de contenu"""
+
+    def __init__(self, title: str, start_line: int):
+        self.title = title
+        self.start_line = start_line
+        self.end_line = start_line
+        self.lines: List[str] = []
+
+    def add_line(self, line: str) -> None:
+        self.lines.append(line)
+
+    def add_blank(self) -> None:
+        if self.lines:
+            self.lines.append('')
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            'title': self.title,
+            'content': '\n'.join(self.lines).strip(),
+            'start_line': self.start_line,
+            'end_line': self.end_line
+        }
+
+
+class ChapterTracker:
+    """
+    Détection incrémentale des chapitres : les lignes sont fournies une à une
+    (au fil des pages OCR), seul le chapitre en cours est gardé ouvert.
+
+    chapter_factory(title, start_line) crée l'accumulateur du chapitre
+    (ChapterText par défaut, ou un accumulateur de statistiques).
+    """
+
+    def __init__(self, chapter_factory: Callable[[str, int], Any] = ChapterText):
+        self.chapter_factory = chapter_factory
+        self.chapters: List[Any] = []
+        self.current = None
+        self.line_count = 0
+
+    def feed_line(self, line: str) -> None:
+        index = self.line_count
+        self.line_count += 1
+
+        line = line.strip()
+        if not line:
+            if self.current is not None:
+                self.current.add_blank()
+            return
+
+        if is_chapter_title(line):
+            # Clore le chapitre précédent
+            if self.current is not None:
+                self.current.end_line = index - 1
+                self.chapters.append(self.current)
+            self.current = self.chapter_factory(line, index)
+        elif self.current is not None:
+            self.current.add_line(line)
+
+    def finish(self) -> List[Any]:
+        """Clore le dernier chapitre et retourner tous les chapitres"""
+        if self.current is not None:
+            self.current.end_line = self.line_count - 1
+            self.chapters.append(self.current)
+            self.current = None
+        return self.chapters
+
+
 class TextCleaner:
     """Nettoie et améliore la qualité du texte extrait par OCR"""
     
     def __init__(self):
         # Corrections courantes pour le français
-        self.common_replacements = {
-            # Caractères mal reconnus
-            'ﬁ': 'fi',
-            'ﬂ': 'fl',
-            'œ': 'oe',
-            'æ': 'ae',
-            '©': 'e',
-            '®': 'e',
-            '€': 'e',
-            
-            # Espaces problématiques
-            '  ': ' ',  # Double espace
-            ' ,': ',',
-            ' .': '.',
-            ' ;': ';',
-            ' :': ':',
-            ' !': '!',
-            ' ?': '?',
-            '( ': '(',
-            ' )': ')',
-            
-            # Apostrophes
-            ''': "'",
-            ''': "'",
-            '´': "'",
-            '`': "'",
-        }
-        
-        # Mots français courants mal reconnus
-        self.word_corrections = {
-            'ler': '1er',
-            '2eme': '2ème',
-            '3eme': '3ème',
-            'iere': 'ière',
-            'ieme': 'ième',
-            'Etat': 'État',
-            'Ecole': 'École',
-            'Etude': 'Étude',
-            'a la': 'à la',
-            'a l\'': 'à l\'',
-        }
+        self.common_replacements = {**CHARACTER_REPLACEMENTS, **dict(SPACING_REPLACEMENTS)}
+        self.word_corrections = WORD_CORRECTIONS
     
     def clean_text(self, text: str) -> str:
         """Nettoie le texte OCR complet"""
@@ -60,27 +163,26 @@ class TextCleaner:
         text = unicodedata.normalize('NFKC', text)
         
         # 2. Remplacer les caractères problématiques
-        for old, new in self.common_replacements.items():
+        text = text.translate(_CHARACTER_TABLE)
+        for old, new in SPACING_REPLACEMENTS:
             text = text.replace(old, new)
         
-        # 3. Corriger les espaces multiples
-        text = re.sub(r'\s+', ' ', text)
+        # 3. Corriger les espaces multiples (les sauts de ligne disparaissent aussi)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # 4. Corriger les espaces autour de la ponctuation
-        text = re.sub(r'\s+([.,;:!?])', r'\1', text)
-        text = re.sub(r'([.,;:!?])\s*', r'\1 ', text)
+        text = _SPACE_BEFORE_PUNCT_RE.sub(r'\1', text)
+        text = _SPACE_AFTER_PUNCT_RE.sub(r'\1 ', text)
         
-        # 5. Corriger les mots courants
-        for old, new in self.word_corrections.items():
-            text = re.sub(r'\b' + old + r'\b', new, text, flags=re.IGNORECASE)
+        # 5. Corriger les mots courants (une seule passe)
+        text = _WORD_CORRECTIONS_RE.sub(
+            lambda match: _WORD_CORRECTIONS_LOWER[match.group(0).lower()], text
+        )
         
-        # 6. Supprimer les lignes vides multiples
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        
-        # 7. Corriger les tirets et apostrophes
+        # 6. Corriger les tirets et apostrophes
         text = self._fix_punctuation(text)
         
-        # 8. Nettoyer les espaces en début/fin
+        # 7. Nettoyer les espaces en début/fin
         text = text.strip()
         
         return text
@@ -88,81 +190,23 @@ class TextCleaner:
     def _fix_punctuation(self, text: str) -> str:
         """Corrige la ponctuation française"""
         # Guillemets français
-        text = re.sub(r'"([^"]+)"', r'« \1 »', text)
+        text = _QUOTES_RE.sub(r'« \1 »', text)
         
         # Espaces insécables avant : ; ! ?
-        text = re.sub(r'\s*:\s*', ' : ', text)
-        text = re.sub(r'\s*;\s*', ' ; ', text)
-        text = re.sub(r'\s*!\s*', ' ! ', text)
-        text = re.sub(r'\s*\?\s*', ' ? ', text)
+        for pattern, char in zip(_HIGH_PUNCT_RES, ':;!?'):
+            text = pattern.sub(f' {char} ', text)
         
         # Apostrophes dans les contractions
-        text = re.sub(r'\b([dlcjmts])\s+\'', r"\1'", text, flags=re.IGNORECASE)
+        text = _CONTRACTION_RE.sub(r"\1'", text)
         
         return text
     
     def detect_chapters(self, text: str) -> List[Dict[str, str]]:
         """Détecte les chapitres dans un document"""
-        chapters = []
-        
-        # Patterns de détection de chapitres
-        chapter_patterns = [
-            r'^(Chapitre|CHAPITRE|Chap\.|CHAP\.)\s+(\d+|[IVX]+)',
-            r'^(\d+)\.\s+([A-Z][^.]+)$',  # 1. Titre
-            r'^(Section|SECTION)\s+(\d+)',
-            r'^(Partie|PARTIE)\s+(\d+|[IVX]+)',
-            r'^(Article|ARTICLE)\s+(\d+)',
-        ]
-        
-        lines = text.split('\n')
-        current_chapter = None
-        current_content = []
-        chapter_start = 0
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                if current_content:
-                    current_content.append('')
-                continue
-            
-            # Vérifier si c'est un titre de chapitre
-            is_chapter = False
-            for pattern in chapter_patterns:
-                if re.match(pattern, line, re.MULTILINE):
-                    is_chapter = True
-                    break
-            
-            # Ou si c'est en majuscules et court (probable titre)
-            if not is_chapter and line.isupper() and len(line) < 100 and not line.endswith('.'):
-                is_chapter = True
-            
-            if is_chapter:
-                # Sauvegarder le chapitre précédent
-                if current_chapter:
-                    chapters.append({
-                        'title': current_chapter,
-                        'content': '\n'.join(current_content).strip(),
-                        'start_line': chapter_start,
-                        'end_line': i - 1
-                    })
-                
-                current_chapter = line
-                chapter_start = i
-                current_content = []
-            else:
-                current_content.append(line)
-        
-        # Ajouter le dernier chapitre
-        if current_chapter:
-            chapters.append({
-                'title': current_chapter,
-                'content': '\n'.join(current_content).strip(),
-                'start_line': chapter_start,
-                'end_line': len(lines) - 1
-            })
-        
-        return chapters
+        tracker = ChapterTracker()
+        for line in text.split('\n'):
+            tracker.feed_line(line)
+        return [chapter.to_dict() for chapter in tracker.finish()]
     
     def merge_hyphenated_words(self, text: str) -> str:
         """Fusionne les mots coupés par des tirets en fin de ligne"""
@@ -11,8 +11,9 @@ from datetime import datetime
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.database import get_supabase
-from app.services.ocr_v2 import process_document_advanced
-from app.services.ai_analysis_unified import AIAnalyzer, AIProvider, analyze_with_custom_key
+from app.services.ocr_v2 import process_document_advanced, build_ocr_config, get_engine_identity
+from app.services.ocr_cache import ocr_result_cache, hash_content
+from app.services.ai_analysis_unified import AIAnalyzer, AIProvider, AnalysisPipeline, analyze_with_custom_key
 from app.services.auth_unified import UnifiedAuthService
 from app.core.validators import validate_file_extension, validate_file_size, sanitize_filename
 from app.core.exceptions import FileValidationError
@@ -20,6 +21,11 @@ from app.core.exceptions import FileValidationError
 logger = get_logger("upload_unified")
 
 
+def pipeline_enabled() -> bool:
+    """Analyse IA démarrée pendant l'OCR des PDFs (pages analysées au fil de l'extraction)"""
+    return os.getenv("UPLOAD_PIPELINE", "true").lower() == "true"
+
+
 class UploadMode:
     """Modes d'upload disponibles"""
     FULL = "full"        # Mode complet avec stockage en BD
@@ -57,6 +63,7 @@ class UnifiedUploadService:
         self.config = config or UploadConfig()
         self.auth_service = UnifiedAuthService()
         self._progress_callback = None  # Callback pour la progression
+        self._partial_result_callback = None  # Callback pour les analyses IA partielles
     
     async def process_upload(
         self,
@@ -96,6 +103,9 @@ class UnifiedUploadService:
         # Générer un ID unique pour le document
         document_id = str(uuid.uuid4())
         
+        # Empreinte du contenu pour le cache OCR
+        content_hash = hash_content(file_content)
+        
         # Sauvegarder le fichier temporairement
         temp_path = await self._save_temp_file(document_id, file_ext, file_content)
         
@@ -107,7 +117,8 @@ class UnifiedUploadService:
                 file_ext=file_ext,
                 filename=clean_filename,
                 user_id=user_id,
-                options=options
+                options=options,
+                content_hash=content_hash
             )
             
             # Stocker si configuré
@@ -163,7 +174,8 @@ class UnifiedUploadService:
         file_ext: str,
         filename: str,
         user_id: Optional[str],
-        options: Dict[str, Any]
+        options: Dict[str, Any],
+        content_hash: Optional[str] = None
     ) -> Dict[str, Any]:
         """Traiter le document (OCR + AI)"""
         result = {
@@ -177,6 +189,9 @@ class UnifiedUploadService:
         if self._progress_callback:
             self._progress_callback(1, 3, "Démarrage du traitement...")
         
+        # Analyse IA lancée pendant l'OCR quand le document le permet
+        pipeline = self._start_pipeline(file_ext, options)
+        
         # OCR si activé
         extracted_text = ""
         if self.config.enable_ocr:
@@ -189,11 +204,28 @@ class UnifiedUploadService:
                 ocr_options = options.get("ocr_options", {})
                 ocr_options["engine"] = options.get("ocr_engine")  # Permettre de choisir le moteur
                 
-                ocr_result = await process_document_advanced(
-                    file_path,
-                    file_ext,
-                    ocr_options
-                )
+                ocr_result = None
+                cache_key = None
+                if content_hash and ocr_result_cache.enabled and options.get("use_cache", True):
+                    engine_name, engine_version = await get_engine_identity(ocr_options)
+                    cache_key = ocr_result_cache.make_key(
+                        content_hash, file_ext, engine_name, engine_version,
+                        build_ocr_config(ocr_options)
+                    )
+                    ocr_result = ocr_result_cache.get(cache_key)
+                
+                cache_hit = ocr_result is not None
+                if cache_hit:
+                    logger.info(f"Résultat OCR servi depuis le cache pour {document_id}")
+                else:
+                    ocr_result = await process_document_advanced(
+                        file_path,
+                        file_ext,
+                        ocr_options,
+                        on_page=pipeline.feed if pipeline else None
+                    )
+                    if cache_key:
+                        ocr_result_cache.set(cache_key, ocr_result)
                 
                 extracted_text = ocr_result.get("text", "")
                 result["extracted_text"] = extracted_text
@@ -201,10 +233,19 @@ class UnifiedUploadService:
                 result["ocr_metadata"] = {
                     "engine_used": ocr_result.get("engine_used", "unknown"),
                     "page_count": ocr_result.get("page_count", 1),
-                    "processing_time": ocr_result.get("processing_time", 0.0)
+                    "processing_time": ocr_result.get("processing_time", 0.0),
+                    "cache_hit": cache_hit
                 }
+                if ocr_result.get("page_cache"):
+                    result["ocr_metadata"]["page_cache"] = ocr_result["page_cache"]
+                if ocr_result.get("pages"):
+                    result["ocr_metadata"]["text_layer_pages"] = sum(
+                        1 for page in ocr_result["pages"] if page["source"] == "text_layer"
+                    )
                 result["text_length"] = len(extracted_text)
                 result["processing_time"]["ocr"] = (datetime.utcnow() - start_time).total_seconds()
+                if pipeline and pipeline.started_chunks:
+                    result["ocr_metadata"]["ai_chunks_started"] = pipeline.started_chunks
             except Exception as e:
                 logger.error(f"OCR error for {document_id}: {e}")
                 result["ocr_error"] = str(e)
@@ -227,7 +268,13 @@ class UnifiedUploadService:
                 provider_enum = AIProvider[ai_provider.upper()]
                 
                 # Analyser avec l'IA
-                if custom_api_key:
+                if pipeline:
+                    # Le temps IA compté ici est l'attente restant après l'OCR
+                    ai_analysis = await pipeline.finish(
+                        extracted_text,
+                        chapter_summaries=options.get("chapter_summaries", False)
+                    )
+                elif custom_api_key:
                     ai_analysis = await analyze_with_custom_key(
                         text=extracted_text,
                         provider=provider_enum,
@@ -235,7 +282,8 @@ class UnifiedUploadService:
                         detail_level=options.get("detail_level", "medium"),
                         language=options.get("language"),
                         include_structured_data=options.get("include_structured_data", True),
-                        chapter_summaries=options.get("chapter_summaries", False)
+                        chapter_summaries=options.get("chapter_summaries", False),
+                        use_cache=options.get("use_cache", True)
                     )
                 else:
                     analyzer = AIAnalyzer(provider=provider_enum)
@@ -245,7 +293,8 @@ class UnifiedUploadService:
                             detail_level=options.get("detail_level", "medium"),
                             language=options.get("language"),
                             include_structured_data=options.get("include_structured_data", True),
-                            chapter_summaries=options.get("chapter_summaries", False)
+                            chapter_summaries=options.get("chapter_summaries", False),
+                            use_cache=options.get("use_cache", True)
                         )
                 
                 result["ai_analysis"] = ai_analysis
@@ -257,11 +306,42 @@ class UnifiedUploadService:
                 logger.error(f"AI analysis error for {document_id}: {e}")
                 result["ai_error"] = str(e)
         
+        if pipeline:
+            # OCR en échec ou texte vide : analyses de morceaux sans suite
+            pipeline.cancel()
+        
         # Temps total
         result["processing_time"]["total"] = sum(result["processing_time"].values())
         
         return result
     
+    def _start_pipeline(self, file_ext: str, options: Dict[str, Any]) -> Optional[AnalysisPipeline]:
+        """
+        Préparer l'analyse IA en pipeline avec l'OCR : PDFs (extraits page par page),
+        sans clé API de l'utilisateur (analysée dans un contexte isolé après l'OCR).
+        """
+        if not (self.config.enable_ocr and self.config.enable_ai and file_ext == "pdf"):
+            return None
+        if not options.get("pipeline", pipeline_enabled()) or options.get("api_key"):
+            return None
+        try:
+            provider_enum = AIProvider[options.get("ai_provider", self.config.ai_provider.value).upper()]
+        except (KeyError, AttributeError):
+            return None
+        
+        return AIAnalyzer(provider=provider_enum).pipeline(
+            detail_level=options.get("detail_level", "medium"),
+            language=options.get("language"),
+            include_structured_data=options.get("include_structured_data", True),
+            use_cache=options.get("use_cache", True),
+            on_partial=self._publish_partial_result
+        )
+    
+    def _publish_partial_result(self, partial: Dict[str, Any]) -> None:
+        """Transmettre une analyse partielle (morceaux déjà analysés) au suivi du job"""
+        if self._partial_result_callback:
+            self._partial_result_callback(partial)
+    
     async def _store_results(self, document_id: str, user_id: str, result: Dict[str, Any]) -> None:
         """Stocker les résultats en base de données"""
         if self.config.mode != UploadMode.FULL:
@@ -2,9 +2,11 @@
 Template pour l'extraction structurée de données de factures
 """
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 
+from app.utils.document_features import DocumentFeatures, get_document_features
+
 
 class InvoiceTemplate:
     """Extrait les informations structurées d'une facture"""
@@ -49,14 +51,13 @@ class InvoiceTemplate:
             'montant', 'prix', 'référence', 'date', 'échéance'
         ]
     
-    def is_invoice(self, text: str) -> bool:
+    def is_invoice(self, text: Union[str, DocumentFeatures]) -> bool:
         """Détermine si le document est probablement une facture"""
-        text_lower = text.lower()
-        matches = sum(1 for keyword in self.invoice_keywords if keyword in text_lower)
-        return matches >= 3
+        return get_document_features(text).count_keywords(self.invoice_keywords) >= 3
     
-    def extract(self, text: str) -> Dict[str, Any]:
+    def extract(self, text: Union[str, DocumentFeatures]) -> Dict[str, Any]:
         """Extrait toutes les informations de la facture"""
+        features = get_document_features(text)
         result = {
             'type': 'invoice',
             'confidence': 0.0,
@@ -66,24 +67,24 @@ class InvoiceTemplate:
         }
         
         # Vérifier si c'est une facture
-        if not self.is_invoice(text):
+        if not self.is_invoice(features):
             result['type'] = 'unknown'
             result['confidence'] = 0.2
             return result
         
         # Extraire les champs principaux
         result['data'] = {
-            'invoice_number': self._extract_field(text, 'invoice_number'),
-            'date': self._extract_date(text),
-            'total_amount': self._extract_amount(text, 'amount'),
-            'tax_amount': self._extract_amount(text, 'tax'),
-            'vendor': self._extract_field(text, 'vendor'),
-            'client': self._extract_field(text, 'client'),
-            'payment_terms': self._extract_field(text, 'payment_terms'),
+            'invoice_number': self._extract_field(features, 'invoice_number'),
+            'date': self._extract_date(features),
+            'total_amount': self._extract_amount(features, 'amount'),
+            'tax_amount': self._extract_amount(features, 'tax'),
+            'vendor': self._extract_field(features, 'vendor'),
+            'client': self._extract_field(features, 'client'),
+            'payment_terms': self._extract_field(features, 'payment_terms'),
         }
         
         # Extraire les lignes d'articles
-        result['line_items'] = self._extract_line_items(text)
+        result['line_items'] = self._extract_line_items(features)
         
         # Calculer la confiance
         result['confidence'] = self._calculate_confidence(result['data'])
@@ -93,20 +94,20 @@ class InvoiceTemplate:
         
         return result
     
-    def _extract_field(self, text: str, field_name: str) -> Optional[str]:
+    def _extract_field(self, features: DocumentFeatures, field_name: str) -> Optional[str]:
         """Extrait un champ selon les patterns définis"""
         patterns = self.patterns.get(field_name, [])
         
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+            match = features.search(pattern, re.IGNORECASE | re.MULTILINE)
             if match:
                 return match.group(1).strip()
         
         return None
     
-    def _extract_date(self, text: str) -> Optional[str]:
+    def _extract_date(self, features: DocumentFeatures) -> Optional[str]:
         """Extrait et formate la date"""
-        date_str = self._extract_field(text, 'date')
+        date_str = self._extract_field(features, 'date')
         if not date_str:
             return None
         
@@ -120,9 +121,9 @@ class InvoiceTemplate:
         
         return date_str
     
-    def _extract_amount(self, text: str, field_name: str) -> Optional[float]:
+    def _extract_amount(self, features: DocumentFeatures, field_name: str) -> Optional[float]:
         """Extrait et convertit un montant"""
-        amount_str = self._extract_field(text, field_name)
+        amount_str = self._extract_field(features, field_name)
         if not amount_str:
             return None
         
@@ -134,14 +135,14 @@ class InvoiceTemplate:
         except ValueError:
             return None
     
-    def _extract_line_items(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_line_items(self, features: DocumentFeatures) -> List[Dict[str, Any]]:
         """Extrait les lignes d'articles de la facture"""
         items = []
         
         # Pattern pour détecter les lignes avec prix
         line_pattern = r'([^\n]+?)\s+([\d\s]+[,.]?\d*)\s*€'
         
-        for match in re.finditer(line_pattern, text):
+        for match in re.finditer(line_pattern, features.text):
             description = match.group(1).strip()
             amount = match.group(2).strip()
             
@@ -198,7 +199,7 @@ class InvoiceTemplate:
         return ' '.join(parts) if parts else "Facture détectée mais informations incomplètes"
 
 
-def extract_invoice_data(text: str) -> Dict[str, Any]:
+def extract_invoice_data(text: Union[str, DocumentFeatures]) -> Dict[str, Any]:
     """Fonction helper pour extraction facile"""
     template = InvoiceTemplate()
     return template.extract(text)
\ No newline at end of file
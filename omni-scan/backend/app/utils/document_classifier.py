@@ -2,120 +2,158 @@
 Classificateur de documents pour déterminer le type
 """
 import re
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional, Pattern, Union
+
+from app.utils.document_features import DocumentFeatures, get_document_features
+from app.utils.keyword_matcher import WeightedKeywords
+
+
+# Mots-clés pondérés par type de document
+WEIGHTED_PATTERNS = {
+    "invoice": {
+        "strong": ["facture", "invoice", "total ttc", "montant ttc", "n° de facture", "numéro de facture"],
+        "medium": ["tva", "ht", "remise", "montant", "total", "sous-total"],
+        "weak": ["référence", "date", "échéance", "paiement", "client", "fournisseur"]
+    },
+    "contract": {
+        "strong": ["contrat", "agreement", "convention", "entre les parties", "ci-après dénommé"],
+        "medium": ["obligations", "durée", "résiliation", "article", "clause"],
+        "weak": ["parties", "engagement", "conditions", "modalités", "signature"]
+    },
+    "cv": {
+        "strong": ["curriculum vitae", "cv", "expérience professionnelle", "formation", "parcours professionnel"],
+        "medium": ["compétences", "diplôme", "expérience", "poste", "emploi"],
+        "weak": ["langues", "loisirs", "références", "objectif", "profil"]
+    },
+    "email": {
+        "strong": ["de:", "à:", "objet:", "from:", "to:", "subject:", "re:", "fw:"],
+        "medium": ["cordialement", "bien cordialement", "salutations", "regards"],
+        "weak": ["bonjour", "madame", "monsieur", "merci", "réponse"]
+    },
+    "report": {
+        "strong": ["rapport", "report", "analyse", "étude", "synthèse", "compte-rendu"],
+        "medium": ["conclusion", "recommandation", "résultat", "méthodologie", "introduction"],
+        "weak": ["objectif", "contexte", "annexe", "référence", "source"]
+    },
+    "receipt": {
+        "strong": ["ticket", "reçu", "receipt", "caisse", "tpe"],
+        "medium": ["article", "quantité", "prix unitaire", "total", "espèces", "carte"],
+        "weak": ["merci", "à bientôt", "tva", "montant"]
+    },
+    "business_card": {
+        "strong": ["mobile", "portable", "tel", "email", "linkedin", "@"],
+        "medium": ["directeur", "manager", "responsable", "ceo", "président"],
+        "weak": ["société", "entreprise", "sarl", "sas", "adresse"]
+    }
+}
+
+# Expressions régulières spécifiques
+REGEX_PATTERNS = {
+    "invoice": [
+        r"facture\s*n°\s*\w+",
+        r"invoice\s*#?\s*\w+",
+        r"total\s*ttc\s*:?\s*[\d\s,]+",
+        r"\d+[,.]?\d*\s*€\s*ttc"
+    ],
+    "email": [
+        r"^de\s*:\s*.+$",
+        r"^from\s*:\s*.+$",
+        r"^objet\s*:\s*.+$",
+        r"^subject\s*:\s*.+$"
+    ],
+    "phone": [
+        r"(?:0|\+33)\s*[1-9](?:\s*\d{2}){4}",  # Numéro français
+        r"\+\d{1,3}\s*\d{6,14}",  # International
+    ],
+    "date": [
+        r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}",
+        r"\d{4}[/-]\d{1,2}[/-]\d{1,2}"
+    ],
+    "amount": [
+        r"\d+[,.]?\d*\s*€",
+        r"€\s*\d+[,.]?\d*"
+    ]
+}
+
+# Poids des mots-clés selon leur force
+KEYWORD_WEIGHTS = {"strong": 3.0, "medium": 1.5, "weak": 0.5}
+
+# Bonus par expression régulière trouvée
+REGEX_BONUS = 2.0
+
+
+def build_keyword_scores(weighted_patterns: Dict[str, Dict[str, List[str]]]) -> WeightedKeywords:
+    """Automate unique pour les mots-clés de tous les types"""
+    return WeightedKeywords({
+        doc_type: [
+            (keyword, KEYWORD_WEIGHTS[strength])
+            for strength, keywords in patterns.items()
+            for keyword in keywords
+        ]
+        for doc_type, patterns in weighted_patterns.items()
+    })
+
+
+def compile_regex_patterns(regex_patterns: Dict[str, List[str]]) -> Dict[str, List[Pattern]]:
+    return {
+        doc_type: [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in patterns]
+        for doc_type, patterns in regex_patterns.items()
+    }
+
+
+# Construits une fois au chargement du module
+_KEYWORD_SCORES = build_keyword_scores(WEIGHTED_PATTERNS)
+_COMPILED_PATTERNS = compile_regex_patterns(REGEX_PATTERNS)
 
 
 class DocumentClassifier:
     """Détermine le type d'un document basé sur son contenu"""
     
-    def __init__(self):
-        # Mots-clés pondérés par type de document
-        self.weighted_patterns = {
-            "invoice": {
-                "strong": ["facture", "invoice", "total ttc", "montant ttc", "n° de facture", "numéro de facture"],
-                "medium": ["tva", "ht", "remise", "montant", "total", "sous-total"],
-                "weak": ["référence", "date", "échéance", "paiement", "client", "fournisseur"]
-            },
-            "contract": {
-                "strong": ["contrat", "agreement", "convention", "entre les parties", "ci-après dénommé"],
-                "medium": ["obligations", "durée", "résiliation", "article", "clause"],
-                "weak": ["parties", "engagement", "conditions", "modalités", "signature"]
-            },
-            "cv": {
-                "strong": ["curriculum vitae", "cv", "expérience professionnelle", "formation", "parcours professionnel"],
-                "medium": ["compétences", "diplôme", "expérience", "poste", "emploi"],
-                "weak": ["langues", "loisirs", "références", "objectif", "profil"]
-            },
-            "email": {
-                "strong": ["de:", "à:", "objet:", "from:", "to:", "subject:", "re:", "fw:"],
-                "medium": ["cordialement", "bien cordialement", "salutations", "regards"],
-                "weak": ["bonjour", "madame", "monsieur", "merci", "réponse"]
-            },
-            "report": {
-                "strong": ["rapport", "report", "analyse", "étude", "synthèse", "compte-rendu"],
-                "medium": ["conclusion", "recommandation", "résultat", "méthodologie", "introduction"],
-                "weak": ["objectif", "contexte", "annexe", "référence", "source"]
-            },
-            "receipt": {
-                "strong": ["ticket", "reçu", "receipt", "caisse", "tpe"],
-                "medium": ["article", "quantité", "prix unitaire", "total", "espèces", "carte"],
-                "weak": ["merci", "à bientôt", "tva", "montant"]
-            },
-            "business_card": {
-                "strong": ["mobile", "portable", "tel", "email", "linkedin", "@"],
-                "medium": ["directeur", "manager", "responsable", "ceo", "président"],
-                "weak": ["société", "entreprise", "sarl", "sas", "adresse"]
-            }
-        }
-        
-        # Expressions régulières spécifiques
-        self.regex_patterns = {
-            "invoice": [
-                r"facture\s*n°\s*\w+",
-                r"invoice\s*#?\s*\w+",
-                r"total\s*ttc\s*:?\s*[\d\s,]+",
-                r"\d+[,.]?\d*\s*€\s*ttc"
-            ],
-            "email": [
-                r"^de\s*:\s*.+$",
-                r"^from\s*:\s*.+$",
-                r"^objet\s*:\s*.+$",
-                r"^subject\s*:\s*.+$"
-            ],
-            "phone": [
-                r"(?:0|\+33)\s*[1-9](?:\s*\d{2}){4}",  # Numéro français
-                r"\+\d{1,3}\s*\d{6,14}",  # International
-            ],
-            "date": [
-                r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}",
-                r"\d{4}[/-]\d{1,2}[/-]\d{1,2}"
-            ],
-            "amount": [
-                r"\d+[,.]?\d*\s*€",
-                r"€\s*\d+[,.]?\d*"
-            ]
-        }
+    def __init__(
+        self,
+        weighted_patterns: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        regex_patterns: Optional[Dict[str, List[str]]] = None
+    ):
+        self.weighted_patterns = weighted_patterns or WEIGHTED_PATTERNS
+        self.regex_patterns = regex_patterns or REGEX_PATTERNS
+        # Types supplémentaires : automate et expressions construits pour ce classificateur
+        self.keyword_scores = (
+            build_keyword_scores(self.weighted_patterns) if weighted_patterns else _KEYWORD_SCORES
+        )
+        self.compiled_patterns = (
+            compile_regex_patterns(self.regex_patterns) if regex_patterns else _COMPILED_PATTERNS
+        )
     
-    def classify(self, text: str) -> Tuple[str, float, Dict[str, Any]]:
+    def classify(self, text: Union[str, DocumentFeatures]) -> Tuple[str, float, Dict[str, Any]]:
         """
         Classifie le document et retourne le type avec la confiance
         
         Returns:
             Tuple[type, confidence, metadata]
         """
-        if not text or len(text.strip()) < 20:
+        features = get_document_features(text)
+        if not features.text or len(features.text.strip()) < 20:
             return ("unknown", 0.0, {})
         
-        text_lower = text.lower()
         scores = {}
         metadata = {}
         
+        # Normaliser par le nombre de mots du document (racine cubique pour réduire l'impact)
+        norm = features.word_count ** 0.3
+        
+        # Mots-clés de tous les types en une seule passe
+        keyword_scores = self.keyword_scores.score_text(features.lower)
+        
         # Calculer les scores pour chaque type
-        for doc_type, patterns in self.weighted_patterns.items():
-            score = 0.0
-            
-            # Patterns avec poids
-            for keyword in patterns.get("strong", []):
-                if keyword in text_lower:
-                    score += 3.0
-            
-            for keyword in patterns.get("medium", []):
-                if keyword in text_lower:
-                    score += 1.5
-            
-            for keyword in patterns.get("weak", []):
-                if keyword in text_lower:
-                    score += 0.5
+        for doc_type in self.weighted_patterns:
+            score = keyword_scores[doc_type]
             
             # Bonus pour patterns regex
-            if doc_type in self.regex_patterns:
-                for pattern in self.regex_patterns[doc_type]:
-                    if re.search(pattern, text, re.IGNORECASE | re.MULTILINE):
-                        score += 2.0
+            for pattern in self.compiled_patterns.get(doc_type, []):
+                if features.search(pattern):
+                    score += REGEX_BONUS
             
-            # Normaliser par le nombre de mots du document
-            word_count = len(text.split())
-            scores[doc_type] = score / (word_count ** 0.3)  # Racine cubique pour réduire l'impact
+            scores[doc_type] = score / norm
         
         # Trouver le meilleur type
         if not scores:
@@ -133,41 +171,41 @@ class DocumentClassifier:
             best_type = "general"
         
         # Extraire des métadonnées supplémentaires
-        metadata = self._extract_metadata(text, best_type)
+        metadata = self._extract_metadata(features, best_type)
         
         return (best_type, confidence, metadata)
     
-    def _extract_metadata(self, text: str, doc_type: str) -> Dict[str, Any]:
+    def _extract_metadata(self, features: DocumentFeatures, doc_type: str) -> Dict[str, Any]:
         """Extrait des métadonnées selon le type de document"""
         metadata = {
-            "has_amounts": bool(re.search(r"\d+[,.]?\d*\s*€", text)),
-            "has_dates": bool(re.search(r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}", text)),
-            "has_email": bool(re.search(r"[\w\.-]+@[\w\.-]+\.\w+", text)),
-            "has_phone": bool(re.search(r"(?:0|\+33)\s*[1-9](?:\s*\d{2}){4}", text)),
-            "word_count": len(text.split()),
-            "line_count": len(text.split('\n'))
+            "has_amounts": bool(features.search(r"\d+[,.]?\d*\s*€")),
+            "has_dates": bool(features.search(r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}")),
+            "has_email": bool(features.search(r"[\w\.-]+@[\w\.-]+\.\w+")),
+            "has_phone": bool(features.search(r"(?:0|\+33)\s*[1-9](?:\s*\d{2}){4}")),
+            "word_count": features.word_count,
+            "line_count": features.line_count
         }
         
         # Métadonnées spécifiques par type
         if doc_type == "invoice":
             # Chercher le numéro de facture
-            invoice_match = re.search(r"(?:facture|invoice)\s*(?:n°|#)?\s*(\w+)", text, re.IGNORECASE)
+            invoice_match = features.search(r"(?:facture|invoice)\s*(?:n°|#)?\s*(\w+)", re.IGNORECASE)
             if invoice_match:
                 metadata["invoice_number"] = invoice_match.group(1)
         
         elif doc_type == "email":
             # Extraire expéditeur/destinataire
-            from_match = re.search(r"(?:de|from)\s*:\s*(.+)$", text, re.IGNORECASE | re.MULTILINE)
+            from_match = features.search(r"(?:de|from)\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
             if from_match:
                 metadata["sender"] = from_match.group(1).strip()
         
         return metadata
     
-    def get_document_structure(self, text: str, doc_type: str) -> Dict[str, Any]:
+    def get_document_structure(self, text: Union[str, DocumentFeatures], doc_type: str) -> Dict[str, Any]:
         """
         Analyse la structure du document pour mieux l'interpréter
         """
-        lines = text.split('\n')
+        lines = get_document_features(text).lines
         structure = {
             "has_header": False,
             "has_table": False,
@@ -192,8 +230,23 @@ class DocumentClassifier:
         return structure
 
 
+# Instance partagée
+_classifier: Optional[DocumentClassifier] = None
+
+
+def get_document_classifier() -> DocumentClassifier:
+    """Obtenir le classificateur partagé"""
+    global _classifier
+    if _classifier is None:
+        _classifier = DocumentClassifier()
+    return _classifier
+
+
 # Fonction helper
-def classify_document(text: str) -> Tuple[str, float, Dict[str, Any]]:
-    """Classifie un document et retourne le type avec métadonnées"""
-    classifier = DocumentClassifier()
-    return classifier.classify(text)
\ No newline at end of file
+def classify_document(text: Union[str, DocumentFeatures]) -> Tuple[str, float, Dict[str, Any]]:
+    """Classifie un document et retourne le type avec métadonnées (une fois par document)"""
+    features = get_document_features(text)
+    doc_type, confidence, metadata = features.memoize(
+        "classification", lambda: get_document_classifier().classify(features)
+    )
+    return doc_type, confidence, dict(metadata)
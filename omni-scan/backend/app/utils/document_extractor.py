@@ -2,10 +2,12 @@
 Extracteur de données structurées depuis les documents
 """
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Union
 
+from app.utils.document_features import DocumentFeatures, get_document_features
 
-def extract_invoice_data(text: str) -> Dict[str, Any]:
+
+def extract_invoice_data(text: Union[str, DocumentFeatures]) -> Dict[str, Any]:
     """
     Extrait les données structurées d'une facture
     
@@ -21,6 +23,7 @@ def extract_invoice_data(text: str) -> Dict[str, Any]:
         "confidence": 0.0
     }
     
+    features = get_document_features(text)
     confidence_score = 0.0
     
     # Extraction du numéro de facture
@@ -31,7 +34,7 @@ def extract_invoice_data(text: str) -> Dict[str, Any]:
     ]
     
     for pattern in invoice_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = features.search(pattern, re.IGNORECASE)
         if match:
             data["invoice_number"] = match.group(1)
             confidence_score += 0.2
@@ -44,7 +47,7 @@ def extract_invoice_data(text: str) -> Dict[str, Any]:
     ]
     
     for pattern in date_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = features.search(pattern, re.IGNORECASE)
         if match:
             data["date"] = match.group(1)
             confidence_score += 0.15
@@ -58,7 +61,7 @@ def extract_invoice_data(text: str) -> Dict[str, Any]:
     ]
     
     for pattern in total_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = features.search(pattern, re.IGNORECASE)
         if match:
             amount = match.group(1).replace(" ", "").replace(",", ".")
             try:
@@ -75,7 +78,7 @@ def extract_invoice_data(text: str) -> Dict[str, Any]:
     ]
     
     for pattern in tax_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = features.search(pattern, re.IGNORECASE)
         if match:
             amount = match.group(1).replace(" ", "").replace(",", ".")
             try:
@@ -86,7 +89,7 @@ def extract_invoice_data(text: str) -> Dict[str, Any]:
                 pass
     
     # Extraction du vendeur (première ligne non vide souvent)
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    lines = [line.strip() for line in features.lines if line.strip()]
     if lines:
         # Chercher une ligne qui ressemble à un nom d'entreprise
         for line in lines[:5]:  # Regarder dans les 5 premières lignes
@@ -0,0 +1,99 @@
+"""
+Caractéristiques d'un document partagées entre les analyses
+
+Texte en minuscules, lignes, mots, recherches de mots-clés et d'expressions
+régulières sont calculés une fois par document et réutilisés par l'analyseur
+de structure, le classificateur, l'extraction de factures et la construction
+des prompts IA.
+"""
+import re
+import threading
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.utils.cache import LRUCache
+
+# Documents récents gardés en mémoire (une analyse IA repasse plusieurs fois par le même texte)
+FEATURES_CACHE_SIZE = 8
+
+
+class DocumentFeatures:
+    """Vue d'un texte dont les dérivés sont calculés à la demande, une seule fois"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._keywords: Dict[str, bool] = {}
+        self._searches: Dict[Tuple[Any, int], Optional[re.Match]] = {}
+        self._memo: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.text.split('\n')
+
+    @cached_property
+    def words(self) -> List[str]:
+        return self.text.split()
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.lines)
+
+    @property
+    def char_count(self) -> int:
+        return len(self.text)
+
+    def contains(self, keyword: str) -> bool:
+        """Mot-clé (en minuscules) présent dans le texte"""
+        found = self._keywords.get(keyword)
+        if found is None:
+            found = self._keywords[keyword] = keyword in self.lower
+        return found
+
+    def count_keywords(self, keywords: Iterable[str]) -> int:
+        """Nombre de mots-clés présents"""
+        return sum(1 for keyword in keywords if self.contains(keyword))
+
+    def search(self, pattern: Union[str, re.Pattern], flags: int = 0) -> Optional[re.Match]:
+        """Première occurrence d'une expression régulière, texte ou compilée (résultat mémorisé)"""
+        key = (pattern, flags)
+        if key not in self._searches:
+            if isinstance(pattern, re.Pattern):
+                self._searches[key] = pattern.search(self.text)
+            else:
+                self._searches[key] = re.search(pattern, self.text, flags)
+        return self._searches[key]
+
+    def memoize(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Résultat dérivé du texte (classification, prompt...) calculé une seule fois.
+        L'objet est partagé par tout le processus : préfixer la clé par le module
+        appelant quand deux modules calculent des valeurs différentes sous le même nom.
+        """
+        if key not in self._memo:
+            value = compute()
+            with self._lock:
+                self._memo.setdefault(key, value)
+        return self._memo[key]
+
+
+_features_cache = LRUCache(max_entries=FEATURES_CACHE_SIZE)
+
+
+def get_document_features(text: Union[str, DocumentFeatures]) -> DocumentFeatures:
+    """Caractéristiques partagées d'un texte (ou l'objet lui-même s'il est déjà calculé)"""
+    if isinstance(text, DocumentFeatures):
+        return text
+    features = _features_cache.get(text)
+    if features is None:
+        features = DocumentFeatures(text)
+        _features_cache.set(text, features)
+    return features
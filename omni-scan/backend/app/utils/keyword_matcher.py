@@ -0,0 +1,113 @@
+"""
+Recherche simultanée de mots-clés (automate d'Aho–Corasick)
+
+L'automate est construit une fois ; une seule passe sur le texte trouve tous
+les mots-clés, quel que soit leur nombre. pyahocorasick (extension C) est
+utilisé s'il est installé, sinon un automate déterministe en Python pur.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger("keyword_matcher")
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """Ensemble de mots-clés cherchés comme sous-chaînes, en une passe"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keyword for keyword in keywords if keyword)
+        if ahocorasick is not None:
+            self.backend = "pyahocorasick"
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self.backend = "python"
+            self._delta, self._outputs = self._build(self.keywords)
+
+    @staticmethod
+    def _build(keywords: Iterable[str]) -> Tuple[List[Dict[str, int]], List[Tuple[str, ...]]]:
+        """Trie, liens d'échec, puis table de transitions complète (aucun retour arrière au scan)"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[str]] = [set()]
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][char] = next_state
+                state = next_state
+            outputs[state].add(keyword)
+
+        # Parcours en largeur : l'état d'échec est toujours moins profond, donc déjà complet
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                queue.append(child)
+
+        return delta, [tuple(output) for output in outputs]
+
+    def find(self, text: str) -> Set[str]:
+        """Mots-clés présents dans le texte"""
+        if not self.keywords:
+            return set()
+        if self.backend == "pyahocorasick":
+            return {keyword for _, keyword in self._automaton.iter(text)}
+
+        found: Set[str] = set()
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+class WeightedKeywords:
+    """
+    Mots-clés pondérés par étiquette (type de document, thème) sur un seul automate.
+    Un même mot-clé peut compter pour plusieurs étiquettes.
+    """
+
+    def __init__(self, weights: Dict[str, Iterable[Tuple[str, float]]]):
+        self.labels = list(weights)
+        self._weights: Dict[str, List[Tuple[str, float]]] = {}
+        for label, pairs in weights.items():
+            for keyword, weight in pairs:
+                self._weights.setdefault(keyword, []).append((label, weight))
+        self.matcher = KeywordMatcher(self._weights)
+
+    def find(self, text: str) -> Set[str]:
+        return self.matcher.find(text)
+
+    def scores(self, found: Iterable[str]) -> Dict[str, float]:
+        """Somme des poids des mots-clés trouvés, par étiquette"""
+        scores = {label: 0.0 for label in self.labels}
+        for keyword in found:
+            for label, weight in self._weights.get(keyword, ()):
+                scores[label] += weight
+        return scores
+
+    def score_text(self, text: str) -> Dict[str, float]:
+        return self.scores(self.find(text))
@@ -1,242 +1,303 @@
 """
 Post-processing pour améliorer la qualité du texte OCR
+
+Moteur compilé : expressions régulières précompilées au chargement du module,
+une seule passe de tokenisation par ligne, découpage des mots collés par
+programmation dynamique sur un lexique (trie borné par la longueur du plus
+long mot). Le coût est linéaire en la taille du texte, y compris sur les
+longues suites de lettres produites par un OCR raté.
 """
+import os
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 import unicodedata
 
+from app.core.logging import get_logger
+
+logger = get_logger("ocr_postprocessing")
+
+
+# Caractères mal décodés (UTF-8 lu en Latin-1). Les trémas ne sont pas corrigés :
+# ils sont légitimes en français (Noël, naïf) comme dans les noms propres (Müller)
+CHARACTER_FIXES = {
+    'Ã©': 'é',
+    'Ã¨': 'è',
+    'Ãª': 'ê',
+    'Ã\xa0': 'à',
+    'Ã ': 'à',
+    'Ã¢': 'â',
+    'Ã´': 'ô',
+    'Ã»': 'û',
+    'Ã§': 'ç',
+}
+
+# Mots collés fréquents (mot entier)
+GLUED_WORDS = {
+    'ceciest': 'ceci est',
+    'ilya': 'il y a',
+    'cest': "c'est",
+    'nest': "n'est",
+    'quil': "qu'il",
+}
+
+# Mots français courants (validation et découpage des mots collés)
+FRENCH_WORDS = frozenset({
+    'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du',
+    'et', 'ou', 'mais', 'donc', 'car', 'ni', 'or',
+    'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils', 'elles',
+    'être', 'avoir', 'faire', 'dire', 'aller', 'voir',
+    'est', 'sont', 'était', 'sera', 'fait', 'dit',
+    'dans', 'pour', 'avec', 'sans', 'sous', 'sur',
+    'ce', 'ceci', 'cela', 'celui', 'celle', 'ceux',
+    'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses',
+    'notre', 'votre', 'leur', 'leurs',
+    'qui', 'que', 'quoi', 'dont', 'où', 'quand', 'comment',
+    'plus', 'moins', 'très', 'bien', 'mal', 'peu', 'beaucoup',
+    'tout', 'tous', 'toute', 'toutes', 'autre', 'autres',
+    'même', 'mêmes', 'tel', 'telle', 'tels', 'telles',
+})
+
+# Suffixes ordinaux collés au nombre (1er, 2ème, 3e) : pas d'espace inséré
+ORDINAL_SUFFIXES = frozenset({'er', 're', 'ère', 'e', 'è', 'ème', 'eme', 'nd', 'nde'})
+
+# Au-delà de cette longueur un mot est suspect (mots collés)
+SPLIT_MIN_LENGTH = 10
+
+_LOWER = 'a-zß-öø-ÿ'
+_UPPER = 'A-ZÀ-ÖØ-Þ'
+
+_CHARACTER_FIXES_RE = re.compile(
+    '|'.join(re.escape(key) for key in sorted(CHARACTER_FIXES, key=len, reverse=True))
+)
+
+# Tokenisation d'une ligne en une passe ; les nombres gardent leurs séparateurs (12:30, 3,5)
+_TOKEN_RE = re.compile(
+    r"(?P<space>\s+)"
+    r"|(?P<word>[^\W\d_]+(?:['’][^\W\d_]+)*)"
+    r"|(?P<number>\d+(?:[.,:]\d+)*)"
+    r"|(?P<punct>[.!?,;:]+)"
+    r'|(?P<quote>")'
+    r"|(?P<other>.)"
+)
+
+# Mot en minuscules suivi d'un mot capitalisé (motMinuscule + Majuscule) ; les sigles
+# et noms à majuscule interne (GmbH, PhD, eBay) ne sont pas coupés
+_CAMEL_RE = re.compile(f'(?<=[{_LOWER}]{{2}})(?=[{_UPPER}][{_LOWER}])')
+
+_MOJIBAKE_RE = re.compile(r'[Ã¢Ã©Ã¨ÃªÃ´Ã»]')
+_NO_SPACE_AFTER_PUNCT_RE = re.compile(r'[.!?,;:](?=[A-Za-z])')
+
+
+class Lexicon:
+    """Ensemble de mots en trie, pour le découpage des mots collés"""
+
+    _END = ''
+
+    def __init__(self, words: Iterable[str]):
+        self.words = frozenset(word.lower() for word in words if word)
+        self.max_length = max((len(word) for word in self.words), default=0)
+        self._trie: Dict[str, dict] = {}
+        for word in self.words:
+            node = self._trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[self._END] = True
+
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self.words
+
+    def split(self, word: str) -> Optional[List[str]]:
+        """
+        Découper un mot en mots du lexique (le moins de morceaux possible).
+
+        Programmation dynamique : depuis chaque position atteinte, parcours du trie
+        sur au plus max_length caractères, soit O(len(word) × max_length).
+        """
+        lowered = word.lower()
+        length = len(lowered)
+        # best[i] = (nombre de morceaux, début du dernier morceau) pour le préfixe word[:i]
+        best: List[Optional[tuple]] = [None] * (length + 1)
+        best[0] = (0, 0)
+        for start in range(length):
+            if best[start] is None:
+                continue
+            count = best[start][0] + 1
+            node = self._trie
+            for end in range(start, min(length, start + self.max_length)):
+                node = node.get(lowered[end])
+                if node is None:
+                    break
+                if self._END in node and (best[end + 1] is None or count < best[end + 1][0]):
+                    best[end + 1] = (count, start)
+
+        if best[length] is None or best[length][0] < 2:
+            return None
+
+        parts = []
+        end = length
+        while end > 0:
+            start = best[end][1]
+            parts.append(word[start:end])
+            end = start
+        return parts[::-1]
+
+
+def _load_lexicon() -> Lexicon:
+    """Lexique de base, complété par une liste de mots (OCR_LEXICON_PATH, un mot par ligne)"""
+    words = set(FRENCH_WORDS)
+    path = os.getenv("OCR_LEXICON_PATH")
+    if path:
+        try:
+            with open(path, encoding="utf-8") as handle:
+                words.update(line.strip() for line in handle)
+        except OSError as e:
+            logger.warning(f"Lexique {path} illisible, lexique de base utilisé: {e}")
+    return Lexicon(words)
+
+
 class OCRPostProcessor:
-    def __init__(self):
-        # Dictionnaire de corrections courantes
-        self.common_fixes = {
-            # Espaces manquants
-            r'(\w)([A-Z])': r'\1 \2',  # motMinuscule + Majuscule
-            r'(\.)(\w)': r'\1 \2',      # point + mot
-            r'(\d)([a-zA-Z])': r'\1 \2', # chiffre + lettre
-            r'([a-zA-Z])(\d)': r'\1 \2', # lettre + chiffre
-            
-            # Corrections spécifiques français
-            'ä': 'à',
-            'ë': 'è', 
-            'ï': 'î',
-            'ö': 'ô',
-            'ü': 'ù',
-            'Ã©': 'é',
-            'Ã¨': 'è',
-            'Ã ': 'à',
-            'Ã´': 'ô',
-            
-            # Mots collés fréquents
-            'ceciest': 'ceci est',
-            'ilya': 'il y a',
-            'cest': "c'est",
-            'nest': "n'est",
-            'quil': "qu'il",
-            'quand': "qu'and",
-        }
-        
-        # Mots français courants pour validation
-        self.french_words = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du',
-            'et', 'ou', 'mais', 'donc', 'car', 'ni', 'or',
-            'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils', 'elles',
-            'être', 'avoir', 'faire', 'dire', 'aller', 'voir',
-            'est', 'sont', 'était', 'sera', 'fait', 'dit',
-            'dans', 'pour', 'avec', 'sans', 'sous', 'sur',
-            'ce', 'ceci', 'cela', 'celui', 'celle', 'ceux',
-            'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses',
-            'notre', 'votre', 'leur', 'leurs',
-            'qui', 'que', 'quoi', 'dont', 'où', 'quand', 'comment',
-            'plus', 'moins', 'très', 'bien', 'mal', 'peu', 'beaucoup',
-            'tout', 'tous', 'toute', 'toutes', 'autre', 'autres',
-            'même', 'mêmes', 'tel', 'telle', 'tels', 'telles',
-        }
-    
+    def __init__(self, lexicon: Optional[Lexicon] = None):
+        self.lexicon = lexicon or _load_lexicon()
+        # Compatibilité : mots connus
+        self.french_words = self.lexicon.words
+
     def process(self, text: str) -> str:
         """
-        Applique toutes les corrections au texte
+        Applique toutes les corrections au texte (les sauts de ligne sont conservés)
         """
         if not text:
             return text
-            
-        # 1. Normaliser les caractères Unicode
-        text = self._normalize_unicode(text)
-        
-        # 2. Appliquer les corrections de base
-        text = self._apply_basic_fixes(text)
-        
-        # 3. Corriger les espaces manquants
-        text = self._fix_missing_spaces(text)
-        
-        # 4. Corriger la ponctuation
-        text = self._fix_punctuation(text)
-        
-        # 5. Corriger les accents
-        text = self._fix_accents(text)
-        
-        # 6. Nettoyer les espaces multiples
-        text = self._clean_spaces(text)
-        
-        return text.strip()
-    
-    def _normalize_unicode(self, text: str) -> str:
-        """Normalise les caractères Unicode"""
-        return unicodedata.normalize('NFC', text)
-    
-    def _apply_basic_fixes(self, text: str) -> str:
-        """Applique les corrections du dictionnaire"""
-        for pattern, replacement in self.common_fixes.items():
-            if pattern.startswith('r'):
-                # C'est une regex
+
+        # Normaliser les caractères Unicode puis corriger les caractères mal décodés
+        text = unicodedata.normalize('NFC', text)
+        text = _CHARACTER_FIXES_RE.sub(lambda match: CHARACTER_FIXES[match.group(0)], text)
+
+        return '\n'.join(self._process_line(line) for line in text.split('\n')).strip()
+
+    def _process_line(self, line: str) -> str:
+        """
+        Une passe sur les tokens de la ligne : espaces manquants, ponctuation,
+        guillemets et mots collés décidés token par token.
+        """
+        out: List[str] = []
+        previous = None
+        previous_token = ''
+        had_space = False
+        quote_open = False
+
+        for match in _TOKEN_RE.finditer(line):
+            kind = match.lastgroup
+            token = match.group()
+            if kind == 'space':
+                had_space = True
                 continue
-            text = text.replace(pattern, replacement)
-        return text
-    
-    def _fix_missing_spaces(self, text: str) -> str:
-        """Ajoute les espaces manquants"""
-        # Espace après ponctuation
-        text = re.sub(r'([.!?,:;])([A-Za-zÀ-ÿ])', r'\1 \2', text)
-        
-        # Espace entre minuscule et majuscule
-        text = re.sub(r'([a-zà-ÿ])([A-ZÀ-Ÿ])', r'\1 \2', text)
-        
-        # Espace autour des chiffres
-        text = re.sub(r'(\d)([A-Za-zÀ-ÿ])', r'\1 \2', text)
-        text = re.sub(r'([A-Za-zÀ-ÿ])(\d)', r'\1 \2', text)
-        
-        # Détecter et séparer les mots collés
-        text = self._split_concatenated_words(text)
-        
-        return text
-    
-    def _split_concatenated_words(self, text: str) -> str:
-        """Sépare les mots collés en utilisant un dictionnaire"""
-        words = text.split()
-        new_words = []
-        
-        for word in words:
-            if len(word) > 10:  # Mot suspect car trop long
-                # Essayer de trouver des mots français dedans
-                splits = self._find_word_splits(word.lower())
-                if splits:
-                    new_words.extend(splits)
-                else:
-                    new_words.append(word)
+
+            raw = token
+            if kind == 'word':
+                token = self._fix_word(token)
+
+            if not out:
+                separator = ''
+            elif kind == 'quote':
+                # Espace avant le guillemet ouvrant, pas avant le fermant
+                separator = '' if quote_open else ' '
+            elif previous == 'quote' and quote_open:
+                separator = ''
+            elif kind == 'punct':
+                # Ponctuation française : espace avant ! ? : ; mais pas avant . ,
+                separator = ' ' if token[0] in '!?:;' else ''
+            elif previous in ('punct', 'quote'):
+                # Espace après la ponctuation et le guillemet fermant
+                separator = ' '
+            elif {previous, kind} == {'word', 'number'}:
+                # Espace entre lettres et chiffres, sauf ordinaux et références (1er, FAC2024)
+                separator = ' ' if had_space or not self._keeps_glued(previous, previous_token, raw) else ''
             else:
-                new_words.append(word)
-        
-        return ' '.join(new_words)
-    
-    def _find_word_splits(self, word: str) -> List[str]:
-        """Trouve les meilleurs points de séparation dans un mot"""
-        if len(word) < 4:
-            return None
-            
-        # Recherche de combinaisons de mots français
-        for i in range(2, len(word) - 1):
-            left = word[:i]
-            right = word[i:]
-            
-            # Si les deux parties sont des mots français connus
-            if (left in self.french_words or len(left) > 3) and \
-               (right in self.french_words or len(right) > 3):
-                # Récursion pour vérifier si on peut encore diviser
-                left_splits = self._find_word_splits(left) or [left]
-                right_splits = self._find_word_splits(right) or [right]
-                return left_splits + right_splits
-        
-        return None
-    
-    def _fix_punctuation(self, text: str) -> str:
-        """Corrige la ponctuation"""
-        # Espaces avant et après les guillemets
-        text = re.sub(r'\s*"\s*', ' " ', text)
-        text = re.sub(r"\s*'\s*", " ' ", text)
-        
-        # Pas d'espace avant la ponctuation simple
-        text = re.sub(r'\s+([.!?,;])', r'\1', text)
-        
-        # Espace après la ponctuation
-        text = re.sub(r'([.!?,;:])(\S)', r'\1 \2', text)
-        
-        # Ponctuation française : espace avant ! ? : ;
-        text = re.sub(r'(\S)([!?:;])', r'\1 \2', text)
-        
-        return text
-    
-    def _fix_accents(self, text: str) -> str:
-        """Corrige les accents mal reconnus"""
-        # Pour chaque mot
-        words = text.split()
-        corrected_words = []
-        
-        for word in words:
-            # Si le mot contient des caractères bizarres, essayer de corriger
-            if any(c in word for c in 'Ã¢Ã©Ã¨ÃªÃ´Ã»'):
-                word = word.replace('Ã©', 'é')
-                word = word.replace('Ã¨', 'è')
-                word = word.replace('Ãª', 'ê')
-                word = word.replace('Ã ', 'à')
-                word = word.replace('Ã¢', 'â')
-                word = word.replace('Ã´', 'ô')
-                word = word.replace('Ã»', 'û')
-                word = word.replace('Ã§', 'ç')
-            
-            corrected_words.append(word)
-        
-        return ' '.join(corrected_words)
-    
-    def _clean_spaces(self, text: str) -> str:
-        """Nettoie les espaces multiples et trim"""
-        # Remplacer les espaces multiples par un seul
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Supprimer les espaces en début et fin de ligne
-        lines = text.split('\n')
-        cleaned_lines = [line.strip() for line in lines]
-        
-        return '\n'.join(cleaned_lines)
-    
+                separator = ' ' if had_space else ''
+
+            if kind == 'quote':
+                quote_open = not quote_open
+
+            out.append(separator)
+            out.append(token)
+            previous = kind
+            previous_token = raw
+            had_space = False
+
+        return ''.join(out)
+
+    @staticmethod
+    def _keeps_glued(previous: str, previous_token: str, token: str) -> bool:
+        """Lettres et chiffres collés à conserver : ordinal (2ème) ou référence en capitales (FAC2024, A4)"""
+        if previous == 'number':
+            return token.lower() in ORDINAL_SUFFIXES or token.isupper()
+        return previous_token.isupper()
+
+    def _fix_word(self, word: str) -> str:
+        """Mots collés : séparation minuscule/Majuscule, corrections connues, découpage sur le lexique"""
+        parts = []
+        for part in _CAMEL_RE.split(word):
+            glued = GLUED_WORDS.get(part.lower())
+            if glued is not None:
+                parts.append(glued[0].upper() + glued[1:] if part[0].isupper() else glued)
+            elif len(part) > SPLIT_MIN_LENGTH and part not in self.lexicon:
+                parts.extend(self.lexicon.split(part) or [part])
+            else:
+                parts.append(part)
+        return ' '.join(parts)
+
     def get_confidence_score(self, text: str) -> float:
         """
         Calcule un score de confiance basé sur la qualité du texte
         """
         if not text:
             return 0.0
-            
+
         score = 1.0
-        
+
         # Pénalités
-        weird_chars = len(re.findall(r'[Ã¢Ã©Ã¨ÃªÃ´Ã»]', text))
+        weird_chars = len(_MOJIBAKE_RE.findall(text))
         score -= weird_chars * 0.02
-        
+
         # Mots trop longs (probablement collés)
         words = text.split()
         long_words = sum(1 for w in words if len(w) > 20)
         score -= long_words * 0.05
-        
+
         # Manque d'espaces après ponctuation
-        no_space_after_punct = len(re.findall(r'[.!?,;:](?=[A-Za-z])', text))
+        no_space_after_punct = len(_NO_SPACE_AFTER_PUNCT_RE.findall(text))
         score -= no_space_after_punct * 0.03
-        
+
         # Bonus pour mots français reconnus
         french_word_count = sum(1 for w in words if w.lower() in self.french_words)
         if len(words) > 0:
             french_ratio = french_word_count / len(words)
             score += french_ratio * 0.2
-        
+
         return max(0.0, min(1.0, score))
 
 
+# Instance partagée : lexique et trie construits une seule fois
+_postprocessor: Optional[OCRPostProcessor] = None
+
+
+def get_postprocessor() -> OCRPostProcessor:
+    """Obtenir l'instance partagée du post-processeur"""
+    global _postprocessor
+    if _postprocessor is None:
+        _postprocessor = OCRPostProcessor()
+    return _postprocessor
+
+
 # Fonction helper pour utilisation facile
 def improve_ocr_text(text: str) -> Dict[str, any]:
     """
     Améliore le texte OCR et retourne le texte corrigé avec un score de confiance
     """
-    processor = OCRPostProcessor()
+    processor = get_postprocessor()
     improved_text = processor.process(text)
     confidence = processor.get_confidence_score(improved_text)
-    
+
     return {
         'original': text,
         'improved': improved_text,
@@ -249,12 +310,11 @@ def improve_ocr_text(text: str) -> Dict[str, any]:
 def clean_ocr_text(text: str) -> str:
     """
     Fonction wrapper pour nettoyer le texte OCR
-    
+
     Args:
         text: Texte brut de l'OCR
-        
+
     Returns:
         Texte nettoyé
     """
-    processor = OCRPostProcessor()
-    return processor.process(text)
\ No newline at end of file
+    return get_postprocessor().process(text)
@@ -0,0 +1,51 @@
+"""Tests pour le flux d'événements des jobs"""
+
+import asyncio
+import json
+
+import httpx
+
+from app.main import app
+from app.services.job_manager import JobType, job_manager
+
+
+def parse_sse(body: str) -> list:
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+async def test_events_reference_partial_analysis():
+    """Test analyse IA partielle (upload en pipeline) : référence dans les événements, contenu hors de la ligne du job"""
+    job = job_manager.create_job(JobType.UPLOAD, 10)
+    job_manager.start_job(job.id)
+    partial = {"summary": "Article 1", "chunk_count": 1, "partial": True, "pending_chunks": 2}
+    served = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def process():
+            await asyncio.sleep(0.1)
+            job_manager.update_job_partial_result(job.id, partial)
+            # La ligne compacte du job ne porte que la version
+            assert "Article 1" not in json.dumps(job_manager.store.get(job.id))
+            served.append(await client.get(f"/api/v1/job/{job.id}/partial"))
+            await asyncio.sleep(0.5)
+            job_manager.complete_job(job.id, {"ai_analysis": {"summary": "Contrat complet"}})
+
+        worker = asyncio.create_task(process())
+        response = await client.get(f"/api/v1/job/{job.id}/events")
+        await worker
+        after = await client.get(f"/api/v1/job/{job.id}/partial")
+
+    events = parse_sse(response.text)
+    progress = [event for event in events if event["type"] == "progress"]
+    reference = {"version": 1, "url": f"/api/v1/job/{job.id}/partial"}
+    assert any(event.get("partial_analysis") == reference for event in progress)
+    assert served[0].json() == partial
+    assert events[-1]["type"] == "completed"
+    # Le résultat final remplace l'analyse intermédiaire
+    assert "partial_version" not in job_manager.get_job(job.id).metadata
+    assert after.status_code == 404
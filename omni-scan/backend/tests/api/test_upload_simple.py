@@ -111,4 +111,90 @@ def test_upload_with_custom_ai_provider(client, test_files):
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
-    assert data["success"] is True
\ No newline at end of file
+    assert data["success"] is True
+
+class _FakeUserStats:
+    """Table user_stats factice : select().eq().single().execute()"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.lookups = []
+        self._user_id = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self._user_id = value
+        return self
+
+    def single(self):
+        return self
+
+    def execute(self):
+        from types import SimpleNamespace
+        self.lookups.append(self._user_id)
+        if self._user_id not in self.rows:
+            raise RuntimeError("0 rows returned")
+        return SimpleNamespace(data=self.rows[self._user_id])
+
+
+def _submit_with_user(client, monkeypatch, user_metadata, user_stats):
+    """Upload authentifié : priorité demandée à la file de traitement"""
+    from types import SimpleNamespace
+    from app.api import dependencies
+    from app.services.job_manager import job_manager
+
+    user = SimpleNamespace(id="user-1", email="user@example.com", user_metadata=user_metadata)
+    table = _FakeUserStats(user_stats)
+    supabase = SimpleNamespace(
+        auth=SimpleNamespace(get_user=lambda token: SimpleNamespace(user=user)),
+        table=lambda name: table
+    )
+    monkeypatch.setattr(dependencies, "get_supabase", lambda: supabase)
+
+    priorities = []
+
+    async def submit_job(job_id, run, user_key, priority):
+        priorities.append(priority)
+        return {"position": 1}
+
+    monkeypatch.setattr(job_manager, "submit_job", submit_job)
+
+    response = client.post(
+        "/api/v1/upload/simple",
+        files={"file": ("test.txt", io.BytesIO(b"Contenu du document"), "text/plain")},
+        headers={"Authorization": "Bearer token"}
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    return priorities[0], table.lookups
+
+
+def test_upload_priority_ignores_user_metadata(client, monkeypatch):
+    """Test is_pro dans user_metadata (modifiable par l'utilisateur) : priorité standard"""
+    from app.services.job_scheduler import PRIORITY_STANDARD
+
+    priority, _ = _submit_with_user(
+        client, monkeypatch, {"is_pro": True, "is_premium": True},
+        {"user-1": {"subscription_status": "free"}}
+    )
+    assert priority == PRIORITY_STANDARD
+
+
+def test_upload_priority_from_subscription(client, monkeypatch):
+    """Test abonnement Pro dans user_stats (côté serveur) : priorité Pro, une lecture par requête"""
+    from app.services.job_scheduler import PRIORITY_PRO
+
+    priority, lookups = _submit_with_user(
+        client, monkeypatch, {}, {"user-1": {"subscription_status": "pro"}}
+    )
+    assert priority == PRIORITY_PRO
+    assert lookups == ["user-1"]
+
+
+def test_upload_priority_without_user_stats(client, monkeypatch):
+    """Test utilisateur sans ligne user_stats : priorité standard"""
+    from app.services.job_scheduler import PRIORITY_STANDARD
+
+    priority, _ = _submit_with_user(client, monkeypatch, {}, {})
+    assert priority == PRIORITY_STANDARD
@@ -0,0 +1,85 @@
+"""Tests pour le cache des analyses IA"""
+
+import pytest
+
+from app.services import ai_analysis_unified
+from app.services.ai_analysis_unified import AIAnalyzer, AIProvider
+from app.services.ai_cache import AIResponseCache
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+TEXT = """Rapport trimestriel
+Le chiffre d'affaires progresse de 12 % sur le trimestre.
+Les coûts de production restent stables."""
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AIResponseCache(TieredCache(LRUCache(max_entries=16)))
+    monkeypatch.setattr(ai_analysis_unified, "ai_response_cache", cache)
+    return cache
+
+
+def test_key_normalization():
+    """Test espaces et sauts de ligne sans effet sur la clé, provider et modèle pris en compte"""
+    cache = AIResponseCache(TieredCache(LRUCache()))
+    key = cache.make_key("openai", "gpt-4o-mini", "Prompt", "Bonjour\n\nle  monde ")
+
+    assert cache.make_key("openai", "gpt-4o-mini", " Prompt\n", "Bonjour le monde") == key
+    assert cache.make_key("groq", "gpt-4o-mini", "Prompt", "Bonjour le monde") != key
+    assert cache.make_key("openai", "gpt-4o", "Prompt", "Bonjour le monde") != key
+
+
+def test_persistent_tier(tmp_path):
+    """Test analyse relue depuis SQLite après redémarrage"""
+    path = str(tmp_path / "ai.db")
+    first = AIResponseCache(TieredCache(LRUCache(), SQLiteCache(path, ttl=60)))
+    first.set("key", {"summary": "ok"})
+    first.cache.disk.close()
+
+    second = AIResponseCache(TieredCache(LRUCache(), SQLiteCache(path)))
+    assert second.get("key") == {"summary": "ok"}
+    second.cache.disk.close()
+
+
+async def test_provider_response_cached(cache, monkeypatch):
+    """Test une seule requête au provider pour le même texte, contournable par requête"""
+    calls = []
+
+    async def fake_call(self, text, detail_level, language, include_structured_data, provider=None):
+        calls.append(text)
+        return {"summary": "Analyse", "key_points": ["a"]}
+
+    monkeypatch.setattr(AIAnalyzer, "_call_provider", fake_call)
+    analyzer = AIAnalyzer(AIProvider.GROQ)
+
+    first = await analyzer.analyze_text(TEXT, language="fr")
+    first["summary"] = "modifié"
+    second = await analyzer.analyze_text(TEXT + "\n", language="fr")
+    assert second["summary"] == "Analyse"
+    assert len(calls) == 1
+
+    await analyzer.analyze_text(TEXT, language="en")
+    await analyzer.analyze_text(TEXT, language="fr", use_cache=False)
+    assert len(calls) == 3
+
+
+async def test_fallback_cached_apart(cache, monkeypatch):
+    """Test analyse de secours en cache sans masquer la réponse du provider"""
+    built = []
+    build = AIAnalyzer._build_fallback_analysis
+
+    def counting_build(self, *args):
+        built.append(args)
+        return build(self, *args)
+
+    monkeypatch.setattr(AIAnalyzer, "_build_fallback_analysis", counting_build)
+    monkeypatch.setattr(ai_analysis_unified.settings, "openai_api_key", None, raising=False)
+    analyzer = AIAnalyzer(AIProvider.OPENAI)
+    monkeypatch.setattr(analyzer.key_manager, "get_key", lambda provider: None)
+
+    first = await analyzer.analyze_text(TEXT)
+    second = await analyzer.analyze_text(TEXT)
+
+    assert first["analysis_type"] == second["analysis_type"] == "fallback"
+    assert len(built) == 1
+    assert cache.get_stats()["memory"]["entries"] == 1
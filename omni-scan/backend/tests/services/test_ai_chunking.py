@@ -0,0 +1,105 @@
+"""Tests pour l'analyse IA par morceaux"""
+
+import asyncio
+import time
+
+from app.services import ai_analysis_unified, ai_http
+from app.services.ai_analysis_unified import AIAnalyzer, AIProvider
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_chunking import merge_chunk_analyses, split_into_chunks
+from app.services.ai_http import ProviderLimiter
+from app.utils.cache import LRUCache, TieredCache
+
+
+def make_document(chapters: int = 6, lines_per_chapter: int = 8) -> str:
+    parts = ["Contrat de prestation entre les parties soussignées."]
+    for number in range(1, chapters + 1):
+        parts.append(f"Article {number}")
+        parts.extend(
+            f"Clause {number}.{line} : le prestataire s'engage sur le point {line}."
+            for line in range(lines_per_chapter)
+        )
+    return "\n".join(parts)
+
+
+def test_split_on_chapters_without_loss():
+    """Test découpage aux chapitres, taille bornée, préambule conservé"""
+    text = make_document()
+    chunks = split_into_chunks(text, max_chars=800)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.text) <= 800 for chunk in chunks)
+    assert chunks[0].text.startswith("Contrat de prestation")
+    assert all(chunk.title.startswith("Article") for chunk in chunks[1:])
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert "\n".join(chunk.text for chunk in chunks).split("\n") == [l for l in text.split("\n") if l]
+
+
+def test_split_oversized_section():
+    """Test section plus longue qu'un morceau découpée en fenêtres"""
+    text = "x" * 2500
+    chunks = split_into_chunks(text, max_chars=1000)
+    assert [len(chunk.text) for chunk in chunks] == [1000, 1000, 500]
+
+
+def test_merge_deduplicates():
+    """Test fusion : entités et points clés dédupliqués, résumé de la passe reduce"""
+    chunks = split_into_chunks(make_document(), max_chars=800)[:2]
+    results = [
+        {"summary": "Partie A", "key_points": ["Durée 12 mois"], "language": "fr", "confidence": 0.8,
+         "entities": [{"type": "company", "value": "ACME"}], "structured_data": {"dates": ["01/01/2024"]}},
+        {"summary": "Partie B", "key_points": ["durée 12 mois ", "Pénalités"], "language": "fr", "confidence": 0.6,
+         "entities": [{"type": "company", "value": "acme"}], "structured_data": {"dates": ["01/02/2024"]}},
+    ]
+
+    merged = merge_chunk_analyses(chunks, results, {"summary": "Contrat global", "category": "report"})
+
+    assert merged["summary"] == "Contrat global"
+    assert merged["category"] == "report"
+    assert merged["key_points"] == ["Durée 12 mois", "Pénalités"]
+    assert len(merged["entities"]) == 1
+    assert merged["structured_data"]["dates"] == ["01/01/2024", "01/02/2024"]
+    assert merged["confidence"] == 0.7
+    assert [item["summary"] for item in merged["chunk_summaries"]] == ["Partie A", "Partie B"]
+
+
+async def test_rate_limit_spaces_requests():
+    """Test débit limité : départs espacés de 60 / rpm secondes"""
+    limiter = ProviderLimiter(max_concurrency=5, requests_per_minute=600)
+    started = []
+
+    async def request():
+        async with limiter.slot():
+            started.append(time.monotonic())
+
+    await asyncio.gather(*(request() for _ in range(3)))
+    assert started[-1] - started[0] >= 0.19
+
+
+async def test_chunked_analysis_bounded_concurrency(monkeypatch):
+    """Test morceaux analysés en parallèle sous la limite du provider, puis fusionnés"""
+    monkeypatch.setattr(ai_analysis_unified, "ai_response_cache", AIResponseCache(TieredCache(LRUCache())))
+    monkeypatch.setattr(ai_http, "_limiters", {})
+    monkeypatch.setenv("AI_PROVIDER_CONCURRENCY", "2")
+    monkeypatch.setenv("AI_CHUNK_MAX_CHARS", "800")
+    active = []
+    peak = []
+
+    async def fake_call(self, text, detail_level, language, include_structured_data, provider=None):
+        active.append(text)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(text)
+        return {"summary": text.split("\n")[0], "key_points": [], "entities": [], "language": "fr"}
+
+    monkeypatch.setattr(AIAnalyzer, "_call_provider", fake_call)
+    text = make_document()
+
+    result = await AIAnalyzer(AIProvider.GROQ).analyze_text(text)
+
+    chunk_count = len(split_into_chunks(text, max_chars=800))
+    assert result["analysis_type"] == "chunked"
+    assert result["chunk_count"] == chunk_count
+    assert max(peak) == 2
+    # Un appel par morceau + la passe de fusion
+    assert len(peak) == chunk_count + 1
@@ -0,0 +1,118 @@
+"""Tests pour les clients HTTP partagés des providers IA"""
+
+import asyncio
+import json
+import threading
+
+import httpx
+
+from app.services import ai_http
+from app.services.ai_analysis_unified import AIAnalyzer, AIProvider
+from app.services.ai_http import AIClientPool
+
+
+async def test_client_reused_per_provider():
+    """Test un client par provider, réutilisé puis fermé par le pool"""
+    pool = AIClientPool(http2=False)
+
+    openai = pool.get("openai")
+    assert pool.get("openai") is openai
+    assert pool.get("groq") is not openai
+    assert openai.timeout.read == 30.0
+    assert pool.get_stats()["providers"] == ["groq", "openai"]
+
+    await pool.close()
+    assert openai.is_closed
+    assert pool.get("openai") is not openai
+    await pool.close()
+
+
+def test_replaced_client_closed_on_its_loop():
+    """Test boucle changée : l'ancien client est fermé sur sa boucle avant d'être remplacé"""
+    pool = AIClientPool(http2=False)
+    old_loop = asyncio.new_event_loop()
+
+    async def get_client():
+        return pool.get("openai")
+
+    try:
+        old = old_loop.run_until_complete(get_client())
+
+        new = pool.get("openai")
+
+        assert new is not old
+        assert old.is_closed
+    finally:
+        old_loop.close()
+
+
+async def test_replaced_client_closed_on_running_loop():
+    """Test ancienne boucle active dans un autre thread : fermeture planifiée sur elle"""
+    pool = AIClientPool(http2=False)
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+
+    async def get_client():
+        return pool.get("openai")
+
+    try:
+        old = asyncio.run_coroutine_threadsafe(get_client(), other_loop).result(5)
+
+        new = pool.get("openai")
+        for _ in range(50):
+            if old.is_closed:
+                break
+            await asyncio.sleep(0.01)
+
+        assert new is not old
+        assert old.is_closed
+        assert not new.is_closed
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(5)
+        other_loop.close()
+        await pool.close()
+
+
+async def test_provider_timeout_override(monkeypatch):
+    """Test délai de réponse surchargé par variable d'environnement"""
+    monkeypatch.setenv("AI_HTTP_TIMEOUT_OLLAMA", "5")
+    pool = AIClientPool(http2=True)
+
+    client = pool.get("ollama")
+    assert client.timeout.read == 5.0
+    await pool.close()
+
+
+async def test_analyzer_uses_shared_client(monkeypatch):
+    """Test l'analyseur ne ferme pas le client partagé en sortie de contexte"""
+    pool = AIClientPool(http2=False)
+    monkeypatch.setattr(ai_http, "_client_pool", pool)
+
+    async with AIAnalyzer(AIProvider.GROQ) as analyzer:
+        client = analyzer.client
+    async with AIAnalyzer(AIProvider.GROQ) as analyzer:
+        assert analyzer.client is client
+    assert not client.is_closed
+    await pool.close()
+
+
+async def test_analyzer_injected_client(monkeypatch):
+    """Test client injecté utilisé pour les appels au provider"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        content = json.dumps({"summary": "ok", "key_points": []})
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    analyzer = AIAnalyzer(AIProvider.OPENAI, client=client)
+    monkeypatch.setattr(analyzer.key_manager, "get_key", lambda provider: "sk-test")
+
+    result = await analyzer._analyze_openai("Facture n° 12 : total 120 €", "medium", "fr", True)
+
+    assert result["summary"] == "ok"
+    assert requests[0].url.host == "api.openai.com"
+    await client.aclose()
@@ -0,0 +1,177 @@
+"""Tests pour le routage des analyses IA entre providers"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services import ai_analysis_unified, ai_router
+from app.services.ai_analysis_unified import AIAnalyzer, AIProvider
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_router import NoProviderAvailable, ProviderRouter
+from app.utils.cache import LRUCache, TieredCache
+
+
+def make_router(**kwargs) -> ProviderRouter:
+    options = dict(window=20, error_rate=0.5, min_requests=3, open_seconds=30,
+                   default_hedge_delay=0.05, min_hedge_delay=0.01, min_samples=5)
+    options.update(kwargs)
+    return ProviderRouter(**options)
+
+
+async def test_hedged_request_cancels_slow_provider():
+    """Test requête couverte après le délai : la réponse la plus rapide gagne, l'autre est annulée"""
+    router = make_router()
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+        return "slow"
+
+    async def fast():
+        await asyncio.sleep(0.01)
+        return "fast"
+
+    start = time.monotonic()
+    result = await router.run([("openai", "m1", slow), ("groq", "m2", fast)])
+    await asyncio.sleep(0)
+
+    assert result == "fast"
+    assert time.monotonic() - start < 0.5
+    assert cancelled == ["slow"]
+    assert router.stats("groq", "m2").percentile(0.5) is not None
+
+
+async def test_failover_on_error():
+    """Test bascule immédiate sur le provider suivant en cas d'erreur"""
+    router = make_router(default_hedge_delay=10)
+
+    async def broken():
+        raise Exception("503")
+
+    async def working():
+        return "ok"
+
+    start = time.monotonic()
+    assert await router.run([("openai", "m", broken), ("groq", "m", working)]) == "ok"
+    assert time.monotonic() - start < 1
+    assert router.stats("openai", "m").error_rate == 1.0
+
+
+async def test_circuit_opens_then_recovers():
+    """Test disjoncteur ouvert après des échecs répétés, refermé par une requête d'essai réussie"""
+    router = make_router(open_seconds=0.05)
+
+    async def broken():
+        raise Exception("timeout")
+
+    async def working():
+        return "ok"
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            await router.run([("anthropic", "m", broken)])
+    assert router.get_stats()["circuits"]["anthropic"] == "open"
+
+    with pytest.raises(NoProviderAvailable):
+        await router.run([("anthropic", "m", working)])
+
+    await asyncio.sleep(0.06)
+    assert await router.run([("anthropic", "m", working)]) == "ok"
+    assert router.get_stats()["circuits"]["anthropic"] == "closed"
+
+
+def test_rank_by_latency():
+    """Test classement des providers par latence médiane, disjoncteurs ouverts écartés"""
+    router = make_router()
+    for latency in (0.2, 0.3, 0.25):
+        router.record("openai", "m", latency, True)
+        router.record("groq", "m", latency / 4, True)
+    for _ in range(3):
+        router.record("openrouter", "m", 0.01, False)
+
+    ranked = router.rank([("openai", "m"), ("openrouter", "m"), ("groq", "m"), ("anthropic", "m")])
+    assert [provider for provider, _ in ranked] == ["groq", "openai", "anthropic"]
+
+
+async def test_analyzer_routes_missing_key(monkeypatch):
+    """Test provider demandé sans clé : analyse routée vers un provider configuré"""
+    cache = AIResponseCache(TieredCache(LRUCache()))
+    monkeypatch.setattr(ai_analysis_unified, "ai_response_cache", cache)
+    monkeypatch.setenv("AI_HEDGING", "true")
+    monkeypatch.setenv("AI_HEDGE_PROVIDERS", "groq")
+    monkeypatch.setattr(ai_router, "_router", make_router())
+    monkeypatch.setattr(ai_analysis_unified.settings, "openai_api_key", None, raising=False)
+    called = []
+
+    async def fake_call(self, text, detail_level, language, include_structured_data, provider=None):
+        called.append(provider)
+        return {"summary": provider.value, "key_points": []}
+
+    monkeypatch.setattr(AIAnalyzer, "_call_provider", fake_call)
+    analyzer = AIAnalyzer(AIProvider.ANTHROPIC)
+    monkeypatch.setattr(analyzer.key_manager, "get_key", lambda provider: "gsk-test" if provider == "groq" else None)
+
+    result = await analyzer.analyze_text("Compte rendu de réunion du comité de direction.")
+
+    assert called == [AIProvider.GROQ]
+    assert result["summary"] == "groq"
+
+    # En cache sous le provider qui a répondu, pas sous celui demandé
+    text = "Compte rendu de réunion du comité de direction."
+    prompt = analyzer._get_system_prompt("medium", None, True, text)
+    groq_key = cache.make_key("groq", ai_analysis_unified.get_model_name(AIProvider.GROQ), prompt, text)
+    anthropic_key = cache.make_key("anthropic", ai_analysis_unified.get_model_name(AIProvider.ANTHROPIC), prompt, text)
+    assert cache.get(groq_key)["summary"] == "groq"
+    assert cache.get(anthropic_key) is None
+
+
+async def test_no_routing_by_default(monkeypatch):
+    """Test sans AI_HEDGING : le texte ne part jamais chez un autre provider"""
+    monkeypatch.setattr(ai_analysis_unified, "ai_response_cache", AIResponseCache(TieredCache(LRUCache())))
+    monkeypatch.setattr(ai_router, "_router", make_router())
+    monkeypatch.delenv("AI_HEDGING", raising=False)
+    monkeypatch.delenv("AI_HEDGE_PROVIDERS", raising=False)
+    called = []
+
+    async def fake_call(self, text, detail_level, language, include_structured_data, provider=None):
+        called.append(provider)
+        raise RuntimeError("provider indisponible")
+
+    monkeypatch.setattr(AIAnalyzer, "_call_provider", fake_call)
+    analyzer = AIAnalyzer(AIProvider.ANTHROPIC)
+    monkeypatch.setattr(analyzer.key_manager, "get_key", lambda provider: "test-key")
+
+    result = await analyzer.analyze_text("Compte rendu de réunion du comité de direction.")
+
+    assert called == [AIProvider.ANTHROPIC]
+    assert result["analysis_type"] == "error"
+
+
+async def test_anthropic_without_key_does_not_call_openai(monkeypatch):
+    """Test Anthropic sans clé : pas d'appel OpenAI caché, rien d'attribué à Anthropic"""
+    cache = AIResponseCache(TieredCache(LRUCache()))
+    monkeypatch.setattr(ai_analysis_unified, "ai_response_cache", cache)
+    router = make_router()
+    monkeypatch.setattr(ai_router, "_router", router)
+    monkeypatch.delenv("AI_HEDGING", raising=False)
+    called = []
+
+    async def fake_openai(self, text, detail_level, language, include_structured_data):
+        called.append("openai")
+        return {"summary": "openai", "key_points": []}
+
+    monkeypatch.setattr(AIAnalyzer, "_analyze_openai", fake_openai)
+    analyzer = AIAnalyzer(AIProvider.ANTHROPIC)
+    monkeypatch.setattr(analyzer.key_manager, "get_key", lambda provider: "sk-test" if provider == "openai" else None)
+
+    result = await analyzer.analyze_text("Compte rendu de réunion du comité de direction.")
+
+    assert called == []
+    assert result["analysis_type"] == "fallback"
+    assert router.get_stats()["providers"] == {}
+    assert router.get_stats()["circuits"]["anthropic"] == "closed"
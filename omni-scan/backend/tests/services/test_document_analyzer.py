@@ -0,0 +1,103 @@
+"""Tests pour l'analyse incrémentale des documents longs"""
+
+import pytest
+
+from app.services.document_analyzer import DocumentAnalyzer
+
+
+def build_book(chapter_count=4, paragraphs=12):
+    """Livre factice : chapitres, sous-sections, points numérotés sur deux lignes"""
+    pages = []
+    for chapter in range(1, chapter_count + 1):
+        lines = [f"CHAPITRE {chapter}", "", f"Un titre de partie {chapter}", ""]
+        for paragraph in range(paragraphs):
+            lines.append(
+                f"Le système de facturation traite le budget du client numéro {paragraph}. "
+                f"Il est important de vérifier chaque montant avant le paiement final {paragraph}.\n"
+                f"La méthode de vente et l'offre de service restent stables ! Vraiment ?"
+            )
+            lines.append("")
+        lines.append(f"{chapter}.1 Sous-section détaillée")
+        lines.append(f"Étape {chapter}.")
+        lines.append("Vérifier le processus de développement du logiciel")
+        lines.append("En conclusion, le produit répond au marché visé.")
+        pages.append("\n".join(lines))
+    return pages
+
+
+@pytest.fixture
+def analyzer():
+    return DocumentAnalyzer()
+
+
+def test_stream_matches_whole_document(analyzer):
+    """Test pages fournies une à une (coupures quelconques) : même résultat que le texte complet"""
+    pages = build_book()
+    text = "\n\n".join(pages)
+
+    stream = analyzer.stream()
+    for i, page in enumerate(pages):
+        # Coupure au milieu d'une ligne et d'une phrase
+        middle = len(page) // 3
+        stream.feed(page[:middle])
+        stream.feed(page[middle:])
+        if i < len(pages) - 1:
+            stream.feed("\n\n")
+
+    assert stream.finish() == analyzer.analyze_document(text)
+
+
+def test_long_document_analysis(analyzer):
+    """Test statistiques, structure, résumés et points clés d'un document long"""
+    text = "\n\n".join(build_book())
+
+    result = analyzer.analyze_document(text)
+
+    assert result["is_long_document"] is True
+    assert result["stats"]["word_count"] == len(text.split())
+    assert result["stats"]["char_count"] == len(text)
+    assert result["document_type"] == "invoice"
+    assert result["chapter_count"] == 4
+
+    chapters = result["structure_analysis"]["chapters"]
+    assert [chapter["title"] for chapter in chapters] == [f"CHAPITRE {i}" for i in range(1, 5)]
+    assert all(chapter["subsection_count"] == 1 for chapter in chapters)
+    assert result["structure_analysis"]["depth"] == 2
+
+    summary = result["chapter_summaries"][0]
+    assert summary["summary"].startswith("Un titre de partie 1\n\nLe système de facturation")
+    assert "système" in summary["key_concepts"]
+
+    key_points = result["global_summary"]["key_points"]
+    assert key_points[0] == "vérifier chaque montant avant le paiement final 0"
+    assert set(result["key_themes"]) == {"Finance", "Technique", "Commercial"}
+    assert result["main_topics"][0] == "Un titre de partie 1"
+
+
+def test_numbered_point_across_lines(analyzer):
+    """Test point numéroté dont le numéro termine la ligne précédente"""
+    text = "mot " * 1001 + "\nÉtape 2.\nVérifier le processus de développement du logiciel. Fin"
+
+    result = analyzer.analyze_document(text)
+
+    assert result["global_summary"]["key_points"] == ["Vérifier le processus de développement du logiciel"]
+
+
+def test_short_document(analyzer):
+    """Test document court : pas de résumé global"""
+    result = analyzer.analyze_document("Bonjour,\n\nobjet : rendez-vous. Écrire à contact@example.com")
+
+    assert result["is_long_document"] is False
+    assert result["document_type"] == "email"
+    assert result["stats"]["paragraph_count"] == 2
+    assert "global_summary" not in result
+
+
+def test_finished_stream_rejects_text(analyzer):
+    """Test feed après finish refusé"""
+    stream = analyzer.stream()
+    stream.feed("Texte")
+    stream.finish()
+
+    with pytest.raises(RuntimeError):
+        stream.feed("suite")
@@ -0,0 +1,82 @@
+"""Tests pour la diffusion de la progression des jobs"""
+
+import asyncio
+
+from app.services.job_events import JobEventBroker, format_sse
+from app.services.job_manager import JobManager, JobType
+from app.services.job_scheduler import JobScheduler
+from app.services.job_store import MemoryJobStore
+
+
+def make_manager():
+    """JobManager isolé (hors singleton)"""
+    manager = object.__new__(JobManager)
+    manager._initialized = False
+    JobManager.__init__(manager, store=MemoryJobStore(), scheduler=JobScheduler(), events=JobEventBroker())
+    return manager
+
+
+async def collect(manager, job_id, **options):
+    return [event async for event in manager.watch_job(job_id, **options)]
+
+
+async def test_progress_deltas_are_coalesced():
+    """Test rafale de progressions fusionnée, seuls les champs modifiés sont envoyés"""
+    manager = make_manager()
+    job = manager.create_job(JobType.UPLOAD, 100)
+    watcher = asyncio.create_task(collect(manager, job.id, min_interval=0.05, poll_seconds=5))
+    await asyncio.sleep(0.01)
+
+    manager.start_job(job.id)
+    for step in range(1, 51):
+        manager.update_job_progress(job.id, step, "OCR en cours")
+    await asyncio.sleep(0.1)
+    manager.update_job_progress(job.id, 80, "Analyse IA")
+    await asyncio.sleep(0.1)
+    manager.complete_job(job.id, {"extracted_text": "x" * 10_000})
+
+    events = await asyncio.wait_for(watcher, 2)
+
+    assert events[0]["type"] == "snapshot"
+    progress = [event for event in events if event["type"] == "progress"]
+    assert len(progress) <= 3
+    assert progress[0]["status"] == "processing"
+    assert progress[-1] == {"type": "progress", "current": 80, "percentage": 80, "message": "Analyse IA"}
+
+    final = events[-1]
+    assert final == {
+        "type": "completed",
+        "job_id": job.id,
+        "percentage": 100,
+        "result_url": f"/api/v1/job/{job.id}/result"
+    }
+    assert manager.events.subscriber_count() == 0
+
+
+async def test_finished_job_and_updates_from_threads():
+    """Test job déjà terminé, et progression publiée depuis un thread"""
+    manager = make_manager()
+    done = manager.create_job(JobType.OCR)
+    manager.fail_job(done.id, "PDF illisible")
+
+    events = await collect(manager, done.id)
+    assert [event["type"] for event in events] == ["snapshot", "failed"]
+    assert events[-1]["error"] == "PDF illisible"
+
+    job = manager.create_job(JobType.OCR, 10)
+    watcher = asyncio.create_task(collect(manager, job.id, min_interval=0, poll_seconds=5))
+    await asyncio.sleep(0.01)
+    await asyncio.to_thread(manager.update_job_progress, job.id, 5, "Page 5/10")
+    await asyncio.sleep(0.05)
+    manager.complete_job(job.id)
+
+    events = await asyncio.wait_for(watcher, 2)
+    assert events[1] == {"type": "progress", "current": 5, "percentage": 50, "message": "Page 5/10"}
+    assert events[-1]["type"] == "completed"
+
+
+def test_format_sse():
+    """Test encodage d'un événement Server-Sent Events"""
+    assert format_sse({"type": "progress", "message": "Étape 2"}) == (
+        'event: progress\ndata: {"type": "progress", "message": "Étape 2"}\n\n'
+    )
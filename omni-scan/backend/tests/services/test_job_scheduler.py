@@ -0,0 +1,120 @@
+"""Tests pour la file de traitement des jobs"""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import QueueFullError
+from app.services.job_scheduler import JobScheduler, PRIORITY_PRO, PRIORITY_STANDARD
+
+
+def make_scheduler(**overrides):
+    options = dict(workers=1, max_queue=10, max_per_user=5, pro_weight=2, estimated_duration=10)
+    options.update(overrides)
+    return JobScheduler(**options)
+
+
+async def test_pro_first_with_share_for_standard_and_round_robin_users():
+    """Test priorité Pro (2 pour 1) et tourniquet entre utilisateurs"""
+    scheduler = make_scheduler()
+    gate = asyncio.Event()
+    order = []
+
+    async def blocker():
+        await gate.wait()
+
+    def job(name):
+        async def run():
+            order.append(name)
+        return run
+
+    # Occupe l'unique worker pendant la mise en file
+    await scheduler.submit("busy", blocker, "user:0")
+    await asyncio.sleep(0)
+
+    await scheduler.submit("a1", job("a1"), "user:a")
+    await scheduler.submit("a2", job("a2"), "user:a")
+    await scheduler.submit("b1", job("b1"), "user:b")
+    for name in ("p1", "p2", "p3"):
+        await scheduler.submit(name, job(name), "user:pro", PRIORITY_PRO)
+
+    expected = ["p1", "p2", "a1", "p3", "b1", "a2"]
+    assert [entry.job_id for entry in scheduler.dispatch_order()] == expected
+
+    gate.set()
+    while scheduler.queued or scheduler.running:
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert order == expected
+
+
+async def test_position_and_eta():
+    """Test position dans la file et ETA selon les workers occupés"""
+    scheduler = make_scheduler(workers=2)
+    gate = asyncio.Event()
+
+    async def blocker():
+        await gate.wait()
+
+    for index in range(2):
+        await scheduler.submit(f"busy{index}", blocker, f"user:{index}")
+    await asyncio.sleep(0)
+
+    await scheduler.submit("first", blocker, "user:a")
+    queue = await scheduler.submit("second", blocker, "user:b")
+
+    assert queue == {"position": 2, "queued": 2, "eta_seconds": 20}
+    assert scheduler.get_position("first")["eta_seconds"] == 20
+    assert scheduler.get_position("busy0") is None
+
+    interrupted = await scheduler.stop()
+    assert set(interrupted) == {"busy0", "busy1", "first", "second"}
+
+
+async def test_rejects_when_user_or_queue_full():
+    """Test 429 au-delà du quota par utilisateur, 503 quand la file est pleine"""
+    scheduler = make_scheduler(max_queue=3, max_per_user=2)
+    gate = asyncio.Event()
+
+    async def blocker():
+        await gate.wait()
+
+    await scheduler.submit("busy", blocker, "user:0")
+    await asyncio.sleep(0)
+    await scheduler.submit("a1", blocker, "user:a")
+    await scheduler.submit("a2", blocker, "user:a")
+
+    with pytest.raises(QueueFullError) as exc:
+        await scheduler.submit("a3", blocker, "user:a")
+    assert exc.value.status_code == 429
+
+    await scheduler.submit("b1", blocker, "user:b")
+    with pytest.raises(QueueFullError) as exc:
+        await scheduler.submit("c1", blocker, "user:c", PRIORITY_STANDARD)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "10"
+
+    await scheduler.stop()
+
+
+async def test_concurrency_limited_to_workers():
+    """Test jamais plus de jobs simultanés que de workers"""
+    scheduler = make_scheduler(workers=3, max_queue=20, max_per_user=20)
+    active = 0
+    peak = 0
+
+    async def work():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    for index in range(12):
+        await scheduler.submit(f"job{index}", work, f"user:{index % 4}")
+    while scheduler.queued or scheduler.running:
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert peak == 3
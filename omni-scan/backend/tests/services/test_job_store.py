@@ -0,0 +1,89 @@
+"""Tests pour le stockage des jobs"""
+
+import time
+
+import pytest
+
+from app.services.job_manager import JobManager, JobStatus, JobType
+from app.services.job_store import MemoryJobStore, SQLiteJobStore, RedisJobStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    """Chaque backend de stockage"""
+    if request.param == "memory":
+        yield MemoryJobStore(ttl=60, max_jobs=3)
+    elif request.param == "sqlite":
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"), ttl=60, max_jobs=3)
+        yield store
+        store.close()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        yield RedisJobStore(fakeredis.FakeRedis(), ttl=60, max_jobs=3)
+
+
+@pytest.fixture
+def manager(store):
+    """JobManager branché sur un stockage dédié (hors singleton)"""
+    manager = object.__new__(JobManager)
+    manager._initialized = False
+    JobManager.__init__(manager, store=store)
+    return manager
+
+
+def test_job_lifecycle_round_trip(manager):
+    """Test création, progression et résultat stocké à part"""
+    job = manager.create_job(JobType.UPLOAD, 4, metadata={"filename": "facture.pdf"})
+    manager.start_job(job.id)
+    manager.update_job_progress(job.id, 2, "Page 2/4")
+
+    loaded = manager.get_job(job.id)
+    assert loaded.status == JobStatus.PROCESSING
+    assert loaded.progress_percentage == 50
+    assert loaded.metadata == {"filename": "facture.pdf"}
+
+    result = {"extracted_text": "é" * 100_000, "success": True}
+    manager.complete_job(job.id, result)
+
+    assert manager.get_job(job.id).result is None
+    assert manager.get_job_result(job.id) == result
+    assert "".join(manager.stream_job_result(job.id)).startswith('{"extracted_text"')
+
+
+def test_status_index(manager):
+    """Test recherche des jobs par statut"""
+    done = manager.create_job(JobType.OCR)
+    running = manager.create_job(JobType.OCR)
+    manager.start_job(running.id)
+    manager.complete_job(done.id, {"ok": True})
+
+    assert set(manager.get_all_jobs(JobStatus.PROCESSING)) == {running.id}
+    assert set(manager.get_all_jobs(JobStatus.COMPLETED)) == {done.id}
+    assert set(manager.get_all_jobs(JobStatus.PENDING)) == set()
+
+
+def test_evicts_expired_then_oldest_finished(manager, store):
+    """Test éviction par TTL puis par nombre, sans toucher aux jobs en cours"""
+    store.max_jobs = 10
+    jobs = [manager.create_job(JobType.OCR) for _ in range(4)]
+    for job in jobs[:3]:
+        manager.complete_job(job.id, {"ok": True})
+
+    # Le premier job terminé a expiré
+    row = store.get(jobs[0].id)
+    row["updated_at"] = time.time() - 120
+    store.save(row)
+    store.evict()
+
+    assert manager.get_job(jobs[0].id) is None
+    assert manager.get_job_result(jobs[0].id) is None
+
+    # Au-delà de max_jobs, le plus ancien job terminé part en premier
+    store.max_jobs = 3
+    extra = manager.create_job(JobType.OCR)
+    manager.create_job(JobType.OCR)
+    store.evict()
+
+    assert manager.get_job(jobs[1].id) is None
+    assert manager.get_job(jobs[3].id) is not None
+    assert manager.get_job(extra.id) is not None
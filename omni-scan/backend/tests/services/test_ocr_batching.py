@@ -0,0 +1,129 @@
+"""Tests pour le regroupement des inférences OCR (micro-batching)"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.ocr.batching import MicroBatcher, pad_to_common_size
+from app.services.ocr.lightweight_ocr import LightweightOCREngine, _lines_to_result
+
+
+class RecordingModel:
+    """Modèle factice qui enregistre la taille des lots reçus"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        if self.fail:
+            raise RuntimeError("modèle indisponible")
+        return [f"résultat {item}" for item in items]
+
+
+async def test_concurrent_submissions_share_one_batch():
+    """Test requêtes concurrentes regroupées, résultats rendus à chaque appelant"""
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait=0.05)
+
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+
+    assert results == [f"résultat {i}" for i in range(6)]
+    assert [len(batch) for batch in model.batches] == [4, 2]
+    assert batcher.get_stats()["average_batch_size"] == 3
+    await batcher.close()
+
+
+async def test_max_wait_bounds_latency():
+    """Test un lot incomplet part à l'échéance"""
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=8, max_wait=0.01)
+
+    result = await asyncio.wait_for(batcher.submit("seul"), timeout=1)
+
+    assert result == "résultat seul"
+    assert model.batches == [["seul"]]
+    await batcher.close()
+
+
+async def test_batch_error_reaches_every_caller():
+    """Test l'échec d'un lot est propagé à toutes les requêtes du lot"""
+    batcher = MicroBatcher(RecordingModel(fail=True), max_batch_size=4, max_wait=0.01)
+
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    await batcher.close()
+
+
+async def test_batch_size_one_disables_grouping():
+    """Test OCR_BATCH_MAX_SIZE=1 : appel direct, pas de tâche de collecte"""
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=1)
+
+    await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    assert sorted(map(len, model.batches)) == [1, 1]
+    assert batcher._worker is None
+
+
+def test_pad_to_common_size_keeps_top_left_anchor():
+    """Test les images sont complétées en bas à droite avec du blanc"""
+    small = np.zeros((2, 3, 3), dtype=np.uint8)
+    large = np.zeros((4, 5, 3), dtype=np.uint8)
+
+    padded = pad_to_common_size([small, large])
+
+    assert [image.shape for image in padded] == [(4, 5, 3), (4, 5, 3)]
+    assert padded[1] is large
+    assert (padded[0][:2, :3] == 0).all()
+    assert (padded[0][2:, :] == 255).all() and (padded[0][:, 3:] == 255).all()
+
+
+class FakeReader:
+    """Lecteur EasyOCR factice : une ligne par image, marquée par la valeur de son premier pixel"""
+
+    def __init__(self):
+        self.calls = []
+
+    def readtext_batched(self, images, **kwargs):
+        self.calls.append((len(images), kwargs))
+        return [
+            [([[0, 0], [10, 0], [10, 5], [0, 5]], f"page {int(image[0, 0, 0])}", 0.9)]
+            for image in images
+        ]
+
+
+@pytest.fixture
+def engine():
+    engine = LightweightOCREngine()
+    engine.easyocr_reader = FakeReader()
+    engine._easy_batcher.max_wait = 0.05
+    return engine
+
+
+async def test_easyocr_pages_scattered_back_in_order(engine):
+    """Test pages de tailles différentes : un appel au modèle, chaque page retrouve son texte"""
+    images = [np.full((20 + i, 30 + i, 3), i, dtype=np.uint8) for i in range(3)]
+
+    results = await asyncio.gather(*(engine._easy_batcher.submit(image) for image in images))
+
+    assert len(engine.easyocr_reader.calls) == 1
+    size, kwargs = engine.easyocr_reader.calls[0]
+    assert size == 3 and kwargs["paragraph"] is False
+    assert [lines[0][1] for lines in results] == ["page 0", "page 1", "page 2"]
+    await engine.cleanup()
+
+
+def test_lines_to_result():
+    """Test assemblage des lignes d'une image en OCRResult"""
+    result = _lines_to_result(
+        [([[0, 0], [10, 0], [10, 5], [0, 5]], "Bonjour", 0.8), ([[0, 10], [8, 10], [8, 15], [0, 15]], "Monde", 0.6)],
+        "test"
+    )
+
+    assert result.text == "Bonjour\nMonde"
+    assert result.confidence == pytest.approx(0.7)
+    assert result.text_blocks[1]["bbox"] == {"x": 0, "y": 10, "width": 8, "height": 5}
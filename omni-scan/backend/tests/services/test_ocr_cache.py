@@ -0,0 +1,77 @@
+"""Tests pour le cache des résultats OCR"""
+
+from app.services.ocr import OCRConfig
+from app.services.ocr_cache import OCRResultCache, hash_content
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+
+def test_lru_evicts_least_recent():
+    """Test éviction LRU en mémoire"""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_sqlite_evicts_by_size(tmp_path):
+    """Test éviction par taille du cache SQLite"""
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_bytes=60)
+    cache.set("a", "x" * 20)
+    cache.set("b", "y" * 20)
+    cache.get("a")
+    cache.set("c", "z" * 20)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 20
+    assert cache.get_stats()["size_bytes"] <= 60
+    cache.close()
+
+
+def test_tiered_promotes_disk_hits(tmp_path):
+    """Test remontée en mémoire d'une entrée lue sur disque"""
+    disk = SQLiteCache(str(tmp_path / "cache.db"))
+    disk.set("key", {"text": "bonjour"})
+    cache = TieredCache(LRUCache(), disk)
+
+    assert cache.get("key") == {"text": "bonjour"}
+    assert cache.memory.get("key") == {"text": "bonjour"}
+    disk.close()
+
+
+def test_key_depends_on_content_engine_and_config():
+    """Test clé déterministe et sensible au moteur et à la configuration"""
+    cache = OCRResultCache(TieredCache(LRUCache()))
+    content_hash = hash_content(b"%PDF-1.4 test")
+
+    key = cache.make_key(content_hash, "pdf", "tesseract", "5.3", OCRConfig())
+    assert key == cache.make_key(content_hash, "PDF", "tesseract", "5.3", OCRConfig())
+    assert key != cache.make_key(content_hash, "pdf", "tesseract", "5.4", OCRConfig())
+    assert key != cache.make_key(content_hash, "pdf", "lightweight", "5.3", OCRConfig())
+    assert key != cache.make_key(content_hash, "pdf", "tesseract", "5.3", OCRConfig(languages=["eng"]))
+    assert key != cache.make_key(hash_content(b"autre"), "pdf", "tesseract", "5.3", OCRConfig())
+
+
+def test_disabled_cache_is_noop():
+    """Test cache désactivé"""
+    cache = OCRResultCache(TieredCache(LRUCache()), enabled=False)
+    cache.set("key", {"text": "bonjour"})
+    assert cache.get("key") is None
+
+
+def test_entries_are_copied():
+    """Test résultat modifié par l'appelant : l'entrée en cache reste intacte"""
+    cache = OCRResultCache(TieredCache(LRUCache()))
+    result = {"text": "bonjour", "pages": [{"source": "ocr"}]}
+    cache.set("key", result)
+    result["pages"].append({"source": "text_layer"})
+
+    hit = cache.get("key")
+    hit["cache_hit"] = True
+    hit["pages"][0]["source"] = "modifié"
+
+    assert cache.get("key") == {"text": "bonjour", "pages": [{"source": "ocr"}]}
@@ -0,0 +1,97 @@
+"""Tests pour le registre des capacités des moteurs OCR"""
+
+import pytest
+from PIL import Image
+
+from app.services import ocr_v2
+from app.services.ocr import OCRManager, OCRFeature
+from app.services.ocr.base import OCRResult
+from app.services.ocr.capabilities import EngineCapabilityRegistry
+from tests.services.test_pdf_stream import FakeEngine
+
+
+class ProbedEngine(FakeEngine):
+    """Moteur factice qui compte les sondes coûteuses (sous-processus chez Tesseract)"""
+
+    def __init__(self, name, features):
+        super().__init__()
+        self.name = name
+        self.features = features
+        self.probes = 0
+
+    async def process_image(self, image, config=None):
+        return OCRResult(text=f"traité par {self.name}", confidence=0.9)
+
+    def get_supported_features(self):
+        return self.features
+
+    def get_supported_languages(self):
+        self.probes += 1
+        return ["fra", "eng"]
+
+    def get_info(self):
+        return {"name": self.name, "version": "1.2", "supported_formats": ["png"]}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """Gestionnaire avec un moteur par défaut et un moteur capable d'extraire les tableaux"""
+    manager = OCRManager()
+    manager.engines["basic"] = ProbedEngine("Basic", [OCRFeature.BASIC_TEXT])
+    manager.engines["tables"] = ProbedEngine("Tables", [OCRFeature.BASIC_TEXT, OCRFeature.TABLES])
+    manager.default_engine = "basic"
+    manager.capabilities.build(manager.engines)
+    manager._initialized = True
+    monkeypatch.setattr(ocr_v2, "get_ocr_manager", lambda: manager)
+    return manager
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "scan.png"
+    Image.new("L", (20, 10), 255).save(path)
+    return path
+
+
+async def test_requests_do_not_probe_engines(manager, image_path):
+    """Test aucune sonde pendant le traitement : tout vient du registre"""
+    for _ in range(3):
+        await ocr_v2.process_document_advanced(str(image_path), "png", {})
+    info = await ocr_v2.get_engine_info()
+
+    assert [engine.probes for engine in manager.engines.values()] == [1, 1]
+    assert info["engines"]["tables"]["name"] == "Tables"
+    assert info["supported_features"] == ["basic_text", "tables"]
+    assert info["supported_languages"] == ["eng", "fra"]
+
+    await ocr_v2.get_engine_info(refresh=True)
+    assert [engine.probes for engine in manager.engines.values()] == [2, 2]
+
+
+async def test_engine_used_is_the_selected_engine(manager, image_path):
+    """Test engine_used = moteur réellement choisi, pas le moteur par défaut"""
+    response = await ocr_v2.process_document_advanced(str(image_path), "png", {"extract_tables": True})
+
+    assert response["engine_used"] == "tables"
+    assert response["engine_version"] == "1.2"
+    assert response["text"] == "traité par Tables"
+
+    response = await ocr_v2.process_document_advanced(str(image_path), "png", {})
+    assert response["engine_used"] == "basic"
+
+
+def test_registry_staleness():
+    """Test rafraîchissement périodique seulement si un intervalle est configuré"""
+    engines = {"basic": ProbedEngine("Basic", [OCRFeature.BASIC_TEXT])}
+
+    never = EngineCapabilityRegistry(refresh_interval=0)
+    assert never.is_stale()
+    never.build(engines)
+    assert not never.is_stale()
+
+    timed = EngineCapabilityRegistry(refresh_interval=60)
+    timed.build(engines)
+    timed.built_at -= 120
+    assert timed.is_stale()
+    assert timed.get("basic").supports(OCRFeature.BASIC_TEXT)
+    assert not timed.get("basic").supports(OCRFeature.TABLES)
@@ -0,0 +1,95 @@
+"""Tests pour la cascade OCR (moteur léger d'abord, moteur lourd sur les pages peu sûres)"""
+
+import pytest
+from PIL import Image
+
+from app.services.ocr import OCRManager, OCRConfig, pdf_stream
+from app.services.ocr import manager as manager_module
+from app.services.ocr.base import OCRResult
+from app.services.ocr.page_cache import OCRPageCache
+from app.utils.cache import LRUCache, TieredCache
+from tests.services.test_pdf_stream import FakeEngine
+
+
+class CheapEngine(FakeEngine):
+    """Moteur rapide : peu sûr sur les pages paires"""
+
+    cost_rank = 0
+
+    def __init__(self):
+        super().__init__()
+        self.pages = []
+
+    async def process_image(self, image, config=None):
+        if not isinstance(image, Image.Image):
+            image = Image.open(image)
+        self.pages.append(image.width)
+        confidence = 0.4 if image.width % 2 == 0 else 0.9
+        return OCRResult(text=f"rapide {image.width}", confidence=confidence)
+
+
+class HeavyEngine(FakeEngine):
+    """Moteur lourd : toujours sûr"""
+
+    cost_rank = 3
+
+    def __init__(self):
+        super().__init__()
+        self.pages = []
+
+    async def process_image(self, image, config=None):
+        self.pages.append(image.width)
+        return OCRResult(text=f"lourd {image.width}", confidence=0.95)
+
+    async def process_document(self, file_path, file_type, config=None):
+        self.pages.append(file_path)
+        return OCRResult(text="lourd document", confidence=0.95)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    disabled_cache = OCRPageCache(TieredCache(LRUCache()), enabled=False)
+    monkeypatch.setattr(manager_module, "get_page_cache", lambda: disabled_cache)
+    monkeypatch.setattr(pdf_stream, "get_pdf_page_count", lambda path: 5)
+    monkeypatch.setenv("OCR_PDF_TEXT_LAYER", "false")
+
+    manager = OCRManager()
+    # Le moteur lourd est enregistré en premier : la cascade part quand même du moins coûteux
+    manager.engines["heavy"] = HeavyEngine()
+    manager.engines["cheap"] = CheapEngine()
+    manager.default_engine = "heavy"
+    manager.capabilities.build(manager.engines)
+    manager._initialized = True
+    return manager
+
+
+async def test_only_low_confidence_pages_escalate(manager):
+    """Test seules les pages sous le seuil passent par le moteur lourd"""
+    result = await manager.process_document("doc.pdf", "pdf", config=OCRConfig(min_confidence=0.6))
+
+    assert manager.engines["cheap"].pages == [1, 2, 3, 4, 5]
+    assert manager.engines["heavy"].pages == [2, 4]
+    assert "lourd 2" in result.text and "rapide 2" not in result.text
+    assert "rapide 3" in result.text
+    assert [page["engine"] for page in result.page_details] == ["cheap", "heavy", "cheap", "heavy", "cheap"]
+    assert result.engine == "cheap"
+    assert any("2 page(s)" in warning for warning in result.warnings)
+
+
+async def test_no_cascade_without_threshold(manager):
+    """Test sans min_confidence : sélection habituelle, pas de reprise"""
+    await manager.process_document("doc.pdf", "pdf", "cheap", OCRConfig())
+
+    assert manager.engines["heavy"].pages == []
+
+
+async def test_image_document_escalates_whole(manager, tmp_path):
+    """Test image peu sûre : le document entier est repris par le moteur lourd"""
+    path = tmp_path / "scan.png"
+    Image.new("L", (4, 1), 255).save(path)
+
+    result = await manager.process_document(path, "png", config=OCRConfig(min_confidence=0.6))
+
+    assert result.text == "lourd document"
+    assert result.engine == "heavy"
+    assert any("fake" in warning for warning in result.warnings)
@@ -0,0 +1,86 @@
+"""Tests pour le cache OCR par page (révision d'un PDF)"""
+
+import pytest
+from PIL import Image, ImageDraw
+from PyPDF2 import PdfReader
+from reportlab.pdfgen import canvas
+
+from app.services.ocr import OCRManager, pdf_stream
+from app.services.ocr import manager as manager_module
+from app.services.ocr.base import OCRResult
+from app.services.ocr.page_cache import OCRPageCache
+from app.utils.cache import LRUCache, TieredCache
+from tests.services.test_pdf_stream import FakeEngine
+
+
+def write_pdf(path, pages):
+    """PDF réel, une ligne de texte par page"""
+    pdf = canvas.Canvas(str(path))
+    for text in pages:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+class RenderingEngine(FakeEngine):
+    """Moteur factice : rend le texte de chaque page et compte les pages OCRisées"""
+
+    def __init__(self):
+        super().__init__()
+        self.ocr_pages = []
+
+    def rasterize_pdf(self, pdf_path, config=None, first_page=1, last_page=None):
+        reader = PdfReader(str(pdf_path))
+        images = []
+        for page in reader.pages[first_page - 1:last_page]:
+            text = page.extract_text().strip()
+            image = Image.new("L", (400, 20), 255)
+            ImageDraw.Draw(image).text((2, 2), text, fill=0)
+            image.info["text"] = text
+            images.append(image)
+        return images
+
+    async def process_image(self, image, config=None):
+        self.ocr_pages.append(image.info["text"])
+        return OCRResult(text=image.info["text"], confidence=0.9)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    cache = OCRPageCache(TieredCache(LRUCache()))
+    monkeypatch.setattr(manager_module, "get_page_cache", lambda: cache)
+    monkeypatch.setattr(pdf_stream, "get_pdf_page_count", lambda path: len(PdfReader(str(path)).pages))
+    # Couche texte ignorée : toutes les pages passent par l'OCR
+    monkeypatch.setenv("OCR_PDF_TEXT_LAYER", "false")
+
+    manager = OCRManager()
+    manager.engines["fake"] = RenderingEngine()
+    manager.default_engine = "fake"
+    manager.capabilities.build(manager.engines)
+    manager._initialized = True
+    return manager
+
+
+async def test_revised_pdf_reocrs_changed_page_only(manager, tmp_path):
+    """Test révision d'un contrat : seule la page modifiée repasse par le moteur"""
+    engine = manager.engines["fake"]
+    pages = [f"Article {n} : clause initiale" for n in range(1, 6)]
+    original = write_pdf(tmp_path / "contrat_v1.pdf", pages)
+    revised_pages = list(pages)
+    revised_pages[2] = "Article 3 : clause amendee"
+    revised = write_pdf(tmp_path / "contrat_v2.pdf", revised_pages)
+
+    first = await manager.process_document(original, "pdf")
+
+    assert engine.ocr_pages == pages
+    assert first.page_cache == {"hits": 0, "misses": 5}
+
+    engine.ocr_pages.clear()
+    second = await manager.process_document(revised, "pdf")
+
+    assert engine.ocr_pages == ["Article 3 : clause amendee"]
+    assert second.page_cache == {"hits": 4, "misses": 1}
+    assert [page["from_cache"] for page in second.page_details] == [True, True, False, True, True]
+    assert "clause amendee" in second.text
+    assert second.text.count("clause initiale") == 4
@@ -0,0 +1,126 @@
+"""Tests pour le préchauffage OCR et le partage des modèles avec les workers"""
+
+import asyncio
+import gc
+
+import pytest
+from PIL import Image
+
+from app.services.ocr import OCRManager
+from app.services.ocr import worker_pool as worker_pool_module
+from app.services.ocr.base import OCRResult
+from app.services.ocr.worker_pool import OCRWorkerPool
+from tests.services.test_pdf_stream import FakeEngine
+
+
+class SlowLoadingEngine(FakeEngine):
+    """Moteur factice au chargement lent, qui compte chargements et inférences"""
+
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+        self.inferences = 0
+        self.loaded_in = None
+
+    async def initialize(self):
+        if not self._initialized:
+            await asyncio.sleep(0.05)
+            self.loads += 1
+            self._initialized = True
+
+    async def process_image(self, image, config=None):
+        self.inferences += 1
+        return OCRResult(text=f"modèle chargé par {self.loaded_in}", confidence=0.9)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setenv("OCR_WORKER_PROCESSES", "0")
+    engine = SlowLoadingEngine()
+
+    async def load_engines():
+        await engine.initialize()
+        manager.engines["fake"] = engine
+        manager.default_engine = "fake"
+        manager._initialized = True
+
+    manager = OCRManager()
+    monkeypatch.setattr(manager, "_initialize", load_engines)
+    return manager
+
+
+async def test_background_warm_up_sets_readiness(manager):
+    """Test préchauffage en tâche de fond : prêt une fois modèle chargé et inférence faite"""
+    await manager.start_warm_up("background")
+    assert not manager.is_ready
+
+    # Une requête pendant le préchauffage ne recharge pas le moteur
+    await asyncio.gather(manager.initialize(), manager._warmup_task)
+
+    engine = manager.engines["fake"]
+    assert manager.is_ready
+    assert manager.warmup["status"] == "ready"
+    assert manager.warmup["engines"] == ["fake"]
+    assert engine.loads == 1
+    assert engine.inferences == 1
+
+
+async def test_warm_up_disabled_is_ready(manager):
+    """Test OCR_WARMUP=off : chargement à la demande, service prêt immédiatement"""
+    await manager.start_warm_up("off")
+    assert manager.is_ready
+    assert manager.warmup == {"status": "disabled"}
+
+
+async def test_fork_workers_inherit_loaded_engines(monkeypatch):
+    """Test mode fork : les workers utilisent le moteur chargé dans le processus principal"""
+    monkeypatch.setenv("OCR_WORKER_START_METHOD", "fork")
+    pool = OCRWorkerPool(size=2, max_tasks_per_child=5, warm_engines=["fake"])
+
+    # "fake" n'est pas instanciable par _create_engine : seul l'héritage par fork le rend disponible
+    engine = SlowLoadingEngine()
+    await engine.initialize()
+    engine.loaded_in = "parent"
+    try:
+        pool.share_engines({"fake": engine})
+        assert pool.shared_engines == ["fake"]
+
+        assert await pool.warm_up() == 2
+        result = await pool.process_page("fake", Image.new("L", (10, 10)))
+
+        assert result.text == "modèle chargé par parent"
+        assert pool.get_info()["start_method"] == "fork"
+        assert pool.max_tasks_per_child is None
+    finally:
+        pool.shutdown()
+        worker_pool_module._worker_engines.pop("fake", None)
+        gc.unfreeze()
+
+
+class CountingEngine(SlowLoadingEngine):
+    """Moteur factice : indique combien d'inférences le worker avait déjà faites"""
+
+    async def process_image(self, image, config=None):
+        self.inferences += 1
+        await asyncio.sleep(0.05)
+        return OCRResult(text=str(self.inferences), confidence=0.9)
+
+
+async def test_every_worker_warm_before_first_task(monkeypatch):
+    """Test inférence à blanc à l'initialisation de chaque worker, sans délai arbitraire"""
+    monkeypatch.setenv("OCR_WORKER_START_METHOD", "fork")
+    monkeypatch.setenv("OCR_WARMUP", "background")
+    monkeypatch.setitem(worker_pool_module._worker_engines, "fake", CountingEngine())
+    pool = OCRWorkerPool(size=2, warm_engines=["fake"])
+    try:
+        assert await pool.warm_up() == 2
+
+        results = await asyncio.gather(*[
+            pool.process_page("fake", Image.new("L", (10, 10))) for _ in range(4)
+        ])
+
+        # Chaque worker avait déjà fait son inférence à blanc avant la première tâche
+        assert all(int(result.text) >= 2 for result in results)
+        assert pool.get_info()["warm_inference"] is True
+    finally:
+        pool.shutdown()
@@ -0,0 +1,145 @@
+"""Tests pour le pool de processus OCR"""
+
+import os
+import signal
+
+import pytest
+from PIL import Image
+
+from app.services.ocr import OCRManager, OCRConfig, pdf_stream
+from app.services.ocr import manager as manager_module
+from app.services.ocr import worker_pool
+from app.services.ocr.base import OCRResult
+from app.services.ocr.page_cache import OCRPageCache
+from app.services.ocr.worker_pool import OCRWorkerPool
+from app.utils.cache import LRUCache, TieredCache
+from tests.services.test_pdf_stream import FakeEngine
+
+PARENT_PID = os.getpid()
+
+
+class PidEngine(FakeEngine):
+    """Moteur factice : indique le processus qui a traité l'image"""
+
+    def __init__(self, kill_flag=None):
+        super().__init__()
+        self.kill_flag = kill_flag
+
+    async def process_image(self, image, config=None):
+        # Premier appel dans un worker : le worker meurt brutalement
+        if self.kill_flag is not None and os.getpid() != PARENT_PID and not self.kill_flag.exists():
+            self.kill_flag.touch()
+            os.kill(os.getpid(), signal.SIGKILL)
+        return OCRResult(text=f"pid {os.getpid()}", confidence=0.9)
+
+
+class PageEngine(FakeEngine):
+    """Moteur factice : le worker meurt sur la page kill_page"""
+
+    def __init__(self, kill_flag, kill_page):
+        super().__init__()
+        self.kill_flag = kill_flag
+        self.kill_page = kill_page
+        self.parent_pages = []
+
+    async def process_image(self, image, config=None):
+        if os.getpid() == PARENT_PID:
+            self.parent_pages.append(image.width)
+        elif image.width == self.kill_page and not self.kill_flag.exists():
+            self.kill_flag.touch()
+            os.kill(os.getpid(), signal.SIGKILL)
+        return OCRResult(text=f"page {image.width}", confidence=0.9)
+
+
+def make_manager(engine, pool):
+    manager = OCRManager()
+    manager.engines["fake"] = engine
+    manager.default_engine = "fake"
+    manager.capabilities.build(manager.engines)
+    manager.worker_pool = pool
+    manager._initialized = True
+    return manager
+
+
+@pytest.fixture
+def fork_pool(monkeypatch):
+    # Mode fork : les workers héritent du moteur factice déjà enregistré
+    monkeypatch.setenv("OCR_WORKER_START_METHOD", "fork")
+    pools = []
+
+    def make_pool(engine):
+        monkeypatch.setitem(worker_pool._worker_engines, "fake", engine)
+        pool = OCRWorkerPool(size=1, warm_engines=[])
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_default_pool_size(monkeypatch):
+    """Test taille par défaut plafonnée par OCR_WORKER_MAX_PROCESSES"""
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    monkeypatch.delenv("OCR_WORKER_PROCESSES", raising=False)
+
+    monkeypatch.delenv("OCR_WORKER_MAX_PROCESSES", raising=False)
+    assert OCRWorkerPool().size == 4
+    monkeypatch.setenv("OCR_WORKER_MAX_PROCESSES", "8")
+    assert OCRWorkerPool().size == 8
+    monkeypatch.setenv("OCR_WORKER_MAX_PROCESSES", "0")
+    assert OCRWorkerPool().size == 16
+    monkeypatch.setenv("OCR_WORKER_PROCESSES", "2")
+    assert OCRWorkerPool().size == 2
+
+
+async def test_page_dispatched_to_worker(fork_pool):
+    """Test OCR d'une page exécuté hors du processus API"""
+    pool = fork_pool(PidEngine())
+
+    result = await pool.process_page("fake", Image.new("L", (3, 1)), OCRConfig())
+
+    assert result.text.startswith("pid ")
+    assert result.text != f"pid {PARENT_PID}"
+
+
+async def test_recovers_from_killed_worker(fork_pool, tmp_path):
+    """Test worker tué : pool redémarré, document traité, dispatch rétabli"""
+    engine = PidEngine(kill_flag=tmp_path / "killed")
+    manager = make_manager(engine, fork_pool(engine))
+    path = tmp_path / "scan.png"
+    Image.new("L", (3, 1), 255).save(path)
+
+    result = await manager.process_document(path, "png")
+
+    assert (tmp_path / "killed").exists()
+    # Document repris dans le processus API après la mort du worker
+    assert result.text == f"pid {PARENT_PID}"
+    assert result.engine == "fake"
+
+    result = await manager.process_document(path, "png")
+
+    assert result.text != f"pid {PARENT_PID}"
+
+
+async def test_pdf_resumes_in_process_without_resending_pages(fork_pool, tmp_path, monkeypatch):
+    """Test worker tué en cours de PDF : reprise par le même pipeline, chaque page transmise une fois"""
+    cache = OCRPageCache(TieredCache(LRUCache()))
+    monkeypatch.setattr(manager_module, "get_page_cache", lambda: cache)
+    monkeypatch.setattr(pdf_stream, "get_pdf_page_count", lambda path: 5)
+    monkeypatch.setenv("OCR_PDF_TEXT_LAYER", "false")
+    engine = PageEngine(tmp_path / "killed", kill_page=3)
+    manager = make_manager(engine, fork_pool(engine))
+    pages = []
+
+    async def on_page(page_text):
+        pages.append(page_text)
+
+    result = await manager.process_document("doc.pdf", "pdf", on_page=on_page)
+
+    assert (tmp_path / "killed").exists()
+    assert pages == [f"--- Page {n} ---\npage {n}" for n in range(1, 6)]
+    assert result.text == "\n\n".join(pages)
+    # Pages OCRisées avant la panne relues dans le cache de pages
+    assert result.page_cache["hits"] >= 1
+    assert 3 in engine.parent_pages and 1 not in engine.parent_pages
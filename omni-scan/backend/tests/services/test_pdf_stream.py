@@ -0,0 +1,154 @@
+"""Tests pour le pipeline PDF en streaming"""
+
+import asyncio
+
+import pytest
+from PIL import Image
+
+from app.services.ocr import pdf_stream
+from app.services.ocr.base import OCREngine, OCRResult, OCRConfig, OCRFeature
+from app.services.ocr.page_cache import OCRPageCache, record_page_cache_stats
+from app.services.ocr.pdf_stream import iter_page_windows, stream_pdf_pages
+from app.utils.cache import LRUCache, TieredCache
+
+
+class FakeEngine(OCREngine):
+    """Moteur factice : la largeur de l'image encode le numéro de page"""
+
+    def __init__(self):
+        super().__init__()
+        self.windows = []
+
+    async def initialize(self):
+        self._initialized = True
+
+    async def process_image(self, image, config=None):
+        # Les pages paires sont plus lentes pour vérifier l'ordre de sortie
+        await asyncio.sleep(0.01 if image.width % 2 == 0 else 0)
+        return OCRResult(text=f"page {image.width}", confidence=0.9)
+
+    async def process_pdf(self, pdf_path, config=None):
+        raise NotImplementedError
+
+    def rasterize_pdf(self, pdf_path, config=None, first_page=1, last_page=None):
+        self.windows.append((first_page, last_page))
+        return [Image.new("L", (n, 1)) for n in range(first_page, last_page + 1)]
+
+    def get_supported_features(self):
+        return [OCRFeature.BASIC_TEXT]
+
+    def get_supported_languages(self):
+        return ["fra"]
+
+    def get_info(self):
+        return {"name": "fake", "version": "0"}
+
+
+@pytest.fixture
+def seven_pages(monkeypatch):
+    monkeypatch.setattr(pdf_stream, "get_pdf_page_count", lambda path: 7)
+
+
+def test_iter_page_windows():
+    """Test découpage en fenêtres de pages"""
+    assert list(iter_page_windows(7, 3)) == [(1, 3), (4, 6), (7, 7)]
+    assert list(iter_page_windows(7, 3, max_pages=4)) == [(1, 3), (4, 4)]
+    assert list(iter_page_windows(0, 3)) == []
+
+
+async def test_stream_yields_pages_in_order(seven_pages):
+    """Test résultats restitués dans l'ordre avec numéro de page"""
+    engine = FakeEngine()
+    results = [
+        r async for r in stream_pdf_pages(engine, "doc.pdf", OCRConfig(), chunk_size=3)
+    ]
+
+    assert [r.page_number for r in results] == list(range(1, 8))
+    assert [r.text for r in results] == [f"page {n}" for n in range(1, 8)]
+    assert engine.windows == [(1, 3), (4, 6), (7, 7)]
+
+
+async def test_stream_bounds_pages_in_flight(seven_pages):
+    """Test nombre de pages en cours d'OCR borné"""
+    engine = FakeEngine()
+    in_flight = 0
+    peak = 0
+
+    async def ocr_page(image):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+        return OCRResult(text="x")
+
+    results = [
+        r async for r in stream_pdf_pages(
+            engine, "doc.pdf", OCRConfig(), ocr_page=ocr_page, chunk_size=2, max_in_flight=2
+        )
+    ]
+
+    assert len(results) == 7
+    assert peak <= 2
+
+
+async def test_stream_respects_max_pages(seven_pages):
+    """Test limite max_pages"""
+    engine = FakeEngine()
+    results = [
+        r async for r in stream_pdf_pages(engine, "doc.pdf", OCRConfig(max_pages=2), chunk_size=4)
+    ]
+
+    assert [r.page_number for r in results] == [1, 2]
+
+
+async def test_stream_propagates_page_errors(seven_pages):
+    """Test propagation d'une erreur d'OCR"""
+    engine = FakeEngine()
+
+    async def failing(image):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        async for _ in stream_pdf_pages(engine, "doc.pdf", OCRConfig(), ocr_page=failing):
+            pass
+
+
+async def test_stream_reuses_cached_pages(seven_pages):
+    """Test seules les pages modifiées sont ré-OCRisées"""
+    engine = FakeEngine()
+    cache = OCRPageCache(TieredCache(LRUCache()))
+    calls = []
+
+    async def ocr_page(image):
+        calls.append(image.width)
+        return OCRResult(text=f"page {image.width}", confidence=0.9)
+
+    first = [
+        r async for r in stream_pdf_pages(
+            engine, "doc.pdf", OCRConfig(), ocr_page=ocr_page, page_cache=cache
+        )
+    ]
+    assert not any(r.from_cache for r in first)
+
+    # Révision : la page 3 change
+    def revised(pdf_path, config=None, first_page=1, last_page=None):
+        return [
+            Image.new("L", (n, 2 if n == 3 else 1)) for n in range(first_page, last_page + 1)
+        ]
+
+    engine.rasterize_pdf = revised
+    calls.clear()
+    second = [
+        r async for r in stream_pdf_pages(
+            engine, "doc.pdf", OCRConfig(), ocr_page=ocr_page, page_cache=cache
+        )
+    ]
+
+    assert calls == [3]
+    assert [r.page_number for r in second] == list(range(1, 8))
+    assert [r.text for r in second] == [f"page {n}" for n in range(1, 8)]
+
+    merged = record_page_cache_stats(engine.merge_page_results(second), second)
+    assert merged.page_cache == {"hits": 6, "misses": 1}
+    assert any("Cache de pages" in w for w in merged.warnings)
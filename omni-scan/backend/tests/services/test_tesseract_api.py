@@ -0,0 +1,88 @@
+"""Tests pour l'accès à Tesseract (API persistante ou pytesseract)"""
+
+import pytest
+from PIL import Image
+
+from app.services.ocr import OCRConfig, tesseract_api
+from app.services.ocr.tesseract import TesseractEngine
+from app.services.ocr.tesseract_api import RecognizedWord, TesseractAPI, words_to_text
+
+
+def image_to_data_output():
+    """Sortie image_to_data : deux paragraphes, une ligne de deux mots puis une ligne d'un mot"""
+    return {
+        "text": ["", "Facture", "N°42", "", "Total"],
+        "conf": [-1, 96, 88, -1, 70],
+        "left": [0, 10, 120, 0, 10],
+        "top": [0, 10, 10, 0, 60],
+        "width": [0, 100, 50, 0, 80],
+        "height": [0, 20, 20, 0, 20],
+        "block_num": [1, 1, 1, 1, 1],
+        "par_num": [1, 1, 1, 2, 2],
+        "line_num": [1, 1, 1, 1, 1],
+    }
+
+
+def test_pytesseract_fallback_text_and_confidences_in_one_call(monkeypatch):
+    """Test repli pytesseract : un seul appel image_to_data pour le texte et les confiances"""
+    calls = []
+
+    def fake_image_to_data(image, lang=None, config="", output_type=None):
+        calls.append(config)
+        return image_to_data_output()
+
+    monkeypatch.setattr(tesseract_api.pytesseract, "image_to_data", fake_image_to_data)
+    api = TesseractAPI(backend="pytesseract")
+
+    output = api.recognize(Image.new("L", (200, 100), 255), "fra+eng", psm=6)
+
+    assert calls == ["--psm 6 --oem 3"]
+    assert output.text == "Facture N°42\n\nTotal"
+    assert [word.confidence for word in output.words] == [0.96, 0.88, 0.70]
+    assert output.words[1].bbox == (120, 10, 50, 20)
+    assert output.confidence == pytest.approx((0.96 + 0.88 + 0.70) / 3)
+
+
+def test_words_to_text_breaks_lines():
+    """Test reconstitution du texte : lignes d'un même paragraphe sans ligne vide"""
+    words = [
+        RecognizedWord("Bonjour", 0.9, (0, 0, 1, 1), (1, 1, 1)),
+        RecognizedWord("Madame", 0.9, (0, 0, 1, 1), (1, 1, 1)),
+        RecognizedWord("Dupont", 0.9, (0, 0, 1, 1), (1, 1, 2)),
+    ]
+
+    assert words_to_text(words) == "Bonjour Madame\nDupont"
+
+
+def test_backend_selection(monkeypatch):
+    """Test tesserocr absent : repli sur pytesseract, forçage possible"""
+    monkeypatch.setattr(tesseract_api, "_load_tesserocr", lambda: None)
+    monkeypatch.setenv("OCR_TESSERACT_BACKEND", "tesserocr")
+    assert tesseract_api.tesseract_backend() == "pytesseract"
+
+    monkeypatch.setattr(tesseract_api, "_load_tesserocr", lambda: object())
+    monkeypatch.setenv("OCR_TESSERACT_BACKEND", "auto")
+    assert tesseract_api.tesseract_backend() == "tesserocr"
+    monkeypatch.setenv("OCR_TESSERACT_BACKEND", "pytesseract")
+    assert tesseract_api.tesseract_backend() == "pytesseract"
+
+
+async def test_engine_confidence_comes_from_words(monkeypatch):
+    """Test la confiance du moteur est la moyenne des mots, plus une valeur fixe"""
+    monkeypatch.setattr(
+        tesseract_api.pytesseract, "image_to_data",
+        lambda image, lang=None, config="", output_type=None: image_to_data_output()
+    )
+    monkeypatch.setenv("OCR_TESSERACT_BACKEND", "pytesseract")
+    engine = TesseractEngine()
+
+    result = await engine.process_image(
+        Image.new("L", (200, 100), 255),
+        OCRConfig(enable_preprocessing=False, enable_postprocessing=False, detect_regions=False)
+    )
+
+    assert result.text == "Facture N°42\n\nTotal"
+    assert result.confidence == pytest.approx(0.8467, abs=1e-3)
+    assert [block["text"] for block in result.text_blocks] == ["Facture N°42", "Total"]
+    assert result.text_blocks[0]["confidence"] == pytest.approx(0.92)
+    assert result.text_blocks[0]["bbox"] == {"x": 10, "y": 10, "width": 160, "height": 20}
@@ -1,6 +1,6 @@
 """Tests pour le service de nettoyage de texte"""
 
-from app.services.text_cleaner import text_cleaner
+from app.services.text_cleaner import ChapterTracker, text_cleaner
 
 
 def test_clean_text_basic():
@@ -121,4 +121,22 @@ Page 42
     assert "documentation" in cleaned
     assert "42" not in cleaned
     assert "  " not in cleaned  # Pas d'espaces multiples
-    assert "oe" in cleaned
\ No newline at end of file
+    assert "oe" in cleaned
+
+def test_clean_text_typographic_apostrophes():
+    """Test apostrophes typographiques remplacées"""
+    assert text_cleaner.clean_text("l’État et l‘école") == "l'État et l'école"
+
+
+def test_chapter_tracker_incremental():
+    """Test détection ligne par ligne identique à detect_chapters"""
+    text = "Préambule\nCHAPITRE 1\nLigne a\n\nLigne b\n\n\nChapitre II\nLigne c\n"
+    tracker = ChapterTracker()
+    for line in text.split("\n"):
+        tracker.feed_line(line)
+
+    chapters = [chapter.to_dict() for chapter in tracker.finish()]
+
+    assert chapters == text_cleaner.detect_chapters(text)
+    assert chapters[0] == {"title": "CHAPITRE 1", "content": "Ligne a\n\nLigne b", "start_line": 1, "end_line": 6}
+    assert chapters[1]["end_line"] == 9
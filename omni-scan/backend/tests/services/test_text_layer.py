@@ -0,0 +1,72 @@
+"""Tests pour la lecture de la couche texte des PDF natifs"""
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from app.services.ocr import OCRManager, OCRConfig
+from app.services.ocr import manager as manager_module
+from app.services.ocr.page_cache import OCRPageCache
+from app.services.ocr.text_layer import extract_text_layer, is_usable_text
+from app.utils.cache import LRUCache, TieredCache
+from tests.services.test_pdf_stream import FakeEngine
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path):
+    """PDF de 3 pages : texte, page scannée (sans texte), texte"""
+    path = tmp_path / "facture.pdf"
+    pdf = canvas.Canvas(str(path))
+    for page in (1, 2, 3):
+        if page != 2:
+            pdf.setFont("Helvetica", 12)
+            pdf.drawString(72, 750, f"Facture 2024-00{page} - page {page}")
+            pdf.drawString(72, 730, "Total TTC : 1 250,00 EUR")
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+def test_is_usable_text():
+    """Test détection des couches texte vides ou illisibles"""
+    assert is_usable_text("Facture numéro 2024-001 du 12 mars 2024")
+    assert not is_usable_text("   \n ")
+    assert not is_usable_text("(cid:12)(cid:34)(cid:56)(cid:78)(cid:90)(cid:11)")
+    assert not is_usable_text("F a c t u r e n u m e r o d e u x m i l l e")
+    assert not is_usable_text("|||| ---- //// ==== ;;;; ~~~~ ||||")
+
+
+def test_extract_text_layer_with_positions(mixed_pdf):
+    """Test texte et positions extraits, page sans texte à OCRiser"""
+    pages = extract_text_layer(mixed_pdf, dpi=144)
+
+    assert len(pages) == 3
+    assert pages[1] is None
+    assert "Facture 2024-001" in pages[0].text
+    assert pages[0].source == "text_layer"
+    assert pages[0].page_number == 1
+
+    first_block = pages[0].text_blocks[0]
+    assert first_block["text"].startswith("Facture")
+    # x = 72 pt à 144 DPI, texte en haut de page
+    assert first_block["bbox"]["x"] == 144
+    assert first_block["bbox"]["y"] < 200
+
+
+async def test_manager_ocrs_only_pages_without_text(mixed_pdf, monkeypatch):
+    """Test seules les pages sans couche texte passent par l'OCR"""
+    disabled_cache = OCRPageCache(TieredCache(LRUCache()), enabled=False)
+    monkeypatch.setattr(manager_module, "get_page_cache", lambda: disabled_cache)
+
+    engine = FakeEngine()
+    manager = OCRManager()
+    manager.engines["fake"] = engine
+    manager.default_engine = "fake"
+    manager._initialized = True
+
+    result = await manager.process_document(mixed_pdf, "pdf", "fake", OCRConfig())
+
+    assert engine.windows == [(2, 2)]
+    assert [page["source"] for page in result.page_details] == ["text_layer", "ocr", "text_layer"]
+    assert "page 2" in result.text
+    assert {block["page"] for block in result.text_blocks} == {1, 3}
+    assert any("Couche texte PDF: 2/3" in w for w in result.warnings)
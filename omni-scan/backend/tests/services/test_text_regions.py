@@ -0,0 +1,119 @@
+"""Tests pour la détection des zones de texte et l'OCR par zones"""
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services.ocr import OCRConfig
+from app.services.ocr.base import BoundingBox
+from app.services.ocr.tesseract import TesseractEngine
+from app.services.ocr.tesseract_api import TesseractOutput
+from app.services.ocr.text_regions import (
+    TextRegion, as_bounding_box, detect_text_regions, region_coverage, sort_reading_order
+)
+
+
+def _font(size=28):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@pytest.fixture
+def receipt():
+    """Ticket clairsemé : en-tête de deux lignes, articles et montants en colonnes"""
+    image = Image.new("L", (1200, 1600), 255)
+    draw = ImageDraw.Draw(image)
+    font = _font()
+    draw.text((100, 100), "BOULANGERIE DU COIN", font=font, fill=0)
+    draw.text((100, 140), "12 rue des Lilas", font=font, fill=0)
+    draw.text((100, 400), "Baguette", font=font, fill=0)
+    draw.text((900, 400), "1,20", font=font, fill=0)
+    draw.text((100, 800), "TOTAL", font=font, fill=0)
+    draw.text((900, 800), "3,60", font=font, fill=0)
+    return image
+
+
+def test_detects_sparse_blocks_in_reading_order(receipt):
+    """Test blocs détectés avec coordonnées, lignes d'un même bloc regroupées"""
+    regions = detect_text_regions(receipt)
+
+    assert len(regions) == 5
+    header = regions[0]
+    assert header.lines == 2 and header.psm == 6
+    assert abs(header.bbox.x - 100) < 10 and abs(header.bbox.y - 100) < 15
+    # Libellé puis montant sur chaque ligne du ticket
+    assert [region.bbox.x < 600 for region in regions[1:]] == [True, False, True, False]
+    assert region_coverage(regions, *receipt.size) < 0.1
+
+
+def test_blank_page_has_no_regions():
+    """Test page blanche : aucune zone"""
+    assert detect_text_regions(Image.new("L", (800, 600), 255)) == []
+
+
+def test_psm_per_block():
+    """Test mode de segmentation : mot isolé, ligne, bloc, zone fournie"""
+    assert TextRegion(BoundingBox(0, 0, 60, 30), lines=1).psm == 8
+    assert TextRegion(BoundingBox(0, 0, 400, 30), lines=1).psm == 7
+    assert TextRegion(BoundingBox(0, 0, 400, 90), lines=3).psm == 6
+    assert TextRegion(BoundingBox(0, 0, 400, 90)).psm == 6
+
+
+def test_reading_order_groups_rows():
+    """Test les blocs d'une même bande sont lus de gauche à droite"""
+    amount = TextRegion(BoundingBox(900, 402, 60, 28), lines=1)
+    label = TextRegion(BoundingBox(100, 400, 200, 30), lines=1)
+    header = TextRegion(BoundingBox(100, 100, 300, 60), lines=2)
+
+    assert sort_reading_order([amount, label, header]) == [header, label, amount]
+
+
+def test_as_bounding_box_accepts_api_formats():
+    """Test zones de l'API en dict ou en liste"""
+    assert as_bounding_box({"x": 1, "y": 2, "width": 3, "height": 4}) == BoundingBox(1, 2, 3, 4)
+    assert as_bounding_box([1, 2, 3, 4]) == BoundingBox(1, 2, 3, 4)
+
+
+async def test_tesseract_ocrs_only_detected_blocks(receipt, monkeypatch):
+    """Test seuls les blocs passent par Tesseract, avec leur PSM, assemblés dans l'ordre de lecture"""
+    calls = []
+
+    def fake_recognize(image, lang, psm=3):
+        calls.append((image.size, psm))
+        return TesseractOutput(text=f"bloc {len(calls)}")
+
+    monkeypatch.setenv("OCR_REGION_CONCURRENCY", "1")
+    engine = TesseractEngine()
+    monkeypatch.setattr(engine.api, "recognize", fake_recognize)
+
+    result = await engine.process_image(
+        receipt, OCRConfig(enable_preprocessing=False, enable_postprocessing=False, detect_regions=True)
+    )
+
+    assert len(calls) == 5
+    assert all(width < 600 and height < 200 for (width, height), _ in calls)
+    assert calls[0][1] == 6 and calls[-1][1] == 8
+    assert result.text.split("\n") == [f"bloc {i}" for i in range(1, 6)]
+    assert result.text_blocks[0]["bbox"]["y"] < result.text_blocks[-1]["bbox"]["y"]
+
+
+async def test_dense_page_falls_back_to_full_page(monkeypatch):
+    """Test mode auto : page dense, un seul OCR pleine page"""
+    calls = []
+    engine = TesseractEngine()
+    monkeypatch.setattr(
+        engine.api, "recognize",
+        lambda image, lang, psm=3: calls.append(psm) or TesseractOutput(text="texte")
+    )
+    image = Image.new("L", (400, 300), 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(10, 290, 24):
+        draw.text((10, y), "Lorem ipsum dolor sit amet consectetur", font=_font(18), fill=0)
+
+    result = await engine.process_image(
+        image, OCRConfig(enable_preprocessing=False, enable_postprocessing=False)
+    )
+
+    assert calls == [3]
+    assert result.text_blocks is None
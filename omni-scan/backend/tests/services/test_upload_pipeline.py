@@ -0,0 +1,143 @@
+"""Tests pour l'analyse IA en pipeline avec l'OCR"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services import ai_analysis_unified, ai_http, upload_unified
+from app.services.ai_analysis_unified import AIAnalyzer
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_chunking import split_into_chunks
+from app.services.upload_unified import UnifiedUploadService, UploadConfig, UploadMode
+from app.utils.cache import LRUCache, TieredCache
+
+OCR_PAGE_SECONDS = 0.1
+AI_CALL_SECONDS = 0.05
+
+
+def make_pages(count: int = 6) -> list:
+    pages = []
+    for number in range(1, count + 1):
+        lines = [f"Article {number}"] + [
+            f"Clause {number}.{line} : le prestataire s'engage sur le point {line}."
+            for line in range(10)
+        ]
+        pages.append("\n".join(lines))
+    return pages
+
+
+def merge_pages(pages: list) -> str:
+    return "\n\n".join(f"--- Page {number} ---\n{text}" for number, text in enumerate(pages, start=1))
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(ai_analysis_unified, "ai_response_cache", AIResponseCache(TieredCache(LRUCache())))
+    monkeypatch.setattr(ai_http, "_limiters", {})
+    monkeypatch.setenv("AI_CHUNK_MAX_CHARS", "800")
+    # Un appel à la fois : l'analyse d'un document long dure autant que son OCR
+    monkeypatch.setenv("AI_PROVIDER_CONCURRENCY", "1")
+    return UnifiedUploadService(UploadConfig(
+        mode=UploadMode.SIMPLE,
+        store_files=False,
+        store_results=False,
+        require_auth=False,
+        check_quota=False
+    ))
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    async def fake_call(self, text, detail_level, language, include_structured_data, provider=None):
+        calls.append(text)
+        await asyncio.sleep(AI_CALL_SECONDS)
+        return {"summary": text.split("\n")[0], "key_points": [], "entities": [], "language": "fr"}
+
+    monkeypatch.setattr(AIAnalyzer, "_call_provider", fake_call)
+    return calls
+
+
+def fake_ocr(monkeypatch, pages: list):
+    async def process_document_advanced(file_path, file_type, options, on_page=None):
+        for number in range(1, len(pages) + 1):
+            await asyncio.sleep(OCR_PAGE_SECONDS)
+            if on_page:
+                await on_page(f"--- Page {number} ---\n{pages[number - 1]}")
+        return {"text": merge_pages(pages), "confidence": 0.9, "page_count": len(pages)}
+
+    monkeypatch.setattr(upload_unified, "process_document_advanced", process_document_advanced)
+
+
+async def process(service, options=None):
+    return await service._process_document(
+        document_id="doc", file_path="doc.pdf", file_ext="pdf",
+        filename="doc.pdf", user_id=None, options=options or {}
+    )
+
+
+async def test_analysis_starts_during_ocr(service, calls, monkeypatch):
+    """Test morceaux analysés pendant l'OCR, réutilisés par l'analyse finale"""
+    pages = make_pages()
+    fake_ocr(monkeypatch, pages)
+    partials = []
+    service._partial_result_callback = partials.append
+
+    start = time.monotonic()
+    result = await process(service)
+    elapsed = time.monotonic() - start
+
+    chunk_count = len(split_into_chunks(merge_pages(pages), max_chars=800))
+    ai_analysis = result["ai_analysis"]
+    assert ai_analysis["analysis_type"] == "chunked"
+    assert ai_analysis["chunk_count"] == chunk_count
+    # Chaque morceau analysé une seule fois, plus la passe de fusion
+    assert len(calls) == chunk_count + 1
+    assert result["ocr_metadata"]["ai_chunks_started"] >= 1
+    assert partials and all(partial["partial"] for partial in partials)
+    # En séquence : OCR puis un appel par morceau et la fusion ; ici seuls le dernier
+    # morceau et la fusion attendent la fin de l'OCR
+    assert elapsed < len(pages) * OCR_PAGE_SECONDS + chunk_count * AI_CALL_SECONDS
+
+
+async def test_pipeline_disabled(service, calls, monkeypatch):
+    """Test sans pipeline : analyse lancée après l'OCR, même résultat"""
+    pages = make_pages()
+    fake_ocr(monkeypatch, pages)
+    partials = []
+    service._partial_result_callback = partials.append
+
+    result = await process(service, {"pipeline": False})
+
+    assert result["ai_analysis"]["analysis_type"] == "chunked"
+    assert "ai_chunks_started" not in result["ocr_metadata"]
+    assert partials == []
+
+
+async def test_ocr_failure_cancels_chunk_analyses(service, calls, monkeypatch):
+    """Test OCR en échec : analyses de morceaux lancées abandonnées"""
+    pages = make_pages()
+    pipelines = []
+    start_pipeline = service._start_pipeline
+
+    def keep_pipeline(file_ext, options):
+        pipelines.append(start_pipeline(file_ext, options))
+        return pipelines[-1]
+
+    async def failing_ocr(file_path, file_type, options, on_page=None):
+        for number in range(1, 5):
+            await on_page(f"--- Page {number} ---\n{pages[number - 1]}")
+        raise RuntimeError("PDF illisible")
+
+    monkeypatch.setattr(service, "_start_pipeline", keep_pipeline)
+    monkeypatch.setattr(upload_unified, "process_document_advanced", failing_ocr)
+
+    result = await process(service)
+    await asyncio.sleep(0)
+
+    assert result["success"] is False
+    assert "ai_analysis" not in result
+    tasks = list(pipelines[0]._tasks.values())
+    assert tasks and all(task.cancelled() for task in tasks)
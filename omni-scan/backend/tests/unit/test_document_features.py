@@ -0,0 +1,93 @@
+"""Tests pour les caractéristiques de document partagées"""
+
+import pytest
+
+from app.services import ai_analysis_unified
+from app.services.ai_analysis_unified import AIAnalyzer, AIProvider
+from app.templates.invoice_template import InvoiceTemplate
+from app.utils import document_classifier
+from app.utils.document_classifier import DocumentClassifier, classify_document
+from app.utils.document_features import DocumentFeatures, get_document_features
+
+INVOICE = """ACME Services
+Facture n° F2024-001
+Date : 12/03/2024
+Client : Dupont SARL
+Prestation conseil 100,00 €
+TVA : 20,00 €
+Total TTC : 120,00 €
+Paiement : 30 jours"""
+
+
+def test_features_computed_once():
+    """Test même objet pour le même texte, recherches mémorisées"""
+    features = get_document_features(INVOICE)
+
+    assert get_document_features(INVOICE) is features
+    assert get_document_features(features) is features
+    assert features.word_count == len(INVOICE.split())
+    assert features.line_count == 8
+    assert features.contains("total ttc")
+    assert features.search(r"facture\s*n°\s*(\S+)", 2).group(1) == "F2024-001"
+    assert features.memoize("clé", lambda: 1) == 1
+    assert features.memoize("clé", lambda: pytest.fail("recalculé")) == 1
+
+
+def test_classification_shared(monkeypatch):
+    """Test classify_document : même résultat que le classificateur, une seule fois par document"""
+    text = INVOICE + "\nMerci"
+    expected = DocumentClassifier().classify(text)
+
+    assert classify_document(text) == expected
+    assert expected[0] == "invoice"
+
+    monkeypatch.setattr(document_classifier, "get_document_classifier", lambda: pytest.fail("reclassé"))
+    assert classify_document(get_document_features(text)) == expected
+
+
+def test_invoice_template_accepts_features():
+    """Test extraction de facture depuis les caractéristiques partagées"""
+    result = InvoiceTemplate().extract(DocumentFeatures(INVOICE))
+
+    assert result == InvoiceTemplate().extract(INVOICE)
+    assert result["data"]["date"] == "2024-03-12"
+    assert result["data"]["total_amount"] == 120.0
+
+
+async def test_system_prompt_built_once(monkeypatch):
+    """Test prompt système construit une fois par document et jeu d'options"""
+    calls = []
+
+    def counting_classify(text):
+        calls.append(text)
+        return classify_document(text)
+
+    monkeypatch.setattr(ai_analysis_unified, "classify_document", counting_classify)
+    text = INVOICE + "\nPrompt"
+
+    async with AIAnalyzer(AIProvider.OPENAI) as analyzer:
+        first = analyzer._get_system_prompt("medium", "fr", True, text)
+        second = analyzer._get_system_prompt("medium", "fr", True, text)
+        other = analyzer._get_system_prompt("high", "fr", True, text)
+
+    assert first == second
+    assert other != first
+    assert len(calls) == 2
+
+
+def test_system_prompts_not_shared_between_analyzers():
+    """Test prompts des analyseurs unifié et multi mémorisés séparément pour un même texte"""
+    from app.services import ai_analysis_multi
+
+    text = INVOICE + "\nDeux analyseurs"
+    unified = ai_analysis_unified.AIAnalyzer(AIProvider.OPENAI)
+    multi = ai_analysis_multi.AIAnalyzer(ai_analysis_multi.AIProvider.OPENAI)
+
+    unified_prompt = unified._get_system_prompt("medium", "fr", True, text)
+    multi_prompt = multi._get_system_prompt("medium", "fr", True, text)
+
+    assert multi_prompt == multi._build_system_prompt(
+        classify_document(text[:1000])[0], "medium", "fr", True
+    )
+    assert unified_prompt == unified._build_system_prompt("medium", "fr", True, text)
+    assert unified_prompt != multi_prompt
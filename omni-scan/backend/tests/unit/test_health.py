@@ -24,6 +24,46 @@ class TestHealthEndpoints:
         assert "timestamp" in data
         assert "version" in data
     
+    def test_readiness_follows_ocr_warm_up(self, client):
+        """Test de la readiness : 503 pendant le préchauffage OCR, 200 ensuite"""
+        from app.services.ocr import get_ocr_manager
+        
+        ocr_manager = get_ocr_manager()
+        previous = ocr_manager.warmup
+        try:
+            ocr_manager.warmup = {"status": "running"}
+            response = client.get("/api/v1/health/ready")
+            assert response.status_code == 503
+            assert response.json()["ready"] is False
+            assert client.get("/api/v1/health").json()["ready"] is False
+            
+            ocr_manager.warmup = {"status": "ready", "workers": 2}
+            response = client.get("/api/v1/health/ready")
+            assert response.status_code == 200
+            assert response.json()["warmup"]["workers"] == 2
+        finally:
+            ocr_manager.warmup = previous
+    
+    def test_readiness_fails_when_warm_up_failed(self, client):
+        """Test de la readiness : 503 si le chargement des modèles OCR a échoué"""
+        from app.services.ocr import get_ocr_manager
+        
+        ocr_manager = get_ocr_manager()
+        previous = ocr_manager.warmup
+        try:
+            ocr_manager.warmup = {"status": "failed", "error": "modèle introuvable"}
+            response = client.get("/api/v1/health/ready")
+            assert response.status_code == 503
+            data = response.json()
+            assert data["ready"] is False
+            assert data["services"]["ocr"] is False
+            assert data["warmup"] == {"status": "failed", "error": "modèle introuvable"}
+            
+            # Liveness inchangée : l'échec n'est signalé que par ready et warmup
+            assert client.get("/api/v1/health").status_code == 200
+        finally:
+            ocr_manager.warmup = previous
+    
     def test_openapi_docs(self, client):
         """Test de l'accès à la documentation OpenAPI"""
         response = client.get("/docs")
@@ -0,0 +1,75 @@
+"""Tests pour les profils de preprocessing d'image"""
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.utils.image_preprocessing import (
+    ImagePreprocessor,
+    PREPROCESSING_PROFILES,
+    estimate_noise,
+    estimate_skew_angle,
+    plan_preprocessing,
+    probe_image_quality
+)
+
+
+@pytest.fixture
+def text_page():
+    """Page synthétique : lignes de texte noir sur fond blanc"""
+    page = np.full((1400, 1100), 255, np.uint8)
+    for y in range(80, 1350, 40):
+        cv2.putText(page, "Lorem ipsum dolor sit amet", (60, y), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    return page
+
+
+def test_estimate_noise_ignores_text_edges(text_page):
+    """Test estimation du bruit robuste aux contours du texte"""
+    rng = np.random.default_rng(0)
+    noisy = np.clip(text_page + rng.normal(0, 12, text_page.shape), 0, 255).astype(np.uint8)
+
+    assert estimate_noise(text_page) < 1
+    assert estimate_noise(noisy) > 5
+
+
+def test_estimate_skew_angle(text_page):
+    """Test angle d'inclinaison par profil de projection"""
+    matrix = cv2.getRotationMatrix2D((550, 700), 3, 1.0)
+    skewed = cv2.warpAffine(text_page, matrix, (1100, 1400), borderValue=255)
+
+    assert estimate_skew_angle(skewed) == pytest.approx(-3, abs=0.2)
+    assert estimate_skew_angle(text_page) == pytest.approx(0, abs=0.2)
+
+
+@pytest.mark.parametrize("profile", ["fast", "balanced", "adaptive", "quality"])
+def test_profiles_return_binarized_grayscale(text_page, profile):
+    """Test chaque profil retourne une image binarisée de même taille"""
+    image = Image.fromarray(text_page).convert("RGB")
+    result = ImagePreprocessor(profile).process(image)
+
+    assert result.mode == "L"
+    assert result.size == image.size
+    assert set(np.unique(np.array(result))) <= {0, 255}
+
+
+def test_probe_detects_born_digital_render(text_page):
+    """Test un rendu PDF propre saute débruitage, binarisation et redressement"""
+    quality = probe_image_quality(text_page)
+    plan = plan_preprocessing(quality, PREPROCESSING_PROFILES["adaptive"])
+
+    assert quality.born_digital
+    assert not (plan.denoise or plan.binarize or plan.deskew)
+
+
+def test_probe_keeps_full_chain_for_poor_photo(text_page):
+    """Test une photo floue, bruitée et peu contrastée garde toutes les étapes"""
+    rng = np.random.default_rng(0)
+    photo = cv2.GaussianBlur(text_page, (7, 7), 2) * 0.4 + 90 + rng.normal(0, 8, text_page.shape)
+    photo = np.clip(photo, 0, 255).astype(np.uint8)
+
+    quality = probe_image_quality(photo)
+    plan = plan_preprocessing(quality, PREPROCESSING_PROFILES["adaptive"])
+
+    assert not quality.born_digital
+    assert plan.sharpen and plan.boost_contrast and plan.denoise and plan.binarize and plan.deskew
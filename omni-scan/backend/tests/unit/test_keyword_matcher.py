@@ -0,0 +1,47 @@
+"""Tests pour la recherche simultanée de mots-clés"""
+
+import random
+
+from app.utils.document_classifier import DocumentClassifier
+from app.utils.keyword_matcher import KeywordMatcher, WeightedKeywords
+
+
+def test_overlapping_keywords():
+    """Test mots-clés imbriqués ou qui se chevauchent"""
+    matcher = KeywordMatcher(["he", "she", "his", "hers", "total ttc", "ttc", ""])
+    assert matcher.find("ushers") == {"he", "she", "hers"}
+    assert matcher.find("montant total ttc : 120") == {"total ttc", "ttc"}
+    assert matcher.find("rien") == set()
+    assert KeywordMatcher([]).find("texte") == set()
+
+
+def test_same_result_as_substring_search():
+    """Test équivalence avec `in` sur des textes aléatoires"""
+    rng = random.Random(0)
+    alphabet = "abé c"
+    keywords = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(40)}
+    matcher = KeywordMatcher(keywords)
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert matcher.find(text) == {k for k in keywords if k in text}
+
+
+def test_weighted_scores():
+    """Test un mot-clé partagé compte pour chaque étiquette"""
+    weights = WeightedKeywords({
+        "finance": [("facture", 2.0), ("montant", 1.0)],
+        "santé": [("patient", 1.0), ("montant", 0.5)],
+    })
+    scores = weights.score_text("le montant de la facture")
+    assert scores == {"finance": 3.0, "santé": 0.5}
+
+
+def test_custom_document_type():
+    """Test ajout d'un type de document sans toucher au code de classification"""
+    classifier = DocumentClassifier(
+        weighted_patterns={"recipe": {"strong": ["ingrédients", "préparation"], "medium": ["four"], "weak": []}},
+        regex_patterns={"recipe": [r"\d+\s*g\b"]},
+    )
+    doc_type, confidence, _ = classifier.classify("Ingrédients : 200 g de farine. Préparation : four à 180°")
+    assert doc_type == "recipe"
+    assert confidence > 0.5
@@ -0,0 +1,84 @@
+"""Tests pour le post-processing du texte OCR"""
+
+import time
+
+import pytest
+
+from app.utils import ocr_postprocessing
+from app.utils.ocr_postprocessing import Lexicon, OCRPostProcessor, get_postprocessor, improve_ocr_text
+
+
+@pytest.fixture
+def processor():
+    return OCRPostProcessor()
+
+
+def test_spacing_rules(processor):
+    """Test espaces manquants, ponctuation française, nombres conservés"""
+    assert processor.process("Bonjour!Comment allez-vous?") == "Bonjour ! Comment allez-vous ?"
+    assert processor.process("Il est 12:30 , total 3,5 €.") == "Il est 12:30, total 3,5 €."
+    assert processor.process("de12euros.Merci") == "de 12 euros. Merci"
+    assert processor.process('il dit "oui" puis "non".') == 'il dit "oui" puis "non".'
+    assert processor.process("motMinuscule") == "mot Minuscule"
+
+
+def test_accents_apostrophes_and_lines_preserved(processor):
+    """Test mots accentués et apostrophes intacts, lignes conservées, encodage corrigé"""
+    text = "l'été  à   Paris\nDeuxième ligne\nÃ©tÃ© trop tÃ´t"
+
+    assert processor.process(text) == "l'été à Paris\nDeuxième ligne\nété trop tôt"
+
+
+def test_correct_text_left_intact(processor):
+    """Test trémas, sigles, ordinaux et références non modifiés"""
+    assert processor.process("Müller GmbH") == "Müller GmbH"
+    assert processor.process("Noël et Zoë, naïf") == "Noël et Zoë, naïf"
+    assert processor.process("le 1er mars, la 2ème fois, le 3e jour") == "le 1er mars, la 2ème fois, le 3e jour"
+    assert processor.process("Facture FAC2024 au format A4") == "Facture FAC2024 au format A4"
+    assert processor.process("eBay et iPhone") == "eBay et iPhone"
+
+
+def test_glued_words(processor):
+    """Test mots collés connus et découpage sur le lexique"""
+    assert processor.process("Cest quand il vient") == "C'est quand il vient"
+    assert processor.process("ceciestpourtouslesautres") == "ceci est pour tous les autres"
+    # Découpage impossible sur le lexique : mot conservé, pas haché en morceaux
+    assert processor.process("gouvernement anticonstitutionnellement") == \
+        "gouvernement anticonstitutionnellement"
+
+
+def test_lexicon_split_prefers_fewest_words():
+    """Test programmation dynamique : le moins de morceaux, casse d'origine conservée"""
+    lexicon = Lexicon(["la", "plu", "part", "plupart", "pour"])
+
+    assert lexicon.split("PourLaPlupart") == ["Pour", "La", "Plupart"]
+    assert lexicon.split("pourlaxplupart") is None
+    assert lexicon.split("plupart") is None
+
+
+def test_garbage_is_linear(processor):
+    """Test longues suites de lettres : temps linéaire"""
+    start = time.perf_counter()
+    processor.process("a" * 100_000 + " " + "lesdeslaune" * 5_000)
+
+    assert time.perf_counter() - start < 2
+
+
+def test_improve_ocr_text_reuses_instance(monkeypatch):
+    """Test improve_ocr_text ne reconstruit pas le post-processeur"""
+    get_postprocessor()
+    monkeypatch.setattr(ocr_postprocessing, "_load_lexicon", lambda: pytest.fail("lexique reconstruit"))
+
+    result = improve_ocr_text("Bonjour!")
+
+    assert result["improved"] == "Bonjour !"
+    assert result["improvements_made"]
+
+
+def test_lexicon_file(tmp_path, monkeypatch):
+    """Test lexique complété par OCR_LEXICON_PATH"""
+    path = tmp_path / "mots.txt"
+    path.write_text("facture\nmontant\n", encoding="utf-8")
+    monkeypatch.setenv("OCR_LEXICON_PATH", str(path))
+
+    assert OCRPostProcessor().process("facturemontant total") == "facture montant total"